@@ -976,7 +976,10 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
               regularizeFactor=0, verbosity=0, check=False,
               check_jacobian=False, gatestringWeights=None,
               gateLabelAliases=None, memLimit=None, comm=None,
-              distributeMethod = "deriv", profiler=None):
+              distributeMethod = "deriv", profiler=None,
+              evaltree_cache_dir=None, evaltree_cache=None, calibrate_evaltree=False,
+              stream_jacobian=False, checkpoint=None, lm_state=None,
+              reuse_lm_buffers=False):
     """
     Performs Least-Squares Gate Set Tomography on the dataset.
 
@@ -1074,6 +1077,49 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
     profiler : Profiler, optional
         A profiler object used for to track timing and memory usage.
 
+    evaltree_cache_dir : str or EvalTreeDiskCache, optional
+        If not None, a directory (or :class:`EvalTreeDiskCache`) in which
+        the evaluation trees built for this computation are saved, and from
+        which identical trees are loaded by later calls (e.g. later runs on
+        the same experiment design) instead of being rebuilt.
+
+    evaltree_cache : dict, optional
+        A dictionary which serves as an in-memory cache for the computed
+        EvalTree used in this computation, as for :func:`do_mlgst`.  If the
+        cached tree is for a different list of gate strings, whose strings
+        begin `gateStringsToUse` (as in iterative GST), it is extended
+        rather than building a new tree from scratch.
+
+    calibrate_evaltree : bool, optional
+        If True, the evaluation tree is split using operation costs measured
+        on this machine (see :method:`GateSet.bulk_evaltree_from_resources`)
+        so that processors are given balanced amounts of work.
+
+    stream_jacobian : bool, optional
+        If True, the full jacobian of the objective function is never held
+        in memory.  Instead, the normal equations used by the optimizer are
+        accumulated one evaluation sub-tree at a time, so that (together with
+        `memLimit`, which determines the sub-trees) much larger gate string
+        lists can be fit.  In this case `check_jacobian` is ignored.
+
+    checkpoint : GSTCheckpoint, optional
+        If not None, the state of the optimizer is saved to this checkpoint
+        (under its current `stage`) after every optimizer iteration, and
+        an optimization interrupted at the same stage is resumed from it.
+
+    lm_state : dict, optional
+        If not None, a dictionary used to warm-start the optimizer's damping
+        parameter with the `'mu'` and `'jtj_scale'` values it holds (if any),
+        and which is updated with the optimizer's final state (see
+        :func:`custom_leastsq`).  Passing the same dictionary to a sequence
+        of related optimizations carries the damping from one to the next.
+
+    reuse_lm_buffers : bool, optional
+        If True, the optimizer reuses its normal-equation arrays and
+        factorizes them once per iteration, rather than once per trial
+        damping parameter (see the `reuse_buffers` argument of
+        :func:`custom_leastsq`).  This pays off for gate sets with many
+        (thousands of) parameters.
 
     Returns
     -------
@@ -1112,7 +1158,10 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
     C = 1.0/1024.0**3
 
     #  Estimate & check persistent memory (from allocs directly below)
-    persistentMem = 8* (ng*(ns + ns*ne + 1 + 3*ns)) # final results in bytes
+    if stream_jacobian: # only JTJ, not the jacobian, is held
+        persistentMem = 8* (ng*(ns + 1 + 3*ns) + ne*ne) # final results in bytes
+    else:
+        persistentMem = 8* (ng*(ns + ns*ne + 1 + 3*ns)) # final results in bytes
     if memLimit is not None and memLimit < persistentMem:
         raise MemoryError("Memory limit (%g GB) is " % (memLimit*C) +
                           "< memory required to hold final results (%g GB)"
@@ -1129,9 +1178,25 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
                     (curMem*C, persistentMem*C, gthrMem*C))
     else: gthrMem = mlim = None
     
-    evTree, wrtBlkSize,_, lookup, outcomes_lookup = gs.bulk_evaltree_from_resources(
-        gateStringsToUse, comm, mlim, distributeMethod,
-        ["bulk_fill_probs","bulk_fill_dprobs"], printer-1) 
+    if evaltree_cache and 'evTree' in evaltree_cache \
+            and evaltree_cache.get('gatestrings',None) == gateStringsToUse:
+        evTree = evaltree_cache['evTree']
+        wrtBlkSize = evaltree_cache['wrtBlkSize']
+        lookup = evaltree_cache['lookup']
+        outcomes_lookup = evaltree_cache['outcomes_lookup']
+    else:
+        evTree, wrtBlkSize,_, lookup, outcomes_lookup = gs.bulk_evaltree_from_resources(
+            gateStringsToUse, comm, mlim, distributeMethod,
+            ["bulk_fill_probs","bulk_fill_dprobs"], printer-1,
+            evaltree_cache_dir, (evaltree_cache or {}).get('evTree',None),
+            calibrate_evaltree)
+
+        if evaltree_cache is not None:
+            evaltree_cache['evTree'] = evTree
+            evaltree_cache['wrtBlkSize'] = wrtBlkSize
+            evaltree_cache['lookup'] = lookup
+            evaltree_cache['outcomes_lookup'] = outcomes_lookup
+            evaltree_cache['gatestrings'] = list(gateStringsToUse)
     profiler.add_time("do_mc2gst: pre-opt treegen",tStart)
 
     KM = evTree.num_final_elements() #shorthand for combined spam+gatestring dimension
@@ -1161,7 +1226,10 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
     #  (must be AFTER possible gate string permutation by
     #   tree and initialization of dsGateStringsToUse)
     probs  = _np.empty( KM, 'd' )
-    jac    = _np.empty( (KM+ex,vec_gs_len), 'd')
+    if stream_jacobian: # just the "extra" rows of the jacobian
+        jac    = _np.empty( (ex,vec_gs_len), 'd')
+    else:
+        jac    = _np.empty( (KM+ex,vec_gs_len), 'd')
 
     N =_np.empty( KM, 'd') 
     f =_np.empty( KM, 'd')
@@ -1176,16 +1244,11 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
     #                         = (p - f)^2 * ( ((1-p) + p)/(p*(1-p)) )
     #                         = 1/(p*(1-p)) * (p - f)^2
 
-    for (i,gateStr) in enumerate(dsGateStringsToUse):
-        N[ lookup[i] ] = dataset[gateStr].total
-        f[ lookup[i] ] = [ dataset[gateStr].fraction(x) for x in outcomes_lookup[i] ]
-        if useFreqWeightedChiSq:
-            wts = []
-            for x in outcomes_lookup[i]:
-                Nx = dataset[gateStr].total
-                f1 = dataset[gateStr].fraction(x); f2 = (f1+1)/(Nx+2)
-                wts.append( _np.sqrt( Nx / (f2*(1-f2)) ) )
-            fweights[ lookup[i] ] = wts
+    dataset.fill_count_vecs(f, N, dsGateStringsToUse, lookup, outcomes_lookup)
+    f /= N
+    if useFreqWeightedChiSq:
+        f2 = (f+1)/(N+2)
+        fweights[:] = _np.sqrt( N / (f2*(1-f2)) )
 
     if gatestringWeights is not None:
         for i in range(len(gateStringsToUse)):
@@ -1436,6 +1499,34 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
             return jac
 
 
+    if stream_jacobian: # Streaming version: compute normal eqns instead of jacobian
+        _objective_func, last_objective = _remember_last_objective(_objective_func)
+        def _jacobian(vectorGS):
+            tm = _time.time()
+            if 'x' in last_objective and _np.array_equal(last_objective['x'], vectorGS):
+                v = last_objective['f'] # gs's vector & probs are already those at vectorGS
+            else:
+                v = _objective_func(vectorGS) # sets gs's vector & fills probs
+            weights  = _get_weights( probs )
+
+            if regularizeFactor != 0:
+                jac[:,:] = _np.diag( [ (regularizeFactor * _np.sign(x) if abs(x) > 1.0 else 0.0) for x in vectorGS ] )
+            else:
+                off = 0
+                if cptp_penalty_factor != 0:
+                    off += _cptp_penalty_jac_fill(jac[off:,:], gs, cptp_penalty_factor,
+                                                  gateBasis)
+                if spam_penalty_factor != 0:
+                    off += _spam_penalty_jac_fill(jac[off:,:], gs, spam_penalty_factor,
+                                                  gateBasis)
+
+            JTJ, JTf = _stream_normal_eqs(
+                gs, evTree, weights+(probs-f)*_get_dweights(probs, weights), v, jac,
+                probClipInterval, check, comm, wrtBlkSize, profiler, gthrMem)
+            profiler.add_time("do_mc2gst: JACOBIAN",tm)
+            return JTJ, JTf
+
+
     profiler.add_time("do_mc2gst: pre-opt",tStart)
 
 
@@ -1444,14 +1535,20 @@ def do_mc2gst(dataset, startGateset, gateStringsToUse,
     x0 = gs.to_vector()
     if isinstance(tol,float): tol = {'relx': 1e-8, 'relf': tol, 'f': 1.0, 'jac': tol }
     if CUSTOMLM:
-        opt_x,converged,msg = _opt.custom_leastsq(
+        opt_x,converged,msg,opt_state = _opt.custom_leastsq(
             _objective_func, _jacobian, x0, f_norm2_tol=tol['f'],
             jac_norm_tol=tol['jac'], rel_ftol=tol['relf'], rel_xtol=tol['relx'],
             max_iter=maxiter, comm=comm,
-            verbosity=printer-1, profiler=profiler)
+            verbosity=printer-1, profiler=profiler, normal_eqs=stream_jacobian,
+            init_state=_lm_init_state(checkpoint, lm_state, len(x0)),
+            state_callback=checkpoint.save_lm_state if (checkpoint is not None) else None,
+            return_state=True, reuse_buffers=reuse_lm_buffers)
+        if lm_state is not None: lm_state.update(opt_state)
         printer.log("Least squares message = %s" % msg,2)
         assert(converged), "Failed to converge: %s" % msg
     else:
+        assert(not stream_jacobian), "`stream_jacobian` requires the custom LM optimizer"
+        assert(checkpoint is None), "`checkpoint` requires the custom LM optimizer"
         opt_x, _, _, msg, flag = \
             _spo.leastsq( _objective_func, x0, xtol=tol['relx'], ftol=tol['relf'], gtol=tol['jac'],
                           maxfev=maxfev*(len(x0)+1), full_output=True, Dfun=_jacobian )
@@ -1736,7 +1833,10 @@ def do_iterative_mc2gst(dataset, startGateset, gateStringSetsToUseInEstimation,
                         check=False, check_jacobian=False,
                         gatestringWeightsDict=None, gateLabelAliases=None,
                         memLimit=None, profiler=None, comm=None, 
-                        distributeMethod = "deriv"):
+                        distributeMethod = "deriv", evaltree_cache_dir=None,
+                        calibrate_evaltree=False, stream_jacobian=False,
+                        checkpoint=None, warm_start=False,
+                        reuse_lm_buffers=False):
     """
     Performs Iterative Minimum Chi^2 Gate Set Tomography on the dataset.
 
@@ -1845,6 +1945,44 @@ def do_iterative_mc2gst(dataset, startGateset, gateStringSetsToUseInEstimation,
         when comm is not None).  "gatestrings" will divide the list of
         gatestrings; "deriv" will divide the columns of the jacobian matrix.
 
+    evaltree_cache_dir : str or EvalTreeDiskCache, optional
+        If not None, a directory (or :class:`EvalTreeDiskCache`) in which
+        the evaluation trees built for this computation are saved, and from
+        which identical trees are loaded by later calls (e.g. later runs on
+        the same experiment design) instead of being rebuilt.
+
+    calibrate_evaltree : bool, optional
+        If True, the evaluation tree is split using operation costs measured
+        on this machine (see :method:`GateSet.bulk_evaltree_from_resources`)
+        so that processors are given balanced amounts of work.
+
+    stream_jacobian : bool, optional
+        If True, the full jacobian of the objective function is never held
+        in memory.  Instead, the normal equations used by the optimizer are
+        accumulated one evaluation sub-tree at a time, so that (together with
+        `memLimit`, which determines the sub-trees) much larger gate string
+        lists can be fit.
+
+    checkpoint : GSTCheckpoint, optional
+        If not None, the result of each iteration (and the optimizer state
+        within an iteration) is saved to this checkpoint, so that a job which
+        is killed can be restarted without repeating finished iterations.
+        Progress saved by a run with different gate string lists, starting
+        gate set or objective function settings is discarded.
+
+    warm_start : bool, optional
+        If True, the damping parameter of the optimizer is carried from each
+        optimization to the next (rescaled to the new objective function)
+        rather than being re-initialized, which typically saves several
+        optimizer iterations per iteration.
+
+    reuse_lm_buffers : bool, optional
+        If True, the optimizer reuses its normal-equation arrays and
+        factorizes them once per iteration, rather than once per trial
+        damping parameter (see the `reuse_buffers` argument of
+        :func:`custom_leastsq`).  This pays off for gate sets with many
+        (thousands of) parameters.
+
 
     Returns
     -------
@@ -1872,9 +2010,20 @@ def do_iterative_mc2gst(dataset, startGateset, gateStringSetsToUseInEstimation,
     #Run MC2GST iteratively on given sets of estimatable strings
     lsgstGatesets = [ ]; minErrs = [ ] #for returnAll == True case
     lsgstGateset = startGateset.copy(); nIters = len(gateStringLists)    
+    evaltree_cache = {} # each iteration's tree is extended by the next one
     tStart = _time.time()
     tRef = tStart
 
+    lmState = {} if warm_start else None # optimizer state carried between iterations
+    nRestored = 0 # number of checkpointed iterations used so far
+    if checkpoint is not None:
+        checkpoint.begin( checkpoint.key(
+            "do_iterative_mc2gst", gateStringLists, startGateset.to_vector(),
+            _checkpoint_data_args(dataset, gateStringLists, gateLabelAliases),
+            maxiter, maxfev, tol, cptp_penalty_factor, spam_penalty_factor, minProbClipForWeighting,
+            probClipInterval, useFreqWeightedChiSq, regularizeFactor,
+            gatestringWeightsDict, gateLabelAliases) )
+
     with printer.progress_logging(1):
         for (i, stringsToEstimate) in enumerate(gateStringLists):
             #printer.log('', 2)
@@ -1883,6 +2032,14 @@ def do_iterative_mc2gst(dataset, startGateset, gateStringSetsToUseInEstimation,
 
             if stringsToEstimate is None or len(stringsToEstimate) == 0: continue
 
+            if checkpoint is not None and nRestored < checkpoint.num_completed:
+                minErr, lsgstGateset = checkpoint.get_completed(nRestored); nRestored += 1
+                printer.log("    Iteration %d restored from checkpoint" % (i+1),2)
+                if returnAll:
+                    lsgstGatesets.append(lsgstGateset)
+                    minErrs.append(minErr)
+                continue
+
             if gatestringWeightsDict is not None:
                 gatestringWeights = _np.ones( len(stringsToEstimate), 'd')
                 for gatestr, weight in gatestringWeightsDict.items():
@@ -1890,6 +2047,7 @@ def do_iterative_mc2gst(dataset, startGateset, gateStringSetsToUseInEstimation,
                         gatestringWeights[ stringsToEstimate.index(gatestr) ] = weight
             else: gatestringWeights = None
             lsgstGateset.basis = startGateset.basis
+            if checkpoint is not None: checkpoint.stage = "iteration %d chi2" % (i+1)
 
             minErr, lsgstGateset = \
                 do_mc2gst( dataset, lsgstGateset, stringsToEstimate,
@@ -1899,7 +2057,11 @@ def do_iterative_mc2gst(dataset, startGateset, gateStringSetsToUseInEstimation,
                            useFreqWeightedChiSq, regularizeFactor,
                            printer-1, check, check_jacobian,
                            gatestringWeights, gateLabelAliases, memLimit, comm,
-                           distributeMethod, profiler)
+                           distributeMethod, profiler, evaltree_cache_dir,
+                           evaltree_cache, calibrate_evaltree, stream_jacobian,
+                           checkpoint, lmState, reuse_lm_buffers)
+            if checkpoint is not None:
+                checkpoint.complete( (minErr, lsgstGateset) ); nRestored += 1
             if returnAll:
                 lsgstGatesets.append(lsgstGateset)
                 minErrs.append(minErr)
@@ -2143,7 +2305,10 @@ def do_mlgst(dataset, startGateset, gateStringsToUse,
              poissonPicture=True, verbosity=0, check=False,
              gatestringWeights=None, gateLabelAliases=None,
              memLimit=None, comm=None,
-             distributeMethod = "deriv", profiler=None):
+             distributeMethod = "deriv", profiler=None,
+             evaltree_cache_dir=None, calibrate_evaltree=False,
+             stream_jacobian=False, checkpoint=None, lm_state=None,
+             reuse_lm_buffers=False):
 
     """
     Performs Maximum Likelihood Estimation Gate Set Tomography on the dataset.
@@ -2229,6 +2394,43 @@ def do_mlgst(dataset, startGateset, gateStringsToUse,
     profiler : Profiler, optional
         A profiler object used for to track timing and memory usage.
 
+    evaltree_cache_dir : str or EvalTreeDiskCache, optional
+        If not None, a directory (or :class:`EvalTreeDiskCache`) in which
+        the evaluation trees built for this computation are saved, and from
+        which identical trees are loaded by later calls (e.g. later runs on
+        the same experiment design) instead of being rebuilt.
+
+    calibrate_evaltree : bool, optional
+        If True, the evaluation tree is split using operation costs measured
+        on this machine (see :method:`GateSet.bulk_evaltree_from_resources`)
+        so that processors are given balanced amounts of work.
+
+    stream_jacobian : bool, optional
+        If True, the full jacobian of the objective function is never held
+        in memory.  Instead, the normal equations used by the optimizer are
+        accumulated one evaluation sub-tree at a time, so that (together with
+        `memLimit`, which determines the sub-trees) much larger gate string
+        lists can be fit.
+
+    checkpoint : GSTCheckpoint, optional
+        If not None, the state of the optimizer is saved to this checkpoint
+        (under its current `stage`) after every optimizer iteration, and
+        an optimization interrupted at the same stage is resumed from it.
+
+    lm_state : dict, optional
+        If not None, a dictionary used to warm-start the optimizer's damping
+        parameter with the `'mu'` and `'jtj_scale'` values it holds (if any),
+        and which is updated with the optimizer's final state (see
+        :func:`custom_leastsq`).  Passing the same dictionary to a sequence
+        of related optimizations carries the damping from one to the next.
+
+    reuse_lm_buffers : bool, optional
+        If True, the optimizer reuses its normal-equation arrays and
+        factorizes them once per iteration, rather than once per trial
+        damping parameter (see the `reuse_buffers` argument of
+        :func:`custom_leastsq`).  This pays off for gate sets with many
+        (thousands of) parameters.
+
 
     Returns
     -------
@@ -2241,7 +2443,12 @@ def do_mlgst(dataset, startGateset, gateStringsToUse,
                           maxfev, tol,cptp_penalty_factor, spam_penalty_factor, minProbClip,
                           probClipInterval, radius, poissonPicture, verbosity,
                           check, gatestringWeights, gateLabelAliases, memLimit,
-                          comm, distributeMethod, profiler, None, None)
+                          comm, distributeMethod, profiler, None, None,
+                          evaltree_cache_dir=evaltree_cache_dir,
+                          calibrate_evaltree=calibrate_evaltree,
+                          stream_jacobian=stream_jacobian,
+                          checkpoint=checkpoint, lm_state=lm_state,
+                          reuse_lm_buffers=reuse_lm_buffers)
 
 
 def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
@@ -2253,7 +2460,9 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
                    memLimit=None, comm=None,
                    distributeMethod = "deriv", profiler=None,
                    evaltree_cache=None, forcefn_grad=None,
-                   shiftFctr=100):
+                   shiftFctr=100, evaltree_cache_dir=None, calibrate_evaltree=False,
+                   stream_jacobian=False, checkpoint=None, lm_state=None,
+                   reuse_lm_buffers=False):
     """ 
     Same args and behavior as do_mlgst, but with additional:
     
@@ -2264,8 +2473,46 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
         in this computation.  If an empty dictionary is supplied, it is filled
         with cached values to speed up subsequent executions of this function
         which use the *same* `startGateset`, `gateStringsToUse`, `memLimit`,
-        `comm`, and `distributeMethod`.
-       
+        `comm`, and `distributeMethod`.  A cached tree for a different list of
+        gate strings which begins `gateStringsToUse` is extended instead of
+        building a new tree from scratch.
+
+    evaltree_cache_dir : str or EvalTreeDiskCache, optional
+        An on-disk evaluation tree cache, as for :func:`do_mlgst`.  This
+        persists trees between runs, whereas `evaltree_cache` only holds the
+        final tree of this call in memory.
+
+    calibrate_evaltree : bool, optional
+        If True, the evaluation tree is split using operation costs measured
+        on this machine (see :method:`GateSet.bulk_evaltree_from_resources`)
+        so that processors are given balanced amounts of work.
+
+    stream_jacobian : bool, optional
+        If True, the full jacobian of the objective function is never held
+        in memory.  Instead, the normal equations used by the optimizer are
+        accumulated one evaluation sub-tree at a time, so that (together with
+        `memLimit`, which determines the sub-trees) much larger gate string
+        lists can be fit.
+
+    checkpoint : GSTCheckpoint, optional
+        If not None, the state of the optimizer is saved to this checkpoint
+        (under its current `stage`) after every optimizer iteration, and
+        an optimization interrupted at the same stage is resumed from it.
+
+    lm_state : dict, optional
+        If not None, a dictionary used to warm-start the optimizer's damping
+        parameter with the `'mu'` and `'jtj_scale'` values it holds (if any),
+        and which is updated with the optimizer's final state (see
+        :func:`custom_leastsq`).  Passing the same dictionary to a sequence
+        of related optimizations carries the damping from one to the next.
+
+    reuse_lm_buffers : bool, optional
+        If True, the optimizer reuses its normal-equation arrays and
+        factorizes them once per iteration, rather than once per trial
+        damping parameter (see the `reuse_buffers` argument of
+        :func:`custom_leastsq`).  This pays off for gate sets with many
+        (thousands of) parameters.
+
     forcefn_grad : numpy array, optional
         An array of shape `(D,nParams)`, where `D` is the dimension of the
         (unspecified) forcing function and `nParams=startGateset.num_params()`.
@@ -2316,7 +2563,10 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
     C = 1.0/1024.0**3
 
     #  Estimate & check persistent memory (from allocs directly below)
-    persistentMem = 8* (ng*(ns + ns*ne + 1*ns)) # final results in bytes
+    if stream_jacobian: # only JTJ, not the jacobian, is held
+        persistentMem = 8* (ng*(ns + 1*ns) + ne*ne) # final results in bytes
+    else:
+        persistentMem = 8* (ng*(ns + ns*ne + 1*ns)) # final results in bytes
     if memLimit is not None and memLimit < persistentMem:
         raise MemoryError("Memory limit (%g GB) is " % (memLimit*C) +
                           "< memory required to hold final results (%g GB)"
@@ -2333,20 +2583,27 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
     else: gthrMem = mlim = None
     
     if evaltree_cache and 'evTree' in evaltree_cache \
-            and 'wrtBlkSize' in evaltree_cache:
+            and evaltree_cache.get('gatestrings',None) == gateStringsToUse:
         #use cache dictionary to speed multiple calls which use
         # the same gateset, gate strings, comm, memlim, etc.
         evTree = evaltree_cache['evTree']
         wrtBlkSize = evaltree_cache['wrtBlkSize']
+        lookup = evaltree_cache['lookup']
+        outcomes_lookup = evaltree_cache['outcomes_lookup']
     else:
         evTree, wrtBlkSize,_,lookup,outcomes_lookup = gs.bulk_evaltree_from_resources(
             gateStringsToUse, comm, mlim, distributeMethod,
-            ["bulk_fill_probs","bulk_fill_dprobs"], printer-1)
+            ["bulk_fill_probs","bulk_fill_dprobs"], printer-1,
+            evaltree_cache_dir, (evaltree_cache or {}).get('evTree',None),
+            calibrate_evaltree)
         
         #Fill cache dict if one was given
         if evaltree_cache is not None:
             evaltree_cache['evTree'] = evTree
             evaltree_cache['wrtBlkSize'] = wrtBlkSize
+            evaltree_cache['lookup'] = lookup
+            evaltree_cache['outcomes_lookup'] = outcomes_lookup
+            evaltree_cache['gatestrings'] = list(gateStringsToUse)
 
     KM = evTree.num_final_elements() #shorthand for combined spam+gatestring dimension
     
@@ -2372,14 +2629,15 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
     #Allocate peristent memory
     cntVecMx = _np.empty( KM, 'd' )
     probs = _np.empty( KM, 'd' )
-    jac    = _np.empty( (KM+ex,vec_gs_len), 'd' )
+    if stream_jacobian: # just the "extra" rows of the jacobian
+        jac    = _np.empty( (ex,vec_gs_len), 'd' )
+    else:
+        jac    = _np.empty( (KM+ex,vec_gs_len), 'd' )
 
 
     cntVecMx = _np.empty(KM, 'd' )
     totalCntVec = _np.empty(KM, 'd' )
-    for (i,gateStr) in enumerate(dsGateStringsToUse):
-        totalCntVec[ lookup[i] ] = dataset[gateStr].total
-        cntVecMx[ lookup[i] ] = [ dataset[gateStr][x] for x in outcomes_lookup[i] ]
+    dataset.fill_count_vecs(cntVecMx, totalCntVec, dsGateStringsToUse, lookup, outcomes_lookup)
 
     logL_upperbound = _tools.logl_max(gs, dataset, dsGateStringsToUse,
                                       poissonPicture) # The theoretical upper bound on the log(likelihood)
@@ -2474,16 +2732,7 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
         #  if p <  p_min then term == sqrt( N_{i,sl} * -log(p_min) + N[i] * p_min + S*(p-p_min) )
         #   and deriv == 0.5 / sqrt(...) * S * dp
 
-        def _jacobian(vectorGS):
-            tm = _time.time()
-            dprobs = jac[0:KM,:] #avoid mem copying: use jac mem for dprobs
-            dprobs.shape = (KM,vec_gs_len)
-            gs.from_vector(vectorGS)
-            gs.bulk_fill_dprobs(dprobs, evTree,
-                                prMxToFill=probs, clipTo=probClipInterval,
-                                check=check, comm=comm, wrtBlockSize=wrtBlkSize,
-                                profiler=profiler, gatherMemLimit=gthrMem)
-
+        def _get_dprobs_factor(probs):
             pos_probs = _np.where(probs < min_p, min_p, probs)
             S = minusCntVecMx / min_p + totalCntVec
             S2 = -0.5 * minusCntVecMx / (min_p**2)
@@ -2498,8 +2747,18 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
             dprobs_factor_neg = (0.5 / v) * (S + 2*S2*(probs - min_p))
             dprobs_factor_zerofreq = (0.5 / v) * totalCntVec * _np.where( probs >= a, 1.0, (-1.0/a**2)*probs**2 + 2*probs/a )
             dprobs_factor = _np.where( probs < min_p, dprobs_factor_neg, dprobs_factor_pos)
-            dprobs_factor = _np.where( minusCntVecMx == 0, dprobs_factor_zerofreq, dprobs_factor )
-            dprobs *= dprobs_factor[:,None] # (KM,N) * (KM,1)   (N = dim of vectorized gateset)
+            return _np.where( minusCntVecMx == 0, dprobs_factor_zerofreq, dprobs_factor )
+
+        def _jacobian(vectorGS):
+            tm = _time.time()
+            dprobs = jac[0:KM,:] #avoid mem copying: use jac mem for dprobs
+            dprobs.shape = (KM,vec_gs_len)
+            gs.from_vector(vectorGS)
+            gs.bulk_fill_dprobs(dprobs, evTree,
+                                prMxToFill=probs, clipTo=probClipInterval,
+                                check=check, comm=comm, wrtBlockSize=wrtBlkSize,
+                                profiler=profiler, gatherMemLimit=gthrMem)
+            dprobs *= _get_dprobs_factor(probs)[:,None] # (KM,N) * (KM,1)   (N = dim of vectorized gateset)
               #Note: this also sets jac[0:KM,:]
 
             off = 0
@@ -2572,16 +2831,7 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
         #  if p <  p_min then term == sqrt( N_{i,sl} * -log(p_min) + N[i] * p_min + S*(p-p_min) )
         #   and deriv == 0.5 / sqrt(...) * S * dp
 
-        def _jacobian(vectorGS):
-            tm = _time.time()
-            dprobs = jac[0:KM,:] #avoid mem copying: use jac mem for dprobs
-            dprobs.shape = (KM,vec_gs_len)
-            gs.from_vector(vectorGS)
-            gs.bulk_fill_dprobs(dprobs, evTree,
-                                prMxToFill=probs, clipTo=probClipInterval,
-                                check=check, comm=comm, wrtBlockSize=wrtBlkSize,
-                                profiler=profiler, gatherMemLimit=gthrMem)
-
+        def _get_dprobs_factor(probs):
             pos_probs = _np.where(probs < min_p, min_p, probs)
             S = minusCntVecMx / min_p
             S2 = -0.5 * minusCntVecMx / (min_p**2)
@@ -2595,8 +2845,18 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
             dprobs_factor_pos = (0.5 / v) * (minusCntVecMx / pos_probs)
             dprobs_factor_neg = (0.5 / v) * (S + 2*S2*(probs - min_p))
             dprobs_factor = _np.where( probs < min_p, dprobs_factor_neg, dprobs_factor_pos)
-            dprobs_factor = _np.where( minusCntVecMx == 0, 0.0, dprobs_factor )
-            dprobs *= dprobs_factor[:,None] # (KM,N) * (KM,1)   (N = dim of vectorized gateset)
+            return _np.where( minusCntVecMx == 0, 0.0, dprobs_factor )
+
+        def _jacobian(vectorGS):
+            tm = _time.time()
+            dprobs = jac[0:KM,:] #avoid mem copying: use jac mem for dprobs
+            dprobs.shape = (KM,vec_gs_len)
+            gs.from_vector(vectorGS)
+            gs.bulk_fill_dprobs(dprobs, evTree,
+                                prMxToFill=probs, clipTo=probClipInterval,
+                                check=check, comm=comm, wrtBlockSize=wrtBlkSize,
+                                profiler=profiler, gatherMemLimit=gthrMem)
+            dprobs *= _get_dprobs_factor(probs)[:,None] # (KM,N) * (KM,1)   (N = dim of vectorized gateset)
               #Note: this also sets jac[0:KM,:]
 
             off = 0
@@ -2615,6 +2875,31 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
             profiler.add_time("do_mlgst: JACOBIAN",tm)
             return jac
 
+    if stream_jacobian: # Streaming version: compute normal eqns instead of jacobian
+        _objective_func, last_objective = _remember_last_objective(_objective_func)
+        def _jacobian(vectorGS):
+            tm = _time.time()
+            if 'x' in last_objective and _np.array_equal(last_objective['x'], vectorGS):
+                v = last_objective['f'] # gs's vector & probs are already those at vectorGS
+            else:
+                v = _objective_func(vectorGS) # sets gs's vector & fills probs
+
+            off = 0
+            if cptp_penalty_factor != 0:
+                off += _cptp_penalty_jac_fill(jac[off:,:], gs, cptp_penalty_factor,
+                                              gateBasis)
+            if spam_penalty_factor != 0:
+                off += _spam_penalty_jac_fill(jac[off:,:], gs, spam_penalty_factor,
+                                              gateBasis)
+            if forcefn_grad is not None:
+                jac[forceOffset-KM:,:] = -forcefn_grad
+
+            JTJ, JTf = _stream_normal_eqs(
+                gs, evTree, _get_dprobs_factor(probs), v, jac,
+                probClipInterval, check, comm, wrtBlkSize, profiler, gthrMem)
+            profiler.add_time("do_mlgst: JACOBIAN",tm)
+            return JTJ, JTf
+
     profiler.add_time("do_mlgst: pre-opt",tStart)
 
     #Run optimization (use leastsq)
@@ -2622,14 +2907,20 @@ def _do_mlgst_base(dataset, startGateset, gateStringsToUse,
     x0 = gs.to_vector()
     if isinstance(tol,float): tol = {'relx': 1e-8, 'relf': tol, 'f': 1.0, 'jac': tol }
     if CUSTOMLM:
-        opt_x,converged,msg = _opt.custom_leastsq(
+        opt_x,converged,msg,opt_state = _opt.custom_leastsq(
             _objective_func, _jacobian, x0, f_norm2_tol=tol['f'],
             jac_norm_tol=tol['jac'], rel_ftol=tol['relf'], rel_xtol=tol['relx'],
             max_iter=maxiter, comm=comm,
-            verbosity=printer-1, profiler=profiler)
+            verbosity=printer-1, profiler=profiler, normal_eqs=stream_jacobian,
+            init_state=_lm_init_state(checkpoint, lm_state, len(x0)),
+            state_callback=checkpoint.save_lm_state if (checkpoint is not None) else None,
+            return_state=True, reuse_buffers=reuse_lm_buffers)
+        if lm_state is not None: lm_state.update(opt_state)
         printer.log("Least squares message = %s" % msg,2)
         assert(converged), "Failed to converge: %s" % msg
     else:
+        assert(not stream_jacobian), "`stream_jacobian` requires the custom LM optimizer"
+        assert(checkpoint is None), "`checkpoint` requires the custom LM optimizer"
         opt_x, _, _, msg, flag = \
             _spo.leastsq( _objective_func, x0, xtol=tol['relx'], ftol=tol['relx'], gtol=0,
                           maxfev=maxfev*(len(x0)+1), full_output=True, Dfun=_jacobian )
@@ -2731,7 +3022,10 @@ def do_iterative_mlgst(dataset, startGateset, gateStringSetsToUseInEstimation,
                        verbosity=0, check=False, gatestringWeightsDict=None,
                        gateLabelAliases=None, memLimit=None, 
                        profiler=None, comm=None, distributeMethod = "deriv",
-                       alwaysPerformMLE=False):
+                       alwaysPerformMLE=False, evaltree_cache_dir=None,
+                       calibrate_evaltree=False, stream_jacobian=False,
+                       checkpoint=None, warm_start=False,
+                       reuse_lm_buffers=False):
     """
     Performs Iterative Maximum Liklihood Estimation Gate Set Tomography on the dataset.
 
@@ -2840,6 +3134,44 @@ def do_iterative_mlgst(dataset, startGateset, gateStringSetsToUseInEstimation,
         when comm is not None).  "gatestrings" will divide the list of
         gatestrings; "deriv" will divide the columns of the jacobian matrix.
 
+    evaltree_cache_dir : str or EvalTreeDiskCache, optional
+        If not None, a directory (or :class:`EvalTreeDiskCache`) in which
+        the evaluation trees built for each iteration are saved, and from
+        which identical trees are loaded by later runs instead of being
+        rebuilt.
+
+    calibrate_evaltree : bool, optional
+        If True, the evaluation tree is split using operation costs measured
+        on this machine (see :method:`GateSet.bulk_evaltree_from_resources`)
+        so that processors are given balanced amounts of work.
+
+    stream_jacobian : bool, optional
+        If True, the full jacobian of the objective function is never held
+        in memory.  Instead, the normal equations used by the optimizer are
+        accumulated one evaluation sub-tree at a time, so that (together with
+        `memLimit`, which determines the sub-trees) much larger gate string
+        lists can be fit.
+
+    checkpoint : GSTCheckpoint, optional
+        If not None, the result of each iteration (and the optimizer state
+        within an iteration) is saved to this checkpoint, so that a job which
+        is killed can be restarted without repeating finished iterations.
+        Progress saved by a run with different gate string lists, starting
+        gate set or objective function settings is discarded.
+
+    warm_start : bool, optional
+        If True, the damping parameter of the optimizer is carried from each
+        optimization to the next (rescaled to the new objective function)
+        rather than being re-initialized, which typically saves several
+        optimizer iterations per iteration.
+
+    reuse_lm_buffers : bool, optional
+        If True, the optimizer reuses its normal-equation arrays and
+        factorizes them once per iteration, rather than once per trial
+        damping parameter (see the `reuse_buffers` argument of
+        :func:`custom_leastsq`).  This pays off for gate sets with many
+        (thousands of) parameters.
+
     alwaysPerformMLE : bool, optional
         When True, perform a maximum-likelihood estimate after *every* iteration,
         not just the final one.  When False, chi2 minimization is used for all
@@ -2873,9 +3205,20 @@ def do_iterative_mlgst(dataset, startGateset, gateStringSetsToUseInEstimation,
     #Run extended MLGST iteratively on given sets of estimatable strings
     mleGatesets = [ ]; maxLogLs = [ ] #for returnAll == True case
     mleGateset = startGateset.copy(); nIters = len(gateStringLists)
+    evaltree_cache = {} # each iteration's tree is extended by the next one
     tStart = _time.time()
     tRef = tStart
 
+    lmState = {} if warm_start else None # optimizer state carried between stages
+    nRestored = 0 # number of checkpointed iterations used so far
+    if checkpoint is not None:
+        checkpoint.begin( checkpoint.key(
+            "do_iterative_mlgst", gateStringLists, startGateset.to_vector(),
+            _checkpoint_data_args(dataset, gateStringLists, gateLabelAliases),
+            maxiter, maxfev, tol, cptp_penalty_factor, spam_penalty_factor, minProbClip,
+            probClipInterval, radius, poissonPicture, useFreqWeightedChiSq,
+            gatestringWeightsDict, gateLabelAliases, alwaysPerformMLE) )
+
     with printer.progress_logging(1):
         for (i,stringsToEstimate) in enumerate(gateStringLists):
             #printer.log('', 2)
@@ -2886,6 +3229,14 @@ def do_iterative_mlgst(dataset, startGateset, gateStringSetsToUseInEstimation,
 
             if stringsToEstimate is None or len(stringsToEstimate) == 0: continue
 
+            if checkpoint is not None and nRestored < checkpoint.num_completed:
+                maxLogL, mleGateset = checkpoint.get_completed(nRestored); nRestored += 1
+                printer.log("Iteration %d restored from checkpoint" % (i+1),2)
+                if returnAll:
+                    mleGatesets.append(mleGateset)
+                    maxLogLs.append(maxLogL)
+                continue
+
             if gatestringWeightsDict is not None:
                 gatestringWeights = _np.ones( len(stringsToEstimate), 'd')
                 for gatestr, weight in gatestringWeightsDict.items():
@@ -2896,20 +3247,32 @@ def do_iterative_mlgst(dataset, startGateset, gateStringSetsToUseInEstimation,
             mleGateset.basis = startGateset.basis 
               #set basis in case of CPTP constraints
 
+            if checkpoint is not None: checkpoint.stage = "iteration %d chi2" % (i+1)
+
             _, mleGateset = do_mc2gst(dataset, mleGateset, stringsToEstimate,
                                       maxiter, maxfev, tol, cptp_penalty_factor,
                                       spam_penalty_factor, minProbClip, probClipInterval,
                                       useFreqWeightedChiSq, 0,printer-1, check,
                                       check, gatestringWeights, gateLabelAliases,
-                                      memLimit, comm, distributeMethod, profiler)
+                                      memLimit, comm, distributeMethod, profiler,
+                                      evaltree_cache_dir, evaltree_cache,
+                                      calibrate_evaltree, stream_jacobian, checkpoint,
+                                      lmState, reuse_lm_buffers)
 
             if alwaysPerformMLE:
-                _, mleGateset = do_mlgst(dataset, mleGateset, stringsToEstimate,
-                                         maxiter, maxfev, tol,
-                                         cptp_penalty_factor, spam_penalty_factor,
-                                         minProbClip, probClipInterval, radius,
-                                         poissonPicture, printer-1, check, gatestringWeights,
-                                         gateLabelAliases, memLimit, comm, distributeMethod, profiler)
+                if checkpoint is not None: checkpoint.stage = "iteration %d logl" % (i+1)
+                _, mleGateset = _do_mlgst_base(dataset, mleGateset, stringsToEstimate,
+                                               maxiter, maxfev, tol,
+                                               cptp_penalty_factor, spam_penalty_factor,
+                                               minProbClip, probClipInterval, radius,
+                                               poissonPicture, printer-1, check, gatestringWeights,
+                                               gateLabelAliases, memLimit, comm, distributeMethod, profiler,
+                                               evaltree_cache=evaltree_cache,
+                                               evaltree_cache_dir=evaltree_cache_dir,
+                                               calibrate_evaltree=calibrate_evaltree,
+                                               stream_jacobian=stream_jacobian,
+                                               checkpoint=checkpoint, lm_state=lmState,
+                                               reuse_lm_buffers=reuse_lm_buffers)
 
 
             tNxt = _time.time();
@@ -2932,12 +3295,16 @@ def do_iterative_mlgst(dataset, startGateset, gateStringSetsToUseInEstimation,
                 printer.log("Switching to ML objective (last iteration)",2)
 
                 mleGateset.basis = startGateset.basis 
+                if checkpoint is not None: checkpoint.stage = "iteration %d logl" % (i+1)
     
-                maxLogL_p, mleGateset_p = do_mlgst(
+                maxLogL_p, mleGateset_p = _do_mlgst_base(
                   dataset, mleGateset, stringsToEstimate, maxiter, maxfev, tol,
                   cptp_penalty_factor, spam_penalty_factor, minProbClip, probClipInterval, radius,
                   poissonPicture, printer-1, check, gatestringWeights, gateLabelAliases,
-                  memLimit, comm, distributeMethod, profiler)
+                  memLimit, comm, distributeMethod, profiler, evaltree_cache=evaltree_cache,
+                  evaltree_cache_dir=evaltree_cache_dir, calibrate_evaltree=calibrate_evaltree,
+                  stream_jacobian=stream_jacobian, checkpoint=checkpoint,
+                  lm_state=lmState, reuse_lm_buffers=reuse_lm_buffers)
 
                 printer.log("2*Delta(log(L)) = %g" % (2*(logL_ub - maxLogL_p)),2)
 
@@ -2953,6 +3320,9 @@ def do_iterative_mlgst(dataset, startGateset, gateStringSetsToUseInEstimation,
                 printer.log('',2) #extra newline
                 tRef=tNxt
 
+            if checkpoint is not None:
+                checkpoint.complete( (maxLogL, mleGateset) ); nRestored += 1
+
             if returnAll:
                 mleGatesets.append(mleGateset)
                 maxLogLs.append(maxLogL)
@@ -3165,6 +3535,121 @@ def _spam_penalty_jac_fill(spamPenaltyVecGradToFill, gs, prefactor, gateBasis):
     return len(gs.preps) + sum([ len(povm) for povm in gs.povms.values()])
 
 
+def _lm_init_state(checkpoint, lm_state, nParams):
+    """
+    Get the `init_state` argument of :func:`custom_leastsq`: the state saved
+    to `checkpoint` for its current stage if there is one, otherwise the
+    damping parameter held by `lm_state` (for a warm start), if any.
+    """
+    if checkpoint is not None:
+        init_state = checkpoint.get_lm_state(nParams)
+        if init_state is not None: return init_state
+    if lm_state is not None and 'mu' in lm_state:
+        return {'mu': lm_state['mu'], 'jtj_scale': lm_state['jtj_scale']}
+    return None
+
+
+def _checkpoint_data_args(dataset, gateStringLists, gateLabelAliases):
+    """
+    Helper function - the data of `dataset` used by an iterative GST
+    driver (its outcome labels and the counts of all the gate strings in
+    `gateStringLists`), as a list for a checkpoint key.
+    """
+    allStrs = []; seen = set()
+    for gsList in gateStringLists:
+        for gstr in gsList:
+            if gstr not in seen:
+                seen.add(gstr); allStrs.append(gstr)
+    dsStrs = _tools.find_replace_tuple_list(allStrs, gateLabelAliases)
+    return [ list(dataset.olIndex.items()), dataset.counts_array(dsStrs),
+             dataset.totals_array(dsStrs) ]
+
+
+def _remember_last_objective(obj_fn):
+    """
+    Helper function - wraps the objective function `obj_fn` so that the
+    point and value of its most recent evaluation are stored (as "x" and "f")
+    in the returned dictionary.  This lets a streaming jacobian function
+    reuse the probabilities already computed by the optimizer's last
+    objective-function call at the same point.
+
+    Returns
+    -------
+    wrapped_fn : function
+    last_eval : dict
+    """
+    last_eval = {}
+    def wrapped_fn(x):
+        f = obj_fn(x)
+        last_eval['x'] = _np.array(x, 'd')
+        last_eval['f'] = _np.array(f, 'd')
+        return f
+    return wrapped_fn, last_eval
+
+
+def _stream_normal_eqs(gs, evTree, dprobs_factor, objVec, extraJac,
+                       clipTo, check, comm, wrtBlockSize, profiler,
+                       gatherMemLimit):
+    """
+    Helper function - computes the normal-equation quantities `JTJ` and
+    `JTf` of a least-squares objective whose jacobian is
+    `J = [ dprobs * dprobs_factor[:,None] ; extraJac ]` and whose objective
+    vector is `objVec`, where `dprobs` are the probability derivatives of
+    `evTree`'s elements.
+
+    The probability-derivative rows are computed and accumulated one
+    sub-tree of `evTree` at a time, so that only a single sub-tree's block
+    of the jacobian is ever held in memory.  The returned quantities are
+    summed over (and the same on) all the processors of `comm`.
+
+    Returns
+    -------
+    JTJ : numpy array
+        shape (nParams,nParams)
+    JTf : numpy array
+        shape (nParams,)
+    """
+    KM = evTree.num_final_elements()
+    nP = gs.num_params()
+    JTJ = _np.zeros( (nP,nP), 'd')
+    JTf = _np.zeros( nP, 'd')
+
+    subtrees = evTree.get_sub_trees()
+    mySubTreeIndices, _, mySubComm = evTree.distribute(comm)
+    for iSubTree in mySubTreeIndices:
+        evalSubTree = subtrees[iSubTree]
+        felInds = evalSubTree.final_element_indices(evTree)
+        if evalSubTree.myFinalElsToParentFinalElsMap is not None:
+            #a sub-tree's spamtuple_indices index its *parent's* final elements,
+            # so re-index them to fill a block just big enough for the sub-tree
+            evalSubTree = evalSubTree.copy()
+            evalSubTree.recompute_spamtuple_indices(bLocal=True)
+
+        tm = _time.time()
+        jacBlk = _np.empty( (evalSubTree.num_final_elements(), nP), 'd')
+        gs.bulk_fill_dprobs(jacBlk, evalSubTree, clipTo=clipTo, check=check,
+                            comm=mySubComm, wrtBlockSize=wrtBlockSize,
+                            profiler=profiler, gatherMemLimit=gatherMemLimit)
+        jacBlk *= dprobs_factor[felInds][:,None]
+        profiler.add_time("stream_normal_eqs: dprobs block", tm)
+
+        tm = _time.time()
+        if mySubComm is None or mySubComm.Get_rank() == 0: #only count each block once
+            JTJ += _np.dot(jacBlk.T,jacBlk)
+            JTf += _np.dot(jacBlk.T,objVec[felInds])
+        profiler.add_time("stream_normal_eqs: dotprods", tm)
+        jacBlk = None #free mem
+
+    if comm is not None:
+        JTJ = comm.allreduce(JTJ)
+        JTf = comm.allreduce(JTf)
+
+    if extraJac.shape[0] > 0:
+        JTJ += _np.dot(extraJac.T,extraJac)
+        JTf += _np.dot(extraJac.T,objVec[KM:])
+    return JTJ, JTf
+
+
 def find_closest_unitary_gatemx(gateMx):
     """
     Get the closest gate matrix (by maximizing fidelity)
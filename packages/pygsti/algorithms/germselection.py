@@ -1134,7 +1134,8 @@ def build_up_breadth(gatesetList, germsList, randomize=True,
         Level of detail printed to stdout.
     """
     if comm is not None and comm.Get_size() > 1:
-        from mpi4py import MPI #not at top so pygsti doesn't require mpi4py
+        SUM = _mpit.get_op(comm, "SUM") # MPI.SUM or equivalent (mpi4py only
+        MIN = _mpit.get_op(comm, "MIN") #  imported if needed)
 
     printer = _objs.VerbosityPrinter.build_printer(verbosity, comm)
 
@@ -1241,7 +1242,7 @@ def build_up_breadth(gatesetList, germsList, randomize=True,
         if comm is not None and comm.Get_size() > 1:
             for k,gateset in enumerate(gatesetList):
                 result = _np.empty( (Np,Np), 'complex')
-                comm.Allreduce(currentDDDList[k], result, op=MPI.SUM)
+                comm.Allreduce(currentDDDList[k], result, op=SUM)
                 currentDDDList[k][:,:] = result[:,:]
                 result = None #free mem
 
@@ -1324,10 +1325,10 @@ def build_up_breadth(gatesetList, germsList, randomize=True,
         if comm is not None and comm.Get_size() > 1:
             #figure out which processor has best germ score and distribute
             # its information to the rest of the procs
-            globalMinScore = comm.allreduce(bestGermScore, op=MPI.MIN)
+            globalMinScore = comm.allreduce(bestGermScore, op=MIN)
             toSend = comm.Get_rank() if (globalMinScore == bestGermScore) \
                      else comm.Get_size()+1
-            winningRank = comm.allreduce(toSend, op=MPI.MIN)
+            winningRank = comm.allreduce(toSend, op=MIN)
             bestGermScore = globalMinScore
             toCast = iBestCandidateGerm if (comm.Get_rank() == winningRank) else None
             iBestCandidateGerm = comm.bcast(toCast, root=winningRank)
@@ -20,6 +20,7 @@ from .basis import Basis
 from .parameterized import parameterized
 from .dim import Dim
 from .smartcache import SmartCache, CustomDigestError, smart_cached
+from .localcomm import LocalComm
 
 #Imported in tools instead, since this makes more logical sense
 #from .basisconstructors import *
@@ -25,8 +25,13 @@ expdstr :: expable [ expop integer ]*
 string  :: expdstr [ [ multop ] expdstr ]*
 """
 
+import re as _re
 from ply import lex, yacc
 
+# The maximum number of gate-label runs (e.g. fiducials and germs) whose
+# parsed tuples are remembered by the fast-path parser.
+FAST_MEMO_SIZE = 100000
+
 
 class GateStringLexer:
     """ Lexer for matching and interpreting text-format gate sequences """
@@ -183,7 +188,74 @@ class GateStringParser(object):
 
     def parse(self, code):
         """ Perform lexing and parsing of `code` """
-        self._lexer.input(code)
-        result = self._parser.parse(lexer=self._lexer)
+        result = fast_parse(code)
+        if result is None: # not in the fast-path subset of the grammar (or an error)
+            self._lexer.input(code)
+            result = self._parser.parse(lexer=self._lexer)
         return result
 
+
+# Tokens of the fast path: a run of gate labels, a nop, an exponent, a
+# parenthesis, or a multiplication sign (each possibly preceded by spaces).
+_fastToken = _re.compile(r"[ \t]*(?:((?:G[a-z0-9_]+[ \t]*)+)|(\{\})|\^[ \t]*(\d+)|(\()|(\))|(\*))")
+_fastGate = _re.compile(r"G[a-z0-9_]+")
+_fastMemo = {}
+
+def fast_parse(code):
+    """
+    Parse `code` without the (slow) PLY parser, if possible.
+
+    Handles the common subset of the grammar without string references
+    (`S[...]`): gate labels, `{}`, parentheses, `*`, and single `^`
+    exponents.  The tuples of runs of gate labels (e.g. fiducials and
+    germs) are memoized, since they recur across many gate strings.
+
+    Parameters
+    ----------
+    code : str
+        The text to parse.
+
+    Returns
+    -------
+    tuple or None
+        The gate labels of `code`, or `None` if `code` is not in the
+        supported subset of the grammar or is invalid, in which case it
+        should be parsed by :class:`GateStringParser` (which reports any
+        errors).
+    """
+    levels = [[]] # a list of pieces (tuples) per open parenthesis
+    lastKind = None # kind of the last piece, when it may be exponentiated
+    needOperand = True # at start, after '*' or '('
+    pos = 0; end = len(code.rstrip(' \t'))
+    while pos < end:
+        m = _fastToken.match(code, pos)
+        if m is None: return None
+        pos = m.end()
+        run, nop, power, lparen, rparen, mult = m.groups()
+        cur = levels[-1]
+        if run is not None:
+            tup = _fastMemo.get(run,None)
+            if tup is None:
+                if len(_fastMemo) >= FAST_MEMO_SIZE: _fastMemo.clear()
+                tup = _fastMemo[run] = tuple(_fastGate.findall(run))
+            cur.append(tup); lastKind = 'run'; needOperand = False
+        elif nop is not None:
+            cur.append(()); lastKind = 'nop'; needOperand = False
+        elif power is not None:
+            if lastKind is None: return None
+            if lastKind == 'run': # exponent applies to the run's last gate
+                tup = cur[-1]; cur[-1] = tup[:-1] + tup[-1:]*int(power)
+            else: cur[-1] = cur[-1]*int(power)
+            lastKind = None
+        elif lparen is not None:
+            levels.append([]); lastKind = None; needOperand = True
+        elif rparen is not None:
+            if needOperand or len(levels) == 1: return None
+            group = sum(levels.pop(), ())
+            levels[-1].append(group); lastKind = 'group'
+        else: # mult
+            if needOperand: return None
+            lastKind = None; needOperand = True
+    if needOperand or len(levels) > 1: return None
+    return sum(levels[0], ())
+
@@ -0,0 +1,292 @@
+""" Defines the LocalComm class, a multiprocessing stand-in for an MPI communicator """
+from __future__ import division, print_function, absolute_import, unicode_literals
+#*****************************************************************
+#    pyGSTi 0.9:  Copyright 2015 Sandia Corporation
+#    This Software is released under the GPL license detailed
+#    in the file "license.txt" in the top-level pyGSTi directory
+#*****************************************************************
+
+import os as _os
+import sys as _sys
+import tempfile as _tempfile
+import traceback as _traceback
+import multiprocessing as _mp
+import numpy as _np
+
+try: import queue as _queue
+except ImportError: import Queue as _queue # Python 2
+
+#Arrays at most this size are broadcast as messages rather than through shared memory
+SMALL_BUFFER_BYTES = 65536
+
+
+def _sum(a, b, out=None):
+    if out is not None: return _np.add(a, b, out=out)
+    return a + b
+
+def _min(a, b, out=None):
+    if out is not None or isinstance(a, _np.ndarray): return _np.minimum(a, b, out=out)
+    return min(a, b) # any comparable objects, as with MPI.MIN
+
+def _max(a, b, out=None):
+    if out is not None or isinstance(a, _np.ndarray): return _np.maximum(a, b, out=out)
+    return max(a, b)
+
+
+class _LocalWorld(object):
+    """ The inter-process channels shared by all the processes of a :class:`LocalComm` run """
+    def __init__(self, ctx, nprocs):
+        self.nprocs = nprocs
+        self.inboxes = [ ctx.Queue() for i in range(nprocs) ]
+        self.errors = ctx.Queue()
+        self.abort = ctx.Event()
+        self.pending = {} # messages received before they were needed (per-process)
+        self.shmdir = "/dev/shm" if _os.path.isdir("/dev/shm") else _tempfile.gettempdir()
+
+    def first_error(self):
+        """ The traceback of the first failed non-root process, or None """
+        try: return self.errors.get(True, 1.0)
+        except _queue.Empty: return None
+
+
+class LocalComm(object):
+    """
+    A communicator for the processes of a single machine, usable wherever
+    pyGSTi accepts an `mpi4py` communicator (a `comm` argument).
+
+    A `LocalComm` implements the subset of the `mpi4py.MPI.Comm` interface
+    used by pyGSTi with `multiprocessing` queues, and moves large arrays
+    (in :method:`Bcast`, :method:`Allreduce` and pyGSTi's
+    `gather_slices`-type functions) through shared memory instead of
+    sending them as messages.  This allows multi-core computations to be
+    run from an ordinary Python session or notebook, without `mpiexec`.
+
+    Use :method:`run` to start the processes::
+
+        def job(comm):
+            return pygsti.do_long_sequence_gst(..., comm=comm)
+        results = LocalComm.run(4, job)
+    """
+
+    #Reduction operations (stand-ins for MPI.SUM, MPI.MIN & MPI.MAX)
+    SUM = staticmethod(_sum)
+    MIN = staticmethod(_min)
+    MAX = staticmethod(_max)
+
+    def __init__(self, world, ranks, rank, ident=()):
+        """
+        Create a new LocalComm.  Use :method:`run` rather than calling this
+        constructor directly.
+
+        Parameters
+        ----------
+        world : _LocalWorld
+            The channels shared by all processes.
+
+        ranks : list of ints
+            The world-ranks of this communicator's processes, indexed by
+            their rank within this communicator.
+
+        rank : int
+            The rank of the current process within this communicator.
+
+        ident : tuple, optional
+            An identifier of this communicator, distinguishing its messages
+            from those of other communicators (see :method:`Split`).
+        """
+        self._world = world
+        self._ranks = ranks
+        self._rank = rank
+        self._ident = ident
+        self._seq = 0 # number of collective operations performed so far
+        self._scratch = None; self._scratchBytes = 0
+
+    @staticmethod
+    def run(nprocs, fn, *args, **kwargs):
+        """
+        Run `fn(comm, *args, **kwargs)` on `nprocs` processes of this machine.
+
+        The current process acts as rank 0 and the others are started (by
+        forking, when available) using `multiprocessing`.
+
+        Parameters
+        ----------
+        nprocs : int
+            The number of processes.
+
+        fn : function
+            The function to run.  Its first argument is the `LocalComm`
+            shared by all the processes.
+
+        args, kwargs
+            Additional arguments to `fn`.
+
+        Returns
+        -------
+        object
+            The value returned by `fn` on rank 0.
+        """
+        get_context = getattr(_mp, 'get_context', None)
+        if get_context is None: ctx = _mp # Python 2
+        else:
+            try: ctx = get_context('fork') # so `fn` needn't be picklable
+            except ValueError: ctx = get_context()
+
+        world = _LocalWorld(ctx, nprocs)
+        procs = [ ctx.Process(target=_run_rank, args=(world, i, fn, args, kwargs))
+                  for i in range(1,nprocs) ]
+        for p in procs:
+            p.daemon = True; p.start()
+
+        try:
+            result = fn(LocalComm(world, list(range(nprocs)), 0), *args, **kwargs)
+        except BaseException:
+            world.abort.set()
+            for p in procs: p.terminate()
+            err = world.first_error()
+            if err is not None: # report the original failure of another process
+                raise RuntimeError("A LocalComm process failed:\n" + err)
+            raise
+
+        for p in procs: p.join()
+        if any([ p.exitcode != 0 for p in procs ]):
+            raise RuntimeError("A LocalComm process failed:\n" + str(world.first_error()))
+        return result
+
+    def Get_rank(self):
+        """ The rank of the current process within this communicator. """
+        return self._rank
+
+    def Get_size(self):
+        """ The number of processes in this communicator. """
+        return len(self._ranks)
+
+    rank = property(Get_rank)
+    size = property(Get_size)
+
+    def _send(self, dest, obj):
+        self._world.inboxes[self._ranks[dest]].put( (self._ident, self._seq, self._rank, obj) )
+
+    def _recv(self, src):
+        key = (self._ident, self._seq, src)
+        pending = self._world.pending
+        inbox = self._world.inboxes[self._ranks[self._rank]]
+        while key not in pending:
+            try:
+                ident, seq, frm, obj = inbox.get(True, 0.1)
+                pending[(ident, seq, frm)] = obj
+            except _queue.Empty:
+                if self._world.abort.is_set():
+                    raise RuntimeError("Another LocalComm process failed")
+        return pending.pop(key)
+
+    def bcast(self, obj, root=0):
+        """ Broadcast the (picklable) object `obj` from `root` to all processes. """
+        self._seq += 1
+        if self._rank == root:
+            for i in range(len(self._ranks)):
+                if i != root: self._send(i, obj)
+            return obj
+        return self._recv(root)
+
+    def gather(self, sendobj, root=0):
+        """ Gather one object from each process into a list on `root` (others get None). """
+        self._seq += 1
+        if self._rank == root:
+            return [ (sendobj if i == root else self._recv(i)) for i in range(len(self._ranks)) ]
+        self._send(root, sendobj)
+        return None
+
+    def allgather(self, sendobj):
+        """ Gather one object from each process into a list on every process. """
+        return self.bcast(self.gather(sendobj, 0), 0)
+
+    def allreduce(self, sendobj, op=None):
+        """ Reduce one object (e.g. a number or array) from each process with `op` (default SUM). """
+        if op is None: op = _sum
+        objs = self.allgather(sendobj)
+        result = objs[0]
+        for obj in objs[1:]: result = op(result, obj)
+        return result
+
+    def barrier(self):
+        """ Wait until all processes reach this barrier. """
+        self.allgather(None)
+    Barrier = barrier
+
+    def Split(self, color=0, key=0):
+        """
+        Split this communicator into sub-communicators, one per distinct
+        `color`, whose ranks are ordered by `key` (and then by rank here).
+        """
+        members = self.allgather( (color, key, self._rank) )
+        mine = sorted([ (k,r) for c,k,r in members if c == color ])
+        ranks = [ self._ranks[r] for k,r in mine ]
+        subRank = [ r for k,r in mine ].index(self._rank)
+        return LocalComm(self._world, ranks, subRank, self._ident + ((self._seq, color),))
+
+    def shared_scratch(self, shape, dtype='d'):
+        """
+        Get an array shared by (i.e. the same memory on) all the processes.
+
+        This is a collective operation.  The returned array is only valid
+        until the next call, which may reuse its memory.
+
+        Parameters
+        ----------
+        shape : tuple
+            The array's shape.
+
+        dtype : numpy dtype, optional
+            The array's type.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        dtype = _np.dtype(dtype)
+        nBytes = max(int(_np.prod(shape)) * dtype.itemsize, 1)
+        if nBytes > self._scratchBytes: # the same decision is made on all processes
+            path = None
+            if self._rank == 0:
+                fd, path = _tempfile.mkstemp(dir=self._world.shmdir, prefix="pygsti_localcomm_")
+                _os.ftruncate(fd, nBytes); _os.close(fd)
+            path = self.bcast(path, 0)
+            self._scratch = _np.memmap(path, dtype=_np.uint8, mode='r+', shape=(nBytes,))
+            self._scratchBytes = nBytes
+            self.barrier() # all processes have mapped the file, so it can be unlinked
+            if self._rank == 0: _os.remove(path)
+        return self._scratch[0:nBytes].view(dtype)[0:int(_np.prod(shape))].reshape(shape)
+
+    def Bcast(self, buf, root=0):
+        """ Broadcast the contents of the numpy array `buf` from `root`, in place. """
+        if buf.nbytes <= SMALL_BUFFER_BYTES:
+            data = self.bcast(buf if self._rank == root else None, root)
+            if self._rank != root: buf[...] = data
+            return
+        shared = self.shared_scratch(buf.shape, buf.dtype)
+        if self._rank == root: shared[...] = buf
+        self.barrier()
+        if self._rank != root: buf[...] = shared
+        self.barrier() # before `shared` is reused
+
+    def Allreduce(self, sendbuf, recvbuf, op=None):
+        """ Reduce the numpy arrays `sendbuf` of all processes with `op` (default SUM) into `recvbuf`. """
+        if op is None: op = _sum
+        shared = self.shared_scratch((len(self._ranks),) + sendbuf.shape, sendbuf.dtype)
+        shared[self._rank] = sendbuf
+        self.barrier()
+        recvbuf[...] = shared[0]
+        for i in range(1,len(self._ranks)):
+            op(recvbuf, shared[i], out=recvbuf)
+        self.barrier() # before `shared` is reused
+
+
+def _run_rank(world, rank, fn, args, kwargs):
+    """ The body of a non-root process started by :method:`LocalComm.run` """
+    try:
+        fn(LocalComm(world, list(range(world.nprocs)), rank), *args, **kwargs)
+    except BaseException:
+        world.errors.put("Rank %d:\n%s" % (rank, _traceback.format_exc()))
+        world.abort.set()
+        _sys.exit(1)
@@ -272,6 +272,25 @@ def do_long_sequence_gst(dataFilenameOrSet, targetGateFilenameOrSet,
         - nestedGateStringLists = True (default) / False
         - includeLGST = True / False (default is True)
         - distributeMethod = "gatestrings" or "deriv" (default)
+        - evaltreeCacheDir = str (default = None): a directory in which to
+          persist evaluation trees so later runs can skip building them.
+        - calibrateEvaltree = True / False (default): split evaluation trees
+          using operation costs measured on this machine.
+        - streamJacobian = True / False (default): never hold the full
+          jacobian in memory, accumulating the optimizer's normal equations
+          one evaluation sub-tree at a time (see `memLimit`).
+        - warmStart = True / False (default): carry the optimizer's damping
+          parameter from each iteration to the next.
+        - reuseLMBuffers = True / False (default): factorize the optimizer's
+          normal equations once per iteration, reusing their memory.
+        - numThreads = int (default = None): the number of threads each
+          process uses to compute probabilities and their derivatives (see
+          :attr:`GateSet.num_threads`).
+        - checkpointFile = str (default = None): a file to which the progress
+          of the iterative optimization is saved, so that a killed job can be
+          restarted with the same arguments without repeating finished
+          iterations (use with `evaltreeCacheDir` to also skip rebuilding
+          evaluation trees).
         - profile = int (default == 1)
         - check = True / False (default)
         - gateLabelAliases = dict (default = None)
@@ -554,6 +573,10 @@ def do_long_sequence_gst_base(dataFilenameOrSet, targetGateFilenameOrSet,
     else:
         gs_start = comm.bcast(None, root=0)
 
+    if advancedOptions.get('numThreads',None) is not None:
+        gs_start = gs_start.copy() # don't alter a user-supplied starting point
+        gs_start.num_threads = advancedOptions['numThreads']
+
     tNxt = _time.time()
     profiler.add_time('do_long_sequence_gst: Prep Initial seed',tRef); tRef=tNxt
 
@@ -587,7 +610,15 @@ def do_long_sequence_gst_base(dataFilenameOrSet, targetGateFilenameOrSet,
         profiler=profiler,
         comm=comm, distributeMethod=advancedOptions.get(
             'distributeMethod',"deriv"),
-        check=advancedOptions.get('check',False) )
+        check=advancedOptions.get('check',False),
+        evaltree_cache_dir=advancedOptions.get('evaltreeCacheDir',None),
+        calibrate_evaltree=advancedOptions.get('calibrateEvaltree',False),
+        stream_jacobian=advancedOptions.get('streamJacobian',False),
+        warm_start=advancedOptions.get('warmStart',False),
+        reuse_lm_buffers=advancedOptions.get('reuseLMBuffers',False) )
+
+    if advancedOptions.get('checkpointFile',None) is not None:
+        args['checkpoint'] = _objs.GSTCheckpoint(advancedOptions['checkpointFile'], comm)
     
     if objective == "chi2":
         args['useFreqWeightedChiSq'] = advancedOptions.get(
@@ -1279,6 +1310,13 @@ def _post_opt_processing(callerName, ds, gs_target, gs_start, lsgstLists,
                               'probClipInterval', 'check', 'gateLabelAliases',
                               'memLimit', 'comm', 'distributeMethod', 'profiler'):
                         reopt_args[x] = opt_args[x]
+                    reopt_args['evaltree_cache_dir'] = opt_args.get('evaltree_cache_dir',None)
+                    reopt_args['calibrate_evaltree'] = opt_args.get('calibrate_evaltree',False)
+                    reopt_args['stream_jacobian'] = opt_args.get('stream_jacobian',False)
+                    reopt_args['reuse_lm_buffers'] = opt_args.get('reuse_lm_buffers',False)
+                    reopt_args['checkpoint'] = opt_args.get('checkpoint',None)
+                    if reopt_args['checkpoint'] is not None:
+                        reopt_args['checkpoint'].stage = "%s re-optimization" % scale_typ
 
                     printer.log("--- Re-optimizing %s after robust data scaling ---" % objective)
                     if objective == "chi2":
@@ -12,7 +12,7 @@ from . import stdinput as _stdinput
 from .. import objects as _objs
 
 def load_dataset(filename, cache=False, collisionAction="aggregate",
-                 verbosity=1):
+                 verbosity=1, numProcs=1):
     """
     Load a DataSet from a file.  First tries to load file as a
     saved DataSet object, then as a standard text-formatted DataSet.
@@ -23,11 +23,13 @@ def load_dataset(filename, cache=False, collisionAction="aggregate",
         The name of the file
 
     cache : bool, optional
-        When set to True, a pickle file with the name filename + ".cache"
+        When set to True, a cache file with the name filename + ".cache"
         is searched for and loaded instead of filename if it exists
         and is newer than filename.  If no cache file exists or one
         exists but it is older than filename, a cache file will be
-        written after loading from filename.
+        written after loading from filename.  Cache files are written
+        with :method:`DataSet.save_columnar`, so loading one memory-maps
+        it rather than reading it.
 
     collisionAction : {"aggregate", "keepseparate"}
         Specifies how duplicate gate sequences should be handled.  "aggregate"
@@ -39,6 +41,10 @@ def load_dataset(filename, cache=False, collisionAction="aggregate",
         If zero, no output is shown.  If greater than zero,
         loading progress is shown.
 
+    numProcs : int, optional
+        The number of processes used to parse a large text-formatted
+        file (see :meth:`StdInputParser.parse_datafile`).
+
     Returns
     -------
     DataSet
@@ -71,21 +77,23 @@ def load_dataset(filename, cache=False, collisionAction="aggregate",
             # otherwise must use standard dataset file format
             parser = _stdinput.StdInputParser()
             ds = parser.parse_datafile(filename, bToStdout,
-                                       collisionAction=collisionAction)
+                                       collisionAction=collisionAction,
+                                       numProcs=numProcs)
 
             printer.log("Writing cache file (to speed future loads): %s"
                         % cache_filename)
-            ds.save(cache_filename)
+            ds.save_columnar(cache_filename) # memory-mapped when loaded
         else:
             # otherwise must use standard dataset file format
             parser = _stdinput.StdInputParser()
             ds = parser.parse_datafile(filename, bToStdout,
-                                       collisionAction=collisionAction)
+                                       collisionAction=collisionAction,
+                                       numProcs=numProcs)
         return ds
 
 
 def load_multidataset(filename, cache=False, collisionAction="aggregate",
-                      verbosity=1):
+                      verbosity=1, numProcs=1):
     """
     Load a MultiDataSet from a file.  First tries to load file as a
     saved MultiDataSet object, then as a standard text-formatted MultiDataSet.
@@ -112,6 +120,10 @@ def load_multidataset(filename, cache=False, collisionAction="aggregate",
         If zero, no output is shown.  If greater than zero,
         loading progress is shown.
 
+    numProcs : int, optional
+        The number of processes used to parse a large text-formatted
+        file (see :meth:`StdInputParser.parse_datafile`).
+
 
     Returns
     -------
@@ -145,7 +157,8 @@ def load_multidataset(filename, cache=False, collisionAction="aggregate",
             # otherwise must use standard dataset file format
             parser = _stdinput.StdInputParser()
             mds = parser.parse_multidatafile(filename, bToStdout,
-                                             collisionAction=collisionAction)
+                                             collisionAction=collisionAction,
+                                             numProcs=numProcs)
 
             printer.log("Writing cache file (to speed future loads): %s" 
                         % cache_filename)
@@ -155,7 +168,8 @@ def load_multidataset(filename, cache=False, collisionAction="aggregate",
             # otherwise must use standard dataset file format
             parser = _stdinput.StdInputParser()
             mds = parser.parse_multidatafile(filename, bToStdout,
-                                             collisionAction=collisionAction)
+                                             collisionAction=collisionAction,
+                                             numProcs=numProcs)
     return mds
 
 
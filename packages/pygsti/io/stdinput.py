@@ -12,6 +12,8 @@ import sys as _sys
 import time as _time
 import numpy as _np
 import warnings as _warnings
+import locale as _locale
+import multiprocessing as _mp
 from scipy.linalg import expm as _expm
 from collections import OrderedDict as _OrderedDict
 
@@ -20,6 +22,14 @@ from .. import tools as _tools
 
 from ..baseobjs import GateStringParser as _GateStringParser
 
+#Data files smaller than this (in bytes) are always parsed serially, as
+# process start-up and merging would outweigh any gain.
+PARALLEL_MIN_BYTES = 2**20
+
+#The number of chunks a data file is split into per parsing process, so
+# that unevenly sized chunks still keep every process busy.
+CHUNKS_PER_PROC = 4
+
 
 def get_display_progress_fn(showProgress):
     """
@@ -190,7 +200,7 @@ class StdInputParser(object):
             for line in stringfile:
                 line = line.strip()
                 if len(line) == 0 or line[0] =='#': continue
-                gatestring_list.append( _objs.GateString(self.parse_gatestring(line), line) )
+                gatestring_list.append( _objs.GateString(self.parse_gatestring(line), line, bCheck=False) )
         return gatestring_list
 
     def parse_dictfile(self, filename):
@@ -213,11 +223,11 @@ class StdInputParser(object):
                 line = line.strip()
                 if len(line) == 0 or line[0] =='#': continue
                 label, tup, s = self.parse_dictline(line)
-                lookupDict[ label ] = _objs.GateString(tup, s)
+                lookupDict[ label ] = _objs.GateString(tup, s, bCheck=False)
         return lookupDict
 
     def parse_datafile(self, filename, showProgress=True,
-                       collisionAction="aggregate"):
+                       collisionAction="aggregate", numProcs=1):
         """
         Parse a data set file into a DataSet object.
 
@@ -235,6 +245,13 @@ class StdInputParser(object):
             sequence data with by appending a final "#<number>" gate label to the
             duplicated gate sequence.
 
+        numProcs : int, optional
+            The number of processes to parse with.  When greater than one
+            and the file is at least `PARALLEL_MIN_BYTES` long, the file's
+            lines are split into contiguous chunks which are parsed
+            concurrently and then merged, giving the same result as a
+            serial parse.
+
         Returns
         -------
         DataSet
@@ -278,46 +295,57 @@ class StdInputParser(object):
         finally:
             _os.chdir(orig_cwd)
 
+        comment = "\n".join(preamble_comments)
+        if numProcs > 1 and _os.path.getsize(filename) >= PARALLEL_MIN_BYTES:
+            if fillInfo is None:
+                #Resolve the backward-compatible "default" column info up
+                # front, since only the first data line determines it.
+                firstLine = _first_dataline(filename)
+                if firstLine is not None:
+                    _,_,valueList = self.parse_dataline(firstLine, lookupDict, nDataCols)
+                    if len(valueList) > 0 and not isinstance(valueList[0],tuple):
+                        fillInfo = default_fillInfo
+
+            chunkArgs = [ ("data", filename, start, end, lookupDict, nDataCols,
+                           fillInfo, outcomeLabels, collisionAction)
+                          for start,end in _split_file(filename, numProcs*CHUNKS_PER_PROC) ]
+            pieces = _parse_chunks_in_parallel(chunkArgs, numProcs, filename, showProgress)
+            return _merge_static_datasets(pieces, collisionAction, comment)
+
         #Read data lines of data file
         dataset = _objs.DataSet(outcomeLabels=outcomeLabels,collisionAction=collisionAction,
-                                comment="\n".join(preamble_comments))
-        nLines  = 0
-        with open(filename, 'r') as datafile:
-            nLines = sum(1 for line in datafile)
-        nSkip = int(nLines / 100.0)
-        if nSkip == 0: nSkip = 1
-
-        display_progress = get_display_progress_fn(showProgress)
-
-        with open(filename, 'r') as inputfile:
-            for (iLine,line) in enumerate(inputfile):
-                if iLine % nSkip == 0 or iLine+1 == nLines: display_progress(iLine+1, nLines, filename)
-
-                line = line.strip()
-                if len(line) == 0 or line[0] == '#': continue
-                try:
-                    gateStringTuple, gateStringStr, valueList = self.parse_dataline(line, lookupDict, nDataCols)
-                except ValueError as e:
-                    raise ValueError("%s Line %d: %s" % (filename, iLine, str(e)))
-
-                if (len(dataset) == 0) and (fillInfo is None) and \
-                   (len(valueList) > 0) and (not isinstance(valueList[0],tuple)):
-                    #In order to preserve backward compatibility, if the first
-                    # data-line is not in expanded form and there was no column
-                    # header, then use "default" column label info.
-                    fillInfo = default_fillInfo
-
-                countDict = _OrderedDict()
-                self._fillDataCountDict( countDict, fillInfo, valueList )
-                if all([ (abs(v) < 1e-9) for v in list(countDict.values())]):
-                    _warnings.warn( "Dataline for gateString '%s' has zero counts and will be ignored" % gateStringStr)
-                    continue #skip lines in dataset file with zero counts (no experiments done)
-                gateStr = _objs.GateString(gateStringTuple, gateStringStr, lookup=lookupDict)
-                dataset.add_count_dict(gateStr, countDict)
-
+                                comment=comment)
+        self._fill_dataset(dataset, _enumerate_lines(filename, showProgress), filename,
+                           lookupDict, nDataCols, fillInfo, default_fillInfo)
         dataset.done_adding_data()
         return dataset
 
+    def _fill_dataset(self, dataset, lines, filename, lookupDict, nDataCols,
+                      fillInfo, default_fillInfo):
+        """ Add the data lines of `lines`, an iterable of (lineNo, line) pairs, to `dataset` """
+        for (iLine,line) in lines:
+            line = line.strip()
+            if len(line) == 0 or line[0] == '#': continue
+            try:
+                gateStringTuple, gateStringStr, valueList = self.parse_dataline(line, lookupDict, nDataCols)
+            except ValueError as e:
+                raise _DataLineError(filename, iLine, str(e))
+
+            if (len(dataset) == 0) and (fillInfo is None) and \
+               (len(valueList) > 0) and (not isinstance(valueList[0],tuple)):
+                #In order to preserve backward compatibility, if the first
+                # data-line is not in expanded form and there was no column
+                # header, then use "default" column label info.
+                fillInfo = default_fillInfo
+
+            countDict = _OrderedDict()
+            self._fillDataCountDict( countDict, fillInfo, valueList )
+            if all([ (abs(v) < 1e-9) for v in list(countDict.values())]):
+                _warnings.warn( "Dataline for gateString '%s' has zero counts and will be ignored" % gateStringStr)
+                continue #skip lines in dataset file with zero counts (no experiments done)
+            gateStr = _objs.GateString(gateStringTuple, gateStringStr, bCheck=False)
+            dataset.add_count_dict(gateStr, countDict)
+
     def _extractLabelsFromColLabels(self, colLabels ):
         outcomeLabels = []; countCols = []; freqCols = []; impliedCountTotCol1Q = (-1,-1)
 
@@ -391,7 +419,7 @@ class StdInputParser(object):
 
 
     def parse_multidatafile(self, filename, showProgress=True,
-                            collisionAction="aggregate"):
+                            collisionAction="aggregate", numProcs=1):
         """
         Parse a multiple data set file into a MultiDataSet object.
 
@@ -409,6 +437,13 @@ class StdInputParser(object):
             sequence data with by appending a final "#<number>" gate label to the
             duplicated gate sequence.
 
+        numProcs : int, optional
+            The number of processes to parse with.  When greater than one
+            and the file is at least `PARALLEL_MIN_BYTES` long, the file's
+            lines are split into contiguous chunks which are parsed
+            concurrently and then merged, giving the same result as a
+            serial parse.
+
         Returns
         -------
         MultiDataSet
@@ -446,43 +481,47 @@ class StdInputParser(object):
         finally:
             _os.chdir(orig_cwd)
 
-        #Read data lines of data file
-        datasets = _OrderedDict()
-        for dsLabel,outcomeLabels in dsOutcomeLabels.items():
-            datasets[dsLabel] = _objs.DataSet(outcomeLabels=outcomeLabels,
-                                              collisionAction=collisionAction)
+        comment = "\n".join(preamble_comments)
+        if numProcs > 1 and _os.path.getsize(filename) >= PARALLEL_MIN_BYTES:
+            chunkArgs = [ ("multidata", filename, start, end, lookupDict, nDataCols,
+                           fillInfo, dsOutcomeLabels, collisionAction)
+                          for start,end in _split_file(filename, numProcs*CHUNKS_PER_PROC) ]
+            pieces = _parse_chunks_in_parallel(chunkArgs, numProcs, filename, showProgress)
+            datasets = _OrderedDict(
+                [ (dsLabel, _merge_static_datasets([p[dsLabel] for p in pieces], collisionAction))
+                  for dsLabel in dsOutcomeLabels ] )
+        else:
+            #Read data lines of data file
+            datasets = _OrderedDict()
+            for dsLabel,outcomeLabels in dsOutcomeLabels.items():
+                datasets[dsLabel] = _objs.DataSet(outcomeLabels=outcomeLabels,
+                                                  collisionAction=collisionAction)
+            self._fill_multidatasets(datasets, _enumerate_lines(filename, showProgress),
+                                     filename, lookupDict, nDataCols, fillInfo)
+            for ds in datasets.values(): ds.done_adding_data()
+
+        mds = _objs.MultiDataSet(comment=comment)
+        for dsLabel,ds in datasets.items():
+            mds.add_dataset(dsLabel, ds)
+        return mds
 
+    def _fill_multidatasets(self, datasets, lines, filename, lookupDict, nDataCols, fillInfo):
+        """ Add the data lines of `lines`, an iterable of (lineNo, line) pairs, to `datasets` """
         dsCountDicts = _OrderedDict()
-        for dsLabel in dsOutcomeLabels: dsCountDicts[dsLabel] = {}
-
-        nLines = 0
-        with open(filename, 'r') as datafile:
-            nLines = sum(1 for line in datafile)
-        nSkip = max(int(nLines / 100.0),1)
-
-        display_progress = get_display_progress_fn(showProgress)
+        for dsLabel in datasets: dsCountDicts[dsLabel] = {}
 
-        with open(filename, 'r') as inputfile:
-            for (iLine,line) in enumerate(inputfile):
-                if iLine % nSkip == 0 or iLine+1 == nLines: display_progress(iLine+1, nLines, filename)
+        for (iLine,line) in lines:
+            line = line.strip()
+            if len(line) == 0 or line[0] == '#': continue
+            try:
+                gateStringTuple, gateStringStr, valueList = self.parse_dataline(line, lookupDict, nDataCols)
+            except ValueError as e:
+                raise _DataLineError(filename, iLine, str(e))
 
-                line = line.strip()
-                if len(line) == 0 or line[0] == '#': continue
-                try:
-                    gateStringTuple, gateStringStr, valueList = self.parse_dataline(line, lookupDict, nDataCols)
-                except ValueError as e:
-                    raise ValueError("%s Line %d: %s" % (filename, iLine, str(e)))
-
-                gateStr = _objs.GateString(gateStringTuple, gateStringStr, lookup=lookupDict)
-                self._fillMultiDataCountDicts(dsCountDicts, fillInfo, valueList)
-                for dsLabel, countDict in dsCountDicts.items():                    
-                    datasets[dsLabel].add_count_dict(gateStr, countDict)
-
-        mds = _objs.MultiDataSet(comment="\n".join(preamble_comments))
-        for dsLabel,ds in datasets.items():
-            ds.done_adding_data()
-            mds.add_dataset(dsLabel, ds)
-        return mds
+            gateStr = _objs.GateString(gateStringTuple, gateStringStr, bCheck=False)
+            self._fillMultiDataCountDicts(dsCountDicts, fillInfo, valueList)
+            for dsLabel, countDict in dsCountDicts.items():
+                datasets[dsLabel].add_count_dict(gateStr, countDict)
 
 
     #Note: outcome labels must not contain spaces since we use spaces to separate
@@ -619,7 +658,7 @@ class StdInputParser(object):
                 lastpart = parts[-1]
                 gateStringStr = line[:-len(lastpart)].strip()
                 gateStringTuple = self.parse_gatestring(gateStringStr, lookupDict)
-                gateString = _objs.GateString(gateStringTuple, gateStringStr)
+                gateString = _objs.GateString(gateStringTuple, gateStringStr, bCheck=False)
                 timeSeriesStr = lastpart.strip()
             except ValueError as e:
                 raise ValueError("%s Line %d: %s" % (filename, iLine, str(e)))
@@ -633,6 +672,171 @@ class StdInputParser(object):
 
 
 
+class _DataLineError(ValueError):
+    """ A ValueError raised by a data line, remembering where it occurred """
+    def __init__(self, filename, iLine, msg):
+        self.filename = filename
+        self.iLine = iLine
+        self.msg = msg
+        super(_DataLineError,self).__init__("%s Line %d: %s" % (filename, iLine, msg))
+
+
+def _enumerate_lines(filename, showProgress):
+    """
+    Iterate over the (lineNo, line) pairs of a file, displaying progress by
+    the fraction of the file read so the file needn't be read twice.
+    """
+    display_progress = get_display_progress_fn(showProgress)
+    nChars = max(_os.path.getsize(filename),1)
+    nSkip = max(nChars / 100.0, 1)
+    nRead = 0; nextDisplay = 0
+    with open(filename, 'r') as inputfile:
+        for (iLine,line) in enumerate(inputfile):
+            nRead += len(line)
+            if nRead >= nextDisplay:
+                display_progress(min(nRead,nChars), nChars, filename)
+                nextDisplay = nRead + nSkip
+            yield iLine, line
+    display_progress(nChars, nChars, filename)
+
+
+def _first_dataline(filename):
+    """ Returns the first stripped, non-comment line of a file (or None) """
+    with open(filename, 'r') as inputfile:
+        for line in inputfile:
+            line = line.strip()
+            if len(line) > 0 and line[0] != '#': return line
+    return None
+
+
+def _split_file(filename, nChunks):
+    """
+    Split a file into at most `nChunks` contiguous (start,end) byte ranges
+    which each begin at the start of a line.
+    """
+    nBytes = _os.path.getsize(filename)
+    offsets = [0]
+    with open(filename, 'rb') as f:
+        for k in range(1,nChunks):
+            f.seek( max(k*nBytes // nChunks, offsets[-1]) )
+            f.readline() # advance to the beginning of the next line
+            pos = f.tell()
+            if pos >= nBytes: break
+            if pos > offsets[-1]: offsets.append(pos)
+    offsets.append(nBytes)
+    return list(zip(offsets[:-1],offsets[1:]))
+
+
+def _parse_chunk(args):
+    """
+    Parse the lines in a byte range of a data file into non-overlapping
+    static DataSet(s).  A module-level function so it can be sent to a
+    process pool.
+    """
+    mode, filename, start, end, lookupDict, nDataCols, fillInfo, \
+        outcomeLabels, collisionAction = args
+
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text = f.read(end-start).decode(_locale.getpreferredencoding(False))
+    lines = enumerate(text.split('\n'))
+    parser = StdInputParser()
+
+    try:
+        if mode == "data":
+            dataset = _objs.DataSet(outcomeLabels=outcomeLabels,
+                                    collisionAction=collisionAction)
+            parser._fill_dataset(dataset, lines, filename, lookupDict,
+                                 nDataCols, fillInfo, None)
+            dataset.done_adding_data()
+            return dataset
+        else:
+            datasets = _OrderedDict(
+                [ (dsLabel, _objs.DataSet(outcomeLabels=dsOutcomeLabels,
+                                          collisionAction=collisionAction))
+                  for dsLabel,dsOutcomeLabels in outcomeLabels.items() ])
+            parser._fill_multidatasets(datasets, lines, filename, lookupDict,
+                                       nDataCols, fillInfo)
+            for ds in datasets.values(): ds.done_adding_data()
+            return datasets
+
+    except _DataLineError as e:
+        #line numbers are relative to this chunk; only count preceding lines when reporting
+        with open(filename, 'rb') as f:
+            iLineStart = f.read(start).count(b'\n')
+        raise ValueError("%s Line %d: %s" % (e.filename, iLineStart + e.iLine, e.msg))
+
+
+def _parse_chunks_in_parallel(chunkArgs, numProcs, filename, showProgress):
+    """ Run `_parse_chunk` on each of `chunkArgs` using a pool of `numProcs` processes """
+    display_progress = get_display_progress_fn(showProgress)
+    pool = _mp.Pool(min(numProcs, len(chunkArgs)))
+    try:
+        pieces = []
+        for piece in pool.imap(_parse_chunk, chunkArgs):
+            pieces.append(piece)
+            display_progress(len(pieces), len(chunkArgs), filename)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return pieces
+
+
+def _merge_static_datasets(pieces, collisionAction, comment=None):
+    """
+    Merge static DataSets holding consecutive portions of a data file into a
+    single static DataSet, resolving duplicate gate strings as though all the
+    data had been added to a single DataSet in order.
+    """
+    #outcome labels, in order of first appearance
+    olIndex = _OrderedDict()
+    for ds in pieces:
+        for ol in ds.olIndex:
+            if ol not in olIndex: olIndex[ol] = len(olIndex)
+
+    rows = _OrderedDict() # gate string => (oli, time, rep) arrays
+    for ds in pieces:
+        if len(ds) == 0: continue
+        remap = _np.array([ olIndex[ds.ol[i]] for i in range(len(ds.ol)) ], ds.oliType)
+        oliData = remap[ds.oliData]
+        repData = ds.repData if (ds.repData is not None) \
+                  else _np.ones(len(oliData), ds.repType)
+
+        for gateStr, slc in ds.gsIndex.items():
+            if collisionAction == "keepseparate":
+                #strip any tag given within this piece and re-tag against all the data
+                lastLbl = str(gateStr[-1]) if len(gateStr) > 0 else ""
+                if _re.match(r"#\d+$", lastLbl) and gateStr.tup[:-1] in ds.gsIndex:
+                    gateStr = _objs.GateString(gateStr.tup[:-1], gateStr.str[:-len(lastLbl)],
+                                               bCheck=False)
+                if gateStr in rows:
+                    i = 1; tagged = gateStr + _objs.GateString(("#%d" % i,))
+                    while tagged in rows:
+                        i += 1; tagged = gateStr + _objs.GateString(("#%d" % i,))
+                    gateStr = tagged
+            rows[gateStr] = (oliData[slc], ds.timeData[slc], repData[slc]) # "aggregate" overwrites
+
+    if len(rows) == 0:
+        dataset = _objs.DataSet(outcomeLabelIndices=olIndex,
+                                collisionAction=collisionAction, comment=comment)
+        dataset.done_adding_data()
+        return dataset
+
+    gsIndex = _OrderedDict(); curIndx = 0
+    for gateStr,(oli,_,_) in rows.items():
+        gsIndex[gateStr] = slice(curIndx, curIndx+len(oli))
+        curIndx += len(oli)
+    return _objs.DataSet(_np.concatenate([r[0] for r in rows.values()]),
+                         _np.concatenate([r[1] for r in rows.values()]),
+                         _np.concatenate([r[2] for r in rows.values()]),
+                         gateStringIndices=gsIndex, outcomeLabelIndices=olIndex,
+                         bStatic=True, collisionAction=collisionAction,
+                         comment=comment)
+
+
 def _evalElement(el, bComplex):
     myLocal = { 'pi': _np.pi, 'sqrt': _np.sqrt }
     exec( "element = %s" % el, {"__builtins__": None}, myLocal )
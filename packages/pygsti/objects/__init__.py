@@ -15,12 +15,16 @@ from .dataset import DataSet
 from .evaltree import EvalTree
 from .matrixevaltree import MatrixEvalTree
 from .mapevaltree import MapEvalTree
+from .evaltreecache import EvalTreeDiskCache
+from .gstcheckpoint import GSTCheckpoint, BlockCheckpoint
 from .gate import Gate
 from .gate import GateMatrix
 from .gate import LinearlyParameterizedGate
 from .gate import FullyParameterizedGate
 from .gate import TPParameterizedGate
 from .gate import StaticGate
+from .gate import SparseGate
+from .gate import EmbeddedGate
 from .gate import EigenvalueParameterizedGate
 from .gate import LindbladParameterizedGate
 from .gate import TPInstrumentGate
@@ -59,4 +63,4 @@ from .results import Results
 from .gate import compose, optimize_gate, finite_difference_deriv_wrt_params
 
 #Important Base Objects
-from ..baseobjs import VerbosityPrinter, Profiler, SmartCache, Basis
+from ..baseobjs import VerbosityPrinter, Profiler, SmartCache, Basis, LocalComm
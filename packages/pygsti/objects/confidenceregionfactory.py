@@ -15,6 +15,7 @@ from .. import optimize as _opt
 from .. import tools as _tools
 
 from .gatecalc import P_RANK_TOL
+from .gstcheckpoint import BlockCheckpoint as _BlockCheckpoint
 from ..baseobjs import VerbosityPrinter as _VerbosityPrinter
 
 # NON-MARKOVIAN ERROR BARS
@@ -170,20 +171,40 @@ class ConfidenceRegionFactory(object):
         return self.parent.gatesets[self.gateset_lbl]
 
         
-    def compute_hessian(self, comm=None, memLimit=None):
+    def compute_hessian(self, comm=None, memLimit=None, checkpointDir=None,
+                        approximate=False):
         """
         Computes the Hessian for this factory.
 
+        The Hessian is computed in blocks, which are distributed among the
+        processors of `comm` and can be saved to disk as they're finished.
+
         Parameters
         ----------
         comm : mpi4py.MPI.Comm, optional
-            When not None, an MPI communicator for distributing the computation
-            across multiple processors.
+            When not None, an MPI communicator (or a :class:`LocalComm`, to
+            use the processors of a single machine without MPI) for
+            distributing the computation across multiple processors.
 
         memLimit : int, optional
             A rough memory limit in bytes which restricts the amount of intermediate
             values that are computed and stored.
 
+        checkpointDir : str, optional
+            A directory in which each finished block of the Hessian is saved.
+            If a computation is interrupted, calling this method again with
+            the same `checkpointDir` (and number of processors) only computes
+            the blocks that weren't finished.
+
+        approximate : bool, optional
+            If True, compute the expected (Fisher-information, or Gauss-Newton)
+            Hessian from the first derivatives of the probabilities only,
+            rather than the exact Hessian.  This costs a single jacobian instead
+            of the probabilities' second derivatives, and differs from the
+            exact Hessian by terms which are small near a good fit (see
+            :func:`logl_approximate_hessian`).  `checkpointDir` is unused in
+            this case.
+
         Returns
         -------
         numpy.ndarray
@@ -230,11 +251,19 @@ class ConfidenceRegionFactory(object):
         
         MIN_NON_MARK_RADIUS = 1e-8 #must be >= 0
 
+        checkpoint = _BlockCheckpoint(checkpointDir, comm) \
+                     if (checkpointDir is not None and not approximate) else None
+
         if obj == 'logl':
-            hessian = _tools.logl_hessian(gateset, dataset, gatestring_list,
-                                          minProbClip, probClipInterval, radius,
-                                          comm=comm, memLimit=memLimit, verbosity=vb,
-                                          gateLabelAliases=aliases)
+            if approximate:
+                hessian = _tools.logl_approximate_hessian(
+                    gateset, dataset, gatestring_list, minProbClip, probClipInterval,
+                    comm=comm, memLimit=memLimit, verbosity=vb, gateLabelAliases=aliases)
+            else:
+                hessian = _tools.logl_hessian(gateset, dataset, gatestring_list,
+                                              minProbClip, probClipInterval, radius,
+                                              comm=comm, memLimit=memLimit, verbosity=vb,
+                                              gateLabelAliases=aliases, checkpoint=checkpoint)
 
             nonMarkRadiusSq = max( 2*(_tools.logl_max(gateset, dataset)
                                       - _tools.logl(gateset, dataset,
@@ -242,10 +271,20 @@ class ConfidenceRegionFactory(object):
                                    - (nDataParams-nModelParams), MIN_NON_MARK_RADIUS )
 
         elif obj == 'chi2':
-            chi2, hessian = _tools.chi2(gateset, dataset, gatestring_list,
-                                False, True, minProbClipForWeighting,
-                                probClipInterval, memLimit=memLimit,
-                                gateLabelAliases=aliases)
+            if approximate:
+                hessian = _tools.chi2_approximate_hessian(
+                    gateset, dataset, gatestring_list, minProbClipForWeighting,
+                    probClipInterval, comm=comm, memLimit=memLimit, verbosity=vb,
+                    gateLabelAliases=aliases)
+            else:
+                hessian = _tools.chi2_hessian(gateset, dataset, gatestring_list,
+                                              minProbClipForWeighting, probClipInterval,
+                                              comm=comm, memLimit=memLimit, verbosity=vb,
+                                              gateLabelAliases=aliases, checkpoint=checkpoint)
+            chi2 = _tools.chi2(gateset, dataset, gatestring_list,
+                               False, False, minProbClipForWeighting,
+                               probClipInterval, memLimit=memLimit,
+                               gateLabelAliases=aliases)
             
             nonMarkRadiusSq = max(chi2 - (nDataParams-nModelParams), MIN_NON_MARK_RADIUS)
         else:
@@ -795,55 +834,100 @@ class ConfidenceRegionFactoryView(object):
             Only returned when returnFnVal == True. Value of fnOfGate
             at the gate specified by gateLabel.
         """
+        return self.get_fn_confidence_intervals([fnObj], eps, returnFnVal, verbosity)[0]
+
+
+    def get_fn_confidence_intervals(self, fnObjs, eps=1e-7,
+                                    returnFnVals=False, verbosity=0):
+        """
+        Compute the confidence intervals for several functions at once.
+
+        This gives the same results as calling
+        :method:`get_fn_confidence_interval` on each element of `fnObjs`, but
+        each perturbed ("+eps") gate set needed for the finite-difference
+        derivatives is constructed only once and shared by all the functions
+        that depend on the perturbed parameter.  Thus, the number of gate set
+        rebuilds scales with the number of gate set parameters rather than
+        with the number of parameters times the number of functions.
+
+        Parameters
+        ----------
+        fnObjs : list of GateSetFunctions
+            The functions to evaluate (see :method:`get_fn_confidence_interval`).
+
+        eps : float, optional
+            Step size used when taking finite-difference derivatives.
 
+        returnFnVals : bool, optional
+            If True, return the value of each function along with its
+            confidence region half-widths.
+
+        verbosity : int, optional
+            Specifies level of detail in standard output.
+
+        Returns
+        -------
+        list
+            A list of what :method:`get_fn_confidence_interval` returns for
+            each function, i.e. of `df` values or `(df, f0)` tuples when
+            `returnFnVals == True`.
+        """
         nParams = self.gateset.num_params()
-        f0 = fnObj.evaluate(self.gateset) #function value at "base point"
+        f0s = [ fnObj.evaluate(self.gateset) for fnObj in fnObjs ] #function values at "base point"
+
+        #Get finite difference derivatives gradF that are shape (nParams, <shape of f0>)
+        gradFs = [ _create_empty_gradF(f0, nParams) for f0 in f0s ]
 
-        #Get finite difference derivative gradF that is shape (nParams, <shape of f0>)
-        gradF = _create_empty_gradF(f0, nParams)
+        #Which functions must be re-evaluated when each gate set parameter is varied
+        fns_of_gpindex = _collections.defaultdict(list)
+        for i,fnObj in enumerate(fnObjs):
+            for igp in self._get_fn_gpindices(fnObj):
+                fns_of_gpindex[igp].append(i)
 
+        gs = self.gateset.copy() #copy that will contain the "+eps" gate sets
+        vec0 = gs.to_vector()
+        
+        for igp in sorted(fns_of_gpindex.keys()): #iterate over "global" GateSet-parameter indices
+            vec = vec0.copy(); vec[igp] += eps;
+            gs.from_vector(vec)
+            gs.basis = self.gateset.basis #we're still in the same basis (maybe needed by fnObj)
+
+            for i in fns_of_gpindex[igp]:
+                f0, gradF = f0s[i], gradFs[i]
+                f = fnObjs[i].evaluate_nearby( gs )
+                if isinstance(f0, dict): #special behavior for dict: process each item separately
+                    for ky in gradF:
+                        gradF[ky][igp] = ( f[ky] - f0[ky] ) / eps
+                else:
+                    assert( _np.linalg.norm(_np.imag(f-f0)) < 1e-12 or _np.iscomplexobj(gradF) ), "gradF seems to be the wrong type!"
+                    gradF[igp] = _np.real_if_close( f - f0 ) / eps
+
+        return [ self._compute_return_from_gradF(gradF, f0, returnFnVals, verbosity)
+                 for gradF,f0 in zip(gradFs,f0s) ]
+
+
+    def _get_fn_gpindices(self, fnObj):
+        """ The (sorted) global GateSet-parameter indices `fnObj` depends upon """
         fn_dependencies = fnObj.get_dependencies()
         if 'all' in fn_dependencies:
-            fn_dependencies = ['all'] #no need to do anything else
+            return list(range(self.gateset.num_params())) #no need to do anything else
         if 'spam' in fn_dependencies:
             fn_dependencies = ["prep:%s"%l for l in self.gateset.preps.keys()] + \
                               ["povm:%s"%l for l in self.gateset.povms.keys()]
 
-        #elements of fn_dependencies are either 'all', 'spam', or
-        # the "type:label" of a specific gate or spam vector.
+        #elements of fn_dependencies are now the "type:label" of a
+        # specific gate or spam vector.
         all_gpindices = []
         for dependency in fn_dependencies:
-            gs = self.gateset.copy() #copy that will contain the "+eps" gate set
-            
-            if dependency == 'all':
-                all_gpindices.extend( range(gs.num_params()) )
-            else:
-                # copy objects because we add eps to them below
-                typ,lbl = dependency.split(":")
-                if typ == "gate":     gatesetObj = gs.gates[lbl]
-                elif typ == "prep":   gatesetObj = gs.preps[lbl]
-                elif typ == "povm":   gatesetObj = gs.povms[lbl]
-                elif typ == "instrument": gatesetObj = gs.instruments[lbl]
-                else: raise ValueError("Invalid dependency type: %s" % typ)
-                all_gpindices.extend( gatesetObj.gpindices_as_array() )
-
-        vec0 = gs.to_vector()
-        all_gpindices = sorted(list(set(all_gpindices))) #remove duplicates
-        
-        for igp in all_gpindices: #iterate over "global" GateSet-parameter indices
-            vec = vec0.copy(); vec[igp] += eps;
-            gs.from_vector(vec)
-            gs.basis = self.gateset.basis #we're still in the same basis (maybe needed by fnObj)
-            
-            f = fnObj.evaluate_nearby( gs )
-            if isinstance(f0, dict): #special behavior for dict: process each item separately
-                for ky in gradF:
-                    gradF[ky][igp] = ( f[ky] - f0[ky] ) / eps
-            else:
-                assert( _np.linalg.norm(_np.imag(f-f0)) < 1e-12 or _np.iscomplexobj(gradF) ), "gradF seems to be the wrong type!"
-                gradF[igp] = _np.real_if_close( f - f0 ) / eps
-
-        return self._compute_return_from_gradF(gradF, f0, returnFnVal, verbosity)
+            typ,lbl = dependency.split(":")
+            if typ == "gate":     gatesetObj = self.gateset.gates[lbl]
+            elif typ == "prep":   gatesetObj = self.gateset.preps[lbl]
+            elif typ == "povm":   gatesetObj = self.gateset.povms[lbl]
+            elif typ == "instrument": gatesetObj = self.gateset.instruments[lbl]
+            else: raise ValueError("Invalid dependency type: %s" % typ)
+            all_gpindices.extend( gatesetObj.gpindices_as_array() )
+
+        return sorted(list(set(all_gpindices))) #remove duplicates
 
     
     def _compute_return_from_gradF(self, gradF, f0, returnFnVal, verbosity):
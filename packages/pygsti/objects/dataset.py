@@ -7,6 +7,7 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 #*****************************************************************
 
 import numpy as _np
+import array as _array
 import numbers as _numbers
 import uuid as _uuid
 #import scipy.special as _sps
@@ -15,8 +16,11 @@ import uuid as _uuid
 #from scipy.interpolate import interp1d as _interp1d
 import pickle as _pickle
 import copy as _copy
+import os as _os
 import warnings as _warnings
 from collections import OrderedDict as _OrderedDict
+try: from collections.abc import Mapping as _Mapping # Python 3
+except ImportError: from collections import Mapping as _Mapping # Python 2
 
 from ..tools import listtools as _lt
 from ..tools import compattools as _compat
@@ -30,6 +34,135 @@ Time_type = _np.float64
 Repcount_type = _np.float32
  # thought: _np.uint16 but doesn't play well with rescaling
 
+#Separates the gate labels of a packed gate string (see _pack_gate_labels)
+_PACKED_LABEL_SEP = "\x1f"
+
+try: _array.array('q'); _rowTypecode = 'q'
+except ValueError: _rowTypecode = 'l' # Python 2 has no 'q' (long long) arrays
+
+
+def _pack_gate_labels(gatestring):
+    """
+    Pack the gate labels of `gatestring` (a GateString or tuple) into a single
+    string, or just a tuple if they aren't all strings.
+    """
+    tup = gatestring.tup if isinstance(gatestring, _gs.GateString) else gatestring
+    try:
+        return _PACKED_LABEL_SEP.join(tup)
+    except TypeError:
+        return tuple(tup)
+
+
+def _unpack_gate_labels(key):
+    """ The tuple of gate labels packed into `key` by :func:`_pack_gate_labels` """
+    if isinstance(key, tuple): return key
+    return tuple(key.split(_PACKED_LABEL_SEP)) if len(key) > 0 else ()
+
+
+class _CompactGateStringIndex(_Mapping):
+    """
+    The gate string => slice index of a static DataSet, stored compactly.
+
+    Gate strings are held as single packed strings of their gate labels which
+    hash into the table of rows, and the row slices as integer arrays,
+    rather than as GateString and slice objects.  Only string representations
+    that differ from the default (e.g. "Gx^4") are kept.  This behaves as a
+    (read-only) OrderedDict of GateStrings => slices, with GateString objects
+    being built only when the keys are iterated over.
+    """
+    def __init__(self, items=()):
+        self._rows = _OrderedDict() # packed gate string => row index
+        self._strs = {} # row index => non-default string representation
+        self._starts = _array.array(_rowTypecode); self._stops = _array.array(_rowTypecode)
+        for gatestring,slc in items:
+            key = _pack_gate_labels(gatestring)
+            i = self._rows.get(key,None)
+            if i is None:
+                i = self._rows[key] = len(self._starts)
+                self._starts.append(slc.start); self._stops.append(slc.stop)
+            else:
+                self._starts[i] = slc.start; self._stops[i] = slc.stop
+            if isinstance(gatestring, _gs.GateString) and \
+               gatestring.str != _gs._gateSeqToStr(gatestring.tup):
+                self._strs[i] = gatestring.str
+
+    def __getitem__(self, gatestring):
+        i = self._rows.get(_pack_gate_labels(gatestring),None)
+        if i is None: raise KeyError(gatestring)
+        return slice(self._starts[i], self._stops[i])
+
+    def __contains__(self, gatestring):
+        return _pack_gate_labels(gatestring) in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        for i,key in enumerate(self._rows):
+            yield _gs.GateString(_unpack_gate_labels(key), self._strs.get(i,None), bCheck=False)
+
+    def keys(self):
+        return list(self.__iter__())
+
+    def values(self):
+        return [ slice(start,stop) for start,stop in zip(self._starts, self._stops) ]
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+    def __reduce__(self):
+        return (_CompactGateStringIndex, (self.items(),))
+
+    def copy(self):
+        return self # immutable
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _compact_gatestring_index(gsIndex):
+    """ `gsIndex`, an ordered gate string => slice mapping, as a :class:`_CompactGateStringIndex` """
+    if isinstance(gsIndex, _CompactGateStringIndex): return gsIndex
+    return _CompactGateStringIndex(gsIndex.items())
+
+
+#Leading bytes of a file written by DataSet.save_columnar
+COLUMNAR_MAGIC = b"PYGSTI-COLUMNAR-DATASET-1\n"
+
+#Byte alignment of the arrays within a columnar DataSet file
+COLUMNAR_ALIGNMENT = 64
+
+
+class _GateStringTable(object):
+    """
+    The gate strings (keys) of a memory-mapped static DataSet, stored as
+    integer gate label codes with per-string offsets so that building the
+    GateString objects can be put off until they're actually needed.
+    """
+    def __init__(self, labels, codes, codeOffsets, strBytes, strOffsets, starts, stops):
+        self.labels = labels
+        self.codes = codes
+        self.codeOffsets = codeOffsets
+        self.strBytes = strBytes
+        self.strOffsets = strOffsets
+        self.starts = starts
+        self.stops = stops
+
+    def __len__(self):
+        return len(self.starts)
+
+    def build_index(self):
+        """ Materialize the gate string => slice OrderedDict of a static DataSet """
+        labels = self.labels
+        codes = self.codes.tolist()
+        codeOffsets = self.codeOffsets.tolist()
+        strs = self.strBytes.tobytes().decode('utf-8')
+        strOffsets = self.strOffsets.tolist()
+        return _CompactGateStringIndex(
+            [ (_gs.GateString(tuple([ labels[c] for c in codes[codeOffsets[i]:codeOffsets[i+1]] ]),
+                              strs[strOffsets[i]:strOffsets[i+1]], bCheck=False), slice(start,stop))
+              for i,(start,stop) in enumerate(zip(self.starts.tolist(), self.stops.tolist())) ])
+
 class DataSet_KeyValIterator(object):
     """ Iterator class for gate_string,DataSetRow pairs of a DataSet """
     def __init__(self, dataset):
@@ -476,7 +609,7 @@ class DataSet(object):
         DataSet
            a new data set object.
         """
-        # uuid for efficient hashing (set when done adding data or loading from file)
+        # uuid for efficient hashing (set once the DataSet is static)
         self.uuid = None
         
         #Optionally load from a file
@@ -491,7 +624,8 @@ class DataSet(object):
         #   values = slices into oli, time, & rep arrays (static case) or
         #            integer list indices (non-static case)
         if gateStringIndices is not None:
-            self.gsIndex = gateStringIndices
+            self.gsIndex = _compact_gatestring_index(gateStringIndices) if bStatic \
+                           else gateStringIndices
         elif not bStatic:
             if gateStrings is not None:
                 dictData = [ (gs if isinstance(gs,_gs.GateString) else _gs.GateString(gs),i) \
@@ -569,6 +703,7 @@ class DataSet(object):
         
         # self.bStatic
         self.bStatic = bStatic
+        if bStatic: self.uuid = _uuid.uuid4()
         
         # collision action
         assert(collisionAction in ('aggregate','keepseparate'))
@@ -590,7 +725,27 @@ class DataSet(object):
         return self.gsIndex.__iter__() #iterator over gate strings
   
     def __len__(self):
+        if self._gsIndex is None and self._gsTable is not None:
+            return len(self._gsTable) # don't materialize gate strings just to count them
         return len(self.gsIndex)
+
+    @property
+    def gsIndex(self):
+        """
+        An OrderedDict whose keys are the GateStrings of this DataSet and whose
+        values are slices into the data arrays (static case) or integer list
+        indices (non-static case).  For a memory-mapped DataSet this is built
+        the first time it's accessed.
+        """
+        if self._gsIndex is None and self._gsTable is not None:
+            self._gsIndex = self._gsTable.build_index()
+            self._gsTable = None
+        return self._gsIndex
+
+    @gsIndex.setter
+    def gsIndex(self, value):
+        self._gsIndex = value
+        self._gsTable = None
   
     def __contains__(self, gatestring):
         return gatestring in self.gsIndex
@@ -741,6 +896,133 @@ class DataSet(object):
         return list(self.olIndex.keys())
 
 
+    def counts_array(self, gatestring_list, outcome_order=None):
+        """
+        Get the counts of many gate strings at once, as a dense array.
+
+        Counts are aggregated over all time stamps directly from this
+        DataSet's internal arrays (using a single `numpy.bincount`), which is
+        much faster than accessing each row's `.counts`.
+
+        Parameters
+        ----------
+        gatestring_list : list of GateStrings or tuples
+            The gate strings to get counts for.  Each must be in this DataSet.
+
+        outcome_order : list, optional
+            The outcome labels giving the columns of the returned array.
+            Outcomes not present in this DataSet have zero counts.  If None,
+            the columns are indexed by outcome-label index, i.e. the counts
+            of outcome `ol` are in column `self.olIndex[ol]`.
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape `(len(gatestring_list), len(outcome_order))`,
+            or `(len(gatestring_list), max(self.olIndex.values())+1)` when
+            `outcome_order` is None.
+        """
+        rowIndices, oli, reps = self._get_concatenated_rows(gatestring_list)
+        nOutcomes = max(self.olIndex.values())+1 if len(self.olIndex) > 0 else 0
+        counts = _np.bincount(rowIndices * nOutcomes + oli, reps,
+                              len(gatestring_list) * nOutcomes).reshape(
+                                  (len(gatestring_list), nOutcomes))
+        if outcome_order is None:
+            return counts
+
+        ret = _np.zeros( (len(gatestring_list), len(outcome_order)), 'd')
+        for k,ol in enumerate(outcome_order):
+            ol = (ol,) if _compat.isstr(ol) else ol #strings -> tuple outcome labels
+            if ol in self.olIndex: ret[:,k] = counts[:,self.olIndex[ol]]
+        return ret
+
+
+    def totals_array(self, gatestring_list):
+        """
+        Get the total counts of many gate strings at once, as an array.
+
+        Parameters
+        ----------
+        gatestring_list : list of GateStrings or tuples
+            The gate strings to get total counts for.  Each must be in this
+            DataSet.
+
+        Returns
+        -------
+        numpy.ndarray
+            A 1D array of length `len(gatestring_list)`.
+        """
+        rowIndices, _, reps = self._get_concatenated_rows(gatestring_list)
+        return _np.bincount(rowIndices, reps, len(gatestring_list)).astype('d')
+
+
+    def fill_count_vecs(self, countVecToFill, totalVecToFill, gatestring_list,
+                        lookup, outcomes_lookup):
+        """
+        Fill per-element count and total-count vectors of many gate strings.
+
+        The "elements" are those of a gate set's compiled gate strings, as
+        described by the `lookup` and `outcomes_lookup` dictionaries returned
+        by :method:`GateSet.compile_gatestrings` or
+        :method:`GateSet.bulk_evaltree`.
+
+        Parameters
+        ----------
+        countVecToFill, totalVecToFill : numpy.ndarray
+            1D arrays, indexed by element, to fill with the counts of each
+            element's outcome and the total counts of its gate string.
+
+        gatestring_list : list of GateStrings or tuples
+            The gate strings (of this DataSet) corresponding to the keys of
+            `lookup` and `outcomes_lookup`.
+
+        lookup : dict
+            The element indices (a slice or index array) of each
+            `gatestring_list` index.
+
+        outcomes_lookup : dict
+            The outcome labels of each `gatestring_list` index's elements.
+
+        Returns
+        -------
+        None
+        """
+        counts = self.counts_array(gatestring_list)
+        totals = self.totals_array(gatestring_list)
+        for i in range(len(gatestring_list)):
+            totalVecToFill[ lookup[i] ] = totals[i]
+            countVecToFill[ lookup[i] ] = counts[i, [ self.olIndex[x] for x in outcomes_lookup[i] ]]
+
+
+    def _get_concatenated_rows(self, gatestring_list):
+        """
+        Returns the row (i.e. `gatestring_list` index), outcome label index and
+        repetition count of every datum of the gate strings in `gatestring_list`.
+        """
+        if len(gatestring_list) == 0:
+            return _np.empty(0,_np.int64), _np.empty(0,_np.int64), _np.empty(0,'d')
+
+        if self.bStatic:
+            slcs = [ self.gsIndex[gs] for gs in gatestring_list ]
+            starts = _np.array([ slc.start for slc in slcs ], _np.int64)
+            lengths = _np.array([ slc.stop for slc in slcs ], _np.int64) - starts
+            #indices of each row's data when concatenated, offset to its start
+            elIndices = _np.arange(lengths.sum(), dtype=_np.int64) + \
+                        _np.repeat(starts - (_np.cumsum(lengths) - lengths), lengths)
+            oli = self.oliData[elIndices]
+            reps = self.repData[elIndices] if (self.repData is not None) else None
+        else:
+            inds = [ self.gsIndex[gs] for gs in gatestring_list ]
+            lengths = _np.array([ len(self.oliData[i]) for i in inds ], _np.int64)
+            oli = _np.concatenate([ self.oliData[i] for i in inds ])
+            reps = _np.concatenate([ self.repData[i] for i in inds ]) \
+                   if (self.repData is not None) else None
+
+        rowIndices = _np.repeat(_np.arange(len(gatestring_list), dtype=_np.int64), lengths)
+        if reps is None: reps = _np.ones(len(oli), 'd')
+        return rowIndices, oli.astype(_np.int64), reps.astype('d')
+
+
     def get_gate_labels(self, prefix='G'):
         """ 
         Get a list of all the distinct gate labels used
@@ -1275,14 +1557,14 @@ class DataSet(object):
                 new_gsIndex[gatestring] = slice(curIndx, curIndx+seriesLen)
                 curIndx += seriesLen
         
-            self.gsIndex = new_gsIndex
+            self.gsIndex = _CompactGateStringIndex(new_gsIndex.items())
             self.oliData = _np.concatenate( to_concat_oli )
             self.timeData = _np.concatenate( to_concat_time )
             if self.repData is not None:
                 self.repData = _np.concatenate( to_concat_rep )
             
         else:
-            #leave gsIndex alone (should be empty anyway?)
+            self.gsIndex = _CompactGateStringIndex(self.gsIndex.items()) # should be empty anyway
             self.oliData = _np.empty( (0,), self.oliType)
             self.timeData = _np.empty( (0,), self.timeType)
             if self.repData is not None:
@@ -1489,7 +1771,7 @@ class DataSet(object):
                     
         else:  #Normal case
             self.bStatic = bStatic
-            self.gsIndex = gsIndex
+            self.gsIndex = _compact_gatestring_index(gsIndex) if bStatic else gsIndex
             self.olIndex = state_dict['olIndex']
             self.ol = state_dict['ol']
             self.oliData  = state_dict['oliData']
@@ -1564,12 +1846,20 @@ class DataSet(object):
         fileOrFilename string or file object.
             If a string,  interpreted as a filename.  If this filename ends 
             in ".gz", the file will be gzip uncompressed as it is read.
+            A file written by :method:`save_columnar` is memory-mapped
+            rather than read.
         
         Returns
         -------
         None
         """
         bOpen = _compat.isstr(fileOrFilename)
+        if bOpen and not fileOrFilename.endswith(".gz"):
+            with open(fileOrFilename,"rb") as f:
+                bColumnar = (f.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC)
+            if bColumnar: # written by save_columnar: memory-map it
+                self._load_columnar(fileOrFilename); return
+
         if bOpen:
             if fileOrFilename.endswith(".gz"):
                 import gzip as _gzip
@@ -1594,6 +1884,7 @@ class DataSet(object):
         self.olIndex = state_dict['olIndex']
         self.ol      = state_dict['ol']
         self.bStatic = state_dict['bStatic']
+        if self.bStatic: self.gsIndex = _compact_gatestring_index(self.gsIndex)
         self.oliType = state_dict['oliType']
         self.timeType= state_dict['timeType']
         self.repType = state_dict['repType']
@@ -1624,3 +1915,123 @@ class DataSet(object):
                 self.repData = None
         
         if bOpen: f.close()
+
+
+    def save_columnar(self, filename):
+        """
+        Save this (static) DataSet to a file in a columnar binary format.
+
+        The outcome-label-index, time and repetition arrays are written
+        contiguously, along with the gate strings as integer gate label
+        codes and offsets, so that :method:`load` can memory-map the file.
+        Loading is then independent of the data size, gate strings are only
+        built when first needed, and processes that load the same file
+        share the data's memory (via the OS page cache).
+
+        Parameters
+        ----------
+        filename : string
+            The name of the file to write.  This file is written atomically
+            (by renaming a temporary file) so that processes which already
+            have it memory-mapped are unaffected.
+
+        Returns
+        -------
+        None
+        """
+        if not self.bStatic:
+            raise ValueError("Only static DataSets can be saved in columnar format")
+
+        labelIndex = _OrderedDict(); codes = []; codeOffsets = [0]
+        strs = []; strOffsets = [0]
+        starts = []; stops = []
+        for gatestring,slc in self.gsIndex.items():
+            for lbl in gatestring.tup:
+                if lbl not in labelIndex: labelIndex[lbl] = len(labelIndex)
+                codes.append(labelIndex[lbl])
+            codeOffsets.append(len(codes))
+            strs.append(gatestring.str)
+            strOffsets.append(strOffsets[-1] + len(gatestring.str)) # offsets of *characters*
+            starts.append(slc.start); stops.append(slc.stop)
+        strBytes = "".join(strs).encode('utf-8')
+
+        arrays = _OrderedDict()
+        arrays['oliData'] = _np.ascontiguousarray(self.oliData, self.oliType)
+        arrays['timeData'] = _np.ascontiguousarray(self.timeData, self.timeType)
+        if self.repData is not None:
+            arrays['repData'] = _np.ascontiguousarray(self.repData, self.repType)
+        arrays['codes'] = _np.array(codes, _np.uint16 if len(labelIndex) < 2**16 else _np.int64)
+        arrays['codeOffsets'] = _np.array(codeOffsets, _np.int64)
+        arrays['strBytes'] = _np.frombuffer(strBytes, _np.uint8) if len(strBytes) > 0 \
+                             else _np.empty(0, _np.uint8)
+        arrays['strOffsets'] = _np.array(strOffsets, _np.int64)
+        arrays['starts'] = _np.array(starts, _np.int64)
+        arrays['stops'] = _np.array(stops, _np.int64)
+
+        layout = _OrderedDict(); offset = 0
+        for name,ar in arrays.items():
+            layout[name] = (ar.dtype.str, ar.shape, offset)
+            offset += -(-ar.nbytes // COLUMNAR_ALIGNMENT) * COLUMNAR_ALIGNMENT
+
+        header = _pickle.dumps({ 'olIndex': self.olIndex,
+                                 'ol': self.ol,
+                                 'oliType': self.oliType,
+                                 'timeType': self.timeType,
+                                 'repType': self.repType,
+                                 'collisionAction': self.collisionAction,
+                                 'comment': getattr(self,'comment',None),
+                                 'uuid': self.uuid,
+                                 'labels': list(labelIndex.keys()),
+                                 'layout': layout }, protocol=2)
+        dataStart = _columnar_data_start(len(header))
+
+        tmpFilename = filename + ".tmp%d" % _os.getpid()
+        with open(tmpFilename, "wb") as f:
+            f.write(COLUMNAR_MAGIC)
+            f.write(_np.array([len(header)], '<i8').tobytes())
+            f.write(header)
+            for name,ar in arrays.items():
+                f.seek(dataStart + layout[name][2])
+                f.write(ar.tobytes())
+            f.truncate(dataStart + offset)
+        _compat.replace_file(tmpFilename, filename)
+
+
+    def _load_columnar(self, filename):
+        """ Memory-map a DataSet file written by :method:`save_columnar` """
+        with open(filename, "rb") as f:
+            f.read(len(COLUMNAR_MAGIC))
+            headerLen = int(_np.frombuffer(f.read(8), '<i8')[0])
+            header = _pickle.loads(f.read(headerLen))
+        dataStart = _columnar_data_start(headerLen)
+
+        arrays = {}
+        for name,(dtype,shape,offset) in header['layout'].items():
+            if _np.prod(shape) == 0: # can't memory-map an empty region
+                arrays[name] = _np.empty(shape, dtype)
+            else:
+                arrays[name] = _np.memmap(filename, dtype, 'r', dataStart + offset,
+                                          shape).view(_np.ndarray)
+
+        self.gsIndex = None
+        self._gsTable = _GateStringTable(header['labels'], arrays['codes'], arrays['codeOffsets'],
+                                         arrays['strBytes'], arrays['strOffsets'],
+                                         arrays['starts'], arrays['stops'])
+        self.olIndex = header['olIndex']
+        self.ol      = header['ol']
+        self.bStatic = True
+        self.oliType = header['oliType']
+        self.timeType= header['timeType']
+        self.repType = header['repType']
+        self.collisionAction = header['collisionAction']
+        self.comment = header['comment']
+        self.uuid    = header['uuid']
+        self.oliData = arrays['oliData']
+        self.timeData = arrays['timeData']
+        self.repData = arrays.get('repData',None)
+
+
+def _columnar_data_start(headerLen):
+    """ The (aligned) offset of the array data within a columnar DataSet file """
+    n = len(COLUMNAR_MAGIC) + 8 + headerLen
+    return -(-n // COLUMNAR_ALIGNMENT) * COLUMNAR_ALIGNMENT
@@ -111,7 +111,80 @@ class EvalTree(list):
           -------
           None
         """
-        raise NotImplementedError("initialize(...) must be implemented by a derived class") 
+        raise NotImplementedError("initialize(...) must be implemented by a derived class")
+
+
+    def extend_gatestrings(self, compiled_gatestring_list):
+        """
+          Extend this (already initialized) tree to evaluate additional gate strings.
+
+          Only the strings beyond those this tree already evaluates are
+          added, re-using the existing tree elements, which is much faster
+          than initializing a new tree when the current strings make up most
+          of the new list (e.g. the nested lists of iterative GST).  If this
+          tree is split, the split is undone first; the extended tree is
+          *not* split, and may be split afterward as usual.
+
+          Parameters
+          ----------
+          compiled_gatestring_list : OrderedDict
+              The compiled gate strings (as would be passed to `initialize`)
+              of the *entire* extended tree.  Its first
+              `self.num_final_strings()` keys must be this tree's current
+              final strings, in their original order.
+
+          Returns
+          -------
+          None
+        """
+        raise NotImplementedError("extend_gatestrings(...) must be implemented by a derived class")
+
+
+    def _prepare_to_extend(self, compiled_gatestring_list, permute_element):
+        """
+        Common logic for derived-class `extend_gatestrings` methods.
+
+        Checks that this tree's final strings are a prefix of
+        `compiled_gatestring_list`, undoes any split (restoring the original
+        ordering of the final elements, with `permute_element(perm, el)`
+        applying an index permutation to a tree element), and sets the
+        final-string and spamTuple information for the extended list.
+
+        Returns
+        -------
+        gatestring_list : list
+            The new list of final gate strings (as tuples).
+        nOld : int
+            The number of final strings before extension.
+        """
+        if self.myFinalToParentFinalMap is not None:
+            raise ValueError("Cannot extend a sub-tree")
+
+        gatestring_list = [tuple(gs) for gs in compiled_gatestring_list.keys()]
+        nOld = self.num_final_strings()
+        if gatestring_list[0:nOld] != self.generate_gatestring_list(permute=True):
+            raise ValueError("Existing tree strings must be a prefix of the new list")
+
+        if self.original_index_lookup is not None: # undo split permutation
+            perm = list(range(len(self))) # perm[currentIndex] = originalIndex
+            for iorig,icur in self.original_index_lookup.items():
+                perm[icur] = iorig
+            revPerm = [None]*len(self)
+            for icur,iorig in enumerate(perm):
+                revPerm[iorig] = icur
+
+            self.init_indices = [ perm[iCur] for iCur in self.init_indices ]
+            self.eval_order = [ perm[iCur] for iCur in self.eval_order ]
+            self[:] = [ permute_element(perm, self[iCur]) for iCur in revPerm ]
+        self.original_index_lookup = None
+        self.subTrees = []
+        self.distribution.pop('subTreeCosts',None)
+
+        self.num_final_strs = len(gatestring_list)
+        self.compiled_gatestring_spamTuples = list(compiled_gatestring_list.values())
+        self.num_final_els = sum([len(v) for v in self.compiled_gatestring_spamTuples])
+        self.recompute_spamtuple_indices(bLocal=True)
+        return gatestring_list, nOld
 
 
     def _copyBase(self,newTree):
@@ -127,11 +200,12 @@ class EvalTree(list):
         newTree.parentIndexMap = self.parentIndexMap[:] \
             if (self.parentIndexMap is not None) else None
         newTree.subTrees = [ st.copy() for st in self.subTrees ]
-        newTree.original_index_lookup = self.original_index_lookup[:] \
+        newTree.original_index_lookup = self.original_index_lookup.copy() \
             if (self.original_index_lookup is not None) else None
         newTree.compiled_gatestring_spamTuples = self.compiled_gatestring_spamTuples[:]
         #newTree.finalStringToElsMap = self.finalStringToElsMap[:]
         newTree.spamtuple_indices = self.spamtuple_indices.copy()
+        newTree.distribution = self.distribution.copy()
         return newTree
 
     def get_init_labels(self):
@@ -439,8 +513,14 @@ class EvalTree(list):
         mySubCommIndex = mySubCommIndices[0]
 
         assert(nSubtreeComms <= nSubtrees) # don't allow more comms than trees
-        mySubtreeIndices, subTreeOwners = _mpit.distribute_indices_base(
-            list(range(nSubtrees)), nSubtreeComms, mySubCommIndex)
+        subTreeCosts = self.distribution.get('subTreeCosts',None)
+        if subTreeCosts is not None and len(subTreeCosts) == nSubtrees:
+            # balance the (measured) cost of each processor group's subtrees
+            mySubtreeIndices, subTreeOwners = _distribute_by_cost(
+                subTreeCosts, nSubtreeComms, mySubCommIndex)
+        else:
+            mySubtreeIndices, subTreeOwners = _mpit.distribute_indices_base(
+                list(range(nSubtrees)), nSubtreeComms, mySubCommIndex)
 
         # subTreeOwners contains index of owner subComm, but we really want
         #  the owning processor, i.e. the owner of the subComm
@@ -454,7 +534,8 @@ class EvalTree(list):
         return mySubtreeIndices, subTreeOwners, mySubComm
 
 
-    def split(self, elIndicesDict, maxSubTreeSize=None, numSubTrees=None, verbosity=0):
+    def split(self, elIndicesDict, maxSubTreeSize=None, numSubTrees=None, verbosity=0,
+              costModel=None):
         """
         Split this tree into sub-trees in order to reduce the
           maximum size of any tree (useful for limiting memory consumption
@@ -484,6 +565,14 @@ class EvalTree(list):
         verbosity : int, optional
             How much detail to send to stdout.
 
+        costModel : dict, optional
+            Measured operation costs, as returned by
+            :method:`GateCalc.calibrate_costs`.  When given, splitting into
+            `numSubTrees` sub-trees balances the sub-trees' costs as given
+            by :method:`get_element_costs` (instead of a static heuristic),
+            and :method:`distribute` balances these costs across processor
+            groups.
+
         Returns
         -------
         OrderedDict
@@ -491,6 +580,44 @@ class EvalTree(list):
         """
         raise NotImplementedError("split(...) not implemented!")
 
+
+    def get_element_costs(self, costModel):
+        """
+        Computes the cost of computing each element of this tree.
+
+        The cost of an element is the number of tree operations (see
+        :method:`_get_op_counts`) it requires plus, for final elements, the
+        cost of computing the results for each of its spam tuples relative
+        to that of one operation, as given by `costModel`.
+
+        Parameters
+        ----------
+        costModel : dict
+            Measured operation costs, as returned by
+            :method:`GateCalc.calibrate_costs`.
+
+        Returns
+        -------
+        numpy.ndarray
+            A 1D array of length `len(self)` of costs, in units of the
+            cost of one tree operation.
+        """
+        costs = _np.array(self._get_op_counts(), 'd')
+        finalCost = costModel['final'] / costModel['op']
+        nSpamTuples = _np.array([ len(spamTuples) for spamTuples
+                                  in self.compiled_gatestring_spamTuples ], 'd')
+        costs[0:self.num_final_strs] += finalCost * nSpamTuples
+        return costs
+
+
+    def _get_op_counts(self):
+        """
+        Returns a list of the number of tree operations (e.g. products or
+        gate applications) needed to compute each element of this tree from
+        the elements it depends upon.
+        """
+        raise NotImplementedError("_get_op_counts(...) not implemented!")
+
     def recompute_spamtuple_indices(self, bLocal=False):
         """ 
         Recompute this tree's `.spamtuple_indices` array.
@@ -512,7 +639,8 @@ class EvalTree(list):
             None if bLocal else self.myFinalElsToParentFinalElsMap)
         
 
-    def _finish_split(self, elIndicesDict, subTreeSetList, permute_parent_element, create_subtree):
+    def _finish_split(self, elIndicesDict, subTreeSetList, permute_parent_element, create_subtree,
+                      costs=None):
         # Create subtrees from index sets
         need_to_compute = _np.zeros( len(self), 'bool' ) #flags so we don't duplicate computation of needed quantities
         need_to_compute[0:self.num_final_strings()] = True #  b/c multiple subtrees need them as intermediates
@@ -636,6 +764,13 @@ class EvalTree(list):
             sStart += numFinal #increment slice start position
         subTreeIndicesList = newList # => subTreeIndicesList is now permuted
 
+        #Record each subtree's cost, so `distribute` can balance them
+        if costs is not None:
+            self.distribution['subTreeCosts'] = [ float(sum([costs[i] for i in s]))
+                                                  for s in subTreeSetList ]
+        else:
+            self.distribution.pop('subTreeCosts',None)
+
         #Now (finally) create the actual subtrees, which requires
         # taking parent-indices and mapping them the subtree-indices
         for iSubTree,(subTreeIndices,subTreeNumFinal,slc) \
@@ -733,6 +868,25 @@ class EvalTree(list):
                 t.print_analysis()
 
                 
+def _distribute_by_cost(costs, nGroups, myGroupIndex):
+    """
+    Assigns items with the given `costs` to `nGroups` processor groups so
+    that the groups' total costs are balanced, by giving each item (most
+    costly first) to the group with the least total cost so far.  Returns
+    the indices of the items assigned to group `myGroupIndex` and a
+    dictionary mapping each item index to the index of its group (like
+    :func:`mpitools.distribute_indices_base`).
+    """
+    groupCosts = [0.0]*nGroups
+    owners = {}
+    for i in sorted(range(len(costs)), key=lambda i: costs[i], reverse=True):
+        iGroup = min(range(nGroups), key=lambda k: groupCosts[k])
+        owners[i] = iGroup
+        groupCosts[iGroup] += costs[i]
+    myIndices = [ i for i in range(len(costs)) if owners[i] == myGroupIndex ]
+    return myIndices, owners
+
+
 def _compute_spamtuple_indices(compiled_gatestring_spamTuples,
                                subtreeFinalElsToParentFinalElsMap=None):
     """ 
@@ -0,0 +1,151 @@
+""" Defines the EvalTreeDiskCache class, a persistent store for evaluation trees """
+from __future__ import division, print_function, absolute_import, unicode_literals
+#*****************************************************************
+#    pyGSTi 0.9:  Copyright 2015 Sandia Corporation
+#    This Software is released under the GPL license detailed
+#    in the file "license.txt" in the top-level pyGSTi directory
+#*****************************************************************
+
+import os as _os
+import warnings as _warnings
+import hashlib as _hashlib
+import tempfile as _tempfile
+import pickle as _pickle
+
+from .. import _version
+from ..tools import compattools as _compat
+
+class EvalTreeDiskCache(object):
+    """
+    A content-addressed, on-disk store of (possibly split) evaluation trees.
+
+    Building an :class:`EvalTree` for a long list of gate strings (and
+    splitting it into sub-trees) can take a significant amount of time, and
+    it is repeated every time an analysis of the same experiment design is
+    run.  An `EvalTreeDiskCache` saves each tree, together with its lookup
+    dictionaries, to a file whose name is a digest of everything the tree
+    depends on: the gate strings, the gate set's calculator type and its
+    gate/SPAM/instrument labels, and the splitting parameters.  Later
+    requests for an identical tree load it from disk instead of rebuilding.
+    """
+
+    def __init__(self, directory):
+        """
+        Create a new EvalTreeDiskCache.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the cached trees.  It is created if it
+            does not already exist.
+        """
+        self.directory = directory
+        if not _os.path.isdir(directory):
+            try: _os.makedirs(directory)
+            except OSError: pass # another process may have just created it
+
+    def key(self, gateset, gatestring_list, minSubtrees=None,
+            maxTreeSize=None, numSubtreeComms=1, costModel=None):
+        """
+        Compute the cache key for a :method:`GateSet.bulk_evaltree` call.
+
+        Parameters
+        ----------
+        gateset : GateSet
+            The gate set whose evaluation tree is requested.  Only its
+            calculator type and labels (not its parameter values) enter
+            into the key.
+
+        gatestring_list : list of (tuples or GateStrings)
+            The gate strings of the tree.
+
+        minSubtrees, maxTreeSize, numSubtreeComms : int or None
+            The splitting arguments passed to `bulk_evaltree`.
+
+        costModel : dict, optional
+            The `costModel` passed to `bulk_evaltree`.  Since measured costs
+            vary from run to run, only whether one is given enters the key.
+
+        Returns
+        -------
+        str
+            A hexadecimal digest.
+        """
+        M = _hashlib.sha1()
+        def add(x): M.update(repr(x).encode('utf-8'))
+
+        add(_version.__version__)
+        add(gateset._calcClass.__name__)
+        add(list(gateset.gates.keys()))
+        add(list(gateset.preps.keys()))
+        add([ (lbl, list(povm.keys())) for lbl,povm in gateset.povms.items() ])
+        add([ (lbl, list(inst.keys())) for lbl,inst in gateset.instruments.items() ])
+        add((minSubtrees, maxTreeSize, numSubtreeComms, costModel is not None))
+        add(len(gatestring_list))
+        for gstr in gatestring_list:
+            add(tuple(gstr))
+        return M.hexdigest()
+
+    def _path(self, key):
+        return _os.path.join(self.directory, key + ".pkl")
+
+    def load(self, key):
+        """
+        Load the cached value for `key`.
+
+        Parameters
+        ----------
+        key : str
+            A key returned by :method:`key`.
+
+        Returns
+        -------
+        object or None
+            The stored value, or `None` when `key` is not (or not readably)
+            present in the cache.
+        """
+        try:
+            with open(self._path(key), 'rb') as f:
+                return _pickle.load(f)
+        except Exception:
+            return None # missing, truncated, or incompatible file => a cache miss
+
+    def save(self, key, value):
+        """
+        Store `value` under `key`.
+
+        The value is written to a temporary file that is then renamed, so
+        concurrent readers (e.g. other MPI processes or simultaneous runs)
+        never see a partially-written entry.  If the value cannot be stored
+        (e.g. it is not picklable or the directory is read-only) a warning is
+        issued and the cache is left unchanged.
+
+        Parameters
+        ----------
+        key : str
+            A key returned by :method:`key`.
+
+        value : object
+            The (picklable) value to store.
+
+        Returns
+        -------
+        None
+        """
+        fd, tmpPath = _tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with _os.fdopen(fd, 'wb') as f:
+                _pickle.dump(value, f, protocol=_pickle.HIGHEST_PROTOCOL)
+            _compat.replace_file(tmpPath, self._path(key))
+        except Exception as e: # a failed save only means the tree is rebuilt next time
+            if _os.path.exists(tmpPath): _os.remove(tmpPath)
+            _warnings.warn("Could not save evaluation tree cache entry %s: %s" % (self._path(key), str(e)))
+
+    def __len__(self):
+        return len([ f for f in _os.listdir(self.directory) if f.endswith(".pkl") ])
+
+    def clear(self):
+        """ Remove all cached trees from this cache's directory. """
+        for f in _os.listdir(self.directory):
+            if f.endswith(".pkl"):
+                _os.remove(_os.path.join(self.directory, f))
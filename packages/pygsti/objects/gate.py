@@ -8,6 +8,7 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 
 import numpy as _np
 import scipy.linalg as _spl
+import scipy.sparse as _sps
 import functools as _functools
 import copy as _copy
 
@@ -94,7 +95,7 @@ def compose(gate1, gate2, basis, parameterization="auto"):
         values are Matrix-unit (std), Gell-Mann (gm), Pauli-product (pp),
         and Qutrit (qt) (or a custom basis object).
 
-    parameterization : {"auto","full","TP","linear","static"}, optional
+    parameterization : {"auto","full","TP","linear","sparse","static"}, optional
         The parameterization of the resulting gates.  The default, "auto",
         attempts to convert to the most restrictive common parameterization.
 
@@ -113,6 +114,7 @@ def compose(gate1, gate2, basis, parameterization="auto"):
     # Linear => TP (sometimes)
     # Linear => Full
     # TP => Full
+    # Static => Sparse
 
     if parameterization == "auto":
         if any([isinstance(g, FullyParameterizedGate) for g in (gate1,gate2)]):
@@ -123,6 +125,8 @@ def compose(gate1, gate2, basis, parameterization="auto"):
         elif any([isinstance(g, LinearlyParameterizedGate)
                   for g in (gate1,gate2)]):
             paramType = "linear"
+        elif any([isinstance(g, SparseGate) for g in (gate1,gate2)]):
+            paramType = "sparse"
         else:
             assert( isinstance(gate1, StaticGate)
                     and isinstance(gate2, StaticGate) )
@@ -149,7 +153,7 @@ def convert(gate, toType, basis):
     gate : Gate
         Gate to convert
 
-    toType : {"full", "TP", "CPTP", "H+S", "S", "static", "GLND"}
+    toType : {"full", "TP", "CPTP", "H+S", "S", "static", "GLND", "sparse"}
         The type of parameterizaton to convert to.
 
     basis : {'std', 'gm', 'pp', 'qt'} or Basis object
@@ -216,6 +220,12 @@ def convert(gate, toType, basis):
                 nonham_diagonal_only, truncate, basis)
         
 
+    elif toType == "sparse":
+        if isinstance(gate, SparseGate):
+            return gate #no conversion necessary
+        else:
+            return SparseGate( gate )
+
     elif toType == "static":
         if isinstance(gate, StaticGate):
             return gate #no conversion necessary
@@ -350,6 +360,10 @@ class Gate(_gatesetmember.GateSetMember):
         """ Act this gate map on an input state """
         raise NotImplementedError("acton(...) not implemented!")
 
+    def adjoint_acton(self, state):
+        """ Act the adjoint (transpose) of this gate map on an input dual vector """
+        raise NotImplementedError("adjoint_acton(...) not implemented!")
+
     def transform(self, S):
         """ Update gate G with inv(S) * G * S."""
         raise NotImplementedError("This gate cannot be transform()'d")
@@ -421,6 +435,10 @@ class GateMatrix(Gate):
         """ Act this gate matrix on an input state (left-multiply w/matrix) """
         return _np.dot(self.base, state) #TODO: return a SPAMVec?
 
+    def adjoint_acton(self, state):
+        """ Act the transpose of this gate matrix on an input dual vector """
+        return _np.dot(self.base.T, state)
+
     def frobeniusdist2(self, otherGate, transform=None, inv_transform=None):
         """ 
         Return the squared frobenius difference between this gate and
@@ -1124,6 +1142,654 @@ class FullyParameterizedGate(GateMatrix):
         return FullyParameterizedGate( _np.dot( self.base, otherGate.base) )
     
 
+class SparseGate(GateMatrix):
+    """
+    Encapsulates a gate matrix with a fixed sparsity pattern, where each
+      element within the pattern is an independent parameter.  The gate is
+      stored as a compressed sparse row (CSR) matrix, which is used to act on
+      states, in addition to the usual dense matrix.
+    """
+
+    def __init__(self, M, pattern=None):
+        """
+        Initialize a SparseGate object.
+
+        Parameters
+        ----------
+        M : array_like or Gate
+            a square 2D array-like or Gate object representing the gate action.
+            The shape of M sets the dimension of the gate.
+
+        pattern : numpy array, optional
+            A boolean array with the same shape as `M` specifying which
+            elements of the gate matrix may be nonzero (and are parameters).
+            If None, the nonzero elements of `M` are used.
+        """
+        M2 = GateMatrix.convert_to_matrix(M)
+        GateMatrix.__init__(self,M2)
+
+        if pattern is None: pattern = (M2 != 0)
+        rows,cols = _np.nonzero(pattern) # in row-major order, as CSR data is
+        self._flat_inds = rows*self.dim + cols
+        indptr = _np.concatenate( ([0], _np.cumsum(_np.bincount(rows, minlength=self.dim))) )
+        self.sparse_mx = _sps.csr_matrix( (M2[rows,cols], cols, indptr),
+                                          shape=(self.dim,self.dim) )
+        if _np.any(M2[~pattern] != 0):
+            raise ValueError("Gate matrix has nonzero elements outside of `pattern`!")
+
+
+    def acton(self, state):
+        """ Act this gate matrix on an input state (left-multiply w/sparse matrix) """
+        return self.sparse_mx.dot(state)
+
+    def adjoint_acton(self, state):
+        """ Act the transpose of this gate matrix on an input dual vector """
+        return self.sparse_mx.T.dot(state)
+
+
+    def __setitem__(self, key, val):
+        mx = self.base.copy(); mx[key] = val
+        self.set_value(mx) # keeps sparse matrix in sync
+
+
+    def get_pattern(self):
+        """
+        Get the sparsity pattern of this gate.
+
+        Returns
+        -------
+        numpy array
+            A boolean array of shape (dim, dim) which is True where gate
+            matrix elements may be nonzero.
+        """
+        pattern = _np.zeros( (self.dim,self.dim), bool )
+        pattern.flat[self._flat_inds] = True
+        return pattern
+
+
+    def set_value(self, M):
+        """
+        Attempts to modify gate parameters so that the specified raw
+        gate matrix becomes mx.  Will raise ValueError if this operation
+        is not possible.
+
+        Parameters
+        ----------
+        M : array_like or Gate
+            An array of shape (dim, dim) or Gate representing the gate action.
+
+        Returns
+        -------
+        None
+        """
+        mx = GateMatrix.convert_to_matrix(M)
+        if(mx.shape != (self.dim, self.dim)):
+            raise ValueError("Argument must be a (%d,%d) matrix!"
+                             % (self.dim,self.dim))
+        if _np.any(mx[~self.get_pattern()] != 0):
+            raise ValueError("Cannot set a SparseGate to a matrix with nonzero "
+                             + "elements outside of its sparsity pattern!")
+        self.from_vector( mx.flatten()[self._flat_inds] )
+
+
+    def num_params(self):
+        """
+        Get the number of independent parameters which specify this gate.
+
+        Returns
+        -------
+        int
+           the number of independent parameters.
+        """
+        return len(self._flat_inds)
+
+
+    def to_vector(self):
+        """
+        Get the gate parameters as an array of values.
+
+        Returns
+        -------
+        numpy array
+            The gate parameters as a 1D array with length num_params().
+        """
+        return self.sparse_mx.data.copy()
+
+
+    def from_vector(self, v):
+        """
+        Initialize the gate using a vector of parameters.
+
+        Parameters
+        ----------
+        v : numpy array
+            The 1D vector of gate parameters.  Length
+            must == num_params()
+
+        Returns
+        -------
+        None
+        """
+        assert(len(v) == self.num_params())
+        self.sparse_mx.data[:] = v
+        self.base.flat[self._flat_inds] = v
+        self.dirty = True
+
+
+    def deriv_wrt_params(self, wrtFilter=None):
+        """
+        Construct a matrix whose columns are the vectorized
+        derivatives of the flattened gate matrix with respect to a
+        single gate parameter.  Thus, each column is of length
+        gate_dim^2 and there is one column per gate parameter.
+
+        Returns
+        -------
+        numpy array
+            Array of derivatives with shape (dimension^2, num_params)
+        """
+        return self.sparse_deriv_wrt_params(wrtFilter).toarray()
+
+
+    def sparse_deriv_wrt_params(self, wrtFilter=None):
+        """
+        The same as :method:`deriv_wrt_params` except the (very sparse)
+        derivative matrix is returned as a scipy CSR matrix.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            Array of derivatives with shape (dimension^2, num_params)
+        """
+        flat_inds = self._flat_inds if (wrtFilter is None) \
+                    else _np.take(self._flat_inds, wrtFilter)
+        n = len(flat_inds)
+        return _sps.csr_matrix( (_np.ones(n,'d'), (flat_inds, _np.arange(n))),
+                                shape=(self.dim**2, n) )
+
+        
+    def has_nonzero_hessian(self):
+        """ 
+        Returns whether this gate has a non-zero Hessian with
+        respect to its parameters, i.e. whether it only depends
+        linearly on its parameters or not.
+
+        Returns
+        -------
+        bool
+        """
+        return False
+
+
+    def copy(self, parent=None):
+        """
+        Copy this gate.
+
+        Returns
+        -------
+        Gate
+            A copy of this gate.
+        """
+        return self._copy_gpindices( SparseGate(self.base, self.get_pattern()), parent )
+
+
+    def transform(self, S):
+        """
+        Update gate matrix G with inv(S) * G * S,
+
+        Generally, the transform function updates the *parameters* of 
+        the gate such that the resulting gate matrix is altered as 
+        described above.  If such an update cannot be done (because
+        the gate parameters do not allow for it), ValueError is raised.
+
+        In this particular case, a transform is possible only when the
+        transformed gate matrix lies within this gate's sparsity pattern.
+
+        Parameters
+        ----------
+        S : GaugeGroupElement
+            A gauge group element which specifies the "S" matrix 
+            (and it's inverse) used in the above similarity transform.
+        """
+        Smx = S.get_transform_matrix()
+        Si  = S.get_transform_matrix_inverse()
+        self.set_value(_np.dot(Si,_np.dot(self.base, Smx)))
+
+
+    def depolarize(self, amount):
+        """
+        Depolarize this gate by the given `amount`.
+
+        Generally, the depolarize function updates the *parameters* of 
+        the gate such that the resulting gate matrix is depolarized.  If
+        such an update cannot be done (because the gate parameters do not
+        allow for it), ValueError is raised.
+
+        Parameters
+        ----------
+        amount : float or tuple
+            The amount to depolarize by.  If a tuple, it must have length
+            equal to one less than the dimension of the gate. In standard
+            bases, depolarization corresponds to multiplying the gate matrix
+            by a diagonal matrix whose first diagonal element (corresponding
+            to the identity) equals 1.0 and whose subsequent elements 
+            (corresponding to non-identity basis elements) equal
+            `1.0 - amount[i]` (or just `1.0 - amount` if `amount` is a
+            float).
+
+        Returns
+        -------
+        None
+        """
+        if isinstance(amount,float):
+            D = _np.diag( [1]+[1-amount]*(self.dim-1) )
+        else:
+            assert(len(amount) == self.dim-1)
+            D = _np.diag( [1]+list(1.0 - _np.array(amount,'d')) )
+        self.set_value(_np.dot(D,self.base))
+
+
+    def rotate(self, amount, mxBasis="gm"):
+        """
+        Rotate this gate by the given `amount`.
+
+        Generally, the rotate function updates the *parameters* of 
+        the gate such that the resulting gate matrix is rotated.  If
+        such an update cannot be done (because the gate parameters do not
+        allow for it), ValueError is raised.
+
+        Parameters
+        ----------
+        amount : tuple of floats, optional
+            Specifies the rotation "coefficients" along each of the non-identity
+            Pauli-product axes.  The gate's matrix `G` is composed with a
+            rotation operation `R`  (so `G` -> `dot(R, G)` ) where `R` is the
+            unitary superoperator corresponding to the unitary operator 
+            `U = exp( sum_k( i * rotate[k] / 2.0 * Pauli_k ) )`.  Here `Pauli_k`
+            ranges over all of the non-identity un-normalized Pauli operators.
+
+        mxBasis : {'std', 'gm', 'pp', 'qt'} or Basis object
+            The source and destination basis, respectively.  Allowed
+            values are Matrix-unit (std), Gell-Mann (gm), Pauli-product (pp),
+            and Qutrit (qt) (or a custom basis object).
+
+        Returns
+        -------
+        None
+        """
+        rotnMx = _gt.rotation_gate_mx(amount,mxBasis)
+        self.set_value(_np.dot(rotnMx,self.base))
+
+
+    def __str__(self):
+        s = "Sparse gate with shape %s and %d parameters\n" % \
+            (str(self.base.shape), self.num_params())
+        s += _mt.mx_to_string(self.base, width=4, prec=2)
+        return s
+
+
+    def compose(self, otherGate):
+        """
+        Create and return a new gate that is the composition of this gate
+        followed by otherGate, which *must be another SparseGate*.  (For more
+        general compositions between different types of gates, use the
+        module-level compose function.)  The returned gate's matrix is
+        equal to dot(this, otherGate), and its sparsity pattern is the
+        nonzero pattern of this product.
+
+        Parameters
+        ----------
+        otherGate : SparseGate
+            The gate to compose to the right of this one.
+
+        Returns
+        -------
+        SparseGate
+        """
+        assert( isinstance(otherGate, SparseGate) )
+        return SparseGate( self.sparse_mx.dot(otherGate.sparse_mx).toarray() )
+    
+
+class EmbeddedGate(GateMatrix):
+    """
+    Encapsulates a gate that acts on a subset of the tensor-product factors
+      (e.g. qubits) of a larger state space, as the identity on the rest.
+      Only the "local" gate is stored and parameterized, and the gate acts on
+      states by contracting the local gate with the targeted factors.  A dense
+      gate matrix is also maintained, which assumes a tensor-product basis
+      such as the Pauli-product ("pp") basis, where the embedding of a gate
+      `G` on the second of two qubits is `kron(identity(4), G)`.
+    """
+
+    def __init__(self, stateSpaceLabels, targetLabels, gate_to_embed, labelDims=None):
+        """
+        Initialize an EmbeddedGate object.
+
+        Parameters
+        ----------
+        stateSpaceLabels : tuple
+            The labels of the tensor-product factors of the entire state
+            space, e.g. `('Q0','Q1')`, in the order they appear in the
+            (tensor-product) basis.
+
+        targetLabels : tuple
+            The labels of the factors `gate_to_embed` acts upon, in the order
+            used by `gate_to_embed`.  E.g. `('Q1',)`.
+
+        gate_to_embed : GateMatrix
+            The local gate, acting on the factors given by `targetLabels`.  Its
+            parameters become the parameters of this gate.
+
+        labelDims : dict, optional
+            The (superoperator) dimension of each factor, keyed by label.  If
+            None, every factor is assumed to be a qubit, with dimension 4.
+        """
+        self.state_space_labels = tuple(stateSpaceLabels)
+        self.target_labels = tuple(targetLabels)
+        self.embedded_gate = gate_to_embed
+        self.label_dims = labelDims
+
+        if labelDims is None: labelDims = { l: 4 for l in self.state_space_labels }
+        factorDims = [ labelDims[l] for l in self.state_space_labels ]
+        if any([ l not in self.state_space_labels for l in self.target_labels ]):
+            raise ValueError("Target labels %s are not all in the state space labels %s!"
+                             % (str(self.target_labels), str(self.state_space_labels)))
+        targetAxes = [ self.state_space_labels.index(l) for l in self.target_labels ]
+        otherAxes = [ i for i in range(len(factorDims)) if i not in targetAxes ]
+        dim = int(_np.product(factorDims))
+        localDim = int(_np.product([ factorDims[i] for i in targetAxes ]))
+        if gate_to_embed.dim != localDim:
+            raise ValueError("Gate to embed has dimension %d, but the target labels "
+                             % gate_to_embed.dim + "%s have dimension %d!"
+                             % (str(self.target_labels), localDim))
+
+        #_inds[a,r] is the index into the full space of local index `a` and
+        # index `r` of the remaining (non-target) factors.
+        self._inds = _np.arange(dim).reshape(factorDims).transpose(
+            targetAxes + otherAxes).reshape(localDim, dim // localDim)
+
+        GateMatrix.__init__(self, _np.zeros((dim,dim),'d'))
+        self._update_base()
+
+
+    def __setitem__(self, key, val):
+        raise ValueError("Cannot set elements of an EmbeddedGate (use its `embedded_gate`)!")
+
+
+    def _embed(self, localMx):
+        """ Returns the embedding of a (localDim, localDim, ...) array """
+        shape = localMx.shape
+        embedded = _np.zeros( (self.dim,self.dim) + shape[2:], localMx.dtype)
+        embedded[self._inds[:,None,:], self._inds[None,:,:]] = localMx[:,:,None]
+        return embedded
+
+
+    def _update_base(self):
+        self.base[:,:] = self._embed(_np.asarray(self.embedded_gate.base))
+        self.dirty = True
+
+
+    def _apply(self, localMx, state):
+        """ Applies embedded `localMx` to `state` (which may be 2D) """
+        localDim, nRest = self._inds.shape
+        localStates = state[self._inds].reshape( (localDim, -1) ) # rest index "folded" into columns
+        ret = _np.empty(state.shape, 'd')
+        ret[self._inds] = _np.dot(localMx, localStates).reshape( (localDim,nRest) + state.shape[1:] )
+        return ret
+
+
+    def acton(self, state):
+        """ Act this gate on an input state, by contracting with the local gate """
+        return self._apply(self.embedded_gate.base, _np.asarray(state))
+
+
+    def adjoint_acton(self, state):
+        """ Act the transpose of this gate on an input dual vector """
+        return self._apply(self.embedded_gate.base.T, _np.asarray(state))
+
+
+    def num_params(self):
+        """
+        Get the number of independent parameters which specify this gate.
+
+        Returns
+        -------
+        int
+           the number of independent parameters.
+        """
+        return self.embedded_gate.num_params()
+
+
+    def to_vector(self):
+        """
+        Get the gate parameters as an array of values.
+
+        Returns
+        -------
+        numpy array
+            The gate parameters as a 1D array with length num_params().
+        """
+        return self.embedded_gate.to_vector()
+
+
+    def from_vector(self, v):
+        """
+        Initialize the gate using a vector of parameters.
+
+        Parameters
+        ----------
+        v : numpy array
+            The 1D vector of gate parameters.  Length
+            must == num_params()
+
+        Returns
+        -------
+        None
+        """
+        self.embedded_gate.from_vector(v)
+        self._update_base()
+
+
+    def deriv_wrt_params(self, wrtFilter=None):
+        """
+        Construct a matrix whose columns are the vectorized
+        derivatives of the flattened gate matrix with respect to a
+        single gate parameter.  Thus, each column is of length
+        gate_dim^2 and there is one column per gate parameter.
+
+        Returns
+        -------
+        numpy array
+            Array of derivatives with shape (dimension^2, num_params)
+        """
+        return self.sparse_deriv_wrt_params(wrtFilter).toarray()
+
+
+    def sparse_deriv_wrt_params(self, wrtFilter=None):
+        """
+        The same as :method:`deriv_wrt_params` except the derivative matrix,
+        which only has nonzero elements where the embedded gate does, is
+        returned as a scipy CSR matrix.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            Array of derivatives with shape (dimension^2, num_params)
+        """
+        localDeriv = self.embedded_gate.deriv_wrt_params(wrtFilter) # (localDim**2, n)
+        localDim, nRest = self._inds.shape
+        n = localDeriv.shape[1]
+        ab,k = _np.nonzero(localDeriv)
+        rows = self._inds[ab // localDim] # shape (nNonzero, nRest)
+        cols = self._inds[ab % localDim]
+        return _sps.csr_matrix( (_np.repeat(localDeriv[ab,k],nRest),
+                                 ((rows*self.dim + cols).flatten(), _np.repeat(k,nRest))),
+                                shape=(self.dim**2, n) )
+
+
+    def has_nonzero_hessian(self):
+        """ 
+        Returns whether this gate has a non-zero Hessian with
+        respect to its parameters, i.e. whether it only depends
+        linearly on its parameters or not.
+
+        Returns
+        -------
+        bool
+        """
+        return self.embedded_gate.has_nonzero_hessian()
+
+
+    def hessian_wrt_params(self, wrtFilter1=None, wrtFilter2=None):
+        """
+        Construct the Hessian of this gate with respect to its parameters.
+
+        This function returns a tensor whose first axis corresponds to the
+        flattened gate matrix and whose 2nd and 3rd axes correspond to the
+        parameters that are differentiated with respect to.
+
+        Parameters
+        ----------
+        wrtFilter1, wrtFilter2 : list
+            Lists of indices of the paramters to take first and second
+            derivatives with respect to.  If None, then derivatives are
+            taken with respect to all of the gate's parameters.
+
+        Returns
+        -------
+        numpy array
+            Hessian with shape (dimension^2, num_params1, num_params2)
+        """
+        localHessian = self.embedded_gate.hessian_wrt_params(wrtFilter1, wrtFilter2)
+        localDim = self.embedded_gate.dim
+        n1,n2 = localHessian.shape[1:]
+        return self._embed(localHessian.reshape(localDim,localDim,n1,n2)).reshape(
+            self.dim**2, n1, n2)
+
+
+    def copy(self, parent=None):
+        """
+        Copy this gate.
+
+        Returns
+        -------
+        Gate
+            A copy of this gate.
+        """
+        return self._copy_gpindices( EmbeddedGate(self.state_space_labels, self.target_labels,
+                                                  self.embedded_gate.copy(), self.label_dims),
+                                     parent )
+
+
+    def transform(self, S):
+        """
+        Update gate matrix G with inv(S) * G * S,
+
+        Generally, the transform function updates the *parameters* of 
+        the gate such that the resulting gate matrix is altered as 
+        described above.  If such an update cannot be done (because
+        the gate parameters do not allow for it), ValueError is raised.
+
+        In this particular case a general transform isn't possible, since
+        the transformed gate needn't act as the identity on the non-target
+        factors, and so this function *always* raises a ValueError.
+
+        Parameters
+        ----------
+        S : GaugeGroupElement
+            A gauge group element which specifies the "S" matrix 
+            (and it's inverse) used in the above similarity transform.
+        """
+        raise ValueError("Cannot transform an EmbeddedGate (use its `embedded_gate`)!")
+
+
+    def depolarize(self, amount):
+        """
+        Depolarize this gate by the given `amount`.
+
+        Generally, the depolarize function updates the *parameters* of 
+        the gate such that the resulting gate matrix is depolarized.  If
+        such an update cannot be done (because the gate parameters do not
+        allow for it), ValueError is raised.
+
+        In this particular case, depolarizing the entire space cannot be
+        done by altering the local gate, so this function *always* raises a
+        ValueError.  (The `embedded_gate` may be depolarized directly.)
+
+        Parameters
+        ----------
+        amount : float or tuple
+            The amount to depolarize by.
+
+        Returns
+        -------
+        None
+        """
+        raise ValueError("Cannot depolarize an EmbeddedGate (use its `embedded_gate`)!")
+
+
+    def rotate(self, amount, mxBasis="gm"):
+        """
+        Rotate this gate by the given `amount`.
+
+        Generally, the rotate function updates the *parameters* of 
+        the gate such that the resulting gate matrix is rotated.  If
+        such an update cannot be done (because the gate parameters do not
+        allow for it), ValueError is raised.
+
+        In this particular case, a rotation of the entire space cannot be
+        done by altering the local gate, so this function *always* raises a
+        ValueError.  (The `embedded_gate` may be rotated directly.)
+
+        Parameters
+        ----------
+        amount : tuple of floats, optional
+            Specifies the rotation "coefficients" along each of the non-identity
+            Pauli-product axes.
+
+        mxBasis : {'std', 'gm', 'pp', 'qt'} or Basis object
+            The source and destination basis.
+
+        Returns
+        -------
+        None
+        """
+        raise ValueError("Cannot rotate an EmbeddedGate (use its `embedded_gate`)!")
+
+
+    def __str__(self):
+        s = "Embedded gate acting on %s of %s, with local gate:\n" % \
+            (str(self.target_labels), str(self.state_space_labels))
+        s += str(self.embedded_gate)
+        return s
+
+
+    def compose(self, otherGate):
+        """
+        Create and return a new gate that is the composition of this gate
+        followed by otherGate, which *must be another EmbeddedGate* with the
+        same state space and target labels.  The returned gate embeds the
+        composition of the two local gates, so its matrix is equal to
+        dot(this, otherGate).
+
+        Parameters
+        ----------
+        otherGate : EmbeddedGate
+            The gate to compose to the right of this one.
+
+        Returns
+        -------
+        EmbeddedGate
+        """
+        assert( isinstance(otherGate, EmbeddedGate) )
+        if otherGate.state_space_labels != self.state_space_labels or \
+           otherGate.target_labels != self.target_labels:
+            raise ValueError("Can only compose EmbeddedGates with the same embedding!")
+        return EmbeddedGate(self.state_space_labels, self.target_labels,
+                            self.embedded_gate.compose(otherGate.embedded_gate),
+                            self.label_dims)
+    
+
 class TPParameterizedGate(GateMatrix):
     """
     Encapsulates a gate matrix that is fully parameterized except for
@@ -6,10 +6,14 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 #    in the file "license.txt" in the top-level pyGSTi directory
 #*****************************************************************
 
+import os as _os
 import numpy as _np
 import numpy.linalg as _nla
+import timeit as _timeit
 import collections as _collections
 import itertools as _itertools
+import threading as _threading
+import multiprocessing.pool as _mppool
 
 from ..tools import compattools as _compat
 from ..tools import slicetools as _slct
@@ -26,6 +30,35 @@ _dummy_profiler = _DummyProfiler()
 # well.
 P_RANK_TOL = 1e-7
 
+# The number of timing runs, and of calls per run, of each kernel timed by
+# `calibrate_costs` (the fastest run is used, to reduce the effect of other
+# activity on the machine).
+CALIBRATION_REPEATS = 5
+CALIBRATION_CALLS = 50
+
+# Thread pools used by `GateCalc._run_threaded`, keyed by their process
+# (as threads don't survive forking) and size, and a per-thread flag marking
+# the threads of these pools (whose tasks are never themselves run on a pool,
+# as this could exhaust its threads).
+_thread_pools = {}
+_thread_pools_lock = _threading.Lock()
+_pool_thread = _threading.local()
+
+def _get_thread_pool(nThreads):
+    """ Get a (persistent) pool of `nThreads` threads """
+    key = (_os.getpid(), nThreads)
+    with _thread_pools_lock:
+        if key not in _thread_pools:
+            _thread_pools[key] = _mppool.ThreadPool(nThreads)
+        return _thread_pools[key]
+
+def _call_on_pool_thread(fn_and_arg):
+    """ Calls `fn(arg)`, marking the current thread as a pool thread """
+    fn, arg = fn_and_arg
+    _pool_thread.active = True
+    try: return fn(arg)
+    finally: _pool_thread.active = False
+
 
 class GateCalc(object):
     """
@@ -38,7 +71,7 @@ class GateCalc(object):
     fundamental operations.
     """
 
-    def __init__(self, dim, gates, preps, effects, paramvec):
+    def __init__(self, dim, gates, preps, effects, paramvec, numThreads=None):
         """
         Construct a new GateCalc object.
 
@@ -62,6 +95,11 @@ class GateCalc(object):
 
         paramvec : ndarray
             The parameter vector of the GateSet.
+
+        numThreads : int, optional
+            The number of threads used to compute independent parts of the
+            `bulk_fill_*` methods' results concurrently within a process (see
+            :method:`_run_threaded`).  None or 1 means compute sequentially.
         """
         self.dim = dim
         self.gates = gates
@@ -85,6 +123,7 @@ class GateCalc(object):
         # self.tot_params = self.tot_spam_params + self.tot_gate_params
         self.paramvec = paramvec
         self.Np = len(paramvec)
+        self.numThreads = numThreads
 
 
     def to_vector(self):
@@ -122,6 +161,46 @@ class GateCalc(object):
             yield (lbl,obj)
 
 
+    def _process_wrtFilter(self, wrtFilter, obj):
+        """ Helper function for derivative computations (e.g. dgate and hgate):
+            pulls out pieces of a wrtFilter argument relevant for a single
+            object (gate or spam vec) """
+        
+        #Create per-gate with-respect-to parameter filters, used to
+        # select a subset of all the derivative columns, essentially taking
+        # a derivative of only a *subset* of all the gate's parameters
+
+        if isinstance(wrtFilter,slice):
+            wrtFilter = _slct.indices(wrtFilter)
+        
+        if wrtFilter is not None:
+            obj_wrtFilter = [] # values = object-local param indices
+            relevant_gpindices = [] # indices into original wrtFilter'd indices
+
+            gpindices = obj.gpindices_as_array()
+
+            for ii,i in enumerate(wrtFilter):
+                if i in gpindices:
+                    relevant_gpindices.append(ii)
+                    obj_wrtFilter.append(list(gpindices).index(i))
+            relevant_gpindices = _np.array(relevant_gpindices,'i')
+            if len(relevant_gpindices) == 1:
+                #Don't return a length-1 list, as this doesn't index numpy arrays
+                # like length>1 lists do... ugh.
+                relevant_gpindices = slice(relevant_gpindices[0],
+                                           relevant_gpindices[0]+1)
+            elif len(relevant_gpindices) == 0:
+                #Don't return a length-0 list, as this doesn't index numpy arrays
+                # like length>1 lists do... ugh.
+                relevant_gpindices = slice(0,0) #slice that results in a zero dimension
+
+        else:
+            obj_wrtFilter = None
+            relevant_gpindices = obj.gpindices
+            
+        return obj_wrtFilter, relevant_gpindices
+
+
     def deriv_wrt_params(self):
         """
         Construct a matrix whose columns are the vectorized derivatives of all
@@ -863,6 +942,39 @@ class GateCalc(object):
         """
         raise NotImplementedError("construct_evaltree(...) is not implemented!")
 
+
+    def calibrate_costs(self, nDerivCols=0):
+        """
+        Measures, on the current machine, the cost of the basic operations
+        performed when evaluating an evaluation tree.
+
+        The returned dictionary can be given as the `costModel` of
+        :method:`EvalTree.split`, so that sub-trees are balanced according
+        to measured rather than estimated costs.
+
+        Parameters
+        ----------
+        nDerivCols : int, optional
+            The number of derivative columns computed at once (e.g. the
+            parameter block size of `bulk_fill_dprobs`).  When greater than
+            zero, the timed operations include derivative blocks of this
+            many columns.
+
+        Returns
+        -------
+        dict
+            A dictionary with keys `"op"`, the time in seconds of one tree
+            operation (see :method:`EvalTree.get_element_costs`), and
+            `"final"`, the time in seconds to compute the result(s) for one
+            spam tuple of a final gate string.
+        """
+        raise NotImplementedError("calibrate_costs(...) is not implemented!")
+
+    def _time_kernel(self, fn):
+        """ The time in seconds of a single call to `fn()` """
+        times = _timeit.Timer(fn).repeat(CALIBRATION_REPEATS, CALIBRATION_CALLS)
+        return max(min(times) / CALIBRATION_CALLS, 1e-9)
+
     
     def bulk_product(self, evalTree, bScale=False, comm=None):
         """
@@ -1066,8 +1178,49 @@ class GateCalc(object):
         raise NotImplementedError("bulk_hproduct(...) is not implemented!")
     
 
+    def _run_threaded(self, fn, args, comm=None):
+        """
+        Computes `[ fn(a) for a in args ]`, calling `fn` concurrently on up
+        to `self.numThreads` threads.
+
+        The calls must be independent, e.g. fill disjoint parts of an
+        array, and since only one thread runs Python code at a time they
+        should spend most of their time in numpy routines (e.g. matrix
+        products) that release the GIL.  The calls are made sequentially
+        when `self.numThreads` is None or 1, when this method is called
+        from one of the calls of an enclosing `_run_threaded`, or when
+        `comm` has more than one processor - as then the calls perform
+        collective operations, which must occur in the same order on all
+        the processors.
+
+        Parameters
+        ----------
+        fn : function
+            A function of one argument.
+
+        args : list
+            The arguments to call `fn` with.
+
+        comm : mpi4py.MPI.Comm, optional
+            The communicator used within `fn`, if any.
+
+        Returns
+        -------
+        list
+            The values returned by `fn`, in the order of `args`.
+        """
+        nThreads = self.numThreads
+        if nThreads is None or nThreads <= 1 or len(args) <= 1 \
+           or getattr(_pool_thread, 'active', False) \
+           or (comm is not None and comm.Get_size() > 1):
+            return [ fn(a) for a in args ]
+        pool = _get_thread_pool(nThreads)
+        return pool.map(_call_on_pool_thread, [ (fn,a) for a in args ], chunksize=1)
+
+
     def _fill_result_tuple(self, result_tup, evalTree,
-                           param_slice1, param_slice2, calc_and_fill_fn):
+                           param_slice1, param_slice2, calc_and_fill_fn,
+                           comm=None, threadsafe=True):
         """ 
         This function takes a "calc-and-fill" function, which computes
         and *fills* (i.e. doesn't return to save copying) some arrays. The
@@ -1080,18 +1233,31 @@ class GateCalc(object):
         the filling should overwrite or add to the existing array values, 
         which is a functionality needed to correctly handle the remainder
         spam label.
+
+        The different spam labels fill disjoint elements, and are processed
+        concurrently when `self.numThreads > 1` (see :method:`_run_threaded`)
+        unless `threadsafe` is False.  `comm` is the communicator used within
+        `calc_and_fill_fn`, if any.
         """
         
         pslc1 = param_slice1
         pslc2 = param_slice2
         remainder_index = None
-        for spamTuple, (fInds,gInds) in evalTree.spamtuple_indices.items():
+
+        def fill(spamtuple_and_indices):
+            spamTuple, (fInds,gInds) = spamtuple_and_indices
             # fInds = "final indices" = the "element" indices in the final
             #          filled quantity combining both spam and gate-sequence indices
             # gInds  = "gate sequence indices" = indices into the (tree-) list of
             #          all of the raw gate sequences which need to be computed
             #          for the current spamTuple (this list has the SAME length as fInds).            
             calc_and_fill_fn(spamTuple,fInds,gInds,pslc1,pslc2,False)
+
+        spamtuple_items = list(evalTree.spamtuple_indices.items())
+        if threadsafe:
+            self._run_threaded(fill, spamtuple_items, comm)
+        else:
+            for item in spamtuple_items: fill(item)
                     
         return
 
@@ -8,8 +8,10 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 
 import warnings as _warnings
 import numpy as _np
+import scipy.sparse as _sps
 import time as _time
 import itertools as _itertools
+import collections as _collections
 
 from ..tools import mpitools as _mpit
 from ..tools import slicetools as _slct
@@ -21,6 +23,33 @@ from .gatecalc import GateCalc
 
 _dummy_profiler = _DummyProfiler()
 
+# Method used to compute probability derivatives.  "forward" propagates the
+# derivative of each state alongside the state itself, "reverse" propagates
+# (dual) effect vectors backward through each gate string, which is cheaper
+# when there are many parameters relative to the total length of the gate
+# strings, and "auto" chooses between these two based on their estimated
+# costs.  "finitediff" uses (slow) one-parameter-at-a-time finite differences.
+DERIV_MODE = "auto"
+
+# When True, states are propagated through an evaluation tree one
+# "generation" at a time, as (dim, k) blocks holding all the tree elements
+# that apply the same gate at the same position (and all the required preps),
+# so that each gate application is a matrix-matrix product.  When False,
+# each tree element is propagated separately, one vector at a time.  Since
+# the map-tree remainders are short, blocks are typically only a handful of
+# columns wide and the gathering overhead roughly cancels the BLAS-3 gain for
+# 1-3 qubit gate sets, so this is off by default.  (States are shared by all
+# the spam tuples with the same prep either way.)
+BLOCK_PROPAGATION = False
+
+# Static (parameter-free) gates with at most a SPARSE_DENSITY fraction of
+# nonzero elements are applied as CSR sparse matrices, provided the gate
+# dimension is at least SPARSE_MIN_DIM (below this, the fixed overhead of a
+# sparse product exceeds the cost of a small dense one).  (SparseGate objects
+# always apply themselves as sparse matrices.)
+SPARSE_DENSITY = 0.1
+SPARSE_MIN_DIM = 128
+
 #TODO:
 # Gate -> GateMatrix
 # New "Gate" base class, new "GateMap" class
@@ -35,7 +64,7 @@ class GateMapCalc(GateCalc):
     fundamental operations.
     """
 
-    def __init__(self, dim, gates, preps, effects, paramvec):
+    def __init__(self, dim, gates, preps, effects, paramvec, numThreads=None):
         """
         Construct a new GateMapCalc object.
 
@@ -59,15 +88,21 @@ class GateMapCalc(GateCalc):
 
         paramvec : ndarray
             The parameter vector of the GateSet.
+
+        numThreads : int, optional
+            The number of threads used to compute independent parts of the
+            `bulk_fill_*` methods' results concurrently (see
+            :method:`GateCalc._run_threaded`).
         """
         super(GateMapCalc, self).__init__(
-            dim, gates, preps, effects, paramvec)
+            dim, gates, preps, effects, paramvec, numThreads)
+        self._build_actions()
 
         
     def copy(self):
         """ Return a shallow copy of this GateMatrixCalc """
         return GateMapCalc(self.dim, self.gates, self.preps,
-                              self.effects, self.paramvec)
+                              self.effects, self.paramvec, self.numThreads)
 
         
     #Same as GateMatrixCalc, but not general enough to be in base class
@@ -83,6 +118,28 @@ class GateMapCalc(GateCalc):
             E   = _np.conjugate(_np.transpose(Eraw))
         return rho,E
 
+    def _build_actions(self):
+        """
+        Builds the `actons` and `adjoint_actons` dictionaries, which map gate
+        labels to functions that apply a gate to a state (i.e. on the left),
+        and apply the gate's transpose to a dual (effect) vector, respectively.
+        These are the gates' own `acton` and `adjoint_acton` methods, except
+        that sufficiently sparse static gates are applied as sparse matrices.
+        """
+        self.actons = _collections.OrderedDict()
+        self.adjoint_actons = _collections.OrderedDict()
+        for lbl,gate in self.gates.items():
+            if gate.num_params() == 0 and self.dim >= SPARSE_MIN_DIM and \
+               getattr(gate,'sparse_mx',None) is None and \
+               _np.count_nonzero(gate.base) <= SPARSE_DENSITY * self.dim**2:
+                sparse_mx = _sps.csr_matrix(gate.base)
+                self.actons[lbl] = sparse_mx.dot
+                self.adjoint_actons[lbl] = sparse_mx.T.tocsr().dot
+            else: # gates may have their own efficient (e.g. sparse or embedded) actions
+                self.actons[lbl] = gate.acton
+                self.adjoint_actons[lbl] = gate.adjoint_acton
+
+
     def propagate_state(self, rho, gatestring):
         """ 
         State propagation by GateMap objects which have 'acton'
@@ -103,10 +160,78 @@ class GateMapCalc(GateCalc):
         SPAMVec
         """
         for lbl in gatestring:
-            rho = self.gates[lbl].acton(rho) # LEXICOGRAPHICAL VS MATRIX ORDER
+            rho = self.actons[lbl](rho) # LEXICOGRAPHICAL VS MATRIX ORDER
         return rho
 
 
+    def _dgate_actions(self, gatelabels, wrtFilter):
+        """
+        Returns a dictionary of the derivative information needed to propagate
+        state derivatives through the gates labelled by `gatelabels`.  Values
+        are `(gpindices, dG)` tuples, where `gpindices` selects the (filtered)
+        derivative columns a gate contributes to and `dG` is a (dense or, for
+        gates with a `sparse_deriv_wrt_params` method, sparse) matrix of shape
+        `(dim*nGateParams, dim)` such that `dG.dot(rho).reshape(dim,-1)` is the
+        derivative of `G*rho` with respect to those columns.  Values are None
+        for gates which have no parameters selected by `wrtFilter`.
+        """
+        dim = self.dim
+        dgates = {}
+        for lbl in gatelabels:
+            if lbl in dgates: continue
+            gate = self.gates[lbl]
+            gate_wrtFilter, gpindices = self._process_wrtFilter(wrtFilter, gate)
+            if gpindices is None or _slct.length(gpindices) == 0:
+                dgates[lbl] = None
+            elif hasattr(gate,'sparse_deriv_wrt_params'):
+                dG = gate.sparse_deriv_wrt_params(gate_wrtFilter).tocoo() # (dim**2, nGateParams)
+                n = dG.shape[1] # element (i*dim+j, k) => (i*n+k, j)
+                dgates[lbl] = (gpindices, _sps.csr_matrix(
+                    (dG.data, ((dG.row // dim)*n + dG.col, dG.row % dim)), shape=(dim*n,dim)))
+            else:
+                dG = gate.deriv_wrt_params(gate_wrtFilter) # (dim**2, nGateParams)
+                n = dG.shape[1]
+                dgates[lbl] = (gpindices, _np.swapaxes(dG.reshape(dim,dim,n),1,2).reshape(dim*n,dim))
+        return dgates
+
+
+    def _propagate_state_and_deriv(self, rho, drho, gatestring, dgates):
+        """
+        Forward-mode propagation of a state `rho`, of shape `(dim,)`, and its
+        derivative `drho`, of shape `(dim, nDerivCols)`, through `gatestring`
+        using the gate-derivative information in `dgates` (as returned by
+        :method:`_dgate_actions`).  Returns the final `(rho, drho)`.
+        """
+        dim = self.dim
+        for lbl in gatestring:
+            acton = self.actons[lbl] # LEXICOGRAPHICAL VS MATRIX ORDER
+            drho = acton(drho) # d(G*rho) = G*drho + dG*rho
+            if dgates[lbl] is not None:
+                gpindices, dG = dgates[lbl]
+                _fas(drho, [None,gpindices], dG.dot(rho).reshape(dim,-1), add=True)
+            rho = acton(rho)
+        return rho, drho
+
+
+    def _spam_derivs(self, spamTuple, wrtFilter):
+        """
+        Returns `(rho_gpindices, drho, E_gpindices, dE)`: the (filtered)
+        derivative columns and derivatives, of shapes `(dim, nRhoParams)` and
+        `(dim, nEParams)`, of the prep and effect vectors of `spamTuple`.
+        """
+        rholabel,elabel = spamTuple
+        rhoVec, EVec = self.preps[rholabel], self.effects[elabel]
+        rho_wrtFilter, rho_gpindices = self._process_wrtFilter(wrtFilter, rhoVec)
+        E_wrtFilter, E_gpindices = self._process_wrtFilter(wrtFilter, EVec)
+        drho = rhoVec.deriv_wrt_params(rho_wrtFilter) \
+               if (rho_gpindices is not None) else _np.zeros((self.dim,0),'d')
+        dE = EVec.deriv_wrt_params(E_wrtFilter) \
+             if (E_gpindices is not None) else _np.zeros((self.dim,0),'d')
+        if rho_gpindices is None: rho_gpindices = slice(0,0)
+        if E_gpindices is None: E_gpindices = slice(0,0)
+        return rho_gpindices, drho, E_gpindices, dE
+
+
     def pr(self, spamTuple, gatestring, clipTo, bUseScaling=False):
         """
         Compute probability of a single "outcome" (spam-tuple) for a single
@@ -182,18 +307,30 @@ class GateMapCalc(GateCalc):
         probability : float
             only returned if returnPr == True.
         """
-        
-        #Finite difference derivative
-        eps = 1e-7 #hardcoded?
         p = self.pr(spamTuple, gatestring, clipTo)
-        dp = _np.empty( (1,self.Np), 'd' )
 
-        orig_vec = self.to_vector().copy()
-        for i in range(self.Np):
-            vec = orig_vec.copy(); vec[i] += eps
-            self.from_vector(vec)
-            dp[0,i] = (self.pr(spamTuple, gatestring, clipTo)-p)/eps
-        self.from_vector(orig_vec)
+        if DERIV_MODE == "finitediff":
+            #Finite difference derivative
+            eps = 1e-7 #hardcoded?
+            dp = _np.empty( (1,self.Np), 'd' )
+
+            orig_vec = self.to_vector().copy()
+            for i in range(self.Np):
+                vec = orig_vec.copy(); vec[i] += eps
+                self.from_vector(vec)
+                dp[0,i] = (self.pr(spamTuple, gatestring, clipTo)-p)/eps
+            self.from_vector(orig_vec)
+
+        else:
+            #Analytic (forward-mode) derivative
+            rho,E = self._rhoE_from_spamTuple(spamTuple)
+            rho_gpindices, drhoP, E_gpindices, dEP = self._spam_derivs(spamTuple, None)
+            drho = _np.zeros( (self.dim,self.Np), 'd' )
+            _fas(drho, [None,rho_gpindices], drhoP)
+            rho, drho = self._propagate_state_and_deriv(
+                rho[:,0], drho, gatestring, self._dgate_actions(gatestring, None))
+            dp = _np.dot(E, drho) # shape (1,Np)
+            _fas(dp, [0,E_gpindices], _np.dot(rho, dEP), add=True)
                 
         if returnPr:
             if clipTo is not None:  p = _np.clip( p, clipTo[0], clipTo[1] )
@@ -268,7 +405,78 @@ class GateMapCalc(GateCalc):
             else:        return hp
 
 
-    def _compute_pr_cache(self, spamTuple, evalTree, comm, scratch=None):
+    def _propagate_states(self, rhos, evalTree, rho_cache):
+        """
+        Propagates the `k` initial states given by the columns of `rhos`, an
+        array of shape `(dim, k)`, through `evalTree`, filling `rho_cache`, an
+        array of shape `(k, len(evalTree), dim)`.
+
+        When `BLOCK_PROPAGATION` is True, the tree is processed one generation
+        at a time, and within each generation the elements which apply the
+        same gate label at the same position (together with all `k` states of
+        each) are propagated as a single block.
+        """
+        if not BLOCK_PROPAGATION:
+            for k in range(rhos.shape[1]):
+                for i in evalTree.get_evaluation_order():
+                    iStart,remainder = evalTree[i]
+                    if iStart is None:  init_state = rhos[:,k]
+                    else:               init_state = rho_cache[k,iStart]
+                    rho_cache[k,i] = self.propagate_state(init_state, remainder)
+            return
+
+        dim = self.dim
+        k = rhos.shape[1]
+        rhos = _np.asarray(rhos).T # shape (k, dim), like the rows of rho_cache
+        for inds in evalTree.get_evaluation_generations():
+            starts, remainders = zip(*[ evalTree[i] for i in inds ])
+            hasStart = _np.array([ iStart is not None for iStart in starts ], bool)
+            states = _np.empty((len(inds), k, dim), 'd') # element index first
+            states[~hasStart] = rhos[None,:,:]
+            if _np.any(hasStart):
+                states[hasStart] = rho_cache[:,[iStart for iStart in starts
+                                                if iStart is not None],:].transpose(1,0,2)
+
+            #blocks[t] maps gate labels to the positions of the elements
+            # which apply that gate t-th.
+            blocks = [ _collections.OrderedDict() for t in range(max(map(len,remainders))) ]
+            for j,remainder in enumerate(remainders):
+                for t,lbl in enumerate(remainder):
+                    blocks[t].setdefault(lbl,[]).append(j)
+
+            for blocks_t in blocks:
+                for lbl,js in blocks_t.items():
+                    if len(js) == 1: # no need to copy a single element
+                        j = js[0]
+                        states[j] = self.actons[lbl](states[j].T).T
+                        continue
+                    js = _np.array(js, _np.int64)
+                    block = _np.take(states, js, axis=0).reshape(len(js)*k, dim).T # columns are states
+                    block = self.actons[lbl](block) # LEXICOGRAPHICAL VS MATRIX ORDER
+                    states[js] = block.T.reshape(len(js), k, dim)
+            rho_cache[:,inds,:] = states.transpose(1,0,2)
+
+
+    def _compute_rho_caches(self, evalTree):
+        """
+        Computes the propagated states of every tree element for each of the
+        prep labels used by `evalTree`'s spam tuples, all at once, so they can
+        be shared among all the spam tuples with the same prep.  Returns a
+        dictionary whose keys are prep labels and whose values are
+        `(len(evalTree), dim)` arrays.
+        """
+        rholabels = []
+        for spamTuple in evalTree.spamtuple_indices:
+            if spamTuple[0] not in rholabels: rholabels.append(spamTuple[0])
+
+        rho_cache = _np.zeros((len(rholabels), len(evalTree), self.dim), 'd')
+        if len(rholabels) > 0:
+            rhos = _np.concatenate([ self.preps[rl] for rl in rholabels ], axis=1)
+            self._propagate_states(rhos, evalTree, rho_cache)
+        return { rl: rho_cache[k] for k,rl in enumerate(rholabels) }
+
+    
+    def _compute_pr_cache(self, spamTuple, evalTree, comm, scratch=None, rhoCaches=None):
         dim = self.dim
         cacheSize = len(evalTree)
         rho,E = self._rhoE_from_spamTuple(spamTuple)
@@ -281,18 +489,20 @@ class GateMapCalc(GateCalc):
 
         #comm is currently ignored
         #TODO: if evalTree is split, distribute among processors
-        
-        for i in evalTree.get_evaluation_order():
-            iStart,remainder = evalTree[i]
-            if iStart is None:  init_state = rho[:,0]
-            else:               init_state = rho_cache[iStart]
-            rho_cache[i] = self.propagate_state(init_state, remainder)
+
+        if rhoCaches is not None and spamTuple[0] in rhoCaches:
+            # states for this prep have already been computed
+            if scratch is None: rho_cache = rhoCaches[spamTuple[0]]
+            else: rho_cache[:,:] = rhoCaches[spamTuple[0]]
+        else:
+            self._propagate_states(rho, evalTree, rho_cache[None,:,:]) #view, not copy
 
         pCache = _np.dot(E,rho_cache.T) # (1,cacheSize)
         return _np.squeeze(pCache, axis=0) # shape (cacheSize,)
     
     def _compute_dpr_cache(self, spamTuple, evalTree, wrtSlice, comm, scratch=None):
-        #Compute finite difference derivatives, one parameter at a time.
+        #Compute derivatives analytically (unless DERIV_MODE == "finitediff"),
+        # distributing the derivative columns among the processors of `comm`.
 
         param_indices = range(self.Np) if (wrtSlice is None) else _slct.indices(wrtSlice)
         nDerivCols = len(param_indices) # *all*, not just locally computed ones
@@ -307,19 +517,143 @@ class GateMapCalc(GateCalc):
             rho_cache  = scratch[:,nDerivCols:nDerivCols+dim]
             dpr_cache  = scratch[:,0:nDerivCols]
             
-        eps = 1e-7 #hardcoded?
-        pCache = self._compute_pr_cache(spamTuple,evalTree,comm,rho_cache)
-
         all_slices, my_slice, owners, subComm = \
                 _mpit.distribute_slice(slice(0,len(param_indices)), comm)
 
         my_param_indices = param_indices[my_slice]
-        st = my_slice.start #beginning of where my_param_indices results
-                            # get placed into dpr_cache
+
+        if DERIV_MODE == "finitediff":
+            self._fill_dpr_cache_finitediff(spamTuple, evalTree, my_param_indices,
+                                            dpr_cache[:,my_slice], rho_cache, subComm)
+        else:
+            myWrtFilter = None if (_slct.length(my_slice) == self.Np) \
+                          else list(my_param_indices)
+            mode = DERIV_MODE if (DERIV_MODE != "auto") else \
+                   self._choose_deriv_mode(evalTree, len(my_param_indices))
+            if mode == "forward":
+                self._fill_dpr_cache_forward(spamTuple, evalTree, myWrtFilter,
+                                             dpr_cache[:,my_slice], rho_cache)
+            elif mode == "reverse":
+                self._fill_dpr_cache_reverse(spamTuple, evalTree, myWrtFilter,
+                                             dpr_cache[:,my_slice], rho_cache)
+            else: raise ValueError("Invalid derivative mode: %s" % mode)
+
+        #Now each processor has filled the relavant parts of dpr_cache,
+        # so gather together:
+        _mpit.gather_slices(all_slices, owners, dpr_cache,[], axes=1, comm=comm)
+
+        return dpr_cache
+
+
+    def _choose_deriv_mode(self, evalTree, nDerivCols):
+        """
+        Returns "forward" or "reverse", whichever is estimated to compute
+        the derivatives of `evalTree`'s probabilities (for a single spam
+        tuple) with respect to `nDerivCols` parameters more cheaply.
+        """
+        # Forward mode performs one (dim x dim) * (dim x nDerivCols) product per
+        # tree "apply", whereas reverse mode performs two matrix-vector products
+        # per gate of every *full* final gate string (prefixes aren't shared).
+        # Each gate application also carries a fixed (Python) overhead.
+        overhead = 1000 # in units of multiply-adds (~ 1 microsecond)
+        fullLengths = [0]*len(evalTree)
+        for i in evalTree.get_evaluation_order():
+            iStart,remainder = evalTree[i]
+            fullLengths[i] = len(remainder) + (fullLengths[iStart] if (iStart is not None) else 0)
         
+        dim2 = self.dim**2
+        forward_cost = evalTree.get_num_applies() * (overhead + dim2 * nDerivCols)
+        reverse_cost = sum(fullLengths[0:evalTree.num_final_strings()]) * 2 * (overhead + dim2)
+        return "reverse" if (reverse_cost < forward_cost) else "forward"
+
+
+    def _fill_dpr_cache_forward(self, spamTuple, evalTree, wrtFilter, dpr_cache, rho_cache):
+        """
+        Fills `dpr_cache` (and `rho_cache`) by forward-mode propagation of
+        each state's derivative, of shape (dim, nDerivCols), through the tree.
+        Derivative states are only held while they are needed as the starting
+        point of other tree elements.
+        """
+        dim = self.dim
+        nDerivCols = dpr_cache.shape[1]
+        rho,E = self._rhoE_from_spamTuple(spamTuple)
+        rho_gpindices, drhoP, E_gpindices, dEP = self._spam_derivs(spamTuple, wrtFilter)
+        dgates = self._dgate_actions(self.gates.keys(), wrtFilter)
+
+        drho0 = _np.zeros((dim, nDerivCols), 'd')
+        _fas(drho0, [None,rho_gpindices], drhoP)
+
+        nUses = _collections.Counter([ iStart for iStart,_ in evalTree ])
+        dstates = {} # derivative states of the tree elements still needed
+        for i in evalTree.get_evaluation_order():
+            iStart,remainder = evalTree[i]
+            if iStart is None:
+                init_state, init_dstate = rho[:,0], drho0
+            else:
+                init_state, init_dstate = rho_cache[iStart], dstates[iStart]
+                nUses[iStart] -= 1
+                if nUses[iStart] == 0: del dstates[iStart]
+            rho_cache[i], drho = self._propagate_state_and_deriv(
+                init_state, init_dstate, remainder, dgates)
+            if nUses[i] > 0: dstates[i] = drho
+            dpr_cache[i] = _np.dot(E,drho)[0]
+
+        _fas(dpr_cache, [None,E_gpindices], _np.dot(rho_cache, dEP), add=True)
+
+
+    def _fill_dpr_cache_reverse(self, spamTuple, evalTree, wrtFilter, dpr_cache, rho_cache):
+        """
+        Fills `dpr_cache` (and `rho_cache`) by reverse-mode (adjoint)
+        differentiation: for each final gate string the effect vector is
+        propagated backward through the string's gates, so that the cost
+        doesn't scale with the number of derivative columns.
+        """
+        dim = self.dim
+        nDerivCols = dpr_cache.shape[1]
+        rho,E = self._rhoE_from_spamTuple(spamTuple)
+        rho_gpindices, drhoP, E_gpindices, dEP = self._spam_derivs(spamTuple, wrtFilter)
+        dgates = self._dgate_actions(self.gates.keys(), wrtFilter)
+        self._compute_pr_cache(spamTuple, evalTree, None, rho_cache) # fills rho_cache
+
+        nFinal = evalTree.num_final_strings()
+        dpr_cache[nFinal:] = 0 # non-final elements aren't needed
+        for i in range(nFinal):
+            dp = _np.zeros(nDerivCols, 'd')
+            v = _np.array(E[0]) # the "back-propagated" effect (dual) vector
+
+            #Walk backward through the segments of gate string i, each of
+            # which begins at a state that is stored in rho_cache.
+            j = i
+            while j is not None:
+                iStart,remainder = evalTree[j]
+                states = [ rho[:,0] if (iStart is None) else rho_cache[iStart] ]
+                for lbl in remainder[:-1]: # states *before* each gate
+                    states.append( self.actons[lbl](states[-1]) )
+                for lbl,state in zip(reversed(remainder),reversed(states)):
+                    if dgates[lbl] is not None:
+                        gpindices, dG = dgates[lbl]
+                        _fas(dp, [gpindices], _np.dot(v, dG.dot(state).reshape(dim,-1)), add=True)
+                    v = self.adjoint_actons[lbl](v) # LEXICOGRAPHICAL VS MATRIX ORDER
+                j = iStart
+
+            _fas(dp, [rho_gpindices], _np.dot(v, drhoP), add=True)
+            dpr_cache[i] = dp
+
+        _fas(dpr_cache, [None,E_gpindices], _np.dot(rho_cache, dEP), add=True)
+
+
+    def _fill_dpr_cache_finitediff(self, spamTuple, evalTree, param_indices,
+                                   dpr_cache, rho_cache, comm):
+        """
+        Fills `dpr_cache` (and `rho_cache`) with finite difference
+        derivatives, one parameter (of `param_indices`) at a time.
+        """
+        eps = 1e-7 #hardcoded?
+        pCache = self._compute_pr_cache(spamTuple,evalTree,comm,rho_cache)
+
         #Get a map from global parameter indices to the desired
         # final index within dpr_cache
-        iParamToFinal = { i: st+ii for ii,i in enumerate(my_param_indices) }
+        iParamToFinal = { i: ii for ii,i in enumerate(param_indices) }
 
         orig_vec = self.to_vector().copy()
         for i in range(self.Np):
@@ -328,14 +662,9 @@ class GateMapCalc(GateCalc):
                 vec = orig_vec.copy(); vec[i] += eps
                 self.from_vector(vec)
                 dpr_cache[:,iFinal] = ( self._compute_pr_cache(
-                            spamTuple,evalTree,subComm,rho_cache) - pCache)/eps
+                            spamTuple,evalTree,comm,rho_cache) - pCache)/eps
         self.from_vector(orig_vec)
-
-        #Now each processor has filled the relavant parts of dpr_cache,
-        # so gather together:
-        _mpit.gather_slices(all_slices, owners, dpr_cache,[], axes=1, comm=comm)
-
-        return dpr_cache
+        self._compute_pr_cache(spamTuple,evalTree,comm,rho_cache) #un-perturbed states
 
     def _compute_hpr_cache(self, spamTuple, evalTree, wrtSlice1, wrtSlice2, comm):
         #Compute finite difference hessians, one parameter at a time.
@@ -350,7 +679,8 @@ class GateMapCalc(GateCalc):
         dpr_scratch = _np.zeros((cacheSize,nDerivCols2 + dim), 'd')
         hpr_cache  = _np.zeros((cacheSize, nDerivCols1, nDerivCols2),'d')
             
-        eps = 1e-4 #hardcoded?
+        # (first derivatives are exact unless DERIV_MODE == "finitediff")
+        eps = 1e-4 if (DERIV_MODE == "finitediff") else 1e-7 #hardcoded?
         dpCache = self._compute_dpr_cache(spamTuple,evalTree,wrtSlice2,comm,
                                           dpr_scratch).copy()
            #need copy here b/c scratch space is used by sub-calls to
@@ -391,6 +721,43 @@ class GateMapCalc(GateCalc):
         return _MapEvalTree()
 
 
+    def calibrate_costs(self, nDerivCols=0):
+        """
+        Measures, on the current machine, the cost of the basic operations
+        performed when evaluating an evaluation tree.
+
+        For this calculator a tree operation is the application of a single
+        gate to a state (and, if `nDerivCols > 0`, to a block of derivative
+        columns), averaged over the gates, and the final cost is that of
+        contracting a state with an effect vector.
+
+        Parameters
+        ----------
+        nDerivCols : int, optional
+            The number of derivative columns computed at once.  When greater
+            than zero, the timed operations include derivative blocks of
+            this many columns.
+
+        Returns
+        -------
+        dict
+            A dictionary with keys `"op"` and `"final"`, giving the time in
+            seconds of a tree operation and of computing the results of one
+            spam tuple of a final gate string, respectively.
+        """
+        dim = self.dim
+        rho = _np.random.random((dim,1)); E = _np.random.random((1,dim))
+        block = _np.random.random((dim,max(nDerivCols,1)))
+        op = 0.0
+        for acton in self.actons.values():
+            op += self._time_kernel(lambda: acton(rho))
+            if nDerivCols > 0: op += self._time_kernel(lambda: acton(block))
+        op /= max(len(self.actons),1)
+        final = self._time_kernel(lambda: _np.dot(E,rho))
+        if nDerivCols > 0: final += self._time_kernel(lambda: _np.dot(E,block))
+        return {'op': op, 'final': final}
+
+
     def estimate_mem_usage(self, subcalls, cache_size, num_subtrees,
                            num_subtree_proc_groups, num_param1_groups,
                            num_param2_groups):
@@ -512,11 +879,13 @@ class GateMapCalc(GateCalc):
         #eval on each local subtree
         for iSubTree in mySubTreeIndices:
             evalSubTree = subtrees[iSubTree]
+            rhoCaches = self._compute_rho_caches(evalSubTree) #shared by spam tuples
 
             def calc_and_fill(spamTuple, fInds, gInds, pslc1, pslc2, sumInto):
                 """ Compute and fill result quantities for given arguments """
                 #Fill cache info
-                prCache = self._compute_pr_cache(spamTuple, evalSubTree, mySubComm)
+                prCache = self._compute_pr_cache(spamTuple, evalSubTree, mySubComm,
+                                                 rhoCaches=rhoCaches)
 
                 #use cached data to final values
                 ps = evalSubTree.final_view( prCache, axis=0) # ( nGateStrings, )
@@ -644,13 +1013,17 @@ class GateMapCalc(GateCalc):
             #Free memory from previous subtree iteration before computing caches
             paramSlice = slice(None)
             fillComm = mySubComm #comm used by calc_and_fill
+            fillThreadsafe = bool(DERIV_MODE != "finitediff") # finite differences perturb this calculator
+            rhoCaches = self._compute_rho_caches(evalSubTree) \
+                        if (prMxToFill is not None) else None #shared by spam tuples
 
             def calc_and_fill(spamTuple, fInds, gInds, pslc1, pslc2, sumInto):
                 """ Compute and fill result quantities for given arguments """
                 tm = _time.time()
                 
                 if prMxToFill is not None:
-                    prCache = self._compute_pr_cache(spamTuple, evalSubTree, fillComm)
+                    prCache = self._compute_pr_cache(spamTuple, evalSubTree, fillComm,
+                                                     rhoCaches=rhoCaches)
                     ps = evalSubTree.final_view( prCache, axis=0) # ( nGateStrings, )
                     _fas(prMxToFill, [fInds], ps[gInds], add=sumInto)
 
@@ -678,7 +1051,8 @@ class GateMapCalc(GateCalc):
                 
                 #Compute all requested derivative columns at once
                 self._fill_result_tuple( (prMxToFill, mxToFill), evalSubTree,
-                                         slice(None), slice(None), calc_and_fill )
+                                         slice(None), slice(None), calc_and_fill,
+                                         fillComm, fillThreadsafe )
                 profiler.mem_check("bulk_fill_dprobs: post fill")
 
             else: # Divide columns into blocks of at most blkSize
@@ -700,7 +1074,8 @@ class GateMapCalc(GateCalc):
                     paramSlice = blocks[iBlk] #specifies which deriv cols calc_and_fill computes
                     self._fill_result_tuple( 
                         (mxToFill,), evalSubTree,
-                        blocks[iBlk], slice(None), calc_and_fill )
+                        blocks[iBlk], slice(None), calc_and_fill,
+                        fillComm, fillThreadsafe )
                     profiler.mem_check("bulk_fill_dprobs: post fill blk")
 
                 #gather results
@@ -849,12 +1224,15 @@ class GateMapCalc(GateCalc):
             #Free memory from previous subtree iteration before computing caches
             paramSlice1 = slice(None)
             paramSlice2 = slice(None)
+            rhoCaches = self._compute_rho_caches(evalSubTree) \
+                        if (prMxToFill is not None) else None #shared by spam tuples
 
             def calc_and_fill(spamTuple, fInds, gInds, pslc1, pslc2, sumInto):
                 """ Compute and fill result quantities for given arguments """
                 
                 if prMxToFill is not None:
-                    prCache = self._compute_pr_cache(spamTuple, evalSubTree, fillComm)
+                    prCache = self._compute_pr_cache(spamTuple, evalSubTree, fillComm,
+                                                     rhoCaches=rhoCaches)
                     ps = evalSubTree.final_view( prCache, axis=0) # ( nGateStrings, )
                     _fas(prMxToFill, [fInds], ps[gInds], add=sumInto)
 
@@ -900,7 +1278,8 @@ class GateMapCalc(GateCalc):
 
                 #Compute all requested derivative columns at once
                 self._fill_result_tuple((prMxToFill, deriv1MxToFill, deriv2MxToFill, mxToFill),
-                                        evalSubTree, slice(None), slice(None), calc_and_fill)
+                                        evalSubTree, slice(None), slice(None), calc_and_fill,
+                                        threadsafe=False) # hessians perturb this calculator
 
             else: # Divide columns into blocks of at most blkSize
                 assert(wrtFilter1 is None and wrtFilter2 is None) #cannot specify both wrtFilter and blkSize
@@ -929,7 +1308,8 @@ class GateMapCalc(GateCalc):
                     for iBlk2 in myBlk2Indices:
                         paramSlice2 = blocks2[iBlk2]
                         self._fill_result_tuple((prMxToFill, deriv1MxToFill, deriv2MxToFill, mxToFill),
-                                                evalSubTree, blocks1[iBlk1], blocks2[iBlk2], calc_and_fill)
+                                                evalSubTree, blocks1[iBlk1], blocks2[iBlk2], calc_and_fill,
+                                                threadsafe=False)
     
                     #gather column results: gather axis 2 of mxToFill[felInds,blocks1[iBlk1]], dim=(ks,blk1,M)
                     _mpit.gather_slices(blocks2, blk2Owners, mxToFill,[felInds,blocks1[iBlk1]],
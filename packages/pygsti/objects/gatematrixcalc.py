@@ -29,6 +29,16 @@ PSMALL = 1e-100
 DSMALL = 1e-100
 HSMALL = 1e-100
 
+# Whether cache computations evaluate all the products within a dependency
+# "generation" of a MatrixEvalTree (see `get_evaluation_generations`) as a
+# single stacked-matrix operation instead of one tree node at a time.
+BATCH_GENERATIONS = True
+
+# The maximum number of array elements in a single batch of derivative
+# products; generations whose stacked derivatives would be larger than this
+# are processed in several batches so that temporaries stay small.
+BATCH_MAX_ELEMENTS = 2**22
+
 class GateMatrixCalc(GateCalc):
     """
     Encapsulates a calculation tool used by gate set objects to perform product
@@ -40,7 +50,7 @@ class GateMatrixCalc(GateCalc):
     fundamental operations.
     """
 
-    def __init__(self, dim, gates, preps, effects, paramvec):
+    def __init__(self, dim, gates, preps, effects, paramvec, numThreads=None):
         """
         Construct a new GateMatrixCalc object.
 
@@ -64,14 +74,19 @@ class GateMatrixCalc(GateCalc):
 
         paramvec : ndarray
             The parameter vector of the GateSet.
+
+        numThreads : int, optional
+            The number of threads used to compute independent parts of the
+            `bulk_fill_*` methods' results concurrently (see
+            :method:`GateCalc._run_threaded`).
         """
         super(GateMatrixCalc, self).__init__(
-            dim, gates, preps, effects, paramvec)
+            dim, gates, preps, effects, paramvec, numThreads)
 
     def copy(self):
         """ Return a shallow copy of this GateMatrixCalc """
         return GateMatrixCalc(self.dim, self.gates, self.preps,
-                              self.effects, self.paramvec)
+                              self.effects, self.paramvec, self.numThreads)
         
     #OLD
     #def _make_spamgate(self, spamlabel):
@@ -141,45 +156,6 @@ class GateMatrixCalc(GateCalc):
             return G
 
         
-    def _process_wrtFilter(self, wrtFilter, obj):
-        """ Helper function for dgate and hgate below: pulls out pieces of
-            a wrtFilter argument relevant for a single object (gate or spam vec) """
-        
-        #Create per-gate with-respect-to parameter filters, used to
-        # select a subset of all the derivative columns, essentially taking
-        # a derivative of only a *subset* of all the gate's parameters
-
-        if isinstance(wrtFilter,slice):
-            wrtFilter = _slct.indices(wrtFilter)
-        
-        if wrtFilter is not None:
-            obj_wrtFilter = [] # values = object-local param indices
-            relevant_gpindices = [] # indices into original wrtFilter'd indices
-
-            gpindices = obj.gpindices_as_array()
-
-            for ii,i in enumerate(wrtFilter):
-                if i in gpindices:
-                    relevant_gpindices.append(ii)
-                    obj_wrtFilter.append(list(gpindices).index(i))
-            relevant_gpindices = _np.array(relevant_gpindices,'i')
-            if len(relevant_gpindices) == 1:
-                #Don't return a length-1 list, as this doesn't index numpy arrays
-                # like length>1 lists do... ugh.
-                relevant_gpindices = slice(relevant_gpindices[0],
-                                           relevant_gpindices[0]+1)
-            elif len(relevant_gpindices) == 0:
-                #Don't return a length-0 list, as this doesn't index numpy arrays
-                # like length>1 lists do... ugh.
-                relevant_gpindices = slice(0,0) #slice that results in a zero dimension
-
-        else:
-            obj_wrtFilter = None
-            relevant_gpindices = obj.gpindices
-            
-        return obj_wrtFilter, relevant_gpindices
-
-
     #Vectorizing Identities. (Vectorization)
     # Note when vectorizing op uses numpy.flatten rows are kept contiguous, so the first identity below is valid.
     # Below we use E(i,j) to denote the elementary matrix where all entries are zero except the (i,j) entry == 1
@@ -823,6 +799,22 @@ class GateMatrixCalc(GateCalc):
                 prodCache[i] = gate / nG
                 scaleCache[i] = _np.log(nG)
 
+        if BATCH_GENERATIONS:
+            self._compute_product_cache_by_generation(evalTree, prodCache, scaleCache)
+        else:
+            self._compute_product_cache_by_node(evalTree, prodCache, scaleCache)
+
+        nanOrInfCacheIndices = (~_np.isfinite(prodCache)).nonzero()[0]  #may be duplicates (a list, not a set)
+        assert( len(nanOrInfCacheIndices) == 0 ) # since all scaled gates start with norm <= 1, products should all have norm <= 1
+
+        return prodCache, scaleCache
+
+
+    def _compute_product_cache_by_node(self, evalTree, prodCache, scaleCache):
+        """
+        Fills the non-initial elements of `prodCache` and `scaleCache` (whose
+        initial elements must already be set) one tree element at a time.
+        """
         #evaluate gate strings using tree (skip over the zero and single-gate-strings)
         #cnt = 0
         for i in evalTree.get_evaluation_order():
@@ -841,10 +833,33 @@ class GateMatrixCalc(GateCalc):
 
         #print "bulk_product DEBUG: %d rescalings out of %d products" % (cnt, len(evalTree))
 
-        nanOrInfCacheIndices = (~_np.isfinite(prodCache)).nonzero()[0]  #may be duplicates (a list, not a set)
-        assert( len(nanOrInfCacheIndices) == 0 ) # since all scaled gates start with norm <= 1, products should all have norm <= 1
 
-        return prodCache, scaleCache
+    def _compute_product_cache_by_generation(self, evalTree, prodCache, scaleCache):
+        """
+        Fills the non-initial elements of `prodCache` and `scaleCache` (whose
+        initial elements must already be set) by computing all the products
+        of each of `evalTree`'s generations as a single stacked `matmul`.
+        Rescaling of products that become too small is likewise vectorized,
+        and agrees with :method:`_compute_product_cache_by_node`.
+        """
+        # LEXICOGRAPHICAL VS MATRIX ORDER Note: we reverse iLeft <=> iRight from evalTree (see
+        # _compute_product_cache_by_node), so the tree's "right" indices give the left-hand matrices.
+        for inds, iRights, iLefts in evalTree.get_evaluation_generations():
+            L,R = prodCache[iLefts], prodCache[iRights]
+            prods = _np.matmul(L,R)
+            scales = scaleCache[iLefts] + scaleCache[iRights]
+
+            small = _np.logical_and(prods.max(axis=(1,2)) < PSMALL,
+                                    prods.min(axis=(1,2)) > -PSMALL)
+            if _np.any(small):
+                L,R = L[small], R[small]
+                nL = _np.maximum(_np.maximum(_nla.norm(L,axis=(1,2)), _np.exp(-scaleCache[iLefts[small]])), 1e-300)
+                nR = _np.maximum(_np.maximum(_nla.norm(R,axis=(1,2)), _np.exp(-scaleCache[iRights[small]])), 1e-300)
+                prods[small] = _np.matmul(L / nL[:,None,None], R / nR[:,None,None])
+                scales[small] += _np.log(nL) + _np.log(nR)
+
+            prodCache[inds] = prods
+            scaleCache[inds] = scales
 
 
     def _compute_dproduct_cache(self, evalTree, prodCache, scaleCache,
@@ -925,6 +940,27 @@ class GateMatrixCalc(GateCalc):
 
         #profiler.print_mem("DEBUGMEM: POINT1"); profiler.comm.barrier()
 
+        if BATCH_GENERATIONS:
+            self._compute_dproduct_cache_by_generation(evalTree, prodCache, scaleCache,
+                                                       dProdCache, profiler)
+        else:
+            self._compute_dproduct_cache_by_node(evalTree, prodCache, scaleCache,
+                                                 dProdCache, profiler)
+
+        #profiler.print_mem("DEBUGMEM: POINT2"); profiler.comm.barrier()
+
+        profiler.add_time("compute_dproduct_cache: serial", tSerialStart)
+        profiler.add_count("compute_dproduct_cache: num columns", nDerivCols)
+
+        return dProdCache
+
+
+    def _compute_dproduct_cache_by_node(self, evalTree, prodCache, scaleCache,
+                                        dProdCache, profiler):
+        """
+        Fills the non-initial elements of `dProdCache` (whose initial elements
+        must already be set) one tree element at a time.
+        """
         #evaluate gate strings using tree (skip over the zero and single-gate-strings)
         for i in evalTree.get_evaluation_order():
             tm = _time.time()
@@ -947,12 +983,53 @@ class GateMatrixCalc(GateCalc):
             elif _np.count_nonzero(dProdCache[i]) and dProdCache[i].max() < DSMALL and dProdCache[i].min() > -DSMALL:
                 _warnings.warn("Would have scaled dProd but now will not alter scaleCache.")
 
-        #profiler.print_mem("DEBUGMEM: POINT2"); profiler.comm.barrier()
 
-        profiler.add_time("compute_dproduct_cache: serial", tSerialStart)
-        profiler.add_count("compute_dproduct_cache: num columns", nDerivCols)
+    def _compute_dproduct_cache_by_generation(self, evalTree, prodCache, scaleCache,
+                                              dProdCache, profiler):
+        """
+        Fills the non-initial elements of `dProdCache` (whose initial elements
+        must already be set) by computing `dL*R + L*dR` for all the elements
+        of each of `evalTree`'s generations using stacked `matmul` calls.
+        Large generations are broken into batches of at most
+        `BATCH_MAX_ELEMENTS` derivative elements.
+        """
+        nDerivCols, dim = dProdCache.shape[1], self.dim
+        if nDerivCols == 0: return # nothing to compute
 
-        return dProdCache
+        batchSize = max(BATCH_MAX_ELEMENTS // (nDerivCols*dim*dim), 1)
+        for genInds, genRights, genLefts in evalTree.get_evaluation_generations():
+            for start in range(0, len(genInds), batchSize):
+                tm = _time.time()
+                # LEXICOGRAPHICAL VS MATRIX ORDER Note: tree's "right" indices give the left-hand matrices
+                inds = genInds[start:start+batchSize]
+                iLefts = genLefts[start:start+batchSize]
+                iRights = genRights[start:start+batchSize]
+                n = len(inds)
+                L,R = prodCache[iLefts], prodCache[iRights]
+                dL,dR = dProdCache[iLefts], dProdCache[iRights]
+
+                #dot(dS, T) + dot(S, dT), where the derivative index is folded into the
+                # rows of dS and the columns of dT so each term is a single stacked matmul
+                dProds = _np.matmul(dL.reshape(n,nDerivCols*dim,dim), R).reshape(n,nDerivCols,dim,dim)
+                dProds += _np.matmul(L, dR.transpose(0,2,1,3).reshape(n,dim,nDerivCols*dim)) \
+                            .reshape(n,dim,nDerivCols,dim).transpose(0,2,1,3)
+                profiler.add_time("compute_dproduct_cache: dots", tm)
+                profiler.add_count("compute_dproduct_cache: dots", len(inds))
+
+                scale = scaleCache[inds] - (scaleCache[iLefts] + scaleCache[iRights])
+                bScaled = _np.abs(scale) > 1e-8
+                if _np.any(bScaled):
+                    dProds[bScaled] /= _np.exp(scale[bScaled])[:,None,None,None]
+
+                bSmall = _np.logical_and(dProds.max(axis=(1,2,3)) < DSMALL,
+                                         dProds.min(axis=(1,2,3)) > -DSMALL)
+                if _np.any(_np.logical_and(bSmall, bScaled)):
+                    _warnings.warn("Scaled dProd small in order to keep prod managable.")
+                if _np.any(_np.logical_and(bSmall, ~bScaled)) and \
+                   _np.any(dProds[_np.logical_and(bSmall, ~bScaled)]):
+                    _warnings.warn("Would have scaled dProd but now will not alter scaleCache.")
+
+                dProdCache[inds] = dProds
 
 
     def _compute_hproduct_cache(self, evalTree, prodCache, dProdCache1,
@@ -1109,6 +1186,42 @@ class GateMatrixCalc(GateCalc):
         """
         return _MatrixEvalTree()
 
+
+    def calibrate_costs(self, nDerivCols=0):
+        """
+        Measures, on the current machine, the cost of the basic operations
+        performed when evaluating an evaluation tree.
+
+        For this calculator a tree operation is the product of two gate
+        matrices (and, if `nDerivCols > 0`, of their derivatives), and the
+        final cost is that of contracting a product with a state preparation
+        and effect vector.
+
+        Parameters
+        ----------
+        nDerivCols : int, optional
+            The number of derivative columns computed at once.  When greater
+            than zero, the timed operations include derivative blocks of
+            this many columns.
+
+        Returns
+        -------
+        dict
+            A dictionary with keys `"op"` and `"final"`, giving the time in
+            seconds of a tree operation and of computing the results of one
+            spam tuple of a final gate string, respectively.
+        """
+        dim = self.dim
+        G = _np.random.random((dim,dim))
+        rho = _np.random.random((dim,1)); E = _np.random.random((1,dim))
+        op = self._time_kernel(lambda: _np.dot(G,G))
+        final = self._time_kernel(lambda: _np.dot(E,_np.dot(G,rho)))
+        if nDerivCols > 0:
+            dG = _np.random.random((nDerivCols,dim,dim))
+            op += 2*self._time_kernel(lambda: _np.dot(dG,G)) # dL*R and L*dR terms
+            final += self._time_kernel(lambda: _np.dot(_np.dot(E,dG),rho))
+        return {'op': op, 'final': final}
+
     
     def estimate_mem_usage(self, subcalls, cache_size, num_subtrees,
                            num_subtree_proc_groups, num_param1_groups,
@@ -2179,21 +2292,8 @@ class GateMatrixCalc(GateCalc):
                        +" than derivative columns(%d)!" % self.Np 
                        +" [blkSize = %.1f, nBlks=%d]" % (blkSize,nBlks))
 
-                def calc_and_fill_blk(spamTuple, fInds, gInds, pslc1, pslc2, sumInto):
-                    """ Compute and fill result quantities blocks for given arguments """
-                    tm = _time.time()
-                    old_err = _np.seterr(over='ignore')
-                    rho,E = self._rhoE_from_spamTuple(spamTuple)
-                    block_wrtSlice = pslc1
-
-                    _fas(mxToFill, [fInds,pslc1], self._dprobs_from_rhoE(
-                        spamTuple, rho, E, Gs[gInds], dGs[gInds], scaleVals[gInds], block_wrtSlice),
-                         add=sumInto)
-
-                    _np.seterr(**old_err)
-                    profiler.add_time("bulk_fill_dprobs: calc_and_fill_blk", tm)
-
-                for iBlk in myBlkIndices:
+                def fill_blk(iBlk):
+                    """ Compute derivative cache for, and fill, the iBlk-th block of columns """
                     tm = _time.time()
                     block_wrtSlice = blocks[iBlk]
                     dProdCache = self._compute_dproduct_cache(evalSubTree, prodCache, scaleCache,
@@ -2206,6 +2306,20 @@ class GateMatrixCalc(GateCalc):
 
                     dGs = evalSubTree.final_view(dProdCache, axis=0)
                       #( nGateStrings, nDerivCols, dim, dim )
+
+                    def calc_and_fill_blk(spamTuple, fInds, gInds, pslc1, pslc2, sumInto):
+                        """ Compute and fill result quantities blocks for given arguments """
+                        tm = _time.time()
+                        old_err = _np.seterr(over='ignore')
+                        rho,E = self._rhoE_from_spamTuple(spamTuple)
+
+                        _fas(mxToFill, [fInds,pslc1], self._dprobs_from_rhoE(
+                            spamTuple, rho, E, Gs[gInds], dGs[gInds], scaleVals[gInds], block_wrtSlice),
+                             add=sumInto)
+
+                        _np.seterr(**old_err)
+                        profiler.add_time("bulk_fill_dprobs: calc_and_fill_blk", tm)
+
                     self._fill_result_tuple( 
                         (mxToFill,), evalSubTree,
                         blocks[iBlk], slice(None), calc_and_fill_blk )                    
@@ -2213,6 +2327,10 @@ class GateMatrixCalc(GateCalc):
                     profiler.mem_check("bulk_fill_dprobs: post fill blk")
                     dProdCache = dGs = None #free mem
 
+                #Blocks fill disjoint columns, so when numThreads > 1 they're computed
+                # concurrently (holding up to numThreads blocks' caches in memory at once)
+                self._run_threaded(fill_blk, myBlkIndices, blkComm)
+
                 #gather results
                 tm = _time.time()                
                 _mpit.gather_slices(blocks, blkOwners, mxToFill,[felInds],
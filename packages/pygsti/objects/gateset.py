@@ -30,6 +30,7 @@ from . import instrument as _instrument
 from . import labeldicts as _ld
 from . import gaugegroup as _gg
 from .gatematrixcalc import GateMatrixCalc as _GateMatrixCalc
+from .evaltreecache import EvalTreeDiskCache as _EvalTreeDiskCache
 #from .gatemapcalc import GateMapCalc as _GateMapCalc
 
 from ..baseobjs import VerbosityPrinter as _VerbosityPrinter
@@ -100,6 +101,7 @@ class GateSet(object):
         self._default_gauge_group = None
         self._calcClass = _GateMatrixCalc
         #self._calcClass = _GateMapCalc
+        self._numThreads = None
 
         self._paramvec = _np.zeros(0, 'd')
         self._rebuild_paramvec()
@@ -120,6 +122,20 @@ class GateSet(object):
         self._default_gauge_group = value
 
 
+    @property
+    def num_threads(self):
+        """
+        The number of threads used (within each process) to compute the
+        independent parts of bulk probabilities, derivatives, and hessians
+        concurrently.  None, the default, means a single thread.
+        """
+        return getattr(self, '_numThreads', None) #backward compatibility
+
+    @num_threads.setter
+    def num_threads(self, value):
+        self._numThreads = value
+
+
     @property
     def dim(self):
         """
@@ -781,7 +797,7 @@ class GateSet(object):
                 compiled_gates[k] = g
         
         return self._calcClass(self._dim, compiled_gates, self.preps,
-                               compiled_effects, self._paramvec)
+                               compiled_effects, self._paramvec, self.num_threads)
 
     def split_gatestring(self, gatestring, erroron=('prep','povm')):
         """
@@ -1299,7 +1315,8 @@ class GateSet(object):
 
     def bulk_evaltree_from_resources(self, gatestring_list, comm=None, memLimit=None,
                                      distributeMethod="gatestrings", subcalls=[],
-                                     verbosity=0):
+                                     verbosity=0, diskCache=None, baseTree=None,
+                                     calibrate=False):
         """
         Create an evaluation tree based on available memory and CPUs.
 
@@ -1336,6 +1353,23 @@ class GateSet(object):
         verbosity : int, optional
             How much detail to send to stdout.
 
+        diskCache : str or EvalTreeDiskCache, optional
+            If not None, a directory name or :class:`EvalTreeDiskCache` used
+            to persist the (split) evaluation trees built here, so that later
+            calls with the same gate strings and gate set structure - e.g. in
+            a subsequent run - load them from disk instead of rebuilding them.
+
+        baseTree : EvalTree, optional
+            A tree whose gate strings begin `gatestring_list` (e.g. from a
+            previous iteration), which is extended rather than building the
+            new tree from scratch.  See :method:`bulk_evaltree`.
+
+        calibrate : bool, optional
+            If True, the costs of the calculator's basic operations are
+            measured on this machine (see :method:`GateCalc.calibrate_costs`)
+            and the tree is split so that its sub-trees, and the sub-trees
+            assigned to each processor group, have balanced measured costs.
+
         Returns
         -------
         evt : EvalTree
@@ -1385,9 +1419,20 @@ class GateSet(object):
         evt_cache = {} # cache of eval trees based on # min subtrees, to avoid re-computation
         C = 1.0/(1024.0**3)
         calc = self._calc()
+        if diskCache is not None and not isinstance(diskCache, _EvalTreeDiskCache):
+            diskCache = _EvalTreeDiskCache(diskCache)
         
         bNp2Matters = ("bulk_fill_hprobs" in subcalls) or ("bulk_hprobs_by_block" in subcalls)
 
+        costModel = None
+        if calibrate:
+            bDerivs = any([ nm != "bulk_fill_probs" for nm in subcalls ])
+            costModel = calc.calibrate_costs(num_params if bDerivs else 0)
+            if comm is not None: # all procs must build the same tree
+                costModel = comm.bcast(costModel, root=0)
+            printer.log("Calibrated tree costs: %.3g us/op, %.3g us/final" %
+                        (costModel['op']*1e6, costModel['final']*1e6), 2)
+
         if memLimit is not None:
             if memLimit <= 0:
                 raise MemoryError("Attempted evaltree generation " +
@@ -1408,6 +1453,31 @@ class GateSet(object):
                 factors.append(n)
             return factors
 
+        unsplit_evt = [] # holds the un-split tree, built once and then copied & split for each ng
+        def build_evaltree(ng,Ng):
+            """ Builds the tree split for `ng` subtrees """
+            if len(unsplit_evt) == 0:
+                unsplit_evt.append( self.bulk_evaltree(
+                    gatestring_list, numSubtreeComms=Ng, baseTree=baseTree)[0] )
+            return self.bulk_evaltree(gatestring_list, minSubtrees=ng, numSubtreeComms=Ng,
+                                      baseTree=unsplit_evt[0], costModel=costModel)
+
+        def get_evaltree(ng,Ng):
+            """ Builds (or loads from `diskCache`) the tree split for `ng` subtrees """
+            if diskCache is None:
+                return build_evaltree(ng,Ng)
+
+            key = diskCache.key(self, gatestring_list, minSubtrees=ng, numSubtreeComms=Ng,
+                                costModel=costModel)
+            ret = diskCache.load(key)
+            if ret is None:
+                ret = build_evaltree(ng,Ng)
+                if comm is None or comm.Get_rank() == 0:
+                    diskCache.save(key, ret)
+            else:
+                printer.log("Loaded evaluation tree (%d subtrees) from disk cache" % ng, 2)
+            return ret
+
         def memEstimate(ng,np1,np2,Ng,fastCacheSz=False,verb=0):
             """ Returns a memory estimate based on arguments """
             tm = _time.time()
@@ -1416,8 +1486,7 @@ class GateSet(object):
             if not fastCacheSz:
                 #Slower (but more accurate way)
                 if ng not in evt_cache:
-                    evt_cache[ng] = self.bulk_evaltree(
-                        gatestring_list, minSubtrees=ng, numSubtreeComms=Ng)
+                    evt_cache[ng] = get_evaltree(ng,Ng)
                 cacheSize = max([len(s) for s in evt_cache[ng][0].get_sub_trees()])
             else:
                 #heuristic (but fast)
@@ -1598,7 +1667,7 @@ class GateSet(object):
 
 
     def bulk_evaltree(self, gatestring_list, minSubtrees=None, maxTreeSize=None,
-                      numSubtreeComms=1, verbosity=0):
+                      numSubtreeComms=1, verbosity=0, baseTree=None, costModel=None):
         """
         Create an evaluation tree for all the gate strings in gatestring_list.
 
@@ -1626,6 +1695,20 @@ class GateSet(object):
         verbosity : int, optional
             How much detail to send to stdout.
 
+        baseTree : EvalTree, optional
+            A previously created (possibly split) tree for this gate set
+            whose gate strings are the beginning of `gatestring_list`, e.g.
+            the tree of the previous iteration of an iterative GST
+            algorithm.  When given, a copy of `baseTree` is extended with
+            just the additional strings instead of building a new tree from
+            scratch.  If `baseTree` cannot be extended to `gatestring_list`
+            it is ignored.
+
+        costModel : dict, optional
+            Measured operation costs, as returned by
+            :method:`GateCalc.calibrate_costs`, used to balance the costs of
+            the sub-trees when splitting to `minSubtrees` sub-trees.
+
         Returns
         -------
         EvalTree
@@ -1641,19 +1724,35 @@ class GateSet(object):
         compiled_gatestrings, lookup, outcome_lookup, nEls = \
                             self.compile_gatestrings(gatestring_list)
             
-        evalTree = self._calc().construct_evaltree()
-        evalTree.initialize([""] + compiled_gate_labels,
-                            compiled_gatestrings, numSubtreeComms)
-
-        printer.log("bulk_evaltree: created initial tree (%d strs) in %.0fs" %
-                    (len(gatestring_list),_time.time()-tm)); tm = _time.time()
+        evalTree = None
+        if baseTree is not None and \
+           baseTree.get_init_labels() == tuple([""] + compiled_gate_labels) and \
+           baseTree.num_final_strings() <= len(compiled_gatestrings) and \
+           isinstance(baseTree, type(self._calc().construct_evaltree())):
+            evalTree = baseTree.copy()
+            try:
+                evalTree.extend_gatestrings(compiled_gatestrings)
+                evalTree.distribution['numSubtreeComms'] = numSubtreeComms
+                printer.log("bulk_evaltree: extended tree (%d -> %d strs) in %.0fs" %
+                            (baseTree.num_final_strings(), len(gatestring_list),
+                             _time.time()-tm)); tm = _time.time()
+            except ValueError:
+                evalTree = None # baseTree's strings aren't a prefix of gatestring_list
+
+        if evalTree is None:
+            evalTree = self._calc().construct_evaltree()
+            evalTree.initialize([""] + compiled_gate_labels,
+                                compiled_gatestrings, numSubtreeComms)
+
+            printer.log("bulk_evaltree: created initial tree (%d strs) in %.0fs" %
+                        (len(gatestring_list),_time.time()-tm)); tm = _time.time()
 
         if maxTreeSize is not None:
             lookup = evalTree.split(lookup, maxTreeSize, None, printer) # won't split if unnecessary
 
         if minSubtrees is not None:
             if not evalTree.is_split() or len(evalTree.get_sub_trees()) < minSubtrees:
-                lookup = evalTree.split(lookup, None, minSubtrees, printer)
+                lookup = evalTree.split(lookup, None, minSubtrees, printer, costModel)
                 if maxTreeSize is not None and \
                         any([ len(sub)>maxTreeSize for sub in evalTree.get_sub_trees()]):
                     _warnings.warn("Could not create a tree with minSubtrees=%d" % minSubtrees
@@ -2702,6 +2801,7 @@ class GateSet(object):
         if not hasattr(self,"_calcClass"): #for backward compatibility
             self._calcClass = _GateMatrixCalc
         newGateset._calcClass = self._calcClass
+        newGateset._numThreads = self.num_threads
 
         if not hasattr(self,"basis") and hasattr(self,'_basisNameAndDim'): #for backward compatibility
             self.basis = _Basis(self._basisNameAndDim[0],self._basisNameAndDim[1])
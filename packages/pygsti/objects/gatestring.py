@@ -7,9 +7,9 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 #*****************************************************************
 
 import numpy as _np
-import uuid  as _uuid
 from ..tools import compattools as _compat
 from ..baseobjs import GateStringParser as _GateStringParser
+from ..baseobjs.gatestringparser import fast_parse as _fast_parse
 
 def _gateSeqToStr(seq):
     if len(seq) == 0: return "{}" #special case of empty gate string
@@ -27,7 +27,12 @@ class GateString(object):
     A GateString objects behaves very similarly to a tuple and most operations
     supported by a tuple are supported by a GateString (e.g. adding, hashing,
     testing for equality, indexing,  slicing, multiplying).
+
+    GateString objects are immutable: their hash is computed once, when
+    they're created, and a string representation that isn't given is only
+    built when it is first needed.
     """
+    __slots__ = ('_tup','_str','_hash')
 
     def __init__(self, tupleOfGateLabels, stringRepresentation=None, bCheck=True, lookup=None):
         """
@@ -51,15 +56,15 @@ class GateString(object):
             A dictionary with keys == labels and values == tuples of gate labels
             which can be used for substitutions using the S<label> syntax.
         """
-        self.uuid = _uuid.uuid4()
-
         if tupleOfGateLabels is None and stringRepresentation is None:
             raise ValueError("tupleOfGateLabels and stringRepresentation cannot both be None");
 
         if tupleOfGateLabels is None or (bCheck and stringRepresentation is not None):
-            gsparser = _GateStringParser()
-            gsparser.lookup = lookup
-            chkTuple = gsparser.parse(stringRepresentation)
+            chkTuple = _fast_parse(stringRepresentation)
+            if chkTuple is None: # e.g. contains S[...] references
+                gsparser = _GateStringParser()
+                gsparser.lookup = lookup
+                chkTuple = gsparser.parse(stringRepresentation)
 
             if tupleOfGateLabels is None: tupleOfGateLabels = chkTuple
             elif tuple(tupleOfGateLabels) != chkTuple:
@@ -70,17 +75,25 @@ class GateString(object):
         # if tupleOfGateLabels is a GateString, then copy it
         if isinstance(tupleOfGateLabels, GateString):
             self._tup = tupleOfGateLabels.tup
+            self._hash = tupleOfGateLabels._hash
             if stringRepresentation is None:
-                self.str = tupleOfGateLabels.str
+                self._str = tupleOfGateLabels._str
             else:
-                self.str = stringRepresentation
+                self._str = str(stringRepresentation)
 
         else:
-            if stringRepresentation is None:
-                stringRepresentation = _gateSeqToStr( tupleOfGateLabels )
-
+            # the default string representation is built lazily (see `str`)
             self._tup = tuple(tupleOfGateLabels)
-            self.str = str(stringRepresentation)
+            self._hash = hash(self._tup)
+            self._str = str(stringRepresentation) \
+                        if (stringRepresentation is not None) else None
+
+    @property
+    def str(self):
+        """ The string representation of this GateString."""
+        if self._str is None:
+            self._str = _gateSeqToStr( self._tup )
+        return self._str
 
     #Conversion routines for evalTree usage -- TODO: make these member functions
     def to_pythonstr(self,gateLabels):
@@ -159,7 +172,9 @@ class GateString(object):
     def __add__(self,x):
         if not isinstance(x, GateString):
             raise ValueError("Can only add GateStrings objects to other GateString objects")
-        if self.str != "{}":
+        if self._str is None and x._str is None:
+            s = None # default representation of the sum is the sum of the defaults
+        elif self.str != "{}":
             s = (self.str + x.str) if x.str != "{}" else self.str
         else: s = x.str
         return GateString(self._tup + x.tup, s, bCheck=False)
@@ -185,11 +200,10 @@ class GateString(object):
         return self._tup.__gt__(tuple(x))
 
     def __hash__(self):
-        return hash(self._tup)
-        #return hash(self.uuid)
+        return self._hash
 
     def __copy__(self):
-        return GateString( self._tup, self.str, bCheck=False)
+        return GateString( self._tup, self._str, bCheck=False)
 
     #def __deepcopy__(self, memo):
     #    return GateString( self._tup, self.str, bCheck=False)
@@ -203,14 +217,14 @@ class GateString(object):
         raise ValueError("Cannot set elements of GateString tuple (they're read-only)")
 
     def __getstate__(self):
-        return self.__dict__
+        return {'_tup': self._tup, 'str': self.str}
 
     def __setstate__(self, state_dict):
-        for k, v in state_dict.items():
-            if k == 'tup':                    # backwards compatibility
-                self._tup = state_dict['tup'] # backwards compatibility
-            else:
-                self.__dict__[k] = v
+        self._tup = tuple(state_dict['_tup'] if ('_tup' in state_dict)
+                          else state_dict['tup']) # backwards compatibility
+        self._str = state_dict.get('str',None)
+        self._hash = hash(self._tup)
+        #Note: older versions also pickled a (now unused) 'uuid' member
     
     @property
     def tup(self):
@@ -229,6 +243,7 @@ class WeightedGateString(GateString):
     added to plain GateString objects, the plain GateString object is
     treated as having zero weight and the result is another WeightedGateString.
     """
+    __slots__ = ('weight',)
 
     def __init__(self, tupleOfGateLabels, stringRepresentation=None, weight=1.0, bCheck=True):
         """
@@ -274,7 +289,16 @@ class WeightedGateString(GateString):
         return WeightedGateString(tmp.tup, tmp.str, self.weight, bCheck=False) #keep weight
 
     def __copy__(self):
-        return WeightedGateString( self._tup, self.str, self.weight, bCheck=False )
+        return WeightedGateString( self._tup, self._str, self.weight, bCheck=False )
+
+    def __getstate__(self):
+        state = super(WeightedGateString,self).__getstate__()
+        state['weight'] = self.weight
+        return state
+
+    def __setstate__(self, state_dict):
+        super(WeightedGateString,self).__setstate__(state_dict)
+        self.weight = state_dict.get('weight',1.0)
 
 #    def __deepcopy__(self, memo):
 #        return WeightedGateString( self._tup, self.str, self.weight, bCheck=False )
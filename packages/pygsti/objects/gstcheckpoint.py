@@ -0,0 +1,363 @@
+""" Defines the GSTCheckpoint and BlockCheckpoint classes, which let interrupted computations be resumed """
+from __future__ import division, print_function, absolute_import, unicode_literals
+#*****************************************************************
+#    pyGSTi 0.9:  Copyright 2015 Sandia Corporation
+#    This Software is released under the GPL license detailed
+#    in the file "license.txt" in the top-level pyGSTi directory
+#*****************************************************************
+
+import os as _os
+import warnings as _warnings
+import hashlib as _hashlib
+import tempfile as _tempfile
+import pickle as _pickle
+import numpy as _np
+
+from .. import _version
+from ..tools import compattools as _compat
+
+def _digest(*args):
+    """ A hexadecimal digest of `args` (and of the pyGSTi version) """
+    M = _hashlib.sha1()
+    def add(x):
+        if isinstance(x, _np.ndarray):
+            M.update(_np.ascontiguousarray(x).tobytes())
+        elif isinstance(x, list): # e.g. a list of gate string lists
+            M.update(repr(len(x)).encode('utf-8'))
+            for y in x: add(y)
+        else:
+            M.update(repr(x).encode('utf-8'))
+
+    add(_version.__version__)
+    for x in args: add(x)
+    return M.hexdigest()
+
+class GSTCheckpoint(object):
+    """
+    An on-disk record of the progress of an iterative GST optimization.
+
+    Long-sequence GST runs a sequence of (possibly very long) optimizations,
+    one per maximum-length iteration.  A `GSTCheckpoint` records the result
+    of each finished iteration, along with the state of the Levenberg-
+    Marquardt optimizer within the current one, in a single file.  When a
+    job that was killed (e.g. by a batch-queue time limit) is restarted with
+    the same checkpoint file and the same inputs, finished iterations are
+    restored from the file and the optimizer resumes from its last saved
+    state.  Progress saved by a computation with different inputs is
+    discarded.
+    """
+
+    def __init__(self, filename, comm=None):
+        """
+        Create a new GSTCheckpoint, loading any progress saved in `filename`.
+
+        Parameters
+        ----------
+        filename : str
+            The checkpoint file.  It need not exist yet.
+
+        comm : mpi4py.MPI.Comm, optional
+            When not None, the communicator of the processors sharing this
+            checkpoint.  Only the root processor reads and writes the file.
+        """
+        self.filename = filename
+        self.comm = comm
+        self.stage = None
+
+        state = None
+        if comm is None or comm.Get_rank() == 0:
+            try:
+                with open(filename, 'rb') as f:
+                    state = _pickle.load(f)
+            except Exception:
+                state = None # missing, truncated, or incompatible file => start afresh
+        if comm is not None:
+            state = comm.bcast(state, root=0)
+        self._state = state
+
+    def key(self, *args):
+        """
+        Compute a digest of the inputs of a computation.
+
+        Parameters
+        ----------
+        args : objects
+            The inputs (gate strings, numpy arrays, labels, options...) that
+            determine the computation's results.
+
+        Returns
+        -------
+        str
+            A hexadecimal digest.
+        """
+        return _digest(*args)
+
+    def begin(self, key):
+        """
+        Begin (or resume) the computation identified by `key`.
+
+        Saved progress is kept only if it was made by a computation with the
+        same key.
+
+        Parameters
+        ----------
+        key : str
+            A key returned by :method:`key`.
+
+        Returns
+        -------
+        None
+        """
+        if self._state is None or self._state.get('key',None) != key:
+            self._state = {'key': key, 'completed': [], 'lmStates': {}}
+        self.stage = None
+
+    @property
+    def num_completed(self):
+        """ The number of completed iterations recorded in this checkpoint. """
+        return len(self._state['completed']) if (self._state is not None) else 0
+
+    def get_completed(self, i):
+        """
+        Get the recorded result of the `i`-th completed iteration.
+
+        Parameters
+        ----------
+        i : int
+            The iteration index, less than :attr:`num_completed`.
+
+        Returns
+        -------
+        object
+        """
+        return self._state['completed'][i]
+
+    def complete(self, value):
+        """
+        Record the result of the next iteration and save the checkpoint.
+
+        Any saved optimizer states (which belong to the now-finished
+        iteration) are discarded.
+
+        Parameters
+        ----------
+        value : object
+            The (picklable) result of the iteration.
+
+        Returns
+        -------
+        None
+        """
+        self._state['completed'].append(value)
+        self._state['lmStates'] = {}
+        self._save()
+
+    def get_lm_state(self, nParams):
+        """
+        Get the saved optimizer state of the current :attr:`stage`.
+
+        Parameters
+        ----------
+        nParams : int
+            The number of parameters being optimized.  A saved state for a
+            different number of parameters is ignored.
+
+        Returns
+        -------
+        dict or None
+            A state suitable for the `init_state` argument of
+            :func:`custom_leastsq`, or `None` if there is none.
+        """
+        if self._state is None: return None
+        lmState = self._state['lmStates'].get(self.stage, None)
+        if lmState is None or len(lmState['x']) != nParams: return None
+        return lmState
+
+    def save_lm_state(self, lmState):
+        """
+        Save the optimizer state of the current :attr:`stage`.
+
+        This method has the form needed by the `state_callback` argument of
+        :func:`custom_leastsq`.
+
+        Parameters
+        ----------
+        lmState : dict
+            The optimizer's state.
+
+        Returns
+        -------
+        None
+        """
+        if self._state is None: return # not begun: nothing to resume into
+        lmState = lmState.copy()
+        lmState['x'] = _np.array(lmState['x'])
+        self._state['lmStates'][self.stage] = lmState
+        self._save()
+
+    def _save(self):
+        """
+        Write the checkpoint to a temporary file which is then renamed, so
+        that a job killed while saving leaves the previous checkpoint intact.
+        """
+        if self.comm is not None and self.comm.Get_rank() != 0: return
+        directory = _os.path.dirname(_os.path.abspath(self.filename))
+        fd, tmpPath = _tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with _os.fdopen(fd, 'wb') as f:
+                _pickle.dump(self._state, f, protocol=_pickle.HIGHEST_PROTOCOL)
+            _compat.replace_file(tmpPath, self.filename)
+        except Exception as e:
+            if _os.path.exists(tmpPath): _os.remove(tmpPath)
+            _warnings.warn("Could not save checkpoint file %s: %s" % (self.filename, str(e)))
+
+    def clear(self):
+        """ Discard all saved progress, removing the checkpoint file. """
+        self._state = None
+        self.stage = None
+        if self.comm is None or self.comm.Get_rank() == 0:
+            if _os.path.exists(self.filename):
+                _os.remove(self.filename)
+
+
+class BlockCheckpoint(object):
+    """
+    An on-disk record of the finished blocks of a computation that is divided
+    into independent blocks, e.g. the blocks of a Hessian matrix.
+
+    Each finished block is saved as a separate numpy (.npy) file in a
+    directory, by the processor that computed it, so that the processors of
+    a distributed computation save their work independently.  When a job
+    that was killed is restarted with the same directory and the same inputs,
+    the saved blocks are loaded rather than recomputed.  Blocks saved by a
+    computation with different inputs are ignored.
+    """
+
+    def __init__(self, directory, comm=None):
+        """
+        Create a new BlockCheckpoint, creating `directory` if needed.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the saved blocks.  When `comm` has more
+            than one processor it must be shared by all of them.
+
+        comm : mpi4py.MPI.Comm, optional
+            When not None, the communicator of the processors sharing this
+            checkpoint (:method:`begin` is a collective operation).
+        """
+        self.directory = directory
+        self.comm = comm
+        self._key = None
+        self._completed = set()
+
+        if comm is None or comm.Get_rank() == 0:
+            if not _os.path.isdir(directory):
+                _os.makedirs(directory)
+        if comm is not None:
+            comm.barrier()
+
+    def key(self, *args):
+        """
+        Compute a digest of the inputs of a computation.
+
+        Parameters
+        ----------
+        args : objects
+            The inputs (gate strings, numpy arrays, labels, options...) that
+            determine the computation's results.
+
+        Returns
+        -------
+        str
+            A hexadecimal digest.
+        """
+        return _digest(*args)
+
+    def begin(self, key):
+        """
+        Begin (or resume) the computation identified by `key`.
+
+        This finds the blocks previously saved by a computation with the same
+        key.  It is a collective operation.
+
+        Parameters
+        ----------
+        key : str
+            A key returned by :method:`key`.
+
+        Returns
+        -------
+        None
+        """
+        names = None
+        if self.comm is None or self.comm.Get_rank() == 0:
+            prefix = key + "_"
+            names = [ fn[len(prefix):-len(".npy")] for fn in _os.listdir(self.directory)
+                      if fn.startswith(prefix) and fn.endswith(".npy") ]
+        if self.comm is not None:
+            names = self.comm.bcast(names, root=0)
+        self._key = key
+        self._completed = set(names)
+
+    def is_completed(self, name):
+        """ Whether the block `name` was saved (as of :method:`begin`). """
+        return name in self._completed
+
+    def load(self, name):
+        """
+        Load the saved block `name`.
+
+        Parameters
+        ----------
+        name : str
+            The block's name.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        return _np.load(self._path(name))
+
+    def save(self, name, block):
+        """
+        Save a finished block.
+
+        The block is written to a temporary file which is then renamed, so
+        that a job killed while saving leaves no partial block behind.  Only
+        one processor should save any given block.
+
+        Parameters
+        ----------
+        name : str
+            The block's name, which must be a valid file name.
+
+        block : numpy.ndarray
+            The block's values.
+
+        Returns
+        -------
+        None
+        """
+        fd, tmpPath = _tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with _os.fdopen(fd, 'wb') as f:
+                _np.save(f, block)
+            _compat.replace_file(tmpPath, self._path(name))
+            self._completed.add(name)
+        except Exception as e:
+            if _os.path.exists(tmpPath): _os.remove(tmpPath)
+            _warnings.warn("Could not save checkpoint block %s: %s" % (self._path(name), str(e)))
+
+    def clear(self):
+        """ Discard the blocks saved by the current computation (see :method:`begin`). """
+        if self._key is not None and (self.comm is None or self.comm.Get_rank() == 0):
+            prefix = self._key + "_"
+            for fn in _os.listdir(self.directory):
+                if fn.startswith(prefix) and fn.endswith(".npy"):
+                    _os.remove(_os.path.join(self.directory, fn))
+        self._completed = set()
+
+    def _path(self, name):
+        return _os.path.join(self.directory, "%s_%s.npy" % (self._key, name))
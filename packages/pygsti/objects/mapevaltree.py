@@ -132,6 +132,61 @@ class MapEvalTree(EvalTree):
         assert(None not in gatestring_list)
 
 
+    def extend_gatestrings(self, compiled_gatestring_list):
+        """
+          Extend this (already initialized) tree to evaluate additional gate strings.
+
+          Only the strings beyond those this tree already evaluates are
+          added, each starting from the longest existing (or newly added)
+          string that is a prefix of it.  If this tree is split, the split is
+          undone first; the extended tree is *not* split.
+
+          Parameters
+          ----------
+          compiled_gatestring_list : OrderedDict
+              The compiled gate strings (as would be passed to `initialize`)
+              of the *entire* extended tree.  Its first
+              `self.num_final_strings()` keys must be this tree's current
+              final strings, in their original order.
+
+          Returns
+          -------
+          None
+        """
+        def permute_element(perm, el):
+            return (perm[el[0]] if (el[0] is not None) else None, el[1])
+
+        gatestring_list, nOld = self._prepare_to_extend(
+            compiled_gatestring_list, permute_element)
+        nNew = len(gatestring_list) - nOld
+        assert(len(self) == nOld) # map trees have no non-final elements
+        self[nOld:] = [None]*nNew
+
+        #Sort *all* the strings as in initialize, but only find prefixes for
+        # the new ones (processed in sorted order, so new prefixes come first)
+        sorted_strs = sorted(list(enumerate(gatestring_list)),key=lambda x: x[1])
+        for k,(iStr,gateString) in enumerate(sorted_strs):
+            if iStr < nOld: continue
+            L = len(gateString)
+
+            for i in range(k-1,-1,-1): #from k-1 -> 0
+                ic, candidate = sorted_strs[i]
+                Lc = len(candidate)
+                if L >= Lc > 0 and gateString[0:Lc] == candidate:
+                    iStart = ic
+                    remaining = gateString[Lc:]
+                    break
+            else: #no break => no prefix
+                iStart = None
+                remaining = gateString[:]
+
+            self[iStr] = (iStart, remaining)
+
+        #Evaluate in sorted order, as `initialize` does - this is valid (prefixes
+        # sort first) and keeps related strings together for `split`
+        self.eval_order = [ iStr for iStr,_ in sorted_strs ]
+        assert(self.generate_gatestring_list() == gatestring_list)
+
     def generate_gatestring_list(self, permute=True):
         """
         Generate a list of the final gate strings this tree evaluates.
@@ -183,6 +238,11 @@ class MapEvalTree(EvalTree):
             return gateStrings[0:nFinal]
 
 
+    def _get_op_counts(self):
+        """ The number of gate applications needed for each tree element """
+        return [ len(remainder) for _,remainder in self ]
+
+
     def get_num_applies(self):
         """
         Gets the number of "apply" operations required to compute this tree.
@@ -197,7 +257,36 @@ class MapEvalTree(EvalTree):
         return ops
 
 
-    def split(self, elIndicesDict, maxSubTreeSize=None, numSubTrees=None, verbosity=0):
+    def get_evaluation_generations(self):
+        """
+        Returns the evaluation order grouped into dependency "generations".
+
+        Each generation is a set of tree indices whose starting elements
+        (`iStart`) are None or members of *earlier* generations, so that
+        the states of all the elements of a generation can be propagated
+        at once.  Concatenating the generations gives a valid evaluation
+        order.
+
+        Returns
+        -------
+        list
+            A list of integer numpy arrays of tree indices, one per generation.
+        """
+        evalOrder = _np.array(self.eval_order, _np.int64)
+        level = _np.zeros(len(self), _np.int64)
+        for i in self.eval_order:
+            iStart,_ = self[i]
+            if iStart is not None: level[i] = level[iStart] + 1
+
+        if len(evalOrder) == 0: return []
+        perm = _np.argsort(level[evalOrder], kind='mergesort') #stable
+        ordered = evalOrder[perm]
+        boundaries = _np.nonzero(_np.diff(level[ordered]))[0] + 1
+        return _np.split(ordered, boundaries)
+
+
+    def split(self, elIndicesDict, maxSubTreeSize=None, numSubTrees=None, verbosity=0,
+              costModel=None):
         """
         Split this tree into sub-trees in order to reduce the
           maximum size of any tree (useful for limiting memory consumption
@@ -227,6 +316,13 @@ class MapEvalTree(EvalTree):
         verbosity : int, optional
             How much detail to send to stdout.
 
+        costModel : dict, optional
+            Measured operation costs, as returned by
+            :method:`GateCalc.calibrate_costs`.  When given, splitting into
+            `numSubTrees` sub-trees balances the sub-trees' measured costs
+            (see :method:`get_element_costs`) instead of their
+            numbers of gate applications.
+
         Returns
         -------
         OrderedDict
@@ -248,6 +344,8 @@ class MapEvalTree(EvalTree):
 
         self.subTrees = []
         evalOrder = self.get_evaluation_order()
+        costs = self.get_element_costs(costModel) \
+                if (costModel is not None and numSubTrees is not None) else None
         printer.log("EvalTree.split done initial prep in %.0fs" %
                     (_time.time()-tm)); tm = _time.time()
 
@@ -263,14 +361,16 @@ class MapEvalTree(EvalTree):
             """
 
             if costMetric == "applys":
-                cost_fn = lambda rem: len(rem) #length of remainder = #-apply ops needed
+                cost_fn = lambda k: len(self[k][1]) #length of remainder = #-apply ops needed
             elif costMetric == "size":
-                cost_fn = lambda rem: 1 # everything costs 1 in size of tree
+                cost_fn = lambda k: 1 # everything costs 1 in size of tree
+            elif costMetric == "measured":
+                cost_fn = lambda k: costs[k] # from calibrated costModel
             else: raise ValueError("Uknown cost metric: %s" % costMetric)
 
             subTrees = []
             curSubTree = set([evalOrder[0]])
-            curTreeCost = cost_fn(self[evalOrder[0]][1]) #remainder length of 0th evaluant
+            curTreeCost = cost_fn(evalOrder[0]) #remainder length of 0th evaluant
             totalCost = 0
             
             for k in evalOrder:
@@ -278,7 +378,7 @@ class MapEvalTree(EvalTree):
 
                 #compute the cost (additional #applies) which results from
                 # adding this element to the current tree.
-                cost = cost_fn(remainder)
+                cost = cost_fn(k)
                 inds = set([k])
 
                 if iStart is not None and iStart not in curSubTree:
@@ -287,7 +387,7 @@ class MapEvalTree(EvalTree):
                     j = iStart
                     while j is not None:
                         inds.add(j)
-                        cost += cost_fn(self[j][1]) # remainder
+                        cost += cost_fn(j) # remainder
                         j = self[j][0] #iStart
                         
                 if curTreeCost + cost < maxCost:
@@ -300,10 +400,10 @@ class MapEvalTree(EvalTree):
                     subTrees.append(curSubTree)
                     curSubTree = set([k])
                     
-                    cost = cost_fn(remainder); j = iStart
+                    cost = cost_fn(k); j = iStart
                     while j is not None: # always traverse back iStart
                         curSubTree.add(j)
-                        cost += cost_fn(self[j][1]) #remainder
+                        cost += cost_fn(j) #remainder
                         j = self[j][0] #iStart
                     totalCost += curTreeCost
                     curTreeCost = cost
@@ -321,7 +421,8 @@ class MapEvalTree(EvalTree):
         ##################################################################
                         
         if numSubTrees is not None:
-            maxCost = self.get_num_applies() / numSubTrees
+            costMetric = "applys" if (costs is None) else "measured"
+            maxCost = (self.get_num_applies() if (costs is None) else costs.sum()) / numSubTrees
             maxCostLowerBound, maxCostUpperBound = maxCost, None
             maxCostRate, rateLowerBound, rateUpperBound = 0, -1.0/len(self), +1.0/len(self)
             resultingSubtrees = numSubTrees+1 #just to prime the loop
@@ -329,7 +430,7 @@ class MapEvalTree(EvalTree):
 
             #Iterate until the desired number of subtrees have been found.
             while resultingSubtrees != numSubTrees:
-                subTreeSetList, totalCost = create_subtrees(maxCost, maxCostRate)
+                subTreeSetList, totalCost = create_subtrees(maxCost, maxCostRate, costMetric)
                 resultingSubtrees = len(subTreeSetList)
                 #print("DEBUG: resulting numTrees = %d (cost %g) w/maxCost = %g [%s,%s] & rate = %g [%g,%g]" % \
                 #     (resultingSubtrees, totalCost, maxCost, str(maxCostLowerBound), str(maxCostUpperBound),
@@ -451,7 +552,7 @@ class MapEvalTree(EvalTree):
             return subTree
     
         updated_elIndices = self._finish_split(elIndicesDict, subTreeSetList,
-                                               permute_parent_element, create_subtree)
+                                               permute_parent_element, create_subtree, costs)
         printer.log("EvalTree.split done second pass in %.0fs" %
                     (_time.time()-tm)); tm = _time.time()
         return updated_elIndices
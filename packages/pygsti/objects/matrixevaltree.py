@@ -14,6 +14,11 @@ from .evaltree import EvalTree
 import numpy as _np
 import time as _time #DEBUG TIMERS
 
+# Tree construction detects runs of a repeated sub-string (e.g. germ powers)
+# with period up to MAX_REPEAT_PERIOD gates, and computes them by repeated
+# squaring, so that `germ^k` takes O(log k) products (0 disables this).
+MAX_REPEAT_PERIOD = 32
+
 class MatrixEvalTree(EvalTree):
     """
     An Evaluation Tree.  Instances of this class specify how to
@@ -28,6 +33,8 @@ class MatrixEvalTree(EvalTree):
     """
     def __init__(self, items=[]):
         """ Create a new, empty, evaluation tree. """
+        # dependency-grouped evaluation order (see get_evaluation_generations)
+        self.eval_generations = None
         super(MatrixEvalTree, self).__init__(items)
 
     def initialize(self, gateLabels, compiled_gatestring_list, numSubTreeComms=1):
@@ -69,10 +76,10 @@ class MatrixEvalTree(EvalTree):
         #self._compute_finalStringToEls() #depends on compiled_gatestring_spamTuples
         self.recompute_spamtuple_indices(bLocal=True) # bLocal shouldn't matter here
 
-        #Evaluation dictionary:
-        # keys == gate strings that have been evaluated so far
-        # values == index of gate string (key) within evalTree
-        evalDict = { }
+        #Evaluation trie:
+        # a prefix tree of the gate strings that have been evaluated so far,
+        # (see _trie_insert) giving the index of each within evalTree
+        evalTrie = { }
 
         #Evaluation tree:
         # A list of tuples, where each element contains
@@ -98,103 +105,181 @@ class MatrixEvalTree(EvalTree):
         #  These labels serve as the initial values, and each gate string is assumed to be a tuple of
         #  gate labels.
         self.init_indices = [] #indices to put initial zero & single gate results
+        shortStrIndices = {} # first index of each zero- or single-gate string
+        for i,gs in enumerate(gatestring_list):
+            if len(gs) <= 1 and gs not in shortStrIndices: shortStrIndices[gs] = i
         for gateLabel in self.gateLabels:
             tup = () if gateLabel == "" else (gateLabel,) #special case of empty label == no gate
-            if tup in gatestring_list:
-                indx = gatestring_list.index(tup) 
+            if tup in shortStrIndices:
+                indx = shortStrIndices[tup]
                 self[indx] = (None,None) #iLeft = iRight = None for always-evaluated zero string
             else:
                 indx = len(self)
                 self.append( (None,None) ) #iLeft = iRight = None for always-evaluated zero string
             self.init_indices.append( indx )
-            evalDict[ tup ] = indx
+            _trie_insert(evalTrie, tup, indx)
 
-        #print("DB: initial eval dict = ",evalDict)
+        self._add_gatestrings(gatestring_list, list(range(len(gatestring_list))), evalTrie)
 
+        #see if there are superfluous tree nodes: those with iFinal == -1 and
+        self.myFinalToParentFinalMap = None #this tree has no "children",
+        self.myFinalElsToParentFinalElsMap = None # i.e. has not been created by a 'split'
+        self.parentIndexMap = None          
+        self.original_index_lookup = None
+        self.subTrees = [] #no subtrees yet
+        self.eval_generations = None #computed on demand
+        assert(self.generate_gatestring_list() == gatestring_list)
+        assert(None not in gatestring_list)
+
+
+    def _add_gatestrings(self, gatestring_list, indices, evalTrie):
+        """
+        Adds the final strings `gatestring_list[k]` for `k` in `indices` to
+        this tree (see :method:`_add_gatestring`).  Tree positions `k` must
+        hold `None`; new intermediate elements are appended, and `evalTrie`
+        and `self.eval_order` are updated.
+        """
         #Process gatestrings in order of length, so that we always place short strings
         # in the right place (otherwise assert stmt below can fail)
         indices_sorted_by_gatestring_len = \
-            sorted(list(range(len(gatestring_list))),
-                   key=lambda i: len(gatestring_list[i]))
+            sorted(indices, key=lambda i: len(gatestring_list[i]))
 
-        #avgBiteSize = 0
-        #useCounts = {}
-        #OLD (sequential): for (k,gateString) in enumerate(gatestring_list):
         for k in indices_sorted_by_gatestring_len:
-            gateString = gatestring_list[k]
-            L = len(gateString)
-            if L == 0:
-                iEmptyStr = evalDict.get( (), None)
-                assert(iEmptyStr is not None) # duplicate () final strs require
-                if k != iEmptyStr:            # the empty string to be included in the tree too!
-                    assert(self[k] is None)       
-                    self[k] = (iEmptyStr, iEmptyStr) # compute the duplicate () using by
-                    self.eval_order.append(k)        #  multiplying by the empty string.
-
-            start = 0; bite = 1
-            #nBites = 0
-            #print("\nDB: string = ",gateString, "(len=%d)" % len(gateString))
-
-            while start < L:
-
-                #Take a bite out of gateString, starting at `start` that is in evalDict
-                for b in range(L-start,0,-1):
-                    if gateString[start:start+b] in evalDict:
-                        bite = b; break
-                else: assert(False), ("EvalTree Error: probably caused because "
-                  "your gate strings contain gates that your gate set does not")
-                  #Logic error - loop above should always exit when b == 1
-
-                #iInFinal = k if bool(start + bite == L) else -1
-                bFinal = bool(start + bite == L)
-                #print("DB: start=",start,": found ",gateString[start:start+bite],
-                #      " (len=%d) in evalDict" % bite, "(final=%s)" % bFinal)
-
-                if start == 0: #first in-evalDict bite - no need to add anything to self yet
-                    iCur = evalDict[ gateString[0:bite] ]
-                    #print("DB: taking bite: ", gateString[0:bite], "indx = ",iCur)
-                    if bFinal:
-                        if iCur != k:  #then we have a duplicate final gate string
-                            iEmptyStr = evalDict.get( (), None)
-                            assert(iEmptyStr is not None) # duplicate final strs require
-                                      # the empty string to be included in the tree too!
-                            assert(self[k] is None) #make sure we haven't put anything here yet
-                            self[k] = (iCur, iEmptyStr) # compute the duplicate using by                             
-                            self.eval_order.append(k)   #  multiplying by the empty string.
+            self._add_gatestring(gatestring_list[k], evalTrie, k)
+            assert(k in self.eval_order or k in self.init_indices)
+
+
+    def _add_gatestring(self, gateString, evalTrie, k=None):
+        """
+        Adds `gateString` to this tree by taking the largest possible "bites"
+        out of it that are already evaluated (i.e. are in `evalTrie`), or
+        that are powers of a repeated sub-string, computed by squaring.  If
+        `k` is not None, the string is a final string placed at index `k`;
+        otherwise it is an intermediate appended to the tree.  Returns the
+        index of `gateString` within the tree.
+        """
+        L = len(gateString)
+        iEmptyStr = evalTrie.get(None, None) # index of the empty string
+        if L == 0:
+            assert(iEmptyStr is not None) # duplicate () final strs require
+            if k is not None and k != iEmptyStr: # the empty string to be included in the tree too!
+                assert(self[k] is None)       
+                self[k] = (iEmptyStr, iEmptyStr) # compute the duplicate () using by
+                self.eval_order.append(k)        #  multiplying by the empty string.
+                return k
+            return iEmptyStr
+
+        start = 0
+        while start < L:
+
+            #Take the longest bite out of gateString, starting at `start`, that is in evalTrie
+            bite, iBite, biteNode = _trie_longest_match(evalTrie, gateString, start)
+            assert(bite > 0), ("EvalTree Error: probably caused because "
+              "your gate strings contain gates that your gate set does not")
+
+            #If a power of a repeated sub-string is longer, use it instead (but
+            # never compute the entire string as an intermediate)
+            period, reps = _find_repeat(gateString, start, MAX_REPEAT_PERIOD)
+            if reps >= 2:
+                maxLen = period*reps if start > 0 or period*reps < L else L-1
+                powLen = period
+                while 2*powLen <= maxLen: powLen *= 2
+                if powLen > bite:
+                    bite, iBite, biteNode = self._add_power(
+                        gateString[start:start+period], powLen // period, evalTrie)
+
+            bFinal = bool(start + bite == L)
+
+            if start == 0: #first in-evalTrie bite - no need to add anything to self yet
+                iCur = iBite; curNode = biteNode
+                if bFinal:
+                    if k is not None and iCur != k:  #then we have a duplicate final gate string
+                        assert(iEmptyStr is not None) # duplicate final strs require
+                                  # the empty string to be included in the tree too!
+                        assert(self[k] is None) #make sure we haven't put anything here yet
+                        self[k] = (iCur, iEmptyStr) # compute the duplicate using by                             
+                        self.eval_order.append(k)   #  multiplying by the empty string.
+                        iCur = k
+            else:
+                # add (iCur, iBite), extending the current prefix's trie node
+                curNode = _trie_insert(curNode, gateString[start:start+bite])
+                if None in curNode and not (bFinal and k is not None):
+                    iCur = curNode[None] # prefix was already computed (e.g. as a power)
                 else:
-                    # add (iCur, iBite)
-                    assert(gateString[0:start+bite] not in evalDict)
-                    iBite = evalDict[ gateString[start:start+bite] ]
-                    if bFinal: #place (iCur, iBite) at location k
+                    if bFinal and k is not None: #place (iCur, iBite) at location k
                         iNew = k
-                        evalDict[ gateString[0:start+bite] ] = iNew
                         assert(self[iNew] is None) #make sure we haven't put anything here yet
                         self[k] = (iCur, iBite)
                     else:
                         iNew = len(self)
-                        evalDict[ gateString[0:start+bite] ] = iNew
                         self.append( (iCur,iBite) )
-
-                    #print("DB: add %s (index %d)" % (str(gateString[0:start+bite]),iNew))
+                    curNode.setdefault(None, iNew)
                     self.eval_order.append(iNew)
                     iCur = iNew
-                start += bite
-                #nBites += 1
+            start += bite
+        return iCur
 
-            #if nBites > 0: avgBiteSize += L / float(nBites)
-            assert(k in self.eval_order or k in self.init_indices)
-        
-        #avgBiteSize /= float(len(gatestring_list))
-        #print "DEBUG: Avg bite size = ",avgBiteSize
 
-        #see if there are superfluous tree nodes: those with iFinal == -1 and
-        self.myFinalToParentFinalMap = None #this tree has no "children",
-        self.myFinalElsToParentFinalElsMap = None # i.e. has not been created by a 'split'
-        self.parentIndexMap = None          
-        self.original_index_lookup = None
-        self.subTrees = [] #no subtrees yet
-        assert(self.generate_gatestring_list() == gatestring_list)
-        assert(None not in gatestring_list)
+    def _add_power(self, block, power, evalTrie):
+        """
+        Adds `block^power`, where `power` is a power of 2, to this tree (if
+        it isn't already present) by repeated squaring.  Returns a
+        `(length, index, trieNode)` tuple for the power.
+        """
+        node = _trie_insert(evalTrie, block)
+        if None not in node:
+            node[None] = self._add_gatestring(block, evalTrie)
+        iCur = node[None]; curStr = block
+        while len(curStr) < len(block)*power:
+            curStr = curStr + curStr
+            node = _trie_insert(evalTrie, curStr)
+            if None not in node:
+                node[None] = len(self)
+                self.append( (iCur,iCur) )
+                self.eval_order.append(len(self)-1)
+            iCur = node[None]
+        return len(curStr), iCur, node
+
+
+    def get_evaluation_generations(self):
+        """
+        Returns the evaluation order grouped into dependency "generations".
+
+        Each generation is a set of tree indices whose (iLeft, iRight)
+        operands are all initial indices or members of *earlier* generations,
+        so that every element of a generation can be computed at once
+        (e.g. as a single stacked-matrix product).  Concatenating the
+        generations gives a valid evaluation order.
+
+        Returns
+        -------
+        list
+            A list of `(indices, leftIndices, rightIndices)` tuples of integer
+            numpy arrays, one per generation, where
+            `self[indices[k]] == (leftIndices[k], rightIndices[k])`.
+        """
+        if getattr(self,'eval_generations',None) is not None:
+            return self.eval_generations
+
+        evalOrder = _np.array(self.eval_order, _np.int64)
+        lefts = _np.empty(len(self), _np.int64)
+        rights = _np.empty(len(self), _np.int64)
+        level = _np.zeros(len(self), _np.int64) # init indices have level 0
+        for i in self.eval_order:
+            iLeft, iRight = self[i]
+            lefts[i] = iLeft; rights[i] = iRight
+            level[i] = max(level[iLeft], level[iRight]) + 1
+
+        generations = []
+        if len(evalOrder) > 0:
+            perm = _np.argsort(level[evalOrder], kind='mergesort') #stable
+            ordered = evalOrder[perm]
+            boundaries = _np.nonzero(_np.diff(level[ordered]))[0] + 1
+            for inds in _np.split(ordered, boundaries):
+                generations.append( (inds, lefts[inds], rights[inds]) )
+
+        self.eval_generations = generations
+        return generations
 
 
     def generate_gatestring_list(self, permute=True):
@@ -225,17 +310,7 @@ class MatrixEvalTree(EvalTree):
             A list of the gate strings evaluated by this tree, each
             specified as a tuple of gate labels.
         """
-        gateStrings = [None]*len(self)
-
-        #Set "initial" (single- or zero- gate) strings
-        for i,gateLabel in zip(self.get_init_indices(), self.get_init_labels()):
-            if gateLabel == "": gateStrings[i] = () #special case of empty label
-            else: gateStrings[i] = (gateLabel,)
-
-        #Build rest of strings
-        for i in self.get_evaluation_order():
-            iLeft, iRight = self[i]
-            gateStrings[i] = gateStrings[iLeft] + gateStrings[iRight]
+        gateStrings = self._get_all_gatestrings()
             
         #Permute to get final list:
         nFinal = self.num_final_strings()
@@ -250,6 +325,67 @@ class MatrixEvalTree(EvalTree):
             return gateStrings[0:nFinal]
 
 
+    def _get_all_gatestrings(self):
+        """ Returns the gate strings computed by *every* tree element (in tree order) """
+        gateStrings = [None]*len(self)
+
+        #Set "initial" (single- or zero- gate) strings
+        for i,gateLabel in zip(self.get_init_indices(), self.get_init_labels()):
+            if gateLabel == "": gateStrings[i] = () #special case of empty label
+            else: gateStrings[i] = (gateLabel,)
+
+        #Build rest of strings
+        for i in self.get_evaluation_order():
+            iLeft, iRight = self[i]
+            gateStrings[i] = gateStrings[iLeft] + gateStrings[iRight]
+        return gateStrings
+
+
+    def extend_gatestrings(self, compiled_gatestring_list):
+        """
+          Extend this (already initialized) tree to evaluate additional gate strings.
+
+          Only the strings beyond those this tree already evaluates are
+          added, taking "bites" out of them using all the existing tree
+          elements (including intermediates).  If this tree is split, the
+          split is undone first; the extended tree is *not* split.
+
+          Parameters
+          ----------
+          compiled_gatestring_list : OrderedDict
+              The compiled gate strings (as would be passed to `initialize`)
+              of the *entire* extended tree.  Its first
+              `self.num_final_strings()` keys must be this tree's current
+              final strings, in their original order.
+
+          Returns
+          -------
+          None
+        """
+        def permute_element(perm, el):
+            return (perm[el[0]] if (el[0] is not None) else None,
+                    perm[el[1]] if (el[1] is not None) else None)
+
+        gatestring_list, nOld = self._prepare_to_extend(
+            compiled_gatestring_list, permute_element)
+        nNew = len(gatestring_list) - nOld
+
+        if nNew > 0:
+            #Shift non-final elements to make room for the new final ones
+            shift = [ i if i < nOld else i+nNew for i in range(len(self)) ]
+            self[:] = [ permute_element(shift, el) for el in self[0:nOld] ] + [None]*nNew \
+                      + [ permute_element(shift, el) for el in self[nOld:] ]
+            self.init_indices = [ shift[i] for i in self.init_indices ]
+            self.eval_order = [ shift[i] for i in self.eval_order ]
+
+            evalTrie = {}
+            for i,gs in enumerate(self._get_all_gatestrings()):
+                if gs is not None: _trie_insert(evalTrie, gs).setdefault(None, i)
+            self._add_gatestrings(gatestring_list, list(range(nOld,nOld+nNew)), evalTrie)
+
+        self.eval_generations = None
+        assert(self.generate_gatestring_list() == gatestring_list)
+
     def get_min_tree_size(self):
         """
         Returns the minimum sub tree size required to compute each
@@ -262,7 +398,8 @@ class MatrixEvalTree(EvalTree):
         return max(list(map(len,singleItemTreeSetList)))
 
 
-    def split(self, elIndicesDict, maxSubTreeSize=None, numSubTrees=None, verbosity=0):
+    def split(self, elIndicesDict, maxSubTreeSize=None, numSubTrees=None, verbosity=0,
+              costModel=None):
         """
         Split this tree into sub-trees in order to reduce the
           maximum size of any tree (useful for limiting memory consumption
@@ -292,6 +429,13 @@ class MatrixEvalTree(EvalTree):
         verbosity : int, optional
             How much detail to send to stdout.
 
+        costModel : dict, optional
+            Measured operation costs, as returned by
+            :method:`GateCalc.calibrate_costs`.  When given, splitting into
+            `numSubTrees` sub-trees balances the sub-trees' measured costs
+            (see :method:`get_element_costs`) instead of their
+            sizes.
+
         Returns
         -------
         OrderedDict
@@ -315,6 +459,13 @@ class MatrixEvalTree(EvalTree):
         printer.log("EvalTree.split done initial prep in %.0fs" %
                     (_time.time()-tm)); tm = _time.time()
 
+        costs = self.get_element_costs(costModel) \
+                if (costModel is not None and numSubTrees is not None) else None
+        if costs is None:
+            setCost = len
+        else:
+            setCost = lambda s: sum([costs[i] for i in s])
+
         #First pass - identify which indices go in which subtree
         #   Part 1: create disjoint set of subtrees generated by single items
         singleItemTreeSetList = self._createSingleItemTrees()
@@ -439,8 +590,9 @@ class MatrixEvalTree(EvalTree):
                 #        
                 #elif merge_method == "fast":
                 most_at_once = 10
+                subTreeCosts = list(map(setCost,subTreeSetList))
                 while len(indicesLeft) > 0:
-                    iToMergeInto,_ = min(enumerate(map(len,subTreeSetList)), 
+                    iToMergeInto,_ = min(enumerate(subTreeCosts), 
                                          key=lambda x: x[1]) #argmin
                     setToMergeInto = subTreeSetList[iToMergeInto]
                     intersectionSizes = sorted( [ (ii,len(setToMergeInto.intersection(
@@ -451,6 +603,7 @@ class MatrixEvalTree(EvalTree):
                         #if len(subTreeSetList[iToMergeInto]) >= desiredLength: break
                         iMaxIntsct,_ = intersectionSizes[i]
                         setToMerge = singleItemTreeSetList[indicesLeft[iMaxIntsct]]
+                        subTreeCosts[iToMergeInto] += setCost(setToMerge - subTreeSetList[iToMergeInto])
                         subTreeSetList[iToMergeInto].update(setToMerge)
                         toDelete.append(iMaxIntsct)
                     for i in sorted(toDelete,reverse=True):
@@ -620,7 +773,8 @@ class MatrixEvalTree(EvalTree):
             return subTree
     
         updated_elIndices = self._finish_split(elIndicesDict, subTreeSetList,
-                                               permute_parent_element, create_subtree)
+                                               permute_parent_element, create_subtree, costs)
+        self.eval_generations = None #tree elements have been permuted
         printer.log("EvalTree.split done second pass in %.0fs" %
                     (_time.time()-tm)); tm = _time.time()
         return updated_elIndices
@@ -631,6 +785,13 @@ class MatrixEvalTree(EvalTree):
         if iLeft is not None: self._walkSubTree(iLeft,out)
         if iRight is not None: self._walkSubTree(iRight,out)
 
+    def _get_op_counts(self):
+        """ The number of matrix products needed for each tree element """
+        ops = [1]*len(self)
+        for i in self.init_indices: ops[i] = 0
+        return ops
+
+
     def _createSingleItemTrees(self):
         #  Create disjoint set of subtrees generated by single items
         need_to_compute = _np.zeros( len(self), 'bool' )
@@ -697,3 +858,54 @@ class MatrixEvalTree(EvalTree):
     def copy(self):
         """ Create a copy of this evaluation tree. """
         return self._copyBase( MatrixEvalTree(self[:]) )
+
+
+def _trie_insert(node, gatestring, index=None):
+    """
+    Walks down the prefix trie rooted at `node` (a dict whose keys are gate
+    labels and child nodes, along with the key `None` holding a tree index
+    if the string ending at the node has been evaluated), adding nodes as
+    needed, and returns the node of `gatestring`.  If `index` is not None,
+    it is stored at that node.
+    """
+    for lbl in gatestring:
+        child = node.get(lbl, None)
+        if child is None:
+            child = node[lbl] = {}
+        node = child
+    if index is not None: node[None] = index
+    return node
+
+
+def _trie_longest_match(root, gatestring, start):
+    """
+    Finds the longest evaluated string in the trie `root` that begins at
+    `gatestring[start]`.  Returns a `(length, index, node)` tuple, with
+    `length == 0` if there's no such string.
+    """
+    best = (0, None, None)
+    node = root
+    for j in range(start, len(gatestring)):
+        node = node.get(gatestring[j], None)
+        if node is None: break
+        if None in node: best = (j+1-start, node[None], node)
+    return best
+
+
+def _find_repeat(gatestring, start, maxPeriod):
+    """
+    Finds the smallest period `p <= maxPeriod` such that `gatestring`
+    repeats a length-`p` block at least twice beginning at `start`.
+    Returns `(p, reps)`, where `reps` is the number of consecutive
+    repetitions (`reps == 0` if there is no such period).
+    """
+    L = len(gatestring)
+    first = gatestring[start] if start < L else None
+    for p in range(1, min(maxPeriod, (L-start)//2)+1):
+        if gatestring[start+p] != first: continue # quick check before slicing
+        block = gatestring[start:start+p]
+        if gatestring[start+p:start+2*p] == block:
+            reps = 2
+            while gatestring[start+reps*p:start+(reps+1)*p] == block: reps += 1
+            return p, reps
+    return 0, 0
@@ -14,6 +14,7 @@ from collections import OrderedDict as _OrderedDict
 from ..tools import compattools as _compat
 
 from .dataset import DataSet as _DataSet
+from .dataset import _compact_gatestring_index
 from . import gatestring as _gs
 
 
@@ -157,9 +158,10 @@ class MultiDataSet(object):
             self.load(fileToLoadFrom)
             return
 
-        # self.gsIndex  :  Ordered dictionary where keys = gate strings (tuples), values = integer indices into counts
+        # self.gsIndex  :  Ordered dictionary where keys = gate strings (tuples), values = slices into
+        #                  the arrays of each dataset (shared, unconverted, by the DataSets this returns)
         if gateStringIndices is not None:
-            self.gsIndex = gateStringIndices
+            self.gsIndex = _compact_gatestring_index(gateStringIndices)
         else:
             self.gsIndex = None
 
@@ -475,7 +477,7 @@ class MultiDataSet(object):
 
     def __setstate__(self, state_dict):
         gsIndexKeys = [ cgs.expand() for cgs in state_dict['gsIndexKeys'] ]
-        self.gsIndex = _OrderedDict( list(zip(gsIndexKeys, state_dict['gsIndexVals'])) )
+        self.gsIndex = _compact_gatestring_index(_OrderedDict( list(zip(gsIndexKeys, state_dict['gsIndexVals'])) ))
         self.olIndex = state_dict['olIndex']
         self.oliDict = state_dict['oliDict']
         self.timeDict = state_dict['timeDict']
@@ -562,7 +564,7 @@ class MultiDataSet(object):
         gsIndexKeys = [ expand(cgs) for cgs in state_dict['gsIndexKeys'] ]
 
         #gsIndexKeys = [ cgs.expand() for cgs in state_dict['gsIndexKeys'] ]
-        self.gsIndex = _OrderedDict( list(zip(gsIndexKeys, state_dict['gsIndexVals'])) )
+        self.gsIndex = _compact_gatestring_index(_OrderedDict( list(zip(gsIndexKeys, state_dict['gsIndexVals'])) ))
         self.olIndex = state_dict['olIndex']
         self.collisionActions = state_dict['collisionActions']
         self.comments = state_dict["comments"]
@@ -22,7 +22,9 @@ MACH_PRECISION = 1e-12
 
 def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                    rel_ftol=1e-6, rel_xtol=1e-6, max_iter=100, comm=None,
-                   verbosity=0, profiler=None):
+                   verbosity=0, profiler=None, normal_eqs=False,
+                   init_state=None, state_callback=None, return_state=False,
+                   reuse_buffers=False):
     """
     An implementation of the Levenberg-Marquardt least-squares optimization
     algorithm customized for use within pyGSTi.  This general purpose routine
@@ -37,7 +39,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
 
     jac_fn : function
         The jacobian function (not optional!).  Accepts a 1D array of length N
-        and returns an array of shape (M,N).
+        and returns an array of shape (M,N).  If `normal_eqs` is True, this
+        function instead returns the tuple `(JTJ, JTf)` (see below).
 
     x0 : numpy.ndarray
         Initial evaluation point.
@@ -72,6 +75,44 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
     profiler : Profiler, optional
         A profiler object used for to track timing and memory usage.
 
+    normal_eqs : bool, optional
+        If True, `jac_fn` computes the normal-equation quantities
+        `JTJ = dot(J.T,J)`, of shape (N,N), and `JTf = dot(J.T,obj_fn(x))`,
+        of shape (N,), directly.  This allows callers to accumulate these
+        quantities in pieces so that the full (M,N) jacobian `J` is never
+        held in memory.  In this case `JTJ` must be the same on all the
+        processors of `comm`.
+
+    init_state : dict, optional
+        The state of an earlier, interrupted optimization to resume, as
+        given to `state_callback`.  A dictionary with keys `'x'` (which
+        overrides `x0`), `'mu'`, `'nu'`, `'iter'`, `'jtj_scale'` and
+        `'history'` (see `return_state`).  Any of these may be omitted.
+        In particular, a state holding just the `'mu'` and `'jtj_scale'`
+        values returned by a related optimization warm-starts the damping
+        parameter: the initial `mu` is the given one, rescaled by the ratio
+        of the new and old `jtj_scale` values, rather than the default
+        `1e-3 * max(diag(JTJ))`.
+
+    state_callback : function, optional
+        A function called at the start of each outer iteration with a
+        dictionary holding the current state of the optimization (see
+        `init_state`), e.g. to save it so that the optimization can be
+        resumed should it be interrupted.
+
+    return_state : bool, optional
+        If True, also return the final state of the optimizer.
+
+    reuse_buffers : bool, optional
+        If True, `JTJ`, `JTf` and the work vectors of the inner (damping)
+        loop are allocated once and reused, and `JTJ` is factorized (by an
+        eigen-decomposition) just once per outer iteration, so that each
+        trial damping parameter costs only O(N^2) operations and no memory
+        allocation beyond that done by `obj_fn`.  This is beneficial when
+        the number of parameters N is large and several trial dampings are
+        typically needed.  Note that `jac_fn` should also reuse the jacobian
+        array it returns.
+
     Returns
     -------
     x : numpy.ndarray
@@ -80,26 +121,45 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
         Whether the solution converged.
     msg : str
         A message indicating why the solution converged (or didn't).
+    state : dict
+        Only returned when `return_state == True`.  The optimizer's final
+        state, with keys `'x'`, `'mu'` (the damping parameter), `'nu'`,
+        `'iter'` (the number of outer iterations performed), `'jtj_scale'`
+        (the maximum diagonal element of the last undamped `JTJ`) and
+        `'history'` (the list of sum-of-squares values at the start of
+        each outer iteration).
     """
 
     printer = _VerbosityPrinter.build_printer(verbosity, comm)
     
     msg = ""
     converged = False
-    x = x0
+    if init_state is None: init_state = {}
+    x = init_state.get('x',x0)
     f = obj_fn(x)
     norm_f = _np.dot(f,f) # _np.linalg.norm(f)**2
     half_max_nu = 2**62 #what should this be??
     tau = 1e-3
-    nu = 2
-    mu = 0 #initialized on 1st iter
+    nu = init_state.get('nu',2)
+    mu = init_state.get('mu',0) #initialized on 1st iter
+    k0 = init_state.get('iter',0)
+    jtj_scale = init_state.get('jtj_scale',None)
+    history = list(init_state.get('history',[]))
     my_cols_slice = None
 
+    if reuse_buffers:
+        N = len(x0)
+        x = _np.array(x, 'd') # x & new_x buffers are swapped when a step is accepted
+        new_x = _np.empty(N,'d'); dx = _np.empty(N,'d')
+        scratch = _np.empty(N,'d'); VTf = _np.empty(N,'d')
+        JTJ_buf = _np.empty((N,N),'d') if not normal_eqs else None
+        JTf_buf = _np.empty(N,'d') if not normal_eqs else None
+
     if not _np.isfinite(norm_f):
         msg = "Infinite norm of objective function at initial point!"
 
 
-    for k in range(max_iter): #outer loop
+    for k in range(k0,max_iter): #outer loop
         # assume x, f, fnorm hold valid values
 
         if len(msg) > 0: 
@@ -109,23 +169,38 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             msg = "Sum of squares is at most %g" % f_norm2_tol
             converged = True; break
 
+        if state_callback is not None: # copy x, as with reuse_buffers it is overwritten later
+            state_callback({'x': x.copy(), 'mu': mu, 'nu': nu, 'iter': k,
+                            'jtj_scale': jtj_scale, 'history': list(history)})
+        history.append(norm_f)
+
         printer.log("--- Outer Iter %d: norm_f = %g, mu=%g" % (k,norm_f,mu))
             
         if profiler: profiler.mem_check("custom_leastsq: begin outer iter *before de-alloc*")
-        Jac = None; JTJ = None; JTf = None
+        Jac = None; JTJ = None; JTf = None; evals = evecs = None
 
         if profiler: profiler.mem_check("custom_leastsq: begin outer iter")
-        Jac = jac_fn(x)
-        if profiler: profiler.mem_check("custom_leastsq: after jacobian:" 
-                                        + "shape=%s, GB=%.2f" % (str(Jac.shape),
-                                                        Jac.nbytes/(1024.0**3)) )
-
-        tm = _time.time()
-        if my_cols_slice is None:
-            my_cols_slice = _mpit.distribute_for_dot(Jac.shape[0], comm)
-        JTJ = _mpit.mpidot(Jac.T,Jac,my_cols_slice,comm)   #_np.dot(Jac.T,Jac)
-        JTf = _np.dot(Jac.T,f)
-        if profiler: profiler.add_time("custom_leastsq: dotprods",tm)
+        if normal_eqs:
+            JTJ, JTf = jac_fn(x)
+            if profiler: profiler.mem_check("custom_leastsq: after normal eqns:" 
+                                            + "shape=%s, GB=%.2f" % (str(JTJ.shape),
+                                                            JTJ.nbytes/(1024.0**3)) )
+        else:
+            Jac = jac_fn(x)
+            if profiler: profiler.mem_check("custom_leastsq: after jacobian:" 
+                                            + "shape=%s, GB=%.2f" % (str(Jac.shape),
+                                                            Jac.nbytes/(1024.0**3)) )
+
+            tm = _time.time()
+            if my_cols_slice is None:
+                my_cols_slice = _mpit.distribute_for_dot(Jac.shape[0], comm)
+            if reuse_buffers:
+                JTJ = _mpit.mpidot(Jac.T,Jac,my_cols_slice,comm,out=JTJ_buf)
+                JTf = _np.dot(Jac.T,f,out=JTf_buf)
+            else:
+                JTJ = _mpit.mpidot(Jac.T,Jac,my_cols_slice,comm)   #_np.dot(Jac.T,Jac)
+                JTf = _np.dot(Jac.T,f)
+            if profiler: profiler.add_time("custom_leastsq: dotprods",tm)
 
         idiag = _np.diag_indices_from(JTJ)
         norm_JTf = _np.linalg.norm(JTf,ord=_np.inf)
@@ -137,32 +212,54 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             converged = True; break
 
         if k == 0:
-            #mu = tau # initial damping element
-            mu = tau * _np.max(undampled_JTJ_diag) # initial damping element
+            if init_state.get('mu',0) > 0 and init_state.get('jtj_scale',0) > 0:
+                # warm start: keep the given damping relative to the scale of JTJ
+                mu = init_state['mu'] * _np.max(undampled_JTJ_diag) / init_state['jtj_scale']
+            else:
+                #mu = tau # initial damping element
+                mu = tau * _np.max(undampled_JTJ_diag) # initial damping element
             #mu = min(mu, MU_TOL1)
+        jtj_scale = _np.max(undampled_JTJ_diag)
+
+        if reuse_buffers:
+            # JTJ = V diag(evals) V^T => (JTJ + mu*I)^-1 = V diag(1/(evals+mu)) V^T for every mu
+            tm = _time.time()
+            evals, evecs = _scipy.linalg.eigh(JTJ)
+            _np.dot(evecs.T, JTf, out=VTf); VTf *= -1.0
+            if profiler: profiler.add_time("custom_leastsq: factorize",tm)
 
         #determing increment using adaptive damping
         while True:  #inner loop
 
             if profiler: profiler.mem_check("custom_leastsq: begin inner iter")
-            JTJ[idiag] += mu # augment normal equations
-            #JTJ[idiag] *= (1.0 + mu) # augment normal equations
-
-            try:
-                if profiler: profiler.mem_check("custom_leastsq: before linsolve")
+            if reuse_buffers:
                 tm = _time.time()
-                success = True
-                #dx = _np.linalg.solve(JTJ, -JTf) 
-                #NEW scipy: dx = _scipy.linalg.solve(JTJ, -JTf, assume_a='pos') #or 'sym' 
-                dx = _scipy.linalg.solve(JTJ, -JTf, sym_pos=True)
+                _np.add(evals, mu, out=scratch)
+                success = scratch.min() > 0 # damped JTJ is positive definite
+                if success:
+                    _np.divide(VTf, scratch, out=scratch)
+                    _np.dot(evecs, scratch, out=dx)
                 if profiler: profiler.add_time("custom_leastsq: linsolve",tm)
-            #except _np.linalg.LinAlgError:
-            except _scipy.linalg.LinAlgError:
-                success = False
+            else:
+                JTJ[idiag] += mu # augment normal equations
+                #JTJ[idiag] *= (1.0 + mu) # augment normal equations
+
+                try:
+                    if profiler: profiler.mem_check("custom_leastsq: before linsolve")
+                    tm = _time.time()
+                    success = True
+                    #dx = _np.linalg.solve(JTJ, -JTf) 
+                    #NEW scipy: dx = _scipy.linalg.solve(JTJ, -JTf, assume_a='pos') #or 'sym' 
+                    dx = _scipy.linalg.solve(JTJ, -JTf, sym_pos=True)
+                    if profiler: profiler.add_time("custom_leastsq: linsolve",tm)
+                #except _np.linalg.LinAlgError:
+                except _scipy.linalg.LinAlgError:
+                    success = False
             
             if profiler: profiler.mem_check("custom_leastsq: after linsolve")
             if success: #linear solve succeeded
-                new_x = x + dx
+                if reuse_buffers: _np.add(x, dx, out=new_x)
+                else: new_x = x + dx
                 norm_dx = _np.dot(dx,dx) # _np.linalg.norm(dx)**2
 
                 printer.log("  - Inner Loop: mu=%g, norm_dx=%g" % (mu,norm_dx),2)
@@ -180,7 +277,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                 if not _np.isfinite(norm_new_f): # avoid infinite loop...
                     msg = "Infinite norm of objective function!"; break
 
-                dL = _np.dot(dx, mu*dx - JTf) # expected decrease in ||F||^2 from linear model
+                if reuse_buffers: dL = mu*norm_dx - _np.dot(dx, JTf) # same as below, w/out temporaries
+                else: dL = _np.dot(dx, mu*dx - JTf) # expected decrease in ||F||^2 from linear model
                 dF = norm_f - norm_new_f      # actual decrease in ||F||^2
 
                 printer.log("      (cont): norm_new_f=%g, dL=%g, dF=%g, reldL=%g, reldF=%g" % 
@@ -198,7 +296,9 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
                     t = 1.0 - (2*dF/dL-1.0)**3 # dF/dL == gain ratio
                     mu *= max(t,1.0/3.0)
                     nu = 2
-                    x,f, norm_f = new_x, new_f, norm_new_f
+                    if reuse_buffers: x, new_x = new_x, x # swap buffers
+                    else: x = new_x
+                    f, norm_f = new_f, norm_new_f
 
                     printer.log("      Accepted! gain ratio=%g  mu * %g => %g"
                                 % (dF/dL,max(t,1.0/3.0),mu), 2)
@@ -225,7 +325,8 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
             printer.log("      Rejected!  mu => mu*nu = %g, nu => 2*nu = %g"
                         % (mu, nu),2)
             
-            JTJ[idiag] = undampled_JTJ_diag #restore diagonal
+            if not reuse_buffers:
+                JTJ[idiag] = undampled_JTJ_diag #restore diagonal
         #end of inner loop
     #end of outer loop
     else:
@@ -233,6 +334,9 @@ def custom_leastsq(obj_fn, jac_fn, x0, f_norm2_tol=1e-6, jac_norm_tol=1e-6,
         msg = "Maximum iterations (%d) exceeded" % max_iter
 
     #JTJ[idiag] = undampled_JTJ_diag #restore diagonal
+    if return_state:
+        return x, converged, msg, {'x': x, 'mu': mu, 'nu': nu, 'iter': len(history),
+                                   'jtj_scale': jtj_scale, 'history': history}
     return x, converged, msg
     #solution = _optResult()
     #solution.x = x; solution.fun = f
@@ -153,8 +153,10 @@ def total_count_matrix(gsplaq, dataset):
         gate strings.
     """
     ret = _np.nan * _np.ones(gsplaq.num_compiled_elements, 'd')
-    for i,j,gstr,elIndices,outcomes in gsplaq.iter_compiled():
-        ret[elIndices] = dataset[ gstr ].total
+    compiled = list(gsplaq.iter_compiled())
+    totals = dataset.totals_array([ gstr for _,_,gstr,_,_ in compiled ])
+    for (i,j,gstr,elIndices,outcomes),total in zip(compiled,totals):
+        ret[elIndices] = total
           # OR should it sum only over outcomes, i.e.
           # = sum([dataset[gstr][ol] for ol in outcomes])
     return ret
@@ -192,9 +194,10 @@ def count_matrices(gsplaq, dataset):
         effect-fiducial pair.
     """
     ret = _np.nan * _np.ones(gsplaq.num_compiled_elements, 'd')
-    for i,j,gstr,elIndices,outcomes in gsplaq.iter_compiled():
-        datarow = dataset[ gstr ]
-        ret[elIndices] = [datarow[ol] for ol in outcomes]
+    compiled = list(gsplaq.iter_compiled())
+    counts = dataset.counts_array([ gstr for _,_,gstr,_,_ in compiled ])
+    for k,(i,j,gstr,elIndices,outcomes) in enumerate(compiled):
+        ret[elIndices] = counts[k, [ dataset.olIndex[ol] for ol in outcomes ]]
     return ret
 
 
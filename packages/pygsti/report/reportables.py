@@ -66,17 +66,52 @@ def evaluate(gatesetFn, cri=None, verbosity=0):
         If `gatesetFn` does returns a dict of ReportableQty objects, otherwise
         a single ReportableQty.
     """
-    if gatesetFn is None: # so you can set fn to None when they're missing (e.g. diamond norm)
-        return _ReportableQty(_np.nan)
-    
+    return evaluate_all([gatesetFn], cri, verbosity)[0]
+
+
+def evaluate_all(gatesetFns, cri=None, verbosity=0):
+    """ 
+    Evaluate a list of GateSetFunction objects using confidence region
+    information.
+
+    When `cri` is given, the finite-difference derivatives of all the
+    functions are computed together (see
+    :method:`ConfidenceRegionFactoryView.get_fn_confidence_intervals`), which
+    is much faster than calling :func:`evaluate` on each function separately.
+
+    Parameters
+    ----------
+    gatesetFns : list of GateSetFunctions
+        The functions to evaluate.  `None` elements are allowed, and evaluate
+        to NaN.
+
+    cri : ConfidenceRegionFactoryView, optional
+        View for computing confidence intervals.
+
+    verbosity : int, optional
+        Amount of detail to print to stdout.
+
+    Returns
+    -------
+    list
+        A list of the ReportableQty objects (or dicts of them, see
+        :func:`evaluate`) corresponding to `gatesetFns`.
+    """
+    qtys = [ _ReportableQty(_np.nan) for fn in gatesetFns ] # so you can set fn to None when they're missing (e.g. diamond norm)
+    indices = [ i for i,fn in enumerate(gatesetFns) if fn is not None ]
+
     if cri:
         nmEBs = bool(cri.get_errobar_type() == "non-markovian")
-        df, f0 =  cri.get_fn_confidence_interval(
-            gatesetFn, returnFnVal=True,
+        results = cri.get_fn_confidence_intervals(
+            [ gatesetFns[i] for i in indices ], returnFnVals=True,
             verbosity=verbosity)
-        return _make_reportable_qty_or_dict(f0, df, nmEBs)
+        for i,(df, f0) in zip(indices, results):
+            qtys[i] = _make_reportable_qty_or_dict(f0, df, nmEBs)
     else:
-        return _make_reportable_qty_or_dict( gatesetFn.evaluate(gatesetFn.base_gateset) )
+        for i in indices:
+            gatesetFn = gatesetFns[i]
+            qtys[i] = _make_reportable_qty_or_dict( gatesetFn.evaluate(gatesetFn.base_gateset) )
+    return qtys
 
 
 def spam_dotprods(rhoVecs, povms):
@@ -1088,6 +1123,32 @@ def evaluate_gatefn_by_name(name, gateset, targetGateset, gateLabelOrString,
     -------
     ReportableQty
     """
+    return evaluate( gatefn_by_name(name, gateset, targetGateset, gateLabelOrString),
+                     confidenceRegionInfo)
+
+
+def gatefn_by_name(name, gateset, targetGateset, gateLabelOrString):
+    """ 
+    Constructs the gate-function named by the abbreviation `name`, so that
+    several such functions can be evaluated together by :func:`evaluate_all`.
+
+    Parameters
+    ----------
+    name : str
+        An appreviation for a gate-function name.  Allowed values are the
+        same as those of :func:`info_of_gatefn_by_name`.
+
+    gateset, targetGateSet : GateSet
+        The gatesets to compare.
+
+    gateLabelOrString : str or GateString or tuple
+        The gate label or sequence of labels to compare (see
+        :func:`evaluate_gatefn_by_name`).
+
+    Returns
+    -------
+    GateSetFunction
+    """
     gl = gateLabelOrString
     b = bool(_tools.isstr(gl)) #whether this is a gate label or a string
     
@@ -1131,4 +1192,4 @@ def evaluate_gatefn_by_name(name, gateset, targetGateset, gateLabelOrString,
         fn = Fro_diff if b else \
              Gatestring_fro_diff
 
-    return evaluate( fn(gateset, targetGateset, gl), confidenceRegionInfo)
+    return fn(gateset, targetGateset, gl)
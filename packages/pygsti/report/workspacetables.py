@@ -652,19 +652,15 @@ class GatesVsTargetTable(WorkspaceTable):
         else:
             iterOver = gateLabels + [v for v in virtual_gates if len(v) > 1]
 
-        for gl in iterOver:
-            #Note: gl may be a gate label (a string) or a GateString
-            row_data = [ str(gl) ]
-
-            for disp in display:
-                #import time as _time #DEBUG
-                #tStart = _time.time() #DEBUG                
-                qty = _reportables.evaluate_gatefn_by_name(
-                    disp, gateset, targetGateset, gl, confidenceRegionInfo)
-                #tm = _time.time()-tStart #DEBUG
-                #if tm > 0.01: print("DB: Evaluated %s in %gs" % (disp, tm)) #DEBUG
-                row_data.append( qty )
+        #Evaluate all the table's quantities together, so their error bars
+        # share the same finite-difference gate sets
+        fns = [ _reportables.gatefn_by_name(disp, gateset, targetGateset, gl)
+                for gl in iterOver for disp in display ]
+        qtys = _reportables.evaluate_all(fns, confidenceRegionInfo)
 
+        for i,gl in enumerate(iterOver):
+            #Note: gl may be a gate label (a string) or a GateString
+            row_data = [ str(gl) ] + qtys[i*len(display):(i+1)*len(display)]
             table.addrow(row_data, formatters)
         table.finish()
         return table
@@ -707,12 +703,16 @@ class SpamVsTargetTable(WorkspaceTable):
                              confidenceRegionInfo=confidenceRegionInfo)
     
         formatters = [ 'Rho' ] + [ 'Normal' ] * (len(colHeadings) - 1)
-        prepInfidelities = [_ev(_reportables.Vec_infidelity(gateset, targetGateset, l,
-                                                            'prep'), confidenceRegionInfo)
-                            for l in prepLabels]
-        prepTraceDists   = [_ev(_reportables.Vec_tr_diff(gateset, targetGateset, l,
-                                                        'prep'), confidenceRegionInfo)
-                            for l in prepLabels]
+        nPreps, nPOVMs = len(prepLabels), len(povmLabels)
+        fns = [ _reportables.Vec_infidelity(gateset, targetGateset, l, 'prep') for l in prepLabels ] + \
+              [ _reportables.Vec_tr_diff(gateset, targetGateset, l, 'prep') for l in prepLabels ] + \
+              [ _reportables.POVM_entanglement_infidelity(gateset, targetGateset, l) for l in povmLabels ] + \
+              [ _reportables.POVM_jt_diff(gateset, targetGateset, l) for l in povmLabels ] + \
+              [ _reportables.POVM_half_diamond_norm(gateset, targetGateset, l) for l in povmLabels ]
+        qtys = _reportables.evaluate_all(fns, confidenceRegionInfo) # shares finite-difference gate sets
+
+        prepInfidelities = qtys[0:nPreps]
+        prepTraceDists   = qtys[nPreps:2*nPreps]
         prepDiamondDists = [ _objs.reportableqty.ReportableQty(_np.nan) ] * len(prepLabels)
         for rowData in zip(prepLabels, prepInfidelities, prepTraceDists,
                            prepDiamondDists):
@@ -720,15 +720,9 @@ class SpamVsTargetTable(WorkspaceTable):
 
             
         formatters = [ 'Normal' ] + [ 'Normal' ] * (len(colHeadings) - 1)
-        povmInfidelities = [_ev(_reportables.POVM_entanglement_infidelity(
-                             gateset, targetGateset, l), confidenceRegionInfo)
-                            for l in povmLabels]
-        povmTraceDists   = [_ev(_reportables.POVM_jt_diff(
-                             gateset, targetGateset, l), confidenceRegionInfo)
-                            for l in povmLabels]
-        povmDiamondDists = [_ev(_reportables.POVM_half_diamond_norm(
-                             gateset, targetGateset, l), confidenceRegionInfo)
-                            for l in povmLabels]
+        povmInfidelities = qtys[2*nPreps:2*nPreps+nPOVMs]
+        povmTraceDists   = qtys[2*nPreps+nPOVMs:2*nPreps+2*nPOVMs]
+        povmDiamondDists = qtys[2*nPreps+2*nPOVMs:]
 
         for rowData in zip(povmLabels, povmInfidelities, povmTraceDists,
                            povmDiamondDists):
@@ -8,6 +8,7 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 
 import numpy as _np
 from . import listtools as _lt
+from . import likelihoodfns as _lf
 
 def chi2_terms(gateset, dataset, gateStrings=None,
                minProbClipForWeighting=1e-4, clipTo=None,
@@ -63,9 +64,8 @@ def chi2_terms(gateset, dataset, gateStrings=None,
 
     dsGateStrings = _lt.find_replace_tuple_list(
             gateStrings, gateLabelAliases)
-    for (i,gateStr) in enumerate(dsGateStrings):
-        N[ lookup[i] ] = dataset[gateStr].total
-        f[ lookup[i] ] = [ dataset[gateStr].fraction(x) for x in outcomes_lookup[i] ]
+    dataset.fill_count_vecs(f, N, dsGateStrings, lookup, outcomes_lookup)
+    f /= N
 
     gateset.bulk_fill_probs(probs, evTree, clipTo, check)
 
@@ -221,9 +221,8 @@ def chi2(gateset, dataset, gateStrings=None,
 
     dsGateStrings = _lt.find_replace_tuple_list(
         gateStrings, gateLabelAliases)
-    for (i,gateStr) in enumerate(dsGateStrings):
-        N[ lookup[i] ] = dataset[gateStr].total
-        f[ lookup[i] ] = [ dataset[gateStr].fraction(x) for x in outcomes_lookup[i] ]
+    dataset.fill_count_vecs(f, N, dsGateStrings, lookup, outcomes_lookup)
+    f /= N
 
     if returnHessian:
         gateset.bulk_fill_hprobs(hprobs, evTree,
@@ -260,6 +259,160 @@ def chi2(gateset, dataset, gateStrings=None,
         return (chi2, d2chi2) if returnHessian else chi2
 
 
+def chi2_hessian(gateset, dataset, gateStrings=None,
+                 minProbClipForWeighting=1e-4, clipTo=None, check=False,
+                 comm=None, memLimit=None, gateLabelAliases=None,
+                 verbosity=0, checkpoint=None):
+    """
+    The hessian of chi^2, computed in blocks.
+
+    This gives the same hessian as :func:`chi2` with `returnHessian=True`,
+    but computes it a block at a time, so that the blocks can be distributed
+    among the processors of `comm` and saved to a `checkpoint` (see
+    :func:`hessian_by_blocks`).
+
+    Parameters
+    ----------
+    gateset : GateSet
+        The gate set used to specify the probabilities and SPAM labels
+
+    dataset : DataSet
+        The data used to specify frequencies and counts
+
+    gateStrings : list of GateStrings or tuples, optional
+        List of gate strings whose terms will be included in chi^2 sum.
+        Default value (None) means "all strings in dataset".
+
+    minProbClipForWeighting : float, optional
+        defines the clipping interval for the statistical weight (see chi2fn).
+
+    clipTo : 2-tuple, optional
+        (min,max) to clip probabilities to within GateSet probability
+        computation routines (see GateSet.bulk_fill_probs)
+
+    check : bool, optional
+        If True, perform extra checks within code to verify correctness.  Used
+        for testing, and runs much slower when True.
+
+    comm : mpi4py.MPI.Comm, optional
+        When not None, an MPI communicator for distributing the computation
+        across multiple processors.
+
+    memLimit : int, optional
+        A rough memory limit in bytes which restricts the amount of intermediate
+        values that are computed and stored.
+
+    gateLabelAliases : dictionary, optional
+        Dictionary whose keys are gate label "aliases" and whose values are tuples
+        corresponding to what that gate label should be expanded into before querying
+        the dataset. Defaults to the empty dictionary (no aliases defined)
+        e.g. gateLabelAliases['Gx^3'] = ('Gx','Gx','Gx')
+
+    verbosity : int, optional
+        How much detail to print to stdout.
+
+    checkpoint : BlockCheckpoint, optional
+        When not None, each finished block of the hessian is saved to this
+        checkpoint, and the blocks it already holds (from an interrupted run
+        with the same arguments and number of processors) are not recomputed.
+
+    Returns
+    -------
+    numpy array
+        The Hessian matrix of shape (nGatesetParams, nGatesetParams).
+    """
+    if gateStrings is None:
+        gateStrings = list(dataset.keys())
+
+    #NOTE: hessian_from_hprobs modifies hprobs and dprobs12 (to save mem)
+    def hessian_from_hprobs(hprobs, dprobs12, probs, cntVecMx, totalCntVec):
+        """ The chi2 hessian from raw components (see `chi2` for the derivation) """
+        N = totalCntVec; f = cntVecMx / totalCntVec
+        cprobs = _np.clip(probs,minProbClipForWeighting,1e10) #effectively no upper bound
+        t = (probs - f)/cprobs
+        dt_coeffs = 1.0/cprobs - (probs-f)/cprobs**2 # dt/dx = dt_coeffs * dp/dx
+
+        # d2chi2 = N * (dt*(2-t)*dp - t*dt*dp + t*(2-t)*hp)
+        #        = N*dt_coeffs*(2-2t) * dprobs12 + N*t*(2-t) * hprobs
+        hprobs *= (N * t * (2 - t))[:,None,None]
+        dprobs12 *= (N * dt_coeffs * (2 - 2*t))[:,None,None]
+        hessian = dprobs12; hessian += hprobs
+        return _np.sum(hessian, axis=0) # sum over gate strings and spam labels
+
+    return _lf.hessian_by_blocks(gateset, dataset, gateStrings, hessian_from_hprobs,
+                                 clipTo, check, comm, memLimit, gateLabelAliases,
+                                 checkpoint, ("chi2_hessian", minProbClipForWeighting),
+                                 verbosity)
+
+
+def chi2_approximate_hessian(gateset, dataset, gateStrings=None,
+                             minProbClipForWeighting=1e-4, clipTo=None,
+                             check=False, comm=None, memLimit=None,
+                             gateLabelAliases=None, verbosity=0):
+    """
+    An approximation of the hessian of chi^2 which uses only the first
+    derivatives of the probabilities.
+
+    This is the Gauss-Newton approximation `sum_i 2 N_i/p_i dp_i/dx dp_i/dy`,
+    the hessian's expected value (see :func:`logl_approximate_hessian`).
+
+    Parameters
+    ----------
+    gateset : GateSet
+        The gate set used to specify the probabilities and SPAM labels
+
+    dataset : DataSet
+        The data used to specify frequencies and counts
+
+    gateStrings : list of GateStrings or tuples, optional
+        List of gate strings whose terms will be included in chi^2 sum.
+        Default value (None) means "all strings in dataset".
+
+    minProbClipForWeighting : float, optional
+        defines the clipping interval for the statistical weight (see chi2fn).
+
+    clipTo : 2-tuple, optional
+        (min,max) to clip probabilities to within GateSet probability
+        computation routines (see GateSet.bulk_fill_probs)
+
+    check : bool, optional
+        If True, perform extra checks within code to verify correctness.  Used
+        for testing, and runs much slower when True.
+
+    comm : mpi4py.MPI.Comm, optional
+        When not None, an MPI communicator for distributing the computation
+        across multiple processors.
+
+    memLimit : int, optional
+        A rough memory limit in bytes which restricts the amount of intermediate
+        values that are computed and stored.
+
+    gateLabelAliases : dictionary, optional
+        Dictionary whose keys are gate label "aliases" and whose values are tuples
+        corresponding to what that gate label should be expanded into before querying
+        the dataset. Defaults to the empty dictionary (no aliases defined)
+        e.g. gateLabelAliases['Gx^3'] = ('Gx','Gx','Gx')
+
+    verbosity : int, optional
+        How much detail to print to stdout.
+
+    Returns
+    -------
+    numpy array
+        The approximate Hessian matrix of shape (nGatesetParams, nGatesetParams).
+    """
+    if gateStrings is None:
+        gateStrings = list(dataset.keys())
+
+    def weights_from_probs(probs, cntVecMx, totalCntVec):
+        """ The Gauss-Newton weight of each element """
+        return 2 * totalCntVec / _np.clip(probs,minProbClipForWeighting,1e10)
+
+    return _lf.hessian_from_jacobian(gateset, dataset, gateStrings, weights_from_probs,
+                                     clipTo, check, comm, memLimit, gateLabelAliases,
+                                     verbosity)
+
+
 
 #def _oldTotalChiSquared( dataset, gateset, gateStrings=None, useFreqWeightedChiSq=False,
 #                     minProbClipForWeighting=1e-4):
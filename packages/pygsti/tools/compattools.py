@@ -7,6 +7,7 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 #*****************************************************************
 
 import numbers as _numbers
+import os as _os
 
 #Define basestring in python3 so unicode
 # strings can be tested for in python2 using
@@ -24,6 +25,20 @@ def isstr(x):
     """ Return whether `x` has a string type """
     return isinstance(x, basestring)
 
+def replace_file(src, dst):
+    """
+    Rename file `src` to `dst`, overwriting `dst` if it exists.
+
+    This is Python 3's `os.replace`, which is atomic on all platforms.  Under
+    Python 2 `os.rename` is used instead, which is atomic on POSIX systems
+    but (on Windows) requires any existing `dst` to be removed first.
+    """
+    if hasattr(_os, 'replace'):
+        _os.replace(src, dst)
+    else:
+        if _os.name == 'nt' and _os.path.exists(dst): _os.remove(dst)
+        _os.rename(src, dst)
+
 #Worse way to do this
 #import sys as _sys
 #
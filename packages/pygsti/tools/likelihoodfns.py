@@ -206,9 +206,7 @@ def logl_terms(gateset, dataset, gatestring_list=None,
 
     countVecMx = _np.empty(nEls, 'd' )
     totalCntVec = _np.empty(nEls, 'd' )
-    for (i,gateStr) in enumerate(ds_gatestring_list):
-        totalCntVec[ lookup[i] ] = dataset[gateStr].total
-        countVecMx[ lookup[i] ] = [ dataset[gateStr][x] for x in outcomes_lookup[i] ]
+    dataset.fill_count_vecs(countVecMx, totalCntVec, ds_gatestring_list, lookup, outcomes_lookup)
 
     #OLD
     #freqs = countVecMx / totalCntVec[None,:]
@@ -396,9 +394,7 @@ def logl_jacobian(gateset, dataset, gatestring_list=None,
 
     countVecMx = _np.empty(nEls, 'd' )
     totalCntVec = _np.empty(nEls, 'd' )
-    for (i,gateStr) in enumerate(ds_gatestring_list):
-        totalCntVec[ lookup[i] ] = dataset[gateStr].total
-        countVecMx[ lookup[i] ] = [ dataset[gateStr][x] for x in outcomes_lookup[i] ]
+    dataset.fill_count_vecs(countVecMx, totalCntVec, ds_gatestring_list, lookup, outcomes_lookup)
 
     #OLD
     #freqs = cntVecMx / totalCntVec[None,:]
@@ -452,10 +448,13 @@ def logl_jacobian(gateset, dataset, gatestring_list=None,
 def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
                  probClipInterval=(-1e6,1e6), radius=1e-4, poissonPicture=True,
                  check=False, comm=None, memLimit=None,
-                 gateLabelAliases=None, verbosity=0):
+                 gateLabelAliases=None, verbosity=0, checkpoint=None):
     """
     The hessian of the log-likelihood function.
 
+    The hessian is computed in blocks, which are distributed among the
+    processors of `comm` (see :func:`hessian_by_blocks`).
+
     Parameters
     ----------
     gateset : GateSet
@@ -508,6 +507,11 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
     verbosity : int, optional
         How much detail to print to stdout.
 
+    checkpoint : BlockCheckpoint, optional
+        When not None, each finished block of the hessian is saved to this
+        checkpoint, and the blocks it already holds (from an interrupted run
+        with the same arguments and number of processors) are not recomputed.
+
 
     Returns
     -------
@@ -515,43 +519,19 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
       array of shape (M,M), where M is the length of the vectorized gateset.
     """
 
-    nP = gateset.num_params()
-
     if gatestring_list is None:
         gatestring_list = list(dataset.keys())
-    
-    #  Estimate & check persistent memory (from allocs directly below)
-    C = 1.0/1024.0**3; nP = gateset.num_params()
-    persistentMem = 8*nP**2 # in bytes
-    if memLimit is not None and memLimit < persistentMem:
-        raise MemoryError("HLogL Memory limit (%g GB) is " % (memLimit*C) +
-                          "< memory required to hold final results (%g GB)"
-                          % (persistentMem*C))
-
-    #  Allocate persistent memory
-    final_hessian = _np.zeros( (nP,nP), 'd')
-
-    #  Estimate & check intermediate memory
-    #  - figure out how many row & column partitions are needed
-    #    to fit computation within available memory (and use all cpus)
-    mlim = None if (memLimit is None) else memLimit-persistentMem
-    evalTree, blkSize1, blkSize2, lookup, outcomes_lookup = \
-        gateset.bulk_evaltree_from_resources(
-            gatestring_list, comm, mlim, "deriv", ['bulk_hprobs_by_block'],
-            verbosity)
-    
-    rowParts = int(round(nP / blkSize1)) if (blkSize1 is not None) else 1
-    colParts = int(round(nP / blkSize2)) if (blkSize2 is not None) else 1
 
     a = radius # parameterizes "roundness" of f == 0 terms
     min_p = minProbClip
 
     if poissonPicture:
         #NOTE: hessian_from_hprobs MAY modify hprobs and dprobs12 (to save mem)
-        def hessian_from_hprobs(hprobs, dprobs12, cntVecMx, totalCntVec, pos_probs):
+        def hessian_from_hprobs(hprobs, dprobs12, probs, cntVecMx, totalCntVec):
             """ Factored-out computation of hessian from raw components """
             # Notation:  (K=#spam, M=#strings, N=#wrtParams1, N'=#wrtParams2 )
             totCnts = totalCntVec  #shorthand
+            pos_probs = _np.where(probs < min_p, min_p, probs)
             S = cntVecMx / min_p - totCnts # slope term that is derivative of logl at min_p
             S2 = -0.5 * cntVecMx / (min_p**2)          # 2nd derivative of logl term at min_p
 
@@ -596,8 +576,9 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
 
         #(the non-poisson picture requires that the probabilities of the spam labels for a given string are constrained to sum to 1)
         #NOTE: hessian_from_hprobs MAY modify hprobs and dprobs12 (to save mem)
-        def hessian_from_hprobs(hprobs, dprobs12, cntVecMx, totalCntVec, pos_probs):
+        def hessian_from_hprobs(hprobs, dprobs12, probs, cntVecMx, totalCntVec):
             """ Factored-out computation of hessian from raw components """
+            pos_probs = _np.where(probs < min_p, min_p, probs)
             S = cntVecMx / min_p # slope term that is derivative of logl at min_p
             S2 = -0.5 * cntVecMx / (min_p**2) # 2nd derivative of logl term at min_p
 
@@ -626,6 +607,106 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
 
             return _np.sum(hessian, axis=0) #see comments as above
 
+    return hessian_by_blocks(gateset, dataset, gatestring_list, hessian_from_hprobs,
+                             probClipInterval, check, comm, memLimit, gateLabelAliases,
+                             checkpoint, ("logl_hessian", minProbClip, radius, poissonPicture),
+                             verbosity)
+
+
+def hessian_by_blocks(gateset, dataset, gatestring_list, hessian_from_hprobs,
+                      probClipInterval=(-1e6,1e6), check=False, comm=None,
+                      memLimit=None, gateLabelAliases=None, checkpoint=None,
+                      checkpointKeyArgs=(), verbosity=0):
+    """
+    The hessian of a sum of functions of the gate string probabilities,
+    computed one (row-block, column-block) block at a time.
+
+    The blocks of the upper triangle of the hessian are computed, for each
+    evaluation sub-tree, as independent tasks (using
+    :method:`GateSet.bulk_hprobs_by_block`) which are distributed among the
+    processors of `comm` (an MPI communicator or a :class:`LocalComm`).
+    When a `checkpoint` is given, each finished block is saved to disk, and
+    blocks saved by an earlier (e.g. killed) run of the same computation are
+    loaded rather than recomputed.
+
+    Parameters
+    ----------
+    gateset : GateSet
+        Gateset of parameterized gates (including SPAM)
+
+    dataset : DataSet
+        Probability data
+
+    gatestring_list : list of (tuples or GateStrings)
+        The gate strings to include in the sum.
+
+    hessian_from_hprobs : function
+        A function `hessian_from_hprobs(hprobs, dprobs12, probs, cntVecMx,
+        totalCntVec)` which returns the `(N1,N2)` block of the hessian
+        contributed by the elements (outcomes of gate strings) of one
+        sub-tree, given their `(nEls,N1,N2)` probability hessians and products
+        of probability derivatives, and their `(nEls,)` probabilities, counts,
+        and total counts.  It may modify `hprobs` and `dprobs12`.
+
+    probClipInterval : 2-tuple or None, optional
+        (min,max) values used to clip the probabilities.
+
+    check : boolean, optional
+        If True, perform extra checks within code to verify correctness.
+
+    comm : mpi4py.MPI.Comm, optional
+        When not None, an MPI communicator for distributing the computation
+        across multiple processors.
+
+    memLimit : int, optional
+        A rough memory limit in bytes which restricts the amount of intermediate
+        values that are computed and stored.
+
+    gateLabelAliases : dictionary, optional
+        Dictionary whose keys are gate label "aliases" and whose values are tuples
+        corresponding to what that gate label should be expanded into before querying
+        the dataset.
+
+    checkpoint : BlockCheckpoint, optional
+        Where to save the finished blocks of the hessian.  It must be shared
+        by all the processors of `comm`.
+
+    checkpointKeyArgs : tuple, optional
+        The arguments of `hessian_from_hprobs` which determine the
+        computation's results (e.g. its name and clipping parameters).
+        Together with the gate set, data, and block layout, these identify
+        the blocks saved in `checkpoint`.
+
+    verbosity : int, optional
+        How much detail to print to stdout.
+
+    Returns
+    -------
+    numpy array
+      array of shape (M,M), where M is the length of the vectorized gateset.
+    """
+    #  Estimate & check persistent memory (from allocs directly below)
+    C = 1.0/1024.0**3; nP = gateset.num_params()
+    persistentMem = 8*nP**2 # in bytes
+    if memLimit is not None and memLimit < persistentMem:
+        raise MemoryError("Hessian memory limit (%g GB) is " % (memLimit*C) +
+                          "< memory required to hold final results (%g GB)"
+                          % (persistentMem*C))
+
+    #  Allocate persistent memory
+    final_hessian = _np.zeros( (nP,nP), 'd')
+
+    #  Estimate & check intermediate memory
+    #  - figure out how many row & column partitions are needed
+    #    to fit computation within available memory (and use all cpus)
+    mlim = None if (memLimit is None) else memLimit-persistentMem
+    evalTree, blkSize1, blkSize2, lookup, outcomes_lookup = \
+        gateset.bulk_evaltree_from_resources(
+            gatestring_list, comm, mlim, "deriv", ['bulk_hprobs_by_block'],
+            verbosity)
+    
+    rowParts = int(round(nP / blkSize1)) if (blkSize1 is not None) else 1
+    colParts = int(round(nP / blkSize2)) if (blkSize2 is not None) else 1
 
     #Note - we could in the future use comm to distribute over
     # subtrees here.  We currently don't because we parallelize
@@ -643,15 +724,13 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
     probs_mem  = _np.empty( max_nEls, 'd' )
 
     # Fill cntVecMx, totalCntVec for all elements (all subtrees)
-    nEls = evalTree.num_final_elements()
-    cntVecMx_all = _np.empty( nEls,'d')
-    totalCntVec_all = _np.empty(nEls, 'd')
+    cntVecMx_all, totalCntVec_all = _count_vecs(
+        dataset, gatestring_list, evalTree, lookup, outcomes_lookup, gateLabelAliases)
 
-    ds_subtree_gatestring_list = _lt.find_replace_tuple_list(
-        gatestring_list, gateLabelAliases)
-    for (i,gateStr) in enumerate(ds_subtree_gatestring_list):
-        totalCntVec_all[ lookup[i] ] = dataset[gateStr].total
-        cntVecMx_all[ lookup[i] ] = [ dataset[gateStr][x] for x in outcomes_lookup[i] ]
+    if checkpoint is not None:
+        checkpoint.begin(checkpoint.key(
+            gateset.to_vector(), list(gatestring_list), cntVecMx_all, totalCntVec_all,
+            probClipInterval, len(subtrees), rowParts, colParts, *checkpointKeyArgs))
 
     tStart = _time.time()
 
@@ -676,11 +755,10 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
         totalCntVec = totalCntVec_all[ evalSubTree.final_element_indices(evalTree) ]
         assert(len(cntVecMx) == len(probs))
 
-        #compute pos_probs separately
+        #compute probs separately
         gateset.bulk_fill_probs(probs, evalSubTree,
                                 clipTo=probClipInterval, check=check,
                                 comm=mySubComm)
-        pos_probs = _np.where(probs < min_p, min_p, probs)
 
         nCols = gateset.num_params()
         blocks1 = _mpit.slice_up_range(nCols, rowParts)
@@ -690,16 +768,33 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
         # the upper triangle of the hessian
         sliceTupList = [ (slc1,slc2) for slc1,slc2 in sliceTupList_all
                          if slc1.start <= slc2.stop ]
-
-        loc_iBlks, blkOwners, blkComm = \
-            _mpit.distribute_indices(list(range(len(sliceTupList))), mySubComm)
+        blkNames = [ "%d_%d-%d_%d-%d" % (iSubTree,slc1.start,slc1.stop,slc2.start,slc2.stop)
+                     for slc1,slc2 in sliceTupList ]
+
+        #distribute the blocks that aren't already saved in the checkpoint,
+        # which are loaded by (and so "owned" by) the sub-tree's root proc.
+        savedBlks = [ i for i,nm in enumerate(blkNames)
+                      if checkpoint is not None and checkpoint.is_completed(nm) ]
+        blksToCompute = [ i for i in range(len(sliceTupList)) if i not in savedBlks ]
+        if len(blksToCompute) > 0:
+            loc_iBlks, blkOwners, blkComm = \
+                _mpit.distribute_indices(blksToCompute, mySubComm)
+        else:
+            loc_iBlks, blkOwners, blkComm = [], {}, None
         mySliceTupList = [ sliceTupList[i] for i in loc_iBlks ]
+        subRank = mySubComm.Get_rank() if (mySubComm is not None) else 0
        
         subtree_hessian = _np.zeros( (nP,nP), 'd')
 
+        for i in savedBlks:
+            blkOwners[i] = 0
+            if subRank == 0:
+                slice1,slice2 = sliceTupList[i]
+                subtree_hessian[slice1,slice2] = checkpoint.load(blkNames[i])
+
         k,kmax = 0,len(mySliceTupList)
-        for (slice1,slice2,hprobs,dprobs12) in gateset.bulk_hprobs_by_block(
-            evalSubTree, mySliceTupList, True, blkComm):
+        for iBlk,(slice1,slice2,hprobs,dprobs12) in zip(loc_iBlks, gateset.bulk_hprobs_by_block(
+            evalSubTree, mySliceTupList, True, blkComm)):
             rank = comm.Get_rank() if (comm is not None) else 0
 
             if verbosity > 3 or (verbosity == 3 and rank == 0):
@@ -710,10 +805,12 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
                 _sys.stdout.flush(); k += 1
 
             subtree_hessian[slice1,slice2] = \
-                hessian_from_hprobs(hprobs, dprobs12, cntVecMx,
-                                        totalCntVec, pos_probs)
+                hessian_from_hprobs(hprobs, dprobs12, probs, cntVecMx, totalCntVec)
                 #NOTE: hessian_from_hprobs MAY modify hprobs and dprobs12
 
+            if checkpoint is not None and blkOwners[iBlk] == subRank:
+                checkpoint.save(blkNames[iBlk], subtree_hessian[slice1,slice2])
+
         #Gather columns from different procs and add to running final hessian
         #_mpit.gather_slices_by_owner(slicesIOwn, subtree_hessian,[], (0,1), mySubComm)
         _mpit.gather_slices(sliceTupList, blkOwners, subtree_hessian,[], (0,1), mySubComm)
@@ -733,6 +830,198 @@ def logl_hessian(gateset, dataset, gatestring_list=None, minProbClip=1e-6,
 
     return final_hessian # (N,N)
 
+
+def logl_approximate_hessian(gateset, dataset, gatestring_list=None,
+                             minProbClip=1e-6, probClipInterval=(-1e6,1e6),
+                             check=False, comm=None, memLimit=None,
+                             gateLabelAliases=None, verbosity=0):
+    """
+    An approximation of the hessian of the log-likelihood function which
+    uses only the first derivatives of the probabilities.
+
+    This is the (negative) expected Fisher information,
+    `-sum_i N_i/p_i * dp_i/dx dp_i/dy`, where the sum runs over all the
+    outcomes of the gate strings, `N_i` is the total count of outcome `i`'s
+    gate string and `p_i` its probability.  It differs from the hessian
+    (see :func:`logl_hessian`) by terms proportional to the differences
+    between the observed and predicted counts, which are small near a
+    good maximum-likelihood fit, and costs a single jacobian (instead of
+    the second derivatives of all the probabilities) to compute.
+
+    Parameters
+    ----------
+    gateset : GateSet
+        Gateset of parameterized gates (including SPAM)
+
+    dataset : DataSet
+        Probability data
+
+    gatestring_list : list of (tuples or GateStrings), optional
+        Each element specifies a gate string to include in the log-likelihood
+        sum.  Default value of None implies all the gate strings in dataset
+        should be used.
+
+    minProbClip : float, optional
+        Probabilities smaller than this value are replaced by it in the
+        weights `N_i/p_i`.
+
+    probClipInterval : 2-tuple or None, optional
+        (min,max) values used to clip the probabilities predicted by
+        gatesets (if not None).
+
+    check : boolean, optional
+        If True, perform extra checks within code to verify correctness.  Used
+        for testing, and runs much slower when True.
+
+    comm : mpi4py.MPI.Comm, optional
+        When not None, an MPI communicator for distributing the computation
+        across multiple processors.
+
+    memLimit : int, optional
+        A rough memory limit in bytes which restricts the amount of intermediate
+        values that are computed and stored.
+
+    gateLabelAliases : dictionary, optional
+        Dictionary whose keys are gate label "aliases" and whose values are tuples
+        corresponding to what that gate label should be expanded into before querying
+        the dataset. Defaults to the empty dictionary (no aliases defined)
+        e.g. gateLabelAliases['Gx^3'] = ('Gx','Gx','Gx')
+
+    verbosity : int, optional
+        How much detail to print to stdout.
+
+    Returns
+    -------
+    numpy array
+      array of shape (M,M), where M is the length of the vectorized gateset.
+    """
+    if gatestring_list is None:
+        gatestring_list = list(dataset.keys())
+
+    def weights_from_probs(probs, cntVecMx, totalCntVec):
+        """ The (negated) Fisher-information weight of each element """
+        return -totalCntVec / _np.where(probs < minProbClip, minProbClip, probs)
+
+    return hessian_from_jacobian(gateset, dataset, gatestring_list, weights_from_probs,
+                                 probClipInterval, check, comm, memLimit,
+                                 gateLabelAliases, verbosity)
+
+
+def hessian_from_jacobian(gateset, dataset, gatestring_list, weights_from_probs,
+                          probClipInterval=(-1e6,1e6), check=False, comm=None,
+                          memLimit=None, gateLabelAliases=None, verbosity=0):
+    """
+    A (Gauss-Newton) approximation of the hessian of a sum of functions of the
+    gate string probabilities, computed from their first derivatives only.
+
+    The returned matrix is `J^T W J`, where `J` is the jacobian of the
+    probabilities (of all the outcomes of the gate strings) and `W` is a
+    diagonal matrix of weights.  The jacobian is computed, and accumulated
+    into the result, one evaluation sub-tree at a time.
+
+    Parameters
+    ----------
+    gateset : GateSet
+        Gateset of parameterized gates (including SPAM)
+
+    dataset : DataSet
+        Probability data
+
+    gatestring_list : list of (tuples or GateStrings)
+        The gate strings to include in the sum.
+
+    weights_from_probs : function
+        A function `weights_from_probs(probs, cntVecMx, totalCntVec)` which
+        returns the weights (the diagonal of `W`) of the elements (outcomes
+        of gate strings) of one sub-tree, given their probabilities, counts,
+        and total counts, all `(nEls,)` arrays.
+
+    probClipInterval : 2-tuple or None, optional
+        (min,max) values used to clip the probabilities.
+
+    check : boolean, optional
+        If True, perform extra checks within code to verify correctness.
+
+    comm : mpi4py.MPI.Comm, optional
+        When not None, an MPI communicator for distributing the computation
+        across multiple processors.
+
+    memLimit : int, optional
+        A rough memory limit in bytes which restricts the amount of intermediate
+        values that are computed and stored.
+
+    gateLabelAliases : dictionary, optional
+        Dictionary whose keys are gate label "aliases" and whose values are tuples
+        corresponding to what that gate label should be expanded into before querying
+        the dataset.
+
+    verbosity : int, optional
+        How much detail to print to stdout.
+
+    Returns
+    -------
+    numpy array
+      array of shape (M,M), where M is the length of the vectorized gateset.
+    """
+    C = 1.0/1024.0**3; nP = gateset.num_params()
+    persistentMem = 8*nP**2 # in bytes
+    if memLimit is not None and memLimit < persistentMem:
+        raise MemoryError("Hessian memory limit (%g GB) is " % (memLimit*C) +
+                          "< memory required to hold final results (%g GB)"
+                          % (persistentMem*C))
+
+    mlim = None if (memLimit is None) else memLimit-persistentMem
+    evalTree, wrtBlkSize, _, lookup, outcomes_lookup = \
+        gateset.bulk_evaltree_from_resources(
+            gatestring_list, comm, mlim, "deriv", ['bulk_fill_dprobs'],
+            verbosity)
+
+    cntVecMx_all, totalCntVec_all = _count_vecs(
+        dataset, gatestring_list, evalTree, lookup, outcomes_lookup, gateLabelAliases)
+
+    hessian = _np.zeros( (nP,nP), 'd')
+    subtrees = evalTree.get_sub_trees()
+    mySubTreeIndices, _, mySubComm = evalTree.distribute(comm)
+    for iSubTree in mySubTreeIndices:
+        evalSubTree = subtrees[iSubTree]
+        felInds = evalSubTree.final_element_indices(evalTree)
+        if evalSubTree.myFinalElsToParentFinalElsMap is not None:
+            #fill arrays just big enough for this subtree (see hessian_by_blocks)
+            evalSubTree = evalSubTree.copy()
+            evalSubTree.recompute_spamtuple_indices(bLocal=True)
+
+        sub_nEls = evalSubTree.num_final_elements()
+        probs = _np.empty( sub_nEls, 'd')
+        jacBlk = _np.empty( (sub_nEls,nP), 'd')
+        gateset.bulk_fill_dprobs(jacBlk, evalSubTree, prMxToFill=probs,
+                                 clipTo=probClipInterval, check=check,
+                                 comm=mySubComm, wrtBlockSize=wrtBlkSize)
+
+        if mySubComm is None or mySubComm.Get_rank() == 0: #only count each subtree once
+            weights = weights_from_probs(probs, cntVecMx_all[felInds], totalCntVec_all[felInds])
+            hessian += _np.dot(jacBlk.T * weights[None,:], jacBlk)
+        jacBlk = None #free mem
+
+    if comm is not None:
+        hessian = comm.allreduce(hessian)
+    return hessian # (N,N)
+
+
+def _count_vecs(dataset, gatestring_list, evalTree, lookup, outcomes_lookup,
+                gateLabelAliases):
+    """
+    Helper function - returns the counts and total counts of all the final
+    elements of `evalTree` (for `gatestring_list`), as two 1D arrays.
+    """
+    nEls = evalTree.num_final_elements()
+    cntVecMx_all = _np.empty( nEls,'d')
+    totalCntVec_all = _np.empty(nEls, 'd')
+
+    ds_gatestring_list = _lt.find_replace_tuple_list(
+        gatestring_list, gateLabelAliases)
+    dataset.fill_count_vecs(cntVecMx_all, totalCntVec_all, ds_gatestring_list, lookup, outcomes_lookup)
+    return cntVecMx_all, totalCntVec_all
+
 @smart_cached
 def logl_max(gateset, dataset, gatestring_list=None, poissonPicture=True,
              check=False, gateLabelAliases=None):
@@ -826,9 +1115,7 @@ def logl_max_terms(gateset, dataset, gatestring_list=None,
 
     countVecMx = _np.empty(nEls, 'd' )
     totalCntVec = _np.empty(nEls, 'd' )
-    for (i,gateStr) in enumerate(gatestring_list):
-        totalCntVec[ lookup[i] ] = dataset[gateStr].total
-        countVecMx[ lookup[i] ] = [ dataset[gateStr][x] for x in outcomes_lookup[i] ]
+    dataset.fill_count_vecs(countVecMx, totalCntVec, gatestring_list, lookup, outcomes_lookup)
         
     freqs = countVecMx / totalCntVec
     freqs_nozeros = _np.where(countVecMx == 0, 1.0, freqs) # set zero freqs to 1.0 so np.log doesn't complain
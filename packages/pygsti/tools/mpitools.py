@@ -380,6 +380,11 @@ def gather_slices(slices, slice_owners, arToFill,
 
     axes = (axes,) if _compat.isint(axes) else axes
 
+    if hasattr(comm, 'shared_scratch'): # a LocalComm
+        blocks = [ ((slc,) if isinstance(slc,slice) else slc, slice_owners[i])
+                   for i,slc in enumerate(slices) ]
+        _gather_shared(blocks, arToFill, arIndx, axes, comm); return
+
     max_indices = [None]*len(axes)
     if max_buffer_size is not None: #no maximum of buffer size
         chunkBytes = arToFill.nbytes #start with the entire array as the "chunk"
@@ -512,6 +517,12 @@ def gather_slices_by_owner(slicesIOwn, arToFill, arToFillInds,
             
     #Get a list of the slices to broadcast, indexed by the rank of the owner proc
     slices_by_owner = comm.allgather(slicesIOwn) 
+
+    if hasattr(comm, 'shared_scratch'): # a LocalComm
+        blocks = [ ((slc,) if isinstance(slc,slice) else slc, owner)
+                   for owner, slices in enumerate(slices_by_owner) for slc in slices ]
+        _gather_shared(blocks, arToFill, arIndx, axes, comm); return
+
     for owner, slices in enumerate(slices_by_owner):    
         for slcOrSlcTup in slices:
             slcTup =(slcOrSlcTup,) if isinstance(slcOrSlcTup,slice) else slcOrSlcTup
@@ -605,6 +616,11 @@ def gather_indices(indices, index_owners, arToFill, arToFillInds,
 
     axes = (axes,) if _compat.isint(axes) else axes
 
+    if hasattr(comm, 'shared_scratch'): # a LocalComm
+        blocks = [ ((ind,) if not isinstance(ind,tuple) else ind, index_owners[i])
+                   for i,ind in enumerate(indices) ]
+        _gather_shared(blocks, arToFill, arIndx, axes, comm); return
+
     max_indices = [None]*len(axes)
     if max_buffer_size is not None: #no maximum of buffer size
         chunkBytes = arToFill.nbytes #start with the entire array as the "chunk"
@@ -683,6 +699,26 @@ def gather_indices(indices, index_owners, arToFill, arToFillInds,
 
 
 
+def _gather_shared(blocks, arToFill, arIndx, axes, comm):
+    """
+    Gathers data within `arToFill` via memory shared by the processors of
+    `comm` (a :class:`LocalComm`) rather than by broadcasting: each owner
+    copies its blocks into a shared array, from which every other processor
+    then copies them.  `blocks` is a list of `(indexTuple, ownerRank)` pairs
+    where `indexTuple` holds one slice or index-array per axis in `axes`.
+    """
+    my_rank = comm.Get_rank()
+    shared = comm.shared_scratch(arToFill.shape, arToFill.dtype)
+    for mine in (True,False):
+        for indTup, owner in blocks:
+            if (owner == my_rank) != mine: continue
+            for iaxis,axis in enumerate(axes):
+                arIndx[axis] = indTup[iaxis]
+            if mine: _fas(shared, arIndx, _findx(arToFill, arIndx))
+            else: _fas(arToFill, arIndx, _findx(shared, arIndx))
+        comm.barrier() # all owners have written / all have read (before `shared` is reused)
+
+
 def distribute_for_dot(contracted_dim, comm):
     """
     Prepares for one or muliple distributed dot products given the dimension
@@ -712,7 +748,7 @@ def distribute_for_dot(contracted_dim, comm):
     assert(loc_indices == list(range(start,stop)))
     return slice(start, stop) # local column range as a slice
 
-def mpidot(a,b,loc_slice,comm):
+def mpidot(a,b,loc_slice,comm,out=None):
     """
     Performs a distributed dot product, dot(a,b).
 
@@ -728,18 +764,21 @@ def mpidot(a,b,loc_slice,comm):
     comm : mpi4py.MPI.Comm or None
         The communicator used to parallelize the dot product.
 
+    out : numpy.ndarray, optional
+        A C-contiguous array of the result's shape and type into which the
+        result is written, to avoid allocating a new one.
+
     Returns
     -------
     numpy.ndarray
     """
     if comm is None or comm.Get_size() == 1:
         assert(loc_slice == slice(0,b.shape[0]))
-        return _np.dot(a,b)
+        return _np.dot(a,b,out=out)
 
-    from mpi4py import MPI #not at top so can import pygsti on cluster login nodes
     loc_dot = _np.dot(a[:,loc_slice],b[loc_slice,:])
-    result = _np.empty( loc_dot.shape, loc_dot.dtype )
-    comm.Allreduce(loc_dot, result, op=MPI.SUM)
+    result = _np.empty( loc_dot.shape, loc_dot.dtype ) if (out is None) else out
+    comm.Allreduce(loc_dot, result, op=get_op(comm, "SUM"))
 
     #DEBUG: assert(_np.linalg.norm( _np.dot(a,b) - result ) < 1e-6)
     return result
@@ -762,19 +801,46 @@ def parallel_apply(f, l, comm):
         function of an item in the list l
     l : list
         list of items as arguments to f
+    comm : mpi4py.MPI.Comm, LocalComm or None
+        The communicator of the processors sharing the work
 
     Returns
     -------
     results : list
         list of items after f has been applied
     '''
-    locIndices, _, locComm = distribute_indices(l, comm)
+    if comm is None: return [f(x) for x in l]
+    locIndices, _, locComm = distribute_indices(list(range(len(l))), comm)
     if locComm is None or locComm.Get_rank() == 0: #only first proc in local comm group 
-        locResults = [f(l[i]) for i in locIndices] # needs to do anything
+        locResults = [(i,f(l[i])) for i in locIndices] # needs to do anything
     else: locResults = []
-    results = comm.allgather(locResults, root=0) # Certain there is a better way to do this (see above)
+    results = [None]*len(l)
+    for procResults in comm.allgather(locResults):
+        for i,result in procResults: results[i] = result
     return results
 
+def get_op(comm, name):
+    """
+    Get a reduction operation for use with `comm`.
+
+    Parameters
+    ----------
+    comm : mpi4py.MPI.Comm or LocalComm
+        The communicator.
+
+    name : {"SUM", "MIN", "MAX"}
+        The operation.
+
+    Returns
+    -------
+    object
+        `mpi4py.MPI.<name>`, or the equivalent :class:`LocalComm` operation.
+    """
+    if hasattr(comm, 'shared_scratch'): # a LocalComm
+        return getattr(comm, name)
+    from mpi4py import MPI #not at top so can import pygsti on cluster login nodes
+    return getattr(MPI, name)
+
 def get_comm():
     '''
     Get a comm object
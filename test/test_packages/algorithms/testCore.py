@@ -236,6 +236,16 @@ class TestCoreMethods(AlgorithmsBase):
         self.assertAlmostEqual(gs_lsgst.frobeniusdist(gs_lsgst_verb),0)
         self.assertAlmostEqual(gs_lsgst.frobeniusdist(all_gs_lsgst_tups[-1]),0)
 
+        #Normal equations accumulated per sub-tree give the same estimates
+        gs_lsgst_stream = pygsti.do_iterative_mc2gst(ds, gs_clgst, self.lsgstStrings, verbosity=0,
+                                                    minProbClipForWeighting=1e-6, probClipInterval=(-1e6,1e6),
+                                                    memLimit=CM + 1024**3, stream_jacobian=True)
+        gs_single_lsgst_cp_stream = pygsti.do_mc2gst(ds, gs_clgst, self.lsgstStrings[0], minProbClipForWeighting=1e-6,
+                                                     probClipInterval=(-1e6,1e6), cptp_penalty_factor=1.0,
+                                                     verbosity=0, stream_jacobian=True)
+        self.assertAlmostEqual(gs_lsgst.frobeniusdist(gs_lsgst_stream),0, places=5)
+        self.assertAlmostEqual(gs_single_lsgst_cp[1].frobeniusdist(gs_single_lsgst_cp_stream[1]),0, places=5)
+
 
         #Run internal checks on less max-L values (so it doesn't take forever)
         gs_lsgst_chk = pygsti.do_iterative_mc2gst(ds, gs_clgst, self.lsgstStrings[0:2], verbosity=0,
@@ -324,6 +334,25 @@ class TestCoreMethods(AlgorithmsBase):
         self.assertAlmostEqual(gs_mlegst.frobeniusdist(gs_mlegst_verb),0, places=5)
         self.assertAlmostEqual(gs_mlegst.frobeniusdist(all_gs_mlegst_tups[-1]),0,places=5)
 
+        #Normal equations accumulated per sub-tree give the same estimates
+        gs_mlegst_stream = pygsti.do_iterative_mlgst(ds, gs_clgst, self.lsgstStrings, verbosity=0,
+                                                    minProbClip=1e-6, probClipInterval=(-1e2,1e2),
+                                                    memLimit=CM + 1024**3, stream_jacobian=True)
+        self.assertAlmostEqual(gs_mlegst.frobeniusdist(gs_mlegst_stream),0, places=5)
+
+        #Carrying the optimizer's damping between stages converges to the same estimate
+        gs_mlegst_warm = pygsti.do_iterative_mlgst(ds, gs_clgst, self.lsgstStrings, verbosity=0,
+                                                  minProbClip=1e-6, probClipInterval=(-1e2,1e2),
+                                                  memLimit=CM + 1024**3, warm_start=True)
+        self.assertAlmostEqual(gs_mlegst.frobeniusdist(gs_mlegst_warm),0, places=4)
+
+        lmState = {}
+        pygsti.do_mlgst(ds, gs_clgst, self.lsgstStrings[0], minProbClip=1e-6,
+                        probClipInterval=(-1e2,1e2), lm_state=lmState)
+        self.assertTrue(lmState['mu'] > 0 and lmState['jtj_scale'] > 0)
+        self.assertEqual(len(lmState['history']), lmState['iter'])
+        self.assertGreater(lmState['iter'], 0)
+
 
         #Run internal checks on less max-L values (so it doesn't take forever)
         gs_mlegst_chk = pygsti.do_iterative_mlgst(ds, gs_clgst, self.lsgstStrings[0:2], verbosity=0,
@@ -378,6 +407,26 @@ class TestCoreMethods(AlgorithmsBase):
 
         self.assertAlmostEqual( gs_mlegst_go.frobeniusdist(gs_mle_compare), 0, places=4)
 
+    def test_stream_normal_eqs(self):
+        #Streaming only matters when the evaluation tree is split, so force sub-trees
+        gs = self.gateset.depolarize(gate_noise=0.05, spam_noise=0.01)
+        evTree, lookup, outcomes_lookup = gs.bulk_evaltree(self.lsgstStrings[-1], minSubtrees=5)
+        self.assertTrue(len(evTree.get_sub_trees()) > 1)
+
+        KM = evTree.num_final_elements(); nP = gs.num_params()
+        dprobs = np.empty( (KM,nP), 'd')
+        gs.bulk_fill_dprobs(dprobs, evTree)
+        dprobs_factor = np.linspace(0.5, 2.0, KM)
+        extraJac = np.arange(2*nP, dtype='d').reshape((2,nP))
+        objVec = np.linspace(-1.0, 1.0, KM+2)
+        J = np.concatenate( (dprobs * dprobs_factor[:,None], extraJac), axis=0) # dense jacobian
+
+        JTJ, JTf = pygsti.algorithms.core._stream_normal_eqs(
+            gs, evTree, dprobs_factor, objVec, extraJac, None, False, None, None,
+            pygsti.baseobjs.DummyProfiler(), None)
+        self.assertArraysAlmostEqual(JTJ, np.dot(J.T,J))
+        self.assertArraysAlmostEqual(JTf, np.dot(J.T,objVec))
+
     def test_LGST_1overSqrtN_dependence(self):
         my_datagen_gateset = self.gateset.depolarize(gate_noise=0.05, spam_noise=0)
         # !!don't depolarize spam or 1/sqrt(N) dependence saturates!!
@@ -0,0 +1,81 @@
+import unittest
+import pygsti
+import numpy as np
+
+from pygsti.construction import std1Q_XYI as std
+from pygsti.baseobjs import LocalComm
+from pygsti.tools import mpitools
+
+from ..testutils import BaseTestCase, compare_files, temp_files
+
+def collectives_job(comm):
+    rank = comm.Get_rank()
+    big = np.arange(100000, dtype='d') * (rank+1) # larger than SMALL_BUFFER_BYTES
+    summed = np.empty(big.shape, 'd')
+    comm.Allreduce(big, summed, op=mpitools.get_op(comm, "SUM"))
+
+    bcast = big.copy()
+    comm.Bcast(bcast, root=1)
+
+    sub = comm.Split(color=rank % 2, key=rank)
+    return (comm.allgather(rank), comm.allreduce(rank), comm.allreduce(rank, op=comm.MIN),
+            comm.bcast("root" if rank == 0 else None, root=0), sub.allgather(rank),
+            summed, bcast)
+
+def gather_job(comm):
+    ar = np.zeros((6,4), 'd')
+    slices = [ slice(0,2), slice(2,4), slice(4,6) ]
+    owners = { 0: 0, 1: 1, 2: 2 }
+    ar[slices[comm.Get_rank()],:] = comm.Get_rank() + 1
+    mpitools.gather_slices(slices, owners, ar, [], 0, comm)
+
+    a = np.arange(12, dtype='d').reshape((4,3))
+    loc_slice = mpitools.distribute_for_dot(a.shape[0], comm)
+    return ar, mpitools.mpidot(a.T, a, loc_slice, comm), \
+        mpitools.parallel_apply(lambda x: x**2, list(range(5)), comm)
+
+def dprobs_job(comm, gateset, gatestrings):
+    evt, lookup, outcome_lookup = gateset.bulk_evaltree(gatestrings)
+    dprobs = np.empty( (evt.num_final_elements(), gateset.num_params()), 'd')
+    gateset.bulk_fill_dprobs(dprobs, evt, comm=comm)
+    return dprobs
+
+def failing_job(comm):
+    if comm.Get_rank() == 1: raise ValueError("Failure on rank 1")
+    comm.barrier()
+
+
+class LocalCommTestCase(BaseTestCase):
+
+    def test_collectives(self):
+        allranks, ranksum, rankmin, bcast, subranks, summed, bcastAr = LocalComm.run(3, collectives_job)
+        self.assertEqual(allranks, [0,1,2])
+        self.assertEqual(ranksum, 3)
+        self.assertEqual(rankmin, 0)
+        self.assertEqual(bcast, "root")
+        self.assertEqual(subranks, [0,2])
+        self.assertArraysAlmostEqual(summed, 6*np.arange(100000, dtype='d'))
+        self.assertArraysAlmostEqual(bcastAr, 2*np.arange(100000, dtype='d'))
+
+    def test_gather_and_dot(self):
+        ar, dot, squares = LocalComm.run(3, gather_job)
+        self.assertArraysAlmostEqual(ar, np.repeat([1.0,1.0,2.0,2.0,3.0,3.0],4).reshape((6,4)))
+        a = np.arange(12, dtype='d').reshape((4,3))
+        self.assertArraysAlmostEqual(dot, np.dot(a.T,a))
+        self.assertEqual(squares, [0,1,4,9,16])
+
+    def test_bulk_fill_dprobs(self):
+        gatestrings = pygsti.construction.make_lsgst_experiment_list(
+            std.gs_target, std.fiducials, std.fiducials, std.germs, [1,2])
+        gs = std.gs_target.depolarize(gate_noise=0.05)
+        dprobs_serial = dprobs_job(None, gs, gatestrings)
+        dprobs_local = LocalComm.run(3, dprobs_job, gs, gatestrings)
+        self.assertArraysAlmostEqual(dprobs_serial, dprobs_local)
+
+    def test_failure(self):
+        with self.assertRaises(RuntimeError):
+            LocalComm.run(2, failing_job)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
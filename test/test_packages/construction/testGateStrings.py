@@ -1,5 +1,6 @@
 import unittest
 import copy
+import pickle
 import pygsti
 import os
 
@@ -316,6 +317,14 @@ class TestGateStringMethods(BaseTestCase):
             pygsti.obj.GateString( ('Gx','Gx'), "GxGy" ) #mismatch
         with self.assertRaises(ValueError):
             pygsti.obj.GateString( None )
+        with self.assertRaises(AttributeError):
+            s1.str = "GxGx" #string representation is read-only too
+
+        s8 = pygsti.obj.GateString( ('Gx','Gy') ) + pygsti.obj.GateString( ('Gy',) )
+        self.assertEqual( s8.str, "GxGyGy" ) #default string built lazily
+        self.assertEqual( hash(s8), hash(('Gx','Gy','Gy')) )
+        self.assertEqual( pickle.loads(pickle.dumps(s1)).str, "Gx^2" )
+        self.assertEqual( hash(pickle.loads(pickle.dumps(s1))), hash(s1) )
 
         w1 = pygsti.obj.WeightedGateString( ('Gx','Gy'), "GxGy", weight=0.5)
         w2 = pygsti.obj.WeightedGateString( ('Gy',), "Gy", weight=0.5)
@@ -343,6 +352,7 @@ class TestGateStringMethods(BaseTestCase):
         self.assertEqual( w6, ('Gy','Gx','Gx') ); self.assertEqual(w6.weight, 0.5)
         self.assertEqual( x, 'Gx' )
         self.assertEqual( x2, ('Gx','Gy') )
+        self.assertEqual( pickle.loads(pickle.dumps(w1)).weight, 0.5 )
         self.assertEqual( w1, w7)
 
         c1 = pygsti.objects.gatestring.CompressedGateString(s1)
@@ -2,7 +2,7 @@ import unittest
 import pygsti
 from pygsti.construction import std1Q_XYI as std
 from pygsti.objects.gatemapcalc import GateMapCalc
-import sys, os
+import sys, os, warnings
 
 from ..testutils import BaseTestCase, compare_files, temp_files
 
@@ -363,6 +363,80 @@ class TestDriversMethods(DriversTestCase):
                                 ds, gs_target, std.fiducials, std.fiducials,
                                 std.germs, maxLens, advancedOptions={'truncScheme': ts})
 
+    def test_longSequenceGST_evaltreeCache(self):
+        ds = pygsti.objects.DataSet(fileToLoadFrom=compare_files + "/drivers.dataset%s" % self.versionsuffix)
+        cache = pygsti.objects.EvalTreeDiskCache(temp_files + "/evaltree_cache")
+        cache.clear()
+
+        opts = {'truncScheme': "whole germ powers", 'evaltreeCacheDir': cache.directory}
+        result1 = self.runSilent(pygsti.do_long_sequence_gst,
+                                 ds, std.gs_target, std.fiducials, std.fiducials,
+                                 std.germs, self.maxLens, advancedOptions=opts)
+        nCached = len(cache)
+        self.assertGreater(nCached, 0)
+
+        #second run loads every tree from disk and gives the same estimate
+        result2 = self.runSilent(pygsti.do_long_sequence_gst,
+                                 ds, std.gs_target, std.fiducials, std.fiducials,
+                                 std.germs, self.maxLens, advancedOptions=opts)
+        self.assertEqual(len(cache), nCached)
+        gs1 = result1.estimates['default'].gatesets['final iteration estimate']
+        gs2 = result2.estimates['default'].gatesets['final iteration estimate']
+        self.assertAlmostEqual(gs1.frobeniusdist(gs2), 0, places=10)
+
+        #a tree loaded from the cache matches a freshly built one
+        key = cache.key(std.gs_target, self.lsgstStrings[-1], minSubtrees=1, numSubtreeComms=1)
+        evt, lookup, outcome_lookup = std.gs_target.bulk_evaltree(self.lsgstStrings[-1], minSubtrees=1)
+        cache.save(key, (evt, lookup, outcome_lookup))
+        evt2, lookup2, outcome_lookup2 = cache.load(key)
+        self.assertEqual(list(evt), list(evt2))
+        self.assertEqual(evt.get_init_labels(), evt2.get_init_labels())
+        self.assertEqual(list(lookup.keys()), list(lookup2.keys()))
+        self.assertEqual(outcome_lookup, outcome_lookup2)
+        self.assertTrue(cache.load("notakey") is None)
+
+        #an unpicklable value only warns, and leaves no temporary file behind
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            cache.save("unpicklable", lambda x: x)
+        self.assertEqual(len(w), 1)
+        self.assertTrue(cache.load("unpicklable") is None)
+        self.assertEqual([f for f in os.listdir(cache.directory) if f.endswith(".tmp")], [])
+
+    def test_longSequenceGST_checkpoint(self):
+        ds = pygsti.objects.DataSet(fileToLoadFrom=compare_files + "/drivers.dataset%s" % self.versionsuffix)
+        cpFile = temp_files + "/longseq.checkpoint"
+        pygsti.objects.GSTCheckpoint(cpFile).clear()
+
+        opts = {'truncScheme': "whole germ powers", 'checkpointFile': cpFile}
+        result1 = self.runSilent(pygsti.do_long_sequence_gst,
+                                 ds, std.gs_target, std.fiducials, std.fiducials,
+                                 std.germs, self.maxLens, advancedOptions=opts)
+        checkpoint = pygsti.objects.GSTCheckpoint(cpFile)
+        self.assertEqual(checkpoint.num_completed, len(self.maxLens))
+
+        #a restarted run restores every iteration from the checkpoint
+        result2 = self.runSilent(pygsti.do_long_sequence_gst,
+                                 ds, std.gs_target, std.fiducials, std.fiducials,
+                                 std.germs, self.maxLens, advancedOptions=opts)
+        gs1 = result1.estimates['default'].gatesets['final iteration estimate']
+        gs2 = result2.estimates['default'].gatesets['final iteration estimate']
+        self.assertAlmostEqual(gs1.frobeniusdist(gs2), 0, places=10)
+
+        #a run on different data doesn't restore the saved iterations
+        ds2 = pygsti.construction.generate_fake_data(std.gs_target.depolarize(gate_noise=0.02),
+                                                     list(ds.keys()), 1000, sampleError="none")
+        result3 = self.runSilent(pygsti.do_long_sequence_gst,
+                                 ds2, std.gs_target, std.fiducials, std.fiducials,
+                                 std.germs, self.maxLens, advancedOptions=opts)
+        gs3 = result3.estimates['default'].gatesets['final iteration estimate']
+        self.assertGreater(gs1.frobeniusdist(gs3), 1e-4)
+
+        #progress of a different computation is discarded
+        checkpoint.begin(checkpoint.key("another computation"))
+        self.assertEqual(checkpoint.num_completed, 0)
+        checkpoint.clear()
+
 
     def test_longSequenceGST_badfit(self):
         ds = pygsti.objects.DataSet(fileToLoadFrom=compare_files + "/drivers.dataset%s" % self.versionsuffix)
@@ -59,6 +59,28 @@ class TestStdInputParser(BaseTestCase):
         with self.assertRaises(ValueError):
             std.parse_gatestring("(G1")
 
+    def test_fast_parse(self):
+        from pygsti.baseobjs.gatestringparser import fast_parse
+        self.assertEqual(fast_parse("G1(G2G3)^2 G4"), ('G1','G2','G3','G2','G3','G4'))
+        self.assertEqual(fast_parse("G1G2^2"), ('G1','G2','G2'))
+        self.assertEqual(fast_parse("{}"), ())
+        self.assertEqual(fast_parse("S[1]G1"), None) # string references use the full parser
+        self.assertEqual(fast_parse("G1G2^2^2"), None)
+
+        #the fast path must agree with the full (PLY) parser, which
+        # handles - and reports errors for - everything it doesn't accept
+        parser = pygsti.baseobjs.GateStringParser()
+        tokens = ["Gx","Gy","G_1","{}","^2","^3","(",")","*"," ","S[1]"]
+        rand = np.random.RandomState(0)
+        for i in range(2000):
+            s = "".join(rand.choice(tokens, rand.randint(1,8)))
+            fast = fast_parse(s)
+            parser._lexer.input(s)
+            try: full = parser._parser.parse(lexer=parser._lexer)
+            except ValueError: full = None
+            if fast is not None or "S[" not in s:
+                self.assertEqual(fast, full, "Mismatch parsing '%s'" % s)
+
     def test_string_exception(self):
         """Test lookup failure and Syntax error"""
         std = pygsti.io.StdInputParser()
@@ -392,6 +414,65 @@ G2            20  100  5  200
         #TODO: add asserts
 
 
+    def test_parallel_datafile(self):
+        import pygsti.io.stdinput as stdin
+        std = pygsti.io.StdInputParser()
+        strs = [ "Gx"*(i%7) + "Gy"*(i%5) + "Gi"*(i%3) for i in range(200) ]
+        strs = [ (s if len(s) > 0 else "{}") for s in strs ] # includes duplicates
+
+        with open(temp_files + "/sip_parallel.data","w") as f:
+            f.write("## Columns = plus count, count total\n")
+            for i,s in enumerate(strs):
+                f.write("%s  %d  %d\n" % (s, i % 13, 20 + i % 13))
+        with open(temp_files + "/sip_parallel_expanded.data","w") as f:
+            for i,s in enumerate(strs):
+                f.write("%s  0:%d  1:%d  %s:%d\n" % (s, i % 13, 20, "01"[i%2]*2, i))
+        with open(temp_files + "/sip_parallel.multidata","w") as f:
+            f.write("## Columns = DS0 0 count, DS0 1 count, DS1 0 frequency, DS1 count total\n")
+            for i,s in enumerate(strs[0:120]):
+                f.write("%s  %d  %d  %g  %d\n" % (s, i, 100-i, 0.25, 40))
+        with open(temp_files + "/sip_parallel_bad.data","w") as f:
+            f.write("## Columns = plus count, count total\n")
+            for i,s in enumerate(strs):
+                f.write("%s  %d  %d\n" % (s if i != 150 else "GxGy(", i % 13, 20))
+
+        orig = stdin.PARALLEL_MIN_BYTES
+        try:
+            stdin.PARALLEL_MIN_BYTES = 0
+            for fn in ("sip_parallel.data", "sip_parallel_expanded.data"):
+                for collisionAction in ("aggregate","keepseparate"):
+                    ds1 = std.parse_datafile(temp_files + "/" + fn, collisionAction=collisionAction)
+                    ds2 = std.parse_datafile(temp_files + "/" + fn, collisionAction=collisionAction, numProcs=3)
+                    self.assertEqual(list(ds1.keys()), list(ds2.keys()))
+                    self.assertEqual(list(ds1.olIndex.items()), list(ds2.olIndex.items()))
+                    for gstr in ds1:
+                        self.assertEqual(ds1[gstr].counts, ds2[gstr].counts)
+                    self.assertTrue(ds2.bStatic)
+                    self.assertTrue(isinstance(ds2.gsIndex, pygsti.objects.dataset._CompactGateStringIndex))
+                    hash(ds2)
+
+            mds1 = std.parse_multidatafile(temp_files + "/sip_parallel.multidata", collisionAction="keepseparate")
+            mds2 = std.parse_multidatafile(temp_files + "/sip_parallel.multidata", collisionAction="keepseparate",
+                                           numProcs=3)
+            self.assertEqual(list(mds1.keys()), list(mds2.keys()))
+            for dsLabel in mds1:
+                self.assertEqual(list(mds1[dsLabel].keys()), list(mds2[dsLabel].keys()))
+                for gstr in mds1[dsLabel]:
+                    self.assertEqual(mds1[dsLabel][gstr].counts, mds2[dsLabel][gstr].counts)
+                self.assertTrue(isinstance(mds2[dsLabel].gsIndex, pygsti.objects.dataset._CompactGateStringIndex))
+
+            #errors report the same (absolute) line number
+            msgs = []
+            for numProcs in (1,3):
+                with self.assertRaises(ValueError) as cm:
+                    std.parse_datafile(temp_files + "/sip_parallel_bad.data", numProcs=numProcs)
+                msgs.append(str(cm.exception))
+            self.assertEqual(msgs[0], msgs[1])
+            self.assertTrue("Line 151" in msgs[0])
+        finally:
+            stdin.PARALLEL_MIN_BYTES = orig
+
+
     def test_GateSetFile(self):
 
         gatesetfile_test = \
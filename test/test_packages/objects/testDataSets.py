@@ -4,7 +4,7 @@ import pickle
 import pygsti
 import numpy as np
 import warnings
-import os
+import os, shutil
 from pygsti.construction import std1Q_XYI as std
 
 from ..testutils import BaseTestCase, compare_files, temp_files
@@ -200,6 +200,114 @@ Gx^4 0.2 100
         self.assertEqualDatasets(ds, ds2)
 
 
+    def test_columnar_save_load(self):
+        gs_datagen = std.gs_target.depolarize(gate_noise=0.05)
+        gatestrings = pygsti.construction.make_lsgst_experiment_list(
+            list(std.gs_target.gates.keys()), std.fiducials, std.fiducials, std.germs, [1,2])
+        ds = pygsti.construction.generate_fake_data(gs_datagen, gatestrings, nSamples=100,
+                                                    sampleError="binomial", seed=100)
+        ds.comment = "columnar test"
+        ds.save_columnar(temp_files + "/columnar_dataset.saved")
+
+        ds2 = pygsti.objects.DataSet(fileToLoadFrom=temp_files + "/columnar_dataset.saved")
+        self.assertTrue(ds2._gsTable is not None) # gate strings aren't built on load...
+        self.assertEqual(len(ds2), len(ds))
+        self.assertTrue(ds2._gsTable is not None) # ...or to count them
+        self.assertEqualDatasets(ds, ds2)
+        self.assertEqual(list(ds2.keys()), list(ds.keys()))
+        self.assertEqual([gs.str for gs in ds2.keys()], [gs.str for gs in ds.keys()])
+        self.assertEqual(ds2.comment, "columnar test")
+        self.assertEqual(hash(ds2), hash(ds))
+        ds2.copy_nonstatic().add_count_dict(('Gx',), {'0':10, '1':90}) # memory-mapped data isn't shared
+        ds3 = pickle.loads(pickle.dumps(ds2))
+        self.assertEqualDatasets(ds, ds3)
+
+        with self.assertRaises(ValueError):
+            ds.copy_nonstatic().save_columnar(temp_files + "/columnar_dataset_nonstatic.saved")
+
+        empty = pygsti.objects.DataSet(outcomeLabels=['0','1'])
+        empty.done_adding_data()
+        empty.save_columnar(temp_files + "/columnar_dataset_empty.saved")
+        self.assertEqual(len(pygsti.objects.DataSet(fileToLoadFrom=temp_files + "/columnar_dataset_empty.saved")), 0)
+
+        #load_dataset writes (and reads) its cache in columnar format
+        pygsti.io.write_dataset(temp_files + "/columnar_dataset.txt", ds)
+        pygsti.io.load_dataset(temp_files + "/columnar_dataset.txt", cache=True)
+        ds4 = pygsti.io.load_dataset(temp_files + "/columnar_dataset.txt", cache=True)
+        self.assertTrue(ds4._gsTable is not None)
+        self.assertEqualDatasets(ds, ds4)
+
+
+    def test_compact_gatestring_index(self):
+        ds = pygsti.objects.DataSet(outcomeLabels=['0','1'])
+        ds.add_count_dict( pygsti.obj.GateString(None,"Gx^4"), {'0':10, '1':90} )
+        ds.add_count_dict( ('Gx','Gy'), {'0':20, '1':80} )
+        ds.add_count_dict( (), {'0':30, '1':70} )
+        nonstatic_keys = list(ds.keys())
+        ds.done_adding_data()
+
+        gsIndex = ds.gsIndex
+        self.assertTrue(isinstance(gsIndex, pygsti.objects.dataset._CompactGateStringIndex))
+        self.assertEqual(list(ds.keys()), nonstatic_keys)
+        self.assertEqual([gs.str for gs in ds.keys()], ["Gx^4", "GxGy", "{}"])
+        self.assertTrue( ('Gx','Gy') in ds )
+        self.assertTrue( pygsti.obj.GateString(()) in ds )
+        self.assertFalse( ('Gy','Gx') in ds )
+        self.assertFalse( ('Gz',) in ds )
+        self.assertEqual( ds[('Gx','Gx','Gx','Gx')]['1'], 90 )
+        self.assertEqual( ds[()]['0'], 30 )
+        with self.assertRaises(KeyError):
+            ds[('Gy',)]
+        with self.assertRaises(TypeError):
+            gsIndex[('Gy',)] = slice(0,2) # read-only
+        self.assertEqual(gsIndex, collections.OrderedDict(gsIndex.items()))
+        self.assertEqual(pickle.loads(pickle.dumps(gsIndex)), gsIndex)
+        self.assertEqualDatasets(pickle.loads(pickle.dumps(ds)), ds)
+
+        #static DataSets built directly from a gate string => slice dict also index compactly
+        for bThrow in (True, False):
+            ds_trunc = ds.truncate([('Gx','Gy'), ()], bThrowErrorIfStringIsMissing=bThrow)
+            self.assertTrue(isinstance(ds_trunc.gsIndex, pygsti.objects.dataset._CompactGateStringIndex))
+            self.assertEqual( ds_trunc[()]['0'], 30 )
+        mds = pygsti.objects.MultiDataSet()
+        mds.add_dataset("DS0", ds)
+        self.assertTrue(isinstance(mds["DS0"].gsIndex, pygsti.objects.dataset._CompactGateStringIndex))
+        self.assertEqualDatasets(mds["DS0"], ds)
+
+    def test_counts_array(self):
+        ds = pygsti.objects.DataSet(outcomeLabels=['0','1'])
+        ds.add_count_dict( ('Gx',), {'0':10, '1':90} )
+        ds.add_count_dict( ('Gx','Gy'), {'0':20, '1':80} )
+        ds.add_count_dict( (), {'0':30} )
+        strs = [ ('Gx','Gy'), (), ('Gx',), ('Gx','Gy') ]
+
+        for static in (False, True):
+            if static: ds.done_adding_data()
+            counts = ds.counts_array(strs)
+            self.assertEqual(counts.shape, (4,2))
+            for k,gstr in enumerate(strs):
+                row = ds[gstr]
+                self.assertArraysAlmostEqual(counts[k], [row.counts.get(('0',),0), row.counts.get(('1',),0)])
+            self.assertArraysAlmostEqual(ds.totals_array(strs), [ds[s].total for s in strs])
+            self.assertArraysAlmostEqual(ds.counts_array(strs, ['1','2']),
+                                         [[80,0],[0,0],[90,0],[80,0]])
+            self.assertEqual(ds.counts_array([]).shape, (0,2))
+            self.assertEqual(ds.totals_array([]).shape, (0,))
+
+        #outcome-label indices that aren't in insertion order
+        ds = pygsti.objects.DataSet(outcomeLabelIndices=collections.OrderedDict([(('1',),1),(('0',),0)]))
+        ds.add_count_dict( ('Gx',), {'0':90, '1':10} )
+        ds.done_adding_data()
+        counts = ds.counts_array([('Gx',)])
+        self.assertEqual(counts[0, ds.olIndex[('0',)]], 90)
+        self.assertEqual(counts[0, ds.olIndex[('1',)]], 10)
+
+        cnts = np.empty(2,'d'); totals = np.empty(2,'d')
+        ds.fill_count_vecs(cnts, totals, [('Gx',)], {0: slice(0,2)}, {0: [('1',),('0',)]})
+        self.assertArraysAlmostEqual(cnts, [10,90])
+        self.assertArraysAlmostEqual(totals, [100,100])
+
+
     def test_generate_fake_data(self):
 
         gateset = pygsti.construction.build_gateset( [2], [('Q0',)],['Gi','Gx','Gy','Gz'],
@@ -249,7 +357,8 @@ Gx^4 0.2 100
           # datasets will be equal.
 
 
-        saved_ds = pygsti.io.load_dataset(compare_files + "/Fake_Dataset_none.txt", cache=True)
+        shutil.copy(compare_files + "/Fake_Dataset_none.txt", temp_files + "/Fake_Dataset_none.txt")
+        saved_ds = pygsti.io.load_dataset(temp_files + "/Fake_Dataset_none.txt", cache=True) # cache is written to temp_files
         #print("SAVED = ",saved_ds)
         #print("NONE = ",ds_none)
         self.assertEqualDatasets(ds_none, saved_ds)
@@ -74,7 +74,30 @@ class EvalTreeTestCase(BaseTestCase):
                 ops += len(remainder)
             print("Number of apply ops = ", ops)
             self.assertEqual(ops, t.get_num_applies())
-        #else specific tests for MatrixEvalTree?
+
+            #generations must partition the evaluation order and only
+            # start from elements of earlier generations
+            computed = set()
+            nEvaluated = 0
+            for inds in t.get_evaluation_generations():
+                for i in inds:
+                    iStart,_ = t[i]
+                    self.assertTrue(iStart is None or iStart in computed)
+                computed.update(inds)
+                nEvaluated += len(inds)
+            self.assertEqual(nEvaluated, len(t.get_evaluation_order()))
+        else:
+            #generations must partition the evaluation order and only
+            # depend on initial indices or earlier generations
+            computed = set(t.get_init_indices())
+            nEvaluated = 0
+            for inds, lefts, rights in t.get_evaluation_generations():
+                for i,iLeft,iRight in zip(inds,lefts,rights):
+                    self.assertEqual(t[i], (iLeft,iRight))
+                    self.assertTrue(iLeft in computed and iRight in computed)
+                computed.update(inds)
+                nEvaluated += len(inds)
+            self.assertEqual(nEvaluated, len(t.get_evaluation_order()))
 
         #Split using numSubTrees
         gsl1 = t.generate_gatestring_list()
@@ -121,6 +144,69 @@ class EvalTreeTestCase(BaseTestCase):
             self.assertEqual(sub_gsl,unpermuted_list[fslc])
 
 
+        #Extend a (split) tree built from just the first half of the strings
+        nHalf = len(strs)//2
+        half_compiled, half_lookup, _, _ = gs_target.compile_gatestrings(strs[0:nHalf])
+        t3 = TreeClass()
+        t3.initialize([""] + gateLabels, half_compiled)
+        t3.split(half_lookup, numSubTrees=2)
+        t3.extend_gatestrings(compiled_gatestrings)
+        self.assertFalse(t3.is_split())
+        self.assertEqual(t3.num_final_strings(), len(compiled_gatestrings))
+        self.assertEqual(t3.num_final_elements(), nEls)
+        self.assertEqual(t3.generate_gatestring_list(), [tuple(s) for s in compiled_gatestrings.keys()])
+
+        t3.split(lookup, numSubTrees=5)
+        unpermuted_list = t3.generate_gatestring_list(permute=False)
+        for st in t3.get_sub_trees():
+            self.assertEqual(st.generate_gatestring_list(permute=False),
+                             unpermuted_list[st.final_slice(t3)])
+
+        #Split using measured costs
+        costModel = {'op': 1e-6, 'final': 5e-6}
+        t5 = TreeClass()
+        t5.initialize([""] + gateLabels, compiled_gatestrings)
+        costs = t5.get_element_costs(costModel)
+        self.assertEqual(len(costs), len(t5))
+        gsl1 = t5.generate_gatestring_list()
+        t5.split(lookup, numSubTrees=5, costModel=costModel)
+        self.assertEqual(gsl1, t5.generate_gatestring_list())
+        self.assertEqual(len(t5.distribution['subTreeCosts']), len(t5.get_sub_trees()))
+        unpermuted_list = t5.generate_gatestring_list(permute=False)
+        for st in t5.get_sub_trees():
+            self.assertEqual(st.generate_gatestring_list(permute=False),
+                             unpermuted_list[st.final_slice(t5)])
+
+        with self.assertRaises(ValueError):
+            t4 = TreeClass()
+            t4.initialize([""] + gateLabels, half_compiled)
+            t4.extend_gatestrings(gs_target.compile_gatestrings(strs[1:])[0]) # not a prefix
+
+    def test_matrix_tree_repeat_squaring(self):
+        import pygsti.objects.matrixevaltree as met
+        gs_target = std1Q_XY.gs_target
+        gateLabels = list(gs_target.gates.keys())
+        strs = pygsti.construction.make_lsgst_experiment_list(
+            gateLabels, std1Q_XY.fiducials, std1Q_XY.fiducials, std1Q_XY.germs,
+            [1,2,4,8,16,32], includeLGST=False)
+        pygsti.tools.remove_duplicates_in_place(strs)
+        compiled_gatestrings = gs_target.compile_gatestrings(strs)[0]
+
+        orig = met.MAX_REPEAT_PERIOD
+        try:
+            met.MAX_REPEAT_PERIOD = 0
+            t_plain = pygsti.obj.MatrixEvalTree()
+            t_plain.initialize([""] + gateLabels, compiled_gatestrings)
+        finally:
+            met.MAX_REPEAT_PERIOD = orig
+        t_sq = pygsti.obj.MatrixEvalTree()
+        t_sq.initialize([""] + gateLabels, compiled_gatestrings)
+
+        self.assertEqual(t_sq.generate_gatestring_list(), t_plain.generate_gatestring_list())
+        self.assertLess(len(t_sq.get_evaluation_order()), len(t_plain.get_evaluation_order()))
+        self.assertLessEqual(len(t_sq.get_evaluation_generations()),
+                             len(t_plain.get_evaluation_generations()))
+
 
 
 if __name__ == '__main__':
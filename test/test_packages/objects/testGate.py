@@ -49,6 +49,73 @@ class GateTestCase(BaseTestCase):
         testDeriv = check(gs_target_lp2.gates['Gyi'])
         testDeriv = check(gs_target_lp2.gates['Gcnot'])
 
+    def test_sparse_gate(self):
+        mx = np.array( [[1,0,0,0],
+                        [0,0,0,1],
+                        [0,0,0.9,0],
+                        [0,1,0,0]], 'd')
+        gate = pygsti.objects.SparseGate(mx)
+        self.assertEqual(gate.num_params(), 4)
+        pygsti.objects.gate.check_deriv_wrt_params(gate)
+        self.assertArraysAlmostEqual(gate.sparse_deriv_wrt_params([1,3]).toarray(),
+                                     gate.deriv_wrt_params([1,3]))
+
+        state = np.array([1,2,3,4],'d')
+        gate.from_vector(np.array([1,0.5,0.8,0.7]))
+        self.assertArraysAlmostEqual(gate.acton(state), np.dot(gate.base,state))
+        self.assertArraysAlmostEqual(gate.to_vector(), np.array([1,0.5,0.8,0.7]))
+
+        gate.depolarize(0.1) # keeps sparsity pattern
+        gate[2,2] = 0.5
+        self.assertArraysAlmostEqual(gate.acton(state), np.dot(gate.base,state))
+        with self.assertRaises(ValueError):
+            gate[0,1] = 1.0 # outside of sparsity pattern
+        with self.assertRaises(ValueError):
+            gate.rotate([0.01,0.02,0.03],'gm')
+
+        #zero-valued parameters remain in the pattern of copies
+        gate.from_vector(np.zeros(4,'d'))
+        self.assertEqual(gate.copy().num_params(), 4)
+        self.assertTrue(isinstance(pygsti.objects.gate.convert(gate,"sparse","pp"),
+                                   pygsti.objects.SparseGate))
+        self.assertTrue(isinstance(pygsti.objects.gate.compose(
+            gate, pygsti.objects.StaticGate(mx),"pp"), pygsti.objects.SparseGate))
+
+
+    def test_embedded_gate(self):
+        Gx = pygsti.construction.build_gate([2],[('Q0',)],"X(pi/2,Q0)","pp")
+        Gy = pygsti.construction.build_gate([2],[('Q0',)],"Y(pi/2,Q0)","pp")
+        gate = pygsti.objects.EmbeddedGate(('Q0','Q1'), ('Q1',),
+                                           pygsti.objects.TPParameterizedGate(Gx))
+        self.assertEqual(gate.num_params(), 12)
+        self.assertArraysAlmostEqual(gate, np.kron(np.identity(4), Gx))
+        pygsti.objects.gate.check_deriv_wrt_params(gate)
+
+        gate2 = pygsti.objects.EmbeddedGate(('Q0','Q1','Q2'), ('Q2','Q0'),
+                                            pygsti.objects.FullyParameterizedGate(np.kron(Gx,Gy)))
+        pygsti.objects.gate.check_deriv_wrt_params(gate2)
+        self.assertArraysAlmostEqual(gate2.sparse_deriv_wrt_params([0,5]).toarray(),
+                                     gate2.deriv_wrt_params([0,5]))
+
+        states = np.random.random( (64,3) )
+        self.assertArraysAlmostEqual(gate2.acton(states), np.dot(gate2.base,states))
+        self.assertArraysAlmostEqual(gate2.adjoint_acton(states[:,0]), np.dot(gate2.base.T,states[:,0]))
+
+        v = gate.to_vector(); v[3] += 0.1
+        gate.from_vector(v)
+        self.assertArraysAlmostEqual(gate, np.kron(np.identity(4), gate.embedded_gate))
+        self.assertArraysAlmostEqual(gate.compose(gate.copy()), np.dot(gate,gate))
+
+        with self.assertRaises(ValueError):
+            pygsti.objects.EmbeddedGate(('Q0','Q1'), ('Q0','Q1'),
+                                        pygsti.objects.FullyParameterizedGate(Gx)) # wrong dimension
+        with self.assertRaises(ValueError):
+            pygsti.objects.EmbeddedGate(('Q0','Q1'), ('Q2',),
+                                        pygsti.objects.FullyParameterizedGate(Gx)) # bad label
+        with self.assertRaises(ValueError):
+            gate.depolarize(0.1)
+
+
     def test_gate_base(self):
         #check that everything is not implemented
         gate = pygsti.objects.Gate(4)
@@ -100,6 +167,9 @@ class GateTestCase(BaseTestCase):
         gates_to_test.append( pygsti.objects.StaticGate(mx) )
         gates_to_test.append( pygsti.objects.FullyParameterizedGate(mx) )
         gates_to_test.append( pygsti.objects.TPParameterizedGate(mx) )
+        gates_to_test.append( pygsti.objects.SparseGate(mx) )
+        gates_to_test.append( pygsti.objects.EmbeddedGate(
+            ('Q0',), ('Q0',), pygsti.objects.FullyParameterizedGate(mx)) )
 
         parameterArray = np.zeros(2,'d')
         parameterToBaseIndicesMap = {0: [(0,3),(3,0)], 1: [(1,2),(2,1)] }
@@ -240,6 +240,31 @@ class TestGateSetMethods(GateSetTestCase):
         self.assertArraysAlmostEqual(bulk_prods3[0],p1)
         self.assertArraysAlmostEqual(bulk_prods3[1],p2)
 
+        #Compare generation-batched and node-by-node product caches
+        gatestrings = pygsti.construction.gatestring_list(
+            [ ('Gx',)*k + ('Gy',)*j for k in range(5) for j in range(5) ])
+        evt4,_,_ = self.gateset.bulk_evaltree( gatestrings )
+        for psmall in (PORIG, 10):
+            pygsti.objects.gatematrixcalc.PSMALL = psmall
+            pygsti.objects.gatematrixcalc.BATCH_GENERATIONS = False
+            prods_node, scales_node = self.gateset.bulk_product(evt4, bScale=True)
+            pygsti.objects.gatematrixcalc.BATCH_GENERATIONS = True
+            prods_gen, scales_gen = self.gateset.bulk_product(evt4, bScale=True)
+            self.assertArraysAlmostEqual(prods_node, prods_gen)
+            self.assertArraysAlmostEqual(scales_node, scales_gen)
+        pygsti.objects.gatematrixcalc.PSMALL = PORIG
+
+        BORIG = pygsti.objects.gatematrixcalc.BATCH_MAX_ELEMENTS
+        pygsti.objects.gatematrixcalc.BATCH_GENERATIONS = False
+        dprods_node = self.gateset.bulk_dproduct(evt4)
+        pygsti.objects.gatematrixcalc.BATCH_GENERATIONS = True
+        dprods_gen = self.gateset.bulk_dproduct(evt4)
+        pygsti.objects.gatematrixcalc.BATCH_MAX_ELEMENTS = 100 # force several batches per generation
+        dprods_gen2 = self.gateset.bulk_dproduct(evt4)
+        pygsti.objects.gatematrixcalc.BATCH_MAX_ELEMENTS = BORIG
+        self.assertArraysAlmostEqual(dprods_node, dprods_gen)
+        self.assertArraysAlmostEqual(dprods_node, dprods_gen2)
+
 
         #tag on a few extra EvalTree tests
         debug_stuff = evt.get_analysis_plot_infos()
@@ -398,6 +423,16 @@ class TestGateSetMethods(GateSetTestCase):
             self.assertArraysAlmostEqual(probs_to_fill[ lookup[i] ],
                                          mprobs_to_fill[ mlookup[i] ], places=FD_JAC_PLACES)
 
+        #test block-propagation of map-calc states
+        BLOCK_ORIG = pygsti.objects.gatemapcalc.BLOCK_PROPAGATION
+        pygsti.objects.gatemapcalc.BLOCK_PROPAGATION = not BLOCK_ORIG
+        mprobs_to_fill_blk = np.empty( nElements, 'd')
+        self.mgateset.bulk_fill_probs(mprobs_to_fill_blk, mevt)
+        self.assertArraysAlmostEqual(mprobs_to_fill, mprobs_to_fill_blk)
+        self.mgateset.bulk_fill_probs(mprobs_to_fill_blk, mevt_split)
+        self.assertArraysAlmostEqual(mprobs_to_fill_splt, mprobs_to_fill_blk)
+        pygsti.objects.gatemapcalc.BLOCK_PROPAGATION = BLOCK_ORIG
+
         prods = self.gateset.bulk_product(evt) #TODO: test output?
 
 
@@ -579,6 +614,112 @@ class TestGateSetMethods(GateSetTestCase):
 
 
 
+    def test_map_derivative_modes(self):
+        gatestringList = pygsti.construction.gatestring_list(
+            [ (), ('Gx',), ('Gx','Gy'), ('Gx','Gy','Gi','Gx'), ('Gy','Gy','Gy'),
+              ('Gx','Gy','Gy','Gx','Gi'), ('Gi','Gi','Gy','Gx') ])
+        gs = self.gateset.depolarize(gate_noise=0.05, spam_noise=0.02)
+        mgs = gs.copy(); mgs._calcClass = GateMapCalc
+
+        evt,lookup,outcome_lookup = gs.bulk_evaltree(gatestringList)
+        dprobs = np.empty( (evt.num_final_elements(),gs.num_params()), 'd')
+        gs.bulk_fill_dprobs(dprobs, evt)
+
+        mevt,mlookup,moutcome_lookup = mgs.bulk_evaltree(gatestringList)
+        mevt_split = mevt.copy(); mlookup_splt = mevt_split.split(mlookup,numSubTrees=2)
+        mdprobs = np.empty( (mevt.num_final_elements(),gs.num_params()), 'd')
+
+        DERIV_MODE_ORIG = pygsti.objects.gatemapcalc.DERIV_MODE
+        for mode in ("forward","reverse","auto","finitediff"):
+            places = FD_JAC_PLACES if mode == "finitediff" else 7
+            pygsti.objects.gatemapcalc.DERIV_MODE = mode
+            mgs.bulk_fill_dprobs(mdprobs, mevt)
+            for i in range(len(gatestringList)):
+                self.assertArraysAlmostEqual(dprobs[ lookup[i] ], mdprobs[ mlookup[i] ], places=places)
+
+            mgs.bulk_fill_dprobs(mdprobs, mevt_split, wrtBlockSize=3)
+            for i in range(len(gatestringList)):
+                self.assertArraysAlmostEqual(dprobs[ lookup[i] ], mdprobs[ mlookup_splt[i] ], places=places)
+
+            for gstr in gatestringList:
+                mdp = mgs.dprobs(gstr); dp = gs.dprobs(gstr)
+                self.assertArraysAlmostEqual(dp[('0',)], mdp[('0',)], places=places)
+        pygsti.objects.gatemapcalc.DERIV_MODE = DERIV_MODE_ORIG
+
+        with self.assertRaises(ValueError):
+            pygsti.objects.gatemapcalc.DERIV_MODE = "foobar"
+            try: mgs.bulk_fill_dprobs(mdprobs, mevt)
+            finally: pygsti.objects.gatemapcalc.DERIV_MODE = DERIV_MODE_ORIG
+
+
+    def test_map_sparse_gates(self):
+        gatestringList = pygsti.construction.gatestring_list(
+            [ (), ('Gx',), ('Gx','Gy'), ('Gx','Gy','Gi','Gx'), ('Gi','Gi','Gy','Gx') ])
+        gs = self.gateset.depolarize(gate_noise=0.05)
+        gs.gates['Gi'] = pygsti.objects.SparseGate(gs.gates['Gi'])
+        gs.gates['Gy'] = pygsti.objects.StaticGate(gs.gates['Gy'])
+        mgs = gs.copy(); mgs._calcClass = GateMapCalc
+        dprobs = gs.bulk_dprobs(gatestringList)
+
+        SPARSE_MIN_DIM_ORIG = pygsti.objects.gatemapcalc.SPARSE_MIN_DIM
+        for sparse_min_dim in (SPARSE_MIN_DIM_ORIG, 2): # 2 => static gates are also sparse
+            pygsti.objects.gatemapcalc.SPARSE_MIN_DIM = sparse_min_dim
+            mdprobs = mgs.bulk_dprobs(gatestringList)
+            for gstr in gatestringList:
+                self.assertArraysAlmostEqual(dprobs[gstr][('0',)], mdprobs[gstr][('0',)])
+        pygsti.objects.gatemapcalc.SPARSE_MIN_DIM = SPARSE_MIN_DIM_ORIG
+
+
+    def test_embedded_gates(self):
+        gs = pygsti.construction.build_gateset(
+            [4], [('Q0','Q1')],['Gix','Gxi','Gcnot'],
+            [ "X(pi/2,Q1)", "X(pi/2,Q0)", "CX(pi,Q0,Q1)"])
+        Gx = pygsti.construction.build_gate([2],[('Q0',)],"X(pi/2,Q0)","pp")
+        gs.gates['Gix'] = pygsti.objects.EmbeddedGate(('Q0','Q1'), ('Q1',),
+                                                      pygsti.objects.FullyParameterizedGate(Gx))
+        gs.gates['Gxi'] = pygsti.objects.EmbeddedGate(('Q0','Q1'), ('Q0',),
+                                                      pygsti.objects.TPParameterizedGate(Gx))
+        self.assertEqual(gs.gates['Gix'].num_params(), 16) # only local params
+
+        gatestringList = pygsti.construction.gatestring_list(
+            [ (), ('Gix',), ('Gix','Gxi'), ('Gxi','Gcnot','Gix'), ('Gcnot','Gxi','Gxi') ])
+        mgs = gs.copy(); mgs._calcClass = GateMapCalc
+        probs = gs.bulk_probs(gatestringList); mprobs = mgs.bulk_probs(gatestringList)
+        dprobs = gs.bulk_dprobs(gatestringList); mdprobs = mgs.bulk_dprobs(gatestringList)
+        for gstr in gatestringList:
+            for outLbl in probs[gstr]:
+                self.assertAlmostEqual(probs[gstr][outLbl], mprobs[gstr][outLbl])
+                self.assertArraysAlmostEqual(dprobs[gstr][outLbl], mdprobs[gstr][outLbl])
+
+
+    def test_threaded_fills(self):
+        gatestringList = pygsti.construction.gatestring_list(
+            [ (), ('Gx',), ('Gx','Gy'), ('Gx','Gy','Gi','Gx'), ('Gi','Gi','Gy','Gx') ])
+        gs = self.gateset.depolarize(gate_noise=0.05, spam_noise=0.02)
+
+        for calcClass in (pygsti.objects.gatematrixcalc.GateMatrixCalc, GateMapCalc):
+            gs._calcClass = calcClass
+            tgs = gs.copy(); tgs.num_threads = 3
+            self.assertEqual(tgs.copy().num_threads, 3)
+
+            evt,lookup,outcome_lookup = gs.bulk_evaltree(gatestringList)
+            nEls, nP = evt.num_final_elements(), gs.num_params()
+
+            probs = np.empty(nEls, 'd'); tprobs = np.empty(nEls, 'd')
+            gs.bulk_fill_probs(probs, evt); tgs.bulk_fill_probs(tprobs, evt)
+            self.assertArraysAlmostEqual(probs, tprobs)
+
+            dprobs = np.empty((nEls,nP), 'd'); tdprobs = np.empty((nEls,nP), 'd')
+            gs.bulk_fill_dprobs(dprobs, evt)
+            tgs.bulk_fill_dprobs(tdprobs, evt, wrtBlockSize=5) # blocks are computed concurrently
+            self.assertArraysAlmostEqual(dprobs, tdprobs)
+
+            hprobs = np.empty((nEls,nP,nP), 'd'); thprobs = np.empty((nEls,nP,nP), 'd')
+            gs.bulk_fill_hprobs(hprobs, evt)
+            tgs.bulk_fill_hprobs(thprobs, evt, wrtBlockSize1=5, wrtBlockSize2=5)
+            self.assertArraysAlmostEqual(hprobs, thprobs)
+
+
     def test_hessians(self):
         gatestring0 = ('Gi','Gx')
         gatestring1 = ('Gx','Gy')
@@ -1002,6 +1143,41 @@ class TestGateSetMethods(GateSetTestCase):
             self.assertArraysAlmostEqual(bulk_probsA[ lookupA[i] ],
                                          bulk_probsC[ lookupC[i] ])
 
+    def test_calibrated_tree_splitting(self):
+        gatestrings = pygsti.construction.gatestring_list(
+            [ ('Gx',), ('Gy',), ('Gx','Gy'), ('Gy','Gy'), ('Gy','Gx'), ('Gx','Gx','Gx'),
+              ('Gx','Gy','Gx'), ('Gx','Gy','Gy'), ('Gy','Gy','Gy'), ('Gy','Gx','Gx') ])
+        for gs in (self.gateset, self.mgateset):
+            costModel = gs._calc().calibrate_costs(nDerivCols=gs.num_params())
+            self.assertTrue(costModel['op'] > 0 and costModel['final'] > 0)
+
+            evtA,lookupA,_ = gs.bulk_evaltree( gatestrings )
+            evtC,lookupC,_ = gs.bulk_evaltree( gatestrings, minSubtrees=3, costModel=costModel )
+            self.assertEqual(len(evtC.get_sub_trees()), 3)
+            self.assertEqual(len(evtC.distribution['subTreeCosts']), 3)
+            self.assertEqual(evtC.distribute(None)[0], [0,1,2])
+
+            evtD,_,_,lookupD,_ = gs.bulk_evaltree_from_resources(
+                gatestrings, subcalls=['bulk_fill_probs'], calibrate=True)
+
+            bulk_probsA = np.empty( evtA.num_final_elements(), 'd')
+            bulk_probsC = np.empty( evtC.num_final_elements(), 'd')
+            bulk_probsD = np.empty( evtD.num_final_elements(), 'd')
+            gs.bulk_fill_probs(bulk_probsA, evtA)
+            gs.bulk_fill_probs(bulk_probsC, evtC)
+            gs.bulk_fill_probs(bulk_probsD, evtD)
+            for i,gstr in enumerate(gatestrings):
+                self.assertArraysAlmostEqual(bulk_probsA[ lookupA[i] ],
+                                             bulk_probsC[ lookupC[i] ])
+                self.assertArraysAlmostEqual(bulk_probsA[ lookupA[i] ],
+                                             bulk_probsD[ lookupD[i] ])
+
+        #subtrees are assigned to processor groups by (greedily) balancing their costs
+        from pygsti.objects.evaltree import _distribute_by_cost
+        mine, owners = _distribute_by_cost([5,1,1,1,1,1,4], 2, 0)
+        self.assertEqual(mine, [0,2,4])
+        self.assertEqual(sorted(owners.keys()), list(range(7)))
+
 
     def test_failures(self):
 
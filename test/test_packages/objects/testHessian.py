@@ -7,10 +7,14 @@ from pygsti.objects import gatesetfunction as gsf
 from pygsti.objects.gatemapcalc import GateMapCalc
 
 import numpy as np
-import sys, os
+import sys, os, shutil
 
 from ..testutils import BaseTestCase, compare_files, temp_files
 
+def logl_hessian_job(comm, gateset, dataset, checkpointDir):
+    checkpoint = pygsti.objects.BlockCheckpoint(checkpointDir, comm)
+    return pygsti.logl_hessian(gateset, dataset, comm=comm, checkpoint=checkpoint)
+
 
 class TestHessianMethods(BaseTestCase):
 
@@ -334,6 +338,144 @@ class TestHessianMethods(BaseTestCase):
         #TODO: make sure ci_std and ci_std2 are the same
 
 
+    def test_hessian_blocks_and_checkpoint(self):
+        def relerr(a,b): return np.linalg.norm(a-b) / np.linalg.norm(b) # hessian entries are ~1e8
+        chi2, chi2Hessian = pygsti.chi2(self.gateset, self.ds, returnHessian=True)
+        self.assertLess(relerr(pygsti.chi2_hessian(self.gateset, self.ds), chi2Hessian), 1e-10)
+
+        hessian = pygsti.logl_hessian(self.gateset, self.ds)
+        checkpointDir = temp_files + "/hessian_checkpoint"
+        if os.path.isdir(checkpointDir): shutil.rmtree(checkpointDir)
+
+        distributed = pygsti.objects.LocalComm.run(3, logl_hessian_job, self.gateset, self.ds, checkpointDir)
+        self.assertLess(relerr(distributed, hessian), 1e-10)
+        saved = sorted(os.listdir(checkpointDir))
+        self.assertTrue(len(saved) > 1) # one file per block
+
+        os.remove(os.path.join(checkpointDir, saved[0])) # as if the job was killed before saving this block
+        resumed = pygsti.objects.LocalComm.run(3, logl_hessian_job, self.gateset, self.ds, checkpointDir)
+        self.assertLess(relerr(resumed, hessian), 1e-10)
+        self.assertEqual(sorted(os.listdir(checkpointDir)), saved)
+
+        #saved blocks are loaded rather than recomputed: tamper with one and find it in the result
+        # (block files are named <key>_<subtree>_<row-range>_<col-range>.npy)
+        def blk_ranges(fn): return [ [int(i) for i in rng.split('-')] for rng in fn[:-len(".npy")].split('_')[-2:] ]
+        blkFn = [ fn for fn in saved if blk_ranges(fn)[0][0] < blk_ranges(fn)[1][1] ][0] # overlaps upper triangle
+        rows, cols = blk_ranges(blkFn)
+        blkFile = os.path.join(checkpointDir, blkFn)
+        np.save(blkFile, np.load(blkFile) + 1.0)
+        tampered = pygsti.objects.LocalComm.run(3, logl_hessian_job, self.gateset, self.ds, checkpointDir)
+
+        inBlk = np.zeros(hessian.shape, bool); inBlk[rows[0]:rows[1], cols[0]:cols[1]] = True
+        inBlk &= np.triu(np.ones(hessian.shape, bool)) # only the upper triangle of each block is used
+        self.assertTrue(np.allclose((tampered - hessian)[inBlk], 1.0, rtol=0, atol=1e-4))
+        self.assertTrue(np.allclose(np.triu(tampered)[~inBlk], np.triu(hessian)[~inBlk], rtol=1e-10, atol=1e-4))
+
+    def test_approximate_hessian(self):
+        gatestrings = list(self.ds.keys())
+
+        #The approximate hessians are J^T W J, built from the probability jacobian J
+        evt, lookup, outcomes_lookup = self.gateset.bulk_evaltree(gatestrings)
+        KM = evt.num_final_elements(); nP = self.gateset.num_params()
+        probs = np.empty(KM,'d'); dprobs = np.empty((KM,nP),'d')
+        self.gateset.bulk_fill_dprobs(dprobs, evt, prMxToFill=probs)
+        cnts = np.empty(KM,'d'); N = np.empty(KM,'d')
+        self.ds.fill_count_vecs(cnts, N, gatestrings, lookup, outcomes_lookup)
+        logl_chk = np.dot(dprobs.T * (-N/np.maximum(probs,1e-6))[None,:], dprobs)
+        chi2_chk = np.dot(dprobs.T * (2*N/np.clip(probs,1e-4,1e10))[None,:], dprobs)
+
+        def relerr(a,b): return np.linalg.norm(a-b) / np.linalg.norm(b)
+        approx = pygsti.logl_approximate_hessian(self.gateset, self.ds)
+        self.assertArraysAlmostEqual(approx/np.linalg.norm(approx), approx.T/np.linalg.norm(approx))
+        self.assertLess(relerr(approx, logl_chk), 1e-10)
+        self.assertLess(relerr(pygsti.chi2_approximate_hessian(self.gateset, self.ds), chi2_chk), 1e-10)
+
+        #When the data frequencies equal the gate set's probabilities the neglected
+        # second-derivative terms vanish.  This needs a trace-preserving gate set, since
+        # (unlike self.gateset) its probabilities sum to one like the frequencies do.
+        gs_tp = stdxyi.gs_target.depolarize(gate_noise=0.05, spam_noise=0.01)
+        gs_tp.set_all_parameterizations("TP")
+        ds_exact = pygsti.construction.generate_fake_data(gs_tp, gatestrings, 1000000, sampleError="none")
+        for exact_fn, approx_fn in [(pygsti.logl_hessian, pygsti.logl_approximate_hessian),
+                                    (pygsti.chi2_hessian, pygsti.chi2_approximate_hessian)]:
+            self.assertLess(relerr(approx_fn(gs_tp, ds_exact, gatestrings),
+                                   exact_fn(gs_tp, ds_exact, gatestrings)), 1e-5)
+
+        distributed = pygsti.objects.LocalComm.run(3, lambda comm: pygsti.logl_approximate_hessian(
+            self.gateset, self.ds, comm=comm))
+        self.assertLess(relerr(distributed, approx), 1e-10)
+
+        res = pygsti.obj.Results()
+        res.init_dataset(self.ds)
+        res.init_gatestrings(self.gss)
+        res.add_estimate(stdxyi.gs_target.copy(), stdxyi.gs_target.copy(),
+                         [self.gateset]*len(self.maxLengthList), parameters={'objective': 'logl'},
+                         estimate_key="default")
+        est = res.estimates['default']
+        est.add_confidence_region_factory('final iteration estimate', 'final')
+        cfctry = est.get_confidence_region_factory('final iteration estimate', 'final')
+        cfctry.compute_hessian(approximate=True)
+        self.assertTrue(cfctry.has_hessian())
+        cfctry.project_hessian('std')
+
+    def test_batched_fn_confidence_intervals(self):
+        res = pygsti.obj.Results()
+        res.init_dataset(self.ds)
+        res.init_gatestrings(self.gss)
+        res.add_estimate(stdxyi.gs_target.copy(), stdxyi.gs_target.copy(),
+                         [self.gateset]*len(self.maxLengthList), parameters={'objective': 'logl'},
+                         estimate_key="default")
+        est = res.estimates['default']
+        est.add_confidence_region_factory('final iteration estimate', 'final')
+        cfctry = est.get_confidence_region_factory('final iteration estimate', 'final')
+        cfctry.compute_hessian()
+        cfctry.project_hessian('std')
+        ci_std = cfctry.view( 95.0, 'normal', 'std')
+
+        def fnOfVec(v,b):
+            return v[:,0]
+        def fnOfSpam(rhoVecs, povms):
+            return { 'rho%d' % i: float(rho[0]) for i,rho in enumerate(rhoVecs) }
+        fnObjs = [ pygsti.report.reportables.Gate_eigenvalues(self.gateset, 'Gx'),
+                   gsf.gatefn_factory(lambda mx,b: mx[0,:])(self.gateset, 'Gy'),
+                   gsf.vecfn_factory(fnOfVec)(self.gateset, 'rho0', 'prep'),
+                   gsf.spamfn_factory(fnOfSpam)(self.gateset),
+                   pygsti.report.reportables.Gatestring_eigenvalues(self.gateset, ('Gx','Gy')) ]
+
+        def reference_df(fnObj, eps=1e-7):
+            #one-parameter-at-a-time finite differences, each on a fresh copy of the gate set
+            gs0 = ci_std.gateset; vec0 = gs0.to_vector()
+            f0 = fnObj.evaluate(gs0)
+            grads = []
+            for i in range(len(vec0)):
+                gs = gs0.copy(); vec = vec0.copy(); vec[i] += eps
+                gs.from_vector(vec)
+                f = fnObj.evaluate_nearby(gs)
+                grads.append( {ky: (f[ky]-f0[ky])/eps for ky in f0} if isinstance(f0,dict) else (f-f0)/eps )
+
+            Q = ci_std.invRegionQuadcForm
+            def df_of(g): # g has shape (nParams,) + <shape of f0>
+                quad = lambda x: np.sqrt(abs(np.einsum('i...,ij,j...->...', x, Q, x)))
+                return quad(g.real) + 1j*quad(g.imag) if np.iscomplexobj(g) else quad(g)
+            if isinstance(f0,dict):
+                return f0, { ky: df_of(np.array([g[ky] for g in grads])) for ky in f0 }
+            return f0, df_of(np.array(grads))
+
+        batched = ci_std.get_fn_confidence_intervals(fnObjs, returnFnVals=True)
+        for fnObj, (df, f0) in zip(fnObjs, batched):
+            f0_chk, df_chk = reference_df(fnObj)
+            if isinstance(f0, dict):
+                for ky in f0:
+                    self.assertAlmostEqual(f0[ky], f0_chk[ky])
+                    self.assertAlmostEqual(df[ky], df_chk[ky])
+            else:
+                self.assertArraysAlmostEqual(f0, f0_chk)
+                self.assertArraysAlmostEqual(df, df_chk)
+
+        qtys = pygsti.report.reportables.evaluate_all(fnObjs[0:1] + [None], ci_std)
+        self.assertArraysAlmostEqual(qtys[0].get_err_bar(), batched[0][0])
+        self.assertTrue(np.isnan(qtys[1].get_value()))
+
     def test_mapcalc_hessian(self):
         chi2, chi2Hessian = pygsti.chi2(self.gateset, self.ds, 
                                         returnHessian=True)
@@ -16,6 +16,12 @@ def f_vec(x):
 def jac(x):
     return 2*x[None,:]
 
+def rosenbrock_vec(x):
+    return np.array( [10*(x[1]-x[0]**2), 1-x[0]] )
+
+def rosenbrock_jac(x):
+    return np.array( [[-20*x[0], 10], [-1, 0]], 'd')
+
 class TestOptimizeMethods(BaseTestCase):
 
     def setUp(self):
@@ -63,6 +69,44 @@ class TestOptimizeMethods(BaseTestCase):
         pygsti.optimize.check_jac(f_vec, x0, jac(x0), eps=1e-10, tol=1e-6, errType='rel')
         pygsti.optimize.check_jac(f_vec, x0, jac(x0), eps=1e-10, tol=1e-6, errType='abs')
 
+    def test_custom_leastsq(self):
+        x0 = np.array( [-1.2,1.0], 'd')
+        x, converged, msg = pygsti.optimize.custom_leastsq(rosenbrock_vec, rosenbrock_jac, x0,
+                                                           f_norm2_tol=1e-14, jac_norm_tol=1e-14)
+        self.assertTrue(converged)
+        self.assertArraysAlmostEqual(x, np.array([1,1],'d'))
+
+        #buffer-reusing mode (one factorization per outer iteration) finds the same solution
+        x2, converged2, msg2, state = pygsti.optimize.custom_leastsq(
+            rosenbrock_vec, rosenbrock_jac, x0, f_norm2_tol=1e-14, jac_norm_tol=1e-14,
+            reuse_buffers=True, return_state=True)
+        self.assertTrue(converged2)
+        self.assertArraysAlmostEqual(x2, x)
+        self.assertEqual(len(state['history']), state['iter'])
+
+        #an optimization resumed from a saved state gives the same result
+        saved = []
+        pygsti.optimize.custom_leastsq(rosenbrock_vec, rosenbrock_jac, x0, f_norm2_tol=1e-14,
+                                       jac_norm_tol=1e-14, state_callback=saved.append)
+        x3, converged3, msg3 = pygsti.optimize.custom_leastsq(rosenbrock_vec, rosenbrock_jac, x0,
+                                                              f_norm2_tol=1e-14, jac_norm_tol=1e-14,
+                                                              init_state=saved[len(saved)//2])
+        self.assertTrue(converged3)
+        self.assertArraysAlmostEqual(x3, x)
+
+        #saved states aren't overwritten when the optimizer reuses its buffers
+        saved = []
+        pygsti.optimize.custom_leastsq(rosenbrock_vec, rosenbrock_jac, x0, f_norm2_tol=1e-14,
+                                       jac_norm_tol=1e-14, reuse_buffers=True, state_callback=saved.append)
+        self.assertArraysAlmostEqual(saved[0]['x'], x0)
+        self.assertGreater(np.linalg.norm(saved[-1]['x'] - saved[0]['x']), 1.0)
+        x4, converged4, msg4 = pygsti.optimize.custom_leastsq(rosenbrock_vec, rosenbrock_jac, x0,
+                                                              f_norm2_tol=1e-14, jac_norm_tol=1e-14,
+                                                              reuse_buffers=True,
+                                                              init_state=saved[len(saved)//2])
+        self.assertTrue(converged4)
+        self.assertArraysAlmostEqual(x4, x)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
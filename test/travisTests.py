@@ -45,7 +45,7 @@ elif doAlgorithmsB:
     package = 'pygsti.algorithms'
 
 elif doDefault:
-    tests = ['tools', 'iotest', 'optimize', 'construction','extras']
+    tests = ['tools', 'iotest', 'optimize', 'construction','extras','baseobjs']
     #parallel = False #multiprocessing bug in darwin (and apparently TravisCI) causes segfault if used.
 
 elif doMPI: